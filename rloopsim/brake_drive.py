@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+# coding=UTF-8
+
+# File:     brake_drive.py
+# Purpose:  Stepper motor and lead screw dynamics for a brake, integrated with its own sub-step
+# Author:   Ryan Adams (radams@cyandata.com, @ninetimeout)
+# Date:     2017-Feb-13
+
+# Note: The state is the rotor angle and speed (the screw position is angle * pitch / 2pi). The motor pulls the rotor
+#       toward the commanded step angle with -T * sin(N * (angle - commanded)), where T is the pull-out torque at the
+#       commanded step rate and N = steps per revolution / 4 (one electrical cycle is 4 full steps). Against it are the load
+#       from the brake pads through the screw (backdrive efficiency when the load is doing the work, 1/drive efficiency
+#       when the motor is), the negator (always toward extend), damping and the detent torque (as friction).
+# Note: If the load gets more than a cycle ahead of or behind the command, the rotor settles a whole number of cycles
+#       away from it -- those are lost steps. The FCU only finds out from the MLP and the limit switches, as on the pod.
+#       With the motor unpowered only the detent torque holds the screw, so the negator and the pads backdrive it.
+# Note: The drive is integrated with its own sub-step (semi-implicit Euler), so the brakes move accurately with a 1-5 ms
+#       sim step. The FCU's steps during a sim step (its position at the end, see fcu.StepDriveBridge) are spread
+#       over the sub-steps. When the drive is at rest (no command change, settled, and the load within what the motor
+#       or the detent can hold) the sub-steps are skipped and the rotor is just moved to the (slowly changing) equilibrium.
+# Note: Without the FCU, the drive makes its own steps toward the screw position for the brake's gap target, at the
+#       rate that moves the screw between the limit switches in gap.gap_close_min_time, ramping the rate up and down by
+#       motor.step_ramp (a stepper can't start at full speed). Fully applying or retracting drives the screw a full step
+#       past the limit switch (the gap stops at the switch).
+
+import math
+from bisect import bisect_right
+
+from units import Units
+from hot_logging import get_logger
+
+
+class StepperDrive(object):
+    """ A brake's stepper motor, negator and lead screw """
+
+    # At rest if the speed and the distance from equilibrium are below these (rad/s, rad)
+    REST_SPEED = 0.05
+    REST_ANGLE = 0.0005
+    REST_TORQUE = 1e-6   # N*m, slack on the detent (the rotor creeps up to the edge of what it holds)
+
+    def __init__(self, brake, sub_step_usec):
+        self.brake = brake
+        self.config = brake.config.motor
+        self.logger = get_logger("StepperDrive")
+        self.sub_step_usec = sub_step_usec
+
+        self.steps_per_rev = int(self.config.steps_per_revolution or 200)   # Full steps
+        self.microsteps = int(self.config.microsteps or 8)
+        self.step_angle = 2 * math.pi / (self.steps_per_rev * self.microsteps)   # Command resolution
+        self.n_teeth = self.steps_per_rev / 4.0
+        self.holding_torque = Units.SI(self.config.holding_torque or '2.8 N*m')
+        self.detent_torque = Units.SI(self.config.detent_torque or '0.05 N*m')
+        self.damping = Units.SI(self.config.damping or '0.005 N*m*s/rad')
+        self.step_ramp = Units.SI(self.config.step_ramp or '5000 Hz/s') * self.microsteps  # For our own steps
+
+        # Pull-out torque vs speed (linear between the points, the last torque past the end)
+        curve = self.config.torque_curve or [['0 rpm', '2.8 N*m'], ['2000 rpm', '0 N*m']]
+        self.curve_speeds = [Units.SI(speed) for speed, torque in curve]
+        self.curve_torques = [Units.SI(torque) for speed, torque in curve]
+        self.curve_slopes = [(t1 - t0) / (s1 - s0) for s0, s1, t0, t1 in zip(self.curve_speeds, self.curve_speeds[1:],
+                                                                           self.curve_torques, self.curve_torques[1:])] + [0.0]
+
+        # Lead screw
+        self.pitch = brake.screw_pitch
+        self.meters_per_radian = self.pitch / (2 * math.pi)
+        self.drive_efficiency = brake.drive_efficiency
+        self.backdrive_efficiency = brake.backdrive_efficiency
+        self.negator_torque = brake.negator_torque
+        self.angle_range = (Units.SI(brake.config.lead_screw.range_min or '0 um') / self.meters_per_radian,
+                            Units.SI(brake.config.lead_screw.range_max or '75000 um') / self.meters_per_radian)
+
+        # Rotor, screw and the brake carriage (reflected through the screw)
+        self.inertia = (Units.SI(self.config.rotor_inertia or '480 g*cm^2') + Units.SI(self.config.screw_inertia or '100 g*cm^2')
+                        + Units.SI(self.config.carriage_mass or '12.3 kg') * self.meters_per_radian**2)
+
+        self.reset(brake.screw_pos)
+
+    def reset(self, screw_pos):
+        self.angle = screw_pos / self.meters_per_radian
+        self.speed = 0.0
+        self.energized = True
+        self.command = self.angle      # Commanded angle (a whole number of steps from the start)
+        self.target = self.angle       # For our own steps (no FCU)
+        self.external = False          # True once the FCU is commanding us
+        self._command_um = None        # Latest FCU position (microns)
+        self._last_command_um = None   # FCU position at the last step
+        self._step_fraction = 0.0
+        self._step_rate = 0.0          # Current rate of our own steps
+        self.lost_steps = 0
+        self.at_rest = True
+        self.motor_torque = 0.0
+        self.load_torque = 0.0
+
+    @property
+    def screw_pos(self):
+        return self.angle * self.meters_per_radian
+
+    def set_step_rate(self, step_rate):
+        """ (Micro)steps per second, for our own steps """
+        self.step_rate = step_rate
+
+    def set_target(self, screw_pos):
+        """
+        Move (with our own steps) to the nearest step to screw_pos. A limit switch is driven a full step past (the rotor
+        settles up to a full step short of its command under load), so that the switch is sure to be reached.
+        """
+        steps = (screw_pos / self.meters_per_radian - self.command) / self.step_angle
+        if screw_pos <= self.brake.screw_limit_sw_retract:
+            steps = math.floor(steps) - self.microsteps
+        elif screw_pos >= self.brake.screw_limit_sw_extend:
+            steps = math.ceil(steps) + self.microsteps
+        else:
+            steps = round(steps)
+        self.target = self.command + steps * self.step_angle
+
+    def force_position(self, position_um):
+        """ The FCU has set its idea of our position (the steps after this are relative to it) """
+        self._command_um = self._last_command_um = position_um
+
+    def command_position(self, position_um):
+        """ The FCU's latest position. Only the change in position matters (the FCU has its own idea of where zero is). """
+        self.external = True
+        self._command_um = position_um
+
+    def _take_commands(self):
+        """ The angle the FCU has commanded since the last step """
+        position_um, last = self._command_um, self._last_command_um
+        if position_um == last:
+            return 0.0
+        self._last_command_um = position_um
+        if last is None:
+            return 0.0  # Note: no reference yet (see force_position())
+        return (position_um - last) * 1e-6 / self.meters_per_radian
+
+    def is_steady(self):
+        """ At rest with no steps to make (the next step will only move the rotor to its equilibrium) """
+        return self.at_rest and self._command_um == self._last_command_um and (self.external or self.target == self.command)
+
+    def available_torque(self, speed):
+        """ Pull-out torque at a step rate of speed (rad/s) """
+        speed = abs(speed)
+        i = bisect_right(self.curve_speeds, speed) - 1
+        return self.curve_torques[i] + self.curve_slopes[i] * (speed - self.curve_speeds[i])
+
+    def step(self, dt_usec, axial_force):
+        """
+        Move for dt_usec with the given force on the screw (N, + toward extend; held for the step). Returns the screw position.
+        """
+        step_angle = self.step_angle
+
+        # Command at the end of this step
+        if self.external:
+            command_end = self.command + self._take_commands()
+        elif self.target != self.command:
+            # Trapezoidal step rate (slowing down in time to stop at the target)
+            dt = dt_usec / 1000000.0
+            remaining = int(round((self.target - self.command) / step_angle))
+            rate = min(self.step_rate, self._step_rate + self.step_ramp * dt, math.sqrt(2.0 * self.step_ramp * abs(remaining)))
+            steps = self._step_fraction + (self._step_rate + rate) / 2.0 * dt
+            n_steps = min(abs(remaining), int(steps))
+            if n_steps < abs(remaining):
+                self._step_fraction = steps - n_steps
+                self._step_rate = rate
+                command_end = self.command + math.copysign(n_steps, remaining) * step_angle
+            else:
+                self._step_fraction = self._step_rate = 0.0
+                command_end = self.target  # Note: exactly, so that we know we've arrived
+        else:
+            command_end = self.command
+
+        # Load torque (on the rotor, + toward extend)
+        screw_torque = axial_force * self.meters_per_radian
+        negator_torque = self.negator_torque
+
+        if command_end == self.command and self._rest(screw_torque, negator_torque):
+            return self.angle * self.meters_per_radian
+
+        self.at_rest = False
+        n = max(1, int(round(dt_usec / self.sub_step_usec)))
+        h = dt_usec / 1000000.0 / n
+        command_start = self.command
+        command_steps = (command_end - command_start) / step_angle  # Whole (micro)steps unless the FCU's are finer
+        n_teeth = self.n_teeth
+        available_torque = self.available_torque((command_end - command_start) / (dt_usec / 1000000.0)) if self.energized else 0.0
+        detent = self.detent_torque
+        damping = self.damping
+        inertia = self.inertia
+        load_assist = screw_torque * self.backdrive_efficiency + negator_torque
+        load_oppose = screw_torque / self.drive_efficiency + negator_torque
+        angle_min, angle_max = self.angle_range
+
+        angle = self.angle
+        speed = self.speed
+        motor_torque = 0.0
+        load = load_assist
+        for k in xrange(1, n + 1):
+            # The commanded steps are spread evenly over the step
+            command = command_start + round(command_steps * k / n) * step_angle if k < n else command_end
+
+            # Note: the load does the work (backdrive) if it's turning the screw the way it's going
+            load = load_assist if speed * screw_torque >= 0.0 else load_oppose
+            motor_torque = -available_torque * math.sin(n_teeth * (angle - command))
+            torque = motor_torque + load - damping * speed
+
+            # Detent (as friction)
+            if speed == 0.0 and abs(torque) <= detent:
+                continue
+            torque -= math.copysign(detent, speed if speed != 0.0 else torque)
+            new_speed = speed + torque / inertia * h
+            if new_speed * speed < 0.0 and abs(motor_torque + load) <= detent:
+                new_speed = 0.0  # Stopped by the detent
+            speed = new_speed
+            angle += speed * h
+
+            # Hard stops
+            if angle < angle_min:
+                angle, speed = angle_min, 0.0
+            elif angle > angle_max:
+                angle, speed = angle_max, 0.0
+
+        self.angle = angle
+        self.speed = speed
+        self.command = command_end
+        self.motor_torque = motor_torque
+        self.load_torque = load
+        return angle * self.meters_per_radian
+
+    def _rest(self, screw_torque, negator_torque):
+        """ If we're settled and can hold the load, stay (or move to the equilibrium) and return True """
+        if abs(self.speed) > self.REST_SPEED:
+            return False
+        load = screw_torque * self.backdrive_efficiency + negator_torque
+        motor_torque = -self.holding_torque * math.sin(self.n_teeth * (self.angle - self.command)) if self.energized else 0.0
+
+        # Held where we are by the detent
+        if abs(motor_torque + load) <= self.detent_torque + self.REST_TORQUE:
+            self.speed = 0.0
+            self._settled(load, motor_torque)
+            return True
+
+        # Held against a hard stop (e.g. after losing steps)
+        angle_min, angle_max = self.angle_range
+        if (self.angle <= angle_min and motor_torque + load <= 0.0) or (self.angle >= angle_max and motor_torque + load >= 0.0):
+            self.speed = 0.0
+            self._settled(load, motor_torque)
+            return True
+        if not self.energized or abs(load) >= self.holding_torque + self.detent_torque:
+            return False
+
+        # Close to the stable point nearest the rotor (offset by the load, less what the detent takes up)
+        cycle = 2 * math.pi / self.n_teeth
+        center = self.command + round((self.angle - self.command) / cycle) * cycle
+        motor_load = load - math.copysign(self.detent_torque, load)
+        equilibrium = center + math.asin(motor_load / self.holding_torque) / self.n_teeth
+        if abs(self.angle - equilibrium) > self.REST_ANGLE:
+            return False
+        self.angle = equilibrium
+        self.speed = 0.0
+        self._settled(load, -motor_load)
+        return True
+
+    def _settled(self, load_torque, motor_torque):
+        self.load_torque = load_torque
+        self.motor_torque = motor_torque
+        if self.at_rest:
+            return
+        self.at_rest = True
+
+        # Count the (full) steps we've lost (+ = the rotor is short of the command in the extend direction)
+        # Note: the rotor settles a whole number of electrical cycles (4 full steps) from the command
+        lost_steps = int(round((self.command - self.angle) / (2 * math.pi / self.n_teeth))) * 4
+        if lost_steps != self.lost_steps:
+            self.logger.warning("Brake {} motor lost {} steps; it's now {} steps from where it was commanded (load torque {:.2f} N*m)",
+                                self.brake.config.id, abs(lost_steps - self.lost_steps), lost_steps, load_torque)
+            self.lost_steps = lost_steps
@@ -33,38 +33,168 @@ import numpy as np
 import logging
 
 from units import Units
+from hot_logging import get_logger
 from config import Config
+from force_models import load_force_model
+from brake_drive import StepperDrive
+
+class BrakeArray(object):
+    """
+    All of the pod's brakes. Their state is kept here, one list entry per brake, and stepped together; the Brake objects
+    (brakes[i]) are views onto it, so the FCU callbacks etc. work on a single brake as before.
+    """
+    # Note: the forces only depend on the gap and the pod's velocity, so they're calculated once per step for each
+    #       distinct gap -- brakes that are applied or retracted together (the usual case) share the calculation.
+    # Note: the state is in lists rather than numpy arrays -- with 2 (or 4) brakes the per-call overhead of numpy is
+    #       more than the whole step.
 
-class Brakes(object):
     def __init__(self, sim, config):
         self.sim = sim
         self.config = config  # Note: this is a list of configurations
         
-        # print "Config: {}".format(self.config)
-        
+        # State (index = brake)
+        self.gap = []
+        self.gap_target = []
+        self.screw_pos = []
+        self.mlp_raw = []
+        self.retract_sw_activated = []
+        self.extend_sw_activated = []
+        self.normal_force = []
+        self.drag_force = []
+        self.last_normal_force = []
+        self.last_drag_force = []
+        self.drive_torque_reqd = []
+        self.backdrive_torque_applied = []
+
+        # Constants (set by each Brake)
+        self.gap_close_speed = []
+        self.drive_torque_multiplier = []
+        self.backdrive_torque_multiplier = []
+        self.negator_torque = []
+
+        self.force_model = None
         self._list = []
-                
         for i, brake_config in self.config.iteritems():
-            self._list.append( Brake(self.sim, Config(brake_config)) )
-
-        # Testing movement
+            self._list.append( Brake(self.sim, Config(brake_config), self) )
+
+        self._indices = range(len(self._list))
+
+        # Stepper motor and lead screw dynamics (see brake_drive.py). Without them the gap just moves at gap_close_speed.
+        drive_config = self.sim.config.pod.brake_drive
+        self.drives = None
+        if drive_config is not None and drive_config.enabled:
+            sub_step_usec = Units.usec(drive_config.sub_step or '100 usec')
+            self.drives = [StepperDrive(brake, sub_step_usec) for brake in self._list]
+            for brake, drive in zip(self._list, self.drives):
+                brake.drive = drive
+                brake.apply_config()
+        self._drive_gap_target = [None] * len(self._list)  # Gap target we last gave each drive
+
+    def _add(self):
+        """ Add the state for a new brake and return its index (called by Brake) """
+        idx = len(self.gap)
+        for values in (self.gap, self.gap_target, self.screw_pos, self.mlp_raw, self.normal_force, self.drag_force,
+                       self.last_normal_force, self.last_drag_force, self.drive_torque_reqd, self.backdrive_torque_applied,
+                       self.gap_close_speed, self.drive_torque_multiplier, self.backdrive_torque_multiplier, self.negator_torque):
+            values.append(0.0)
+        self.retract_sw_activated.append(False)
+        self.extend_sw_activated.append(False)
+        return idx
 
     def __getitem__(self, idx):
         return self._list[idx]
 
+    def __len__(self):
+        return len(self._list)
+
     def __repr__(self):
-        return 'Brakes(' + str(self._list) + ')'
+        return 'BrakeArray(' + str(self._list) + ')'
 
     def __str__(self):
         return str(self._list)
 
     def get_gaps(self):
         # Note: we always only have 2 brakes
-        return (self._list[0].gap, self._list[1].gap)
+        return (self.gap[0], self.gap[1])
 
-    def step(self, dt_usec):
+    def step(self, dt_usec, indices=None):
+        """ Step all of the brakes (or just the given ones) """
+        v = self.sim.pod.velocity
+        dt = dt_usec / 1000000.0
+        fn = self.force_model.fn
+
+        gaps = self.gap
+        targets = self.gap_target
+        normal_forces = self.normal_force
+        drag_forces = self.drag_force
+        last_normal_forces = self.last_normal_force
+        last_drag_forces = self.last_drag_force
+        drives = self.drives
+
+        forces = {}  # gap -> (F_normal, F_drag) at this step's velocity
+        for i in (self._indices if indices is None else indices):
+            last_normal_forces[i] = normal_forces[i]
+            last_drag_forces[i] = drag_forces[i]
+
+            gap = gaps[i]
+            target = targets[i]
+            if drives is not None:
+                # Move the screw, with the pads' force on it from the last step
+                drive = drives[i]
+                brake = self._list[i]
+                if target != self._drive_gap_target[i]:
+                    drive.set_target(brake.screw_pos_for_gap(target))
+                    self._drive_gap_target[i] = target
+                screw_pos = drive.step(dt_usec, -(normal_forces[i] * 0.292371705 + drag_forces[i] * 0.956304756))
+                gap = brake.set_screw_pos(screw_pos)
+            # TESTING ONLY -- move the gap to the target
+            # @todo: need to convert this to use screw positioning for it to work for testing
+            elif gap > target:
+                gap = max(gap - self.gap_close_speed[i] * dt, target)  # Note: stop at the target rather than dithering around it
+                gaps[i] = gap
+            elif gap < target:
+                gap = min(gap + self.gap_close_speed[i] * dt, target)
+                gaps[i] = gap
+            # /TESTING
+
+            # Calculate normal (normal force) and drag
+            # @see https://rloop.slack.com/archives/eng-numsim/p1484029898001697
+            # Note: the formulas are in conf/force_models/a34_brake.json (fitted to the A34 data, see force_models.py)
+            F = forces.get(gap)
+            if F is None:
+                F = forces[gap] = fn(gap, v)  # Newtons, For one brake
+            F_normal, F_drag = F
+
+            # Save the normal force (to be used for logging) and the drag force (to be used by BrakeForce)
+            # Note: the model's drag is half of the A34 drag (which is for both brakes) @TODO @todo: Confirm brake strength from A34 data!!
+            normal_forces[i] = F_normal
+            drag_forces[i] = F_drag
+
+            # Get linear force acting on lead screw due to the brakes
+            # Note: Formula has a 17 degree angle to the rail. normal force is normal to the rail, drag force is parallel to it. 
+            # Force applied to screw is normal*sin(17) + drag*cos(17)
+            F_screw = F_normal * 0.292371705 + F_drag * 0.956304756
+
+            # Convert linear force to drive torque (motor driven) and backdrive torque (driven by linear force on the screw)
+            # Formulas: http://www.nookindustries.com/LinearLibraryItem/Ballscrew_Torque_Calculations
+            # Note: Drive and backdrive torques are only used to see if the motor can handle the load
+            # Negator Torque. Since the negator attempts to drive the screw in the -x direction (which deploys the brakes), we subtract it
+            negator_torque = self.negator_torque[i]
+            self.drive_torque_reqd[i] = F_screw * self.drive_torque_multiplier[i] - negator_torque
+            self.backdrive_torque_applied[i] = F_screw * self.backdrive_torque_multiplier[i] - negator_torque
+
+    def is_steady(self):
+        """ True if none of the brakes is moving or about to (see fast_forward.py) """
+        if self.drives is None:
+            return self.gap == self.gap_target
+        for i, drive in enumerate(self.drives):
+            if self.gap_target[i] != self._drive_gap_target[i] or not drive.is_steady():
+                return False
+        return True
+
+    def reset(self):
         for brake in self._list:
-            brake.step(dt_usec)
+            brake.reset()
 
     def close_now(self):
         # Close the brakes NOW (no waiting -- just for simulation testing)
@@ -73,16 +203,16 @@ class Brakes(object):
             brake._gap_target = brake.minimum_gap  # TESTING -- the brakes will move back apart if this isn't set. 
 
     def _move_to_gap_target(self, gap_target):
-        for brake in self._list:
-            brake._move_to_gap_target(gap_target)
+        for i in self._indices:
+            self.gap_target[i] = gap_target
 
     def get_drag(self, brake_index=None):
-        tl_force = 0.0
-        
+        return sum(self.drag_force)
+
+    def set_motor_power(self, energized):
+        """ Power the brake motors on or off (off, the negator closes the brakes) """
         for brake in self._list:
-            tl_force += brake.get_drag()
-        
-        return tl_force
+            brake.set_motor_power(energized)
 
     def apply(self):
         # Apply the brakes (move to min gap from current pos)
@@ -96,8 +226,21 @@ class Brakes(object):
 
     def hold(self):
         # Keep the brakes where they are
-        for brake in self._list:
-            brake.hold()
+        self.gap_target[:] = self.gap
+
+
+# Note: the old name (a list of Brake objects)
+Brakes = BrakeArray
+
+
+def _brake_view(name):
+    """ A Brake attribute that's stored in its BrakeArray """
+    def get(self):
+        return getattr(self.array, name)[self.idx]
+    def set(self, value):
+        getattr(self.array, name)[self.idx] = value
+    return property(get, set)
+
 
 class MLP:
     """ Linear Positioning Sensor """
@@ -127,16 +270,36 @@ class MLP:
         # Maybe we should let the holder of the MLP determine these values and do the mapping? 
         
 
-class Brake:
+class Brake(object):
     """
-    Model of a single braking unit
+    Model of a single braking unit (a view onto its entries in the BrakeArray)
     """
-    
-    def __init__(self, sim, config):
+
+    # State and constants, kept in the BrakeArray
+    gap = _brake_view('gap')
+    _gap_target = _brake_view('gap_target')
+    screw_pos = _brake_view('screw_pos')
+    mlp_raw = _brake_view('mlp_raw')
+    retract_sw_activated = _brake_view('retract_sw_activated')
+    extend_sw_activated = _brake_view('extend_sw_activated')
+    normal_force = _brake_view('normal_force')
+    drag_force = _brake_view('drag_force')
+    last_normal_force = _brake_view('last_normal_force')
+    last_drag_force = _brake_view('last_drag_force')
+    drive_torque_reqd = _brake_view('drive_torque_reqd')
+    backdrive_torque_applied = _brake_view('backdrive_torque_applied')
+    negator_torque = _brake_view('negator_torque')
+    _gap_close_speed = _brake_view('gap_close_speed')
+    _drive_torque_multiplier = _brake_view('drive_torque_multiplier')
+    _backdrive_torque_multiplier = _brake_view('backdrive_torque_multiplier')
+
+    def __init__(self, sim, config, array):
         self.sim = sim
         self.config = config
+        self.array = array
+        self.idx = array._add()
 
-        self.logger = logging.getLogger("Brake")
+        self.logger = get_logger("Brake")
 
         # Limit Switches
         # Switch activation: We only want to call the callback when the switch is tripped, not repeatedly
@@ -150,6 +313,7 @@ class Brake:
         # Screw pos is the main value from which we calculate the gap and MLP values. [0, 75000]um fully retracted to fully extended (maps to brake gap)
         # Note: screw position is updated by the callback from the FCU
         self.gap = Units.SI(self.config.gap.initial_gap)
+        self._initial_gap = self.gap  # For reset()
         #print "Gap after conversion is {}".format(self.gap)
         #exit()
         self.retracted_gap = Units.SI(self.config.gap.retracted_gap)
@@ -160,27 +324,34 @@ class Brake:
         self.screw_limit_sw_retract = Units.SI(self.config.lead_screw.limit_sw_retract)
         self.screw_limit_sw_extend = Units.SI(self.config.lead_screw.limit_sw_extend)
         self.screw_range = [self.screw_limit_sw_retract, self.screw_limit_sw_extend]
-        # Calculate initial screw position from the initial gap (note: during processing it's the other way around)
-        self.screw_pos = np.interp(self.gap, self.gap_range, self.screw_range)
-        
         # Linear Position Sensor
         # @todo: check this to make sure the min/max are in the correct order -- should be retracted->extended
         self.mlp_range = [self.config.mlp.raw_min, self.config.mlp.raw_max]
-        # Calculate raw MLP value from the screw position
 
-        print("{}, {}, {}".format(self.screw_pos, self.screw_range, self.mlp_range))
+        # Linear maps from the screw position (for set_screw_pos(), which is called every step)
+        self._gap_per_screw = (self.extended_gap - self.retracted_gap) / (self.screw_limit_sw_extend - self.screw_limit_sw_retract)
+        self._mlp_per_screw = float(self.mlp_range[1] - self.mlp_range[0]) / (self.screw_limit_sw_extend - self.screw_limit_sw_retract)
 
+        # Calculate initial screw position from the initial gap (note: during processing it's the other way around)
+        # Note: not np.interp() -- the gap range is decreasing
+        self.screw_pos = self.screw_pos_for_gap(self.gap)
+        # Calculate raw MLP value from the screw position
         self.mlp_raw = np.interp(self.screw_pos, self.screw_range, self.mlp_range)
 
         # Negator 
         self.negator_torque = Units.SI(self.config.negator.torque)
 
+        # Normal and drag force model (shared by all of the brakes)
+        force_config = self.sim.config.pod.forces.brakes
+        self.force_model = load_force_model(force_config.model or 'conf/force_models/a34_brake.json', bool(force_config.use_table))
+        self.array.force_model = self.force_model
+
+        # Stepper motor and lead screw (set by the BrakeArray if brake_drive is enabled)
+        self.drive = None
+
         # TESTING ONLY
         self._gap_target = self.gap  # Initialize to current value so we don't move yet
-        self._gap_close_time = Units.SI(self.config.gap_close_min_time)
-        self._gap_close_dist = self.retracted_gap - self.extended_gap
-        self._gap_close_speed = self._gap_close_dist / self._gap_close_time  # meters/second -- this is just a guess -- .007 m/s = closing 21mm in 3s
-        #self.logger.debug("Brake gap close speed: {} m/s".format(self._gap_close_speed))
+        self.apply_config()
         # /TESTING
         
         self.normal_force = 0.0  # N -- normal against the rail; +normal is away from the rail
@@ -205,28 +376,70 @@ class Brake:
         # Step size: .05  # Half steps
         # => 400 steps per revolution at half steps
     
-    def stepdrive_update_position(self, u8Step, u8Dir, s32Position):
-        # Note: the only thing we need here is s32Position, which represents the new position of the screw in microns [0, 75000]um
-        # u8Step is always 1, indicating that a step has occured
-        # u8Dir is the direction of the step (0=counterclockwise, 1=clockwise ?)
-        
-        self.screw_pos = s32Position # Note: this is in microns. No need to convert since it's always in microns (we calculate it initially from brake gap)
-
-        self.gap = np.interp(self.screw_pos, self.screw_range, self.gap_range)
+    def apply_config(self):
+        """ (Re)calculate the values that can be changed mid-run (e.g. by LiveConfigEditor) """
+        # TESTING ONLY
+        self._gap_close_time = Units.SI(self.config.gap.gap_close_min_time)
+        self._gap_close_dist = self.retracted_gap - self.extended_gap
+        self._gap_close_speed = self._gap_close_dist / self._gap_close_time  # meters/second -- this is just a guess -- .007 m/s = closing 21mm in 3s
+        #self.logger.debug("Brake gap close speed: {} m/s".format(self._gap_close_speed))
+        if self.drive is not None:
+            # Same speed for the screw (between the limit switches), in steps per second
+            screw_speed = (self.screw_limit_sw_extend - self.screw_limit_sw_retract) / self._gap_close_time
+            self.drive.set_step_rate(screw_speed / (self.drive.meters_per_radian * self.drive.step_angle))
+
+    def reset(self):
+        """ Return to the initial gap (see Sim.reset()) """
+        self.gap = self._initial_gap
+        self.screw_pos = self.screw_pos_for_gap(self.gap)
         self.mlp_raw = np.interp(self.screw_pos, self.screw_range, self.mlp_range)
+        self.retract_sw_activated = False
+        self.extend_sw_activated = False
+        self._gap_target = self.gap
+
+        self.normal_force = 0.0
+        self.drag_force = 0.0
+        self.last_normal_force = 0.0
+        self.last_drag_force = 0.0
+
+        if self.drive is not None:
+            self.drive.reset(self.screw_pos)
+            self.array._drive_gap_target[self.idx] = None
+
+    def screw_pos_for_gap(self, gap):
+        screw_pos = self.screw_limit_sw_retract + (gap - self.retracted_gap) / self._gap_per_screw
+        return max(self.screw_limit_sw_retract, min(self.screw_limit_sw_extend, screw_pos))
+
+    def set_screw_pos(self, screw_pos):
+        """ Set the screw position (m) and the gap, MLP value and limit switches that go with it. Returns the gap. """
+        self.screw_pos = screw_pos
+        travel = max(0.0, min(self.screw_limit_sw_extend - self.screw_limit_sw_retract, screw_pos - self.screw_limit_sw_retract))
+        self.gap = gap = self.retracted_gap + travel * self._gap_per_screw
+        self.mlp_raw = self.mlp_range[0] + travel * self._mlp_per_screw
 
-        # Set the limit switch states
         # Note: this assumes the screw_pos is smaller when retracted
-        if self.screw_pos <= self.screw_limit_sw_retract:
-            self.retract_sw_activated = True
-        elif self.screw_pos >= self.screw_limit_sw_extend:
-            self.extend_sw_activated = True
-        else:
-            # Neither limit switch is activated
-            self.retract_sw_activated = False
-            self.extend_sw_activated = False
-        
-        self.logger.debug("stepdrive_update_position({}, {}, {}): gap: {}, mlp_raw: {}, retract_sw: {}, extend_sw: {}".format(u8Step, u8Dir, s32Position, self.gap, self.mlp_raw, self.retract_sw_activated, self.extend_sw_activated))
+        self.retract_sw_activated = screw_pos <= self.screw_limit_sw_retract
+        self.extend_sw_activated = screw_pos >= self.screw_limit_sw_extend
+        return gap
+
+    def set_motor_power(self, energized):
+        if self.drive is not None:
+            self.drive.energized = energized
+
+    def stepdrive_force_position(self, s32Position):
+        """ The FCU has set its motor position (in microns) to s32Position, e.g. for the calibration process """
+        if self.drive is not None:
+            self.drive.force_position(s32Position)
+
+    def stepdrive_update_position(self, s32Position):
+        """ The FCU's latest motor position (microns), once per sim step (see fcu.StepDriveBridge) """
+        if self.drive is not None:
+            # The motor moves the screw (if it can) in the drive's sub-steps. The gap, MLP and switches follow in step().
+            self.drive.command_position(s32Position)
+            return
+
+        # Note: this represents the new position of the screw in microns [0, 75000]um
+        self.set_screw_pos(s32Position * 1e-6)
     
     def _move_to_gap_target(self, gap_target):
         # TESTING ONLY -- if the move the brakes stanza is uncommented below, this will work
@@ -245,102 +458,8 @@ class Brake:
         self._gap_target = self.gap
 
     def step(self, dt_usec):
-        """ Calculate our movement this step, and the forces that are acting on us. Notify if, for instance, brake force overcomes motor torque """
-        # Note: doing all these calculations in a single function because function calls are expensive
-
-        self.last_normal_force = self.normal_force
-        self.last_drag_force = self.drag_force
-        
-        v = self.sim.pod.velocity
-        
-        # TESTING ONLY -- move the gap to the target
-        # """
-        # @todo: need to convert this to use screw positioning for it to work for testing
-        if self.gap > self._gap_target:
-            dist = self._gap_close_speed * (dt_usec / 1000000.0)
-            self.gap -= dist
-        elif self.gap < self._gap_target:
-            dist = self._gap_close_speed * (dt_usec / 1000000.0)
-            self.gap += dist
-        else:
-            # Don't really need this, but hey
-            self.gap = self._gap_target
-        # /TESTING """
-        
-        # Handle the limit switches
-        # @todo: Watch out for floating point errors...
-        """
-        if self.gap <= self.min_gap:
-            # Note: this should only be called when the switch activates (needs to deactivate then re-activate before being called again)
-            self.extend_sw_activated = True
-        elif self.gap >= self.max_gap:
-            self.retract_sw_activated = True
-        else:
-            # Reset the switches
-            self.extend_sw_activated = False
-            self.retract_sw_activated = False
-        """
-        # Force calculations
-        gap = self.gap
-        
-        # Calculate normal (normal force) and drag
-        # @see https://rloop.slack.com/archives/eng-numsim/p1484029898001697
-        
-        F_normal = (3265.1 * np.exp(-209.4*gap)) * np.log(v + 1) - (2636.7 * np.exp(-207*gap)) * (v + .6) * np.exp(-.16*v)  # Newtons, For one brake
-        
-        # Save the normal force (to be used for logging)
-        self.normal_force = F_normal
-        
-        # F_drag(gap, v) = (5632 * np.exp(-202*gap)) * (-np.exp(-.3*v) + 1) * (1.5 * np.exp(-.02*v) + 1)  # For both brakes
-        F_drag = - (2816 * np.exp(-202*gap)) * (-np.exp(-.3*v) + 1) * (1.5 * np.exp(-.02*v) + 1)  # Newtons, For one brake
-        #F_drag = - (5632 * np.exp(-202*gap)) * (-np.exp(-.3*v) + 1) * (1.5 * np.exp(-.02*v) + 1)  # Newtons, For two brakes? @TODO @todo: Confirm brake strength from A34 data!!
-
-        # Save the drag force (to be used by force_brakes.py)
-        #print "Brakes F_drag is {} (v is {}, gap is {})".format(F_drag, v, gap)
-        self.drag_force = F_drag
-
-        # Get linear force acting on lead screw due to the brakes
-        # Note: Formula has a 17 degree angle to the rail. normal force is normal to the rail, drag force is parallel to it. 
-        # Force applied to screw is normal*sin(17) + drag*cos(17)
-        F_screw = F_normal * 0.292371705 + F_drag * 0.956304756
-        #self.logger.debug("Brakes: F_normal = {}; F_drag = {}; F_screw = {}".format(F_normal, F_drag, F_screw))
-        
-        # Convert linear force to drive torque (motor driven) and backdrive torque (driven by linear force on the screw)
-        # Note: Drive torque is the torque required to move the load, and backdrive torque is the torque required for the load to turn the screw on its own
-
-        """
-        Should we use back driving torque formuala here? Or torque to normal load? 
-        Let's see:
-        - the torque exerted on the motor by the brakes is backdriving torque
-        - The torque exerted by the negator on the motor is just 0.7Nm
-        - The torque exerted by the motor is driving torque (or holding torque? Maybe based on speed of motor? How do we get speed? Calculate # steps over time? Or some other way?)
-            - Use raising torque equation if motor is driving in the opposite direction as load torque
-            - Use lowering torque eqn if motor is driving in the same direction as load torque
-        """
-        # Formulas: http://www.nookindustries.com/LinearLibraryItem/Ballscrew_Torque_Calculations
-        # Note: Drive and backdrive torques are only used to see if the motor can handle the load
-        
-        drive_torque = F_screw * self._drive_torque_multiplier   # Torque generated by the motor
-        backdrive_torque = F_screw * self._backdrive_torque_multiplier  # Torque generated by the load
-        
-        # Negator Torque. Since the negator attempts to drive the screw in the -x direction (which deploys the brakes), we subtract it
-        tl_drive_torque = drive_torque - self.negator_torque
-        tl_backdrive_torque = backdrive_torque - self.negator_torque
-        
-
-        self.drive_torque_reqd = tl_drive_torque   # is this the drive torque required or the drive torque that's being applied (e.g. the motor is moving)
-        self.backdrive_torque_applied = tl_backdrive_torque
-
-        # @todo: add in the mass of the brake (12.3kg) x acceleration -- it's a significant force. Probably should apply to backdrive torque. 
-        
-        # @todo: determine when to trip the limit switches
-        
-        #self.logger.debug("Brakes: v={}, Gap={}, F_normal={}, F_drag={}, F_screw={}, dr_tq={}, bd_tq={}".format(v, self.gap, F_normal, F_drag, F_screw, drive_torque, backdrive_torque))
-        p = self.sim.pod.position
-        a = self.sim.pod.acceleration
-        #self.logger.debug("\t".join([str(x) for x in (p, v, a, self.gap, F_normal, F_drag, F_screw, drive_torque, backdrive_torque, tl_drive_torque, tl_backdrive_torque)]))
-
-        # Calculate new gap based on motor / slipping movement
+        """ Calculate our movement this step, and the forces that are acting on us (see BrakeArray.step()) """
+        self.array.step(dt_usec, (self.idx,))
         
     def get_drag(self):
         return self.drag_force  # Negative? 
@@ -357,31 +476,6 @@ class Brake:
         pass
         
 
-class Motor:
-    def __init__(self):
-        
-        #this is the parameter layout
-        #define C_LOCALDEF__LCCM231__M0_MICROSTEP_RESOLUTION__PARAM_INDEX                       (0U)
-        #define C_LOCALDEF__LCCM231__M0_MAX_ACCELERATION__PARAM_INDEX                           (1U)
-        #define C_LOCALDEF__LCCM231__M0_MICRONS_PER_REVOLUTION__PARAM_INDEX             2U
-        #define C_LOCALDEF__LCCM231__M0_STEPS_PER_REVOLUTION__PARAM_INDEX                       3U
-        #define C_LOCALDEF__LCCM231__M0_MAX_ANGULAR_VELOCITY__PARAM_INDEX 
-        
-        # Configuration
-        self.max_holding_torque = 2.8 # Nm -- @todo: move this to config
-        self.max_drive_torque = 3.5 # Nm -- is this correct? @todo: move this to config
-        self.steps_per_revolution = 100      # @todo: get the actual value for this
-        self.max_acceleration = None  # @todo: Need to find out what this is
-        self.max_angular_velocity = None # @todo: Need to find out what this is
-        
-        
-        # Volatile
-        self.max_torque = 0.0  # Nm -- controlled by state machine        
-        self.state = "FREE_SPIN"  # {FREE_SPIN, DRIVE, HOLD}
-
-        pass
-        
-        
 if __name__ == "__main__":
     from config import Config
     import numpy as np
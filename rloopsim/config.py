@@ -78,6 +78,10 @@ class Config(MutableMapping):
 
     def __delitem__(self, key):
         del self.__internal[key]
+
+    def override(self, key, value):
+        """ Same as config[key] = value (for compatibility with config_compiler.CompiledConfig, which is read-only) """
+        self.__internal[key] = value
         
     def __str__(self):
         return yaml.dump(self.__internal, default_flow_style=False)
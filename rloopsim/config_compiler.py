@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+# coding=UTF-8
+
+# File:     config_compiler.py
+# Purpose:  Compile the yaml config layers into a read-only config with all units resolved to SI (cached by file contents)
+# Author:   Ryan Adams (radams@cyandata.com, @ninetimeout)
+# Date:     2017-Feb-13
+
+# Note: Unit strings (e.g. '50 Hz', '1.5 G') are resolved once at compile time to SIValues. These are plain floats
+#       (in SI units) that remember their original string, so existing Units.SI(self.config.x) calls just return the
+#       float, and Units.usec()/Units.convert() etc. still work. Nested sections are built once up front, so attribute
+#       lookups don't create new wrapper objects like Config.__getattr__ does.
+
+import os
+import re
+import hashlib
+import logging
+import tempfile
+import cPickle as pickle
+from collections import Mapping
+
+import yaml
+
+from config import yaml_merge
+from units import Units
+
+
+# Bump this if the compiled format changes so that stale cache files are ignored
+COMPILER_VERSION = 2
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'rloopsim_config_cache')
+
+# A number followed by a unit (e.g. '50 Hz', '-1.5G', '0.1 kg/m^3'). Anything else (names, ip addresses, '4 *pi') is left alone.
+UNIT_STRING_RE = re.compile(r'^\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*[a-zA-Z]')
+
+
+class SIValue(float):
+    """ 
+    A config unit string resolved to SI units. Behaves as a float; the original string is kept in .text, 
+    and the value as written in .magnitude and .units (pint's name for them, e.g. 'microsecond')
+    """
+
+    def __new__(cls, value, text, magnitude, units):
+        self = float.__new__(cls, value)
+        self.text = text
+        self.magnitude = magnitude
+        self.units = units
+        return self
+
+    def __getnewargs__(self):
+        return (float(self), self.text, self.magnitude, self.units)
+
+    def __str__(self):
+        return self.text
+
+
+class CompiledConfig(Mapping):
+    """ Read-only config section. Keys are available as attributes (missing keys are None, same as Config) """
+
+    def __init__(self, values):
+        object.__setattr__(self, '_values', values)
+        for key, value in values.iteritems():
+            # Note: keys that clash with our methods (e.g. 'keys') are still available with config['keys']
+            if isinstance(key, basestring) and not hasattr(CompiledConfig, key):
+                self.__dict__[key] = value
+
+    def __getattr__(self, name):
+        # Only called if name isn't in __dict__
+        if name.startswith('__'):
+            raise AttributeError(name)  # Don't pretend to support special methods (e.g. for pickle and copy)
+        return self._values.get(name, None)
+
+    def __setattr__(self, name, value):
+        raise TypeError("Compiled config is read-only (use override() to change '{}')".format(name))
+
+    def __delattr__(self, name):
+        raise TypeError("Compiled config is read-only")
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __contains__(self, key):
+        return key in self._values
+
+    def __len__(self):
+        return len(self._values)
+
+    def keys(self):
+        return self._values.keys()
+
+    def override(self, key, value):
+        """ Change a value in place. Only for the sim itself (e.g. working_dir) and live config edits -- everyone else should treat the config as read-only """
+        self._values[key] = value
+        if isinstance(key, basestring) and not hasattr(CompiledConfig, key):
+            self.__dict__[key] = value
+
+    def to_dict(self):
+        """ Back to plain yaml-style dicts, with the original unit strings """
+        return dict((key, _uncompile(value)) for key, value in self._values.iteritems())
+
+    def __str__(self):
+        return yaml.dump(self.to_dict(), default_flow_style=False)
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def _compile(value):
+    if isinstance(value, dict):
+        return CompiledConfig(dict((key, _compile(val)) for key, val in value.iteritems()))
+    elif isinstance(value, list):
+        return tuple(_compile(val) for val in value)
+    elif isinstance(value, basestring) and UNIT_STRING_RE.match(value):
+        try:
+            parsed = Units.registry().parse_expression(value)
+            return SIValue(parsed.to_base_units().magnitude, value, parsed.magnitude, str(parsed.units))
+        except Exception:
+            return value  # Not something pint understands -- leave it as a string
+    else:
+        return value
+
+
+def _uncompile(value):
+    if isinstance(value, CompiledConfig):
+        return value.to_dict()
+    elif isinstance(value, tuple):
+        return [_uncompile(val) for val in value]
+    elif isinstance(value, SIValue):
+        return value.text
+    else:
+        return value
+
+
+def compile_config(config_dict):
+    """ Compile a (merged) config dict """
+    return _compile(config_dict)
+
+
+def overlay_config(config, overrides):
+    """ Overlay a (yaml-style or compiled) dict onto a compiled config in place, as if it were another config file """
+    for key, value in overrides.iteritems():
+        section = config[key] if key in config else None
+        if isinstance(value, Mapping) and isinstance(section, CompiledConfig):
+            overlay_config(section, value)
+        else:
+            config.override(key, _compile(value))
+    return config
+
+
+class ConfigCompiler(object):
+    """ Loads and merges config files into a CompiledConfig, caching the result keyed by the hash of the files' contents """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir  # None to only cache in memory
+        self.logger = logging.getLogger("ConfigCompiler")
+
+        # Pickled results, so that each load gets its own copy (sims may override() values in theirs)
+        self._memory_cache = {}
+
+    def load(self, config_files):
+        """ Returns the compiled config for the given files (later files overlay earlier ones) """
+        contents = []
+        for config_file in config_files:
+            with open(config_file, 'rb') as f:
+                contents.append(f.read())
+        key = self.cache_key(contents)
+
+        pickled = self._memory_cache.get(key)
+        if pickled is None:
+            pickled = self._load_cache_file(key)
+        if pickled is None:
+            pickled = pickle.dumps(self.compile(contents), pickle.HIGHEST_PROTOCOL)
+            self._save_cache_file(key, pickled)
+            self.logger.debug("Compiled config {} ({})".format(config_files, key))
+        self._memory_cache[key] = pickled
+
+        return pickle.loads(pickled)
+
+    @staticmethod
+    def cache_key(contents):
+        h = hashlib.sha1("config_compiler-{}".format(COMPILER_VERSION))
+        for content in contents:
+            # Note: include the length so that moving text between files changes the key
+            h.update("{}:".format(len(content)))
+            h.update(content)
+        return h.hexdigest()
+
+    @staticmethod
+    def compile(contents):
+        merged = {}
+        for content in contents:
+            merged = yaml_merge(merged, yaml.load(content))
+        return compile_config(merged)
+
+    def _cache_filename(self, key):
+        return os.path.join(self.cache_dir, "{}.pickle".format(key))
+
+    def _load_cache_file(self, key):
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._cache_filename(key), 'rb') as f:
+                pickled = f.read()
+            pickle.loads(pickled)  # Make sure it's usable (e.g. not truncated)
+            return pickled
+        except (IOError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError):
+            return None
+
+    def _save_cache_file(self, key, pickled):
+        if self.cache_dir is None:
+            return
+        filename = self._cache_filename(key)
+        tmp_filename = "{}.{}.tmp".format(filename, os.getpid())
+        try:
+            if not os.path.isdir(self.cache_dir):
+                os.makedirs(self.cache_dir)
+            with open(tmp_filename, 'wb') as f:
+                f.write(pickled)
+            # Note: write then rename so that other processes (e.g. sweep workers) never see a partial file
+            os.rename(tmp_filename, filename)
+        except OSError as e:
+            # Another process may have beaten us to it (rename fails on Windows if the file exists) -- not a problem
+            self.logger.debug("Couldn't save compiled config to {}: {}".format(filename, e))
+            if os.path.exists(tmp_filename):
+                os.remove(tmp_filename)
+        except IOError as e:
+            self.logger.warning("Couldn't save compiled config to {}: {}".format(filename, e))
+
+
+# Shared by everything in the process (e.g. each sim created by a sweep)
+default_compiler = ConfigCompiler()
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    t = time.time()
+    config = ConfigCompiler(cache_dir=None).load(sys.argv[1:])
+    print("Compiled in {:.3f}s".format(time.time() - t))
+    print(config)
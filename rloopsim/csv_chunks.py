@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# coding=UTF-8
+
+# File:     csv_chunks.py
+# Purpose:  Read large numeric csv files (e.g. pod.csv) in fixed size chunks, and min/max decimation for plotting them
+# Author:   Ryan Adams (radams@cyandata.com, @ninetimeout)
+# Date:     2017-Feb-13
+
+# Note: np.genfromtxt() reads the whole file into memory and parses it in python, which is far too slow for long runs at
+#       small timesteps. Here we read a few MB at a time and let numpy parse each chunk in C.
+
+import os
+import logging
+import numpy as np
+
+
+class CsvChunkReader(object):
+    """ Iterate over a numeric csv file (with a header row) as dicts of column name -> numpy array """
+
+    def __init__(self, filename, columns=None, chunk_bytes=4*1024*1024):
+        self.filename = filename
+        self.chunk_bytes = chunk_bytes
+        self.logger = logging.getLogger("CsvChunkReader")
+
+        with open(self.filename, 'rb') as f:
+            header = f.readline()
+            self.data_offset = f.tell()
+        self.headers = [name.strip() for name in header.strip().split(',')]
+
+        if columns is None:
+            columns = self.headers
+        missing = [name for name in columns if name not in self.headers]
+        if missing:
+            raise ValueError("Columns {} not found in {} (has {})".format(missing, self.filename, self.headers))
+        self.columns = list(columns)
+        self.column_idx = [self.headers.index(name) for name in self.columns]
+
+    def estimate_rows(self):
+        """ Rough row count from the file size and the length of the first few lines (so we don't have to read the whole file) """
+        file_size = os.path.getsize(self.filename)
+        with open(self.filename, 'rb') as f:
+            f.seek(self.data_offset)
+            sample = f.read(64*1024)
+        n_lines = sample.count('\n')
+        if n_lines == 0:
+            return 0
+        return int((file_size - self.data_offset) / (float(len(sample)) / n_lines))
+
+    def __iter__(self):
+        n_cols = len(self.headers)
+        with open(self.filename, 'rb') as f:
+            f.seek(self.data_offset)
+            remainder = ''
+            while True:
+                block = f.read(self.chunk_bytes)
+                if not block:
+                    text = remainder
+                    remainder = ''
+                else:
+                    # Only parse complete lines; the partial line at the end goes with the next block
+                    text = remainder + block
+                    cut = text.rfind('\n') + 1
+                    text, remainder = text[:cut], text[cut:]
+
+                if text.strip():
+                    values = self._parse(text, n_cols)
+                    yield dict((name, values[:, idx]) for name, idx in zip(self.columns, self.column_idx))
+
+                if not block:
+                    break
+
+    def _parse(self, text, n_cols):
+        text = text.replace('\r', '').strip()
+        values = np.fromstring(text.replace('\n', ','), dtype=float, sep=',')
+        n_lines = text.count('\n') + 1
+        if len(values) != n_lines * n_cols:
+            # Something fromstring() couldn't handle (e.g. an empty field) -- do it the slow way
+            self.logger.debug("Falling back to np.genfromtxt() for a chunk of {}".format(self.filename))
+            values = np.genfromtxt(text.splitlines(), delimiter=',', dtype=float)
+        return values.reshape(-1, n_cols)
+
+
+class MinMaxDecimator(object):
+    """
+    Reduces a (streamed) line to the min and max y of each block of rows, in the order they occurred.
+    Spikes and envelopes look the same as in the full data, at a fraction of the points.
+    """
+
+    def __init__(self, block_rows):
+        self.block_rows = max(1, int(block_rows))
+        self._xs = []
+        self._ys = []
+        # Rows left over from the last chunk that didn't make a full block
+        self._carry_x = np.empty(0)
+        self._carry_y = np.empty(0)
+
+    def add(self, x, y):
+        x = np.concatenate((self._carry_x, x))
+        y = np.concatenate((self._carry_y, y))
+        n = len(y) // self.block_rows * self.block_rows
+        self._carry_x = x[n:]
+        self._carry_y = y[n:]
+        if n:
+            self._reduce(x[:n], y[:n])
+
+    def _reduce(self, x, y):
+        if self.block_rows <= 2:
+            # Nothing to gain
+            self._xs.append(x)
+            self._ys.append(y)
+            return
+
+        xb = x.reshape(-1, self.block_rows)
+        yb = y.reshape(-1, self.block_rows)
+        i_min = yb.argmin(axis=1)
+        i_max = yb.argmax(axis=1)
+        first = np.minimum(i_min, i_max)
+        second = np.maximum(i_min, i_max)
+        rows = np.arange(len(yb))
+        self._xs.append(np.column_stack((xb[rows, first], xb[rows, second])).ravel())
+        self._ys.append(np.column_stack((yb[rows, first], yb[rows, second])).ravel())
+
+    def result(self):
+        """ Returns (x, y) arrays for everything added so far """
+        xs = self._xs + [self._carry_x]
+        ys = self._ys + [self._carry_y]
+        return np.concatenate(xs), np.concatenate(ys)
+
+
+def decimate_csv(filename, lines, max_points=5000, chunk_bytes=4*1024*1024):
+    """
+    Read the (x column, y column) lines from a csv file in chunks and decimate each to about max_points points.
+    Returns a dict of (x column, y column) -> (x array, y array)
+    """
+    columns = sorted(set(name for line in lines for name in line))
+    reader = CsvChunkReader(filename, columns, chunk_bytes)
+
+    # Two points (min and max) per block
+    block_rows = reader.estimate_rows() * 2 // max_points
+    decimators = dict((line, MinMaxDecimator(block_rows)) for line in lines)
+
+    for chunk in reader:
+        for (x_name, y_name), decimator in decimators.iteritems():
+            decimator.add(chunk[x_name], chunk[y_name])
+
+    return dict((line, decimator.result()) for line, decimator in decimators.iteritems())
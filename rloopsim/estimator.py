@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+# coding=UTF-8
+
+# File:     estimator.py
+# Purpose:  Independent pod position/velocity estimate (Kalman filter) from the accel, laser_dist and contrast sensors
+# Author:   Ryan Adams (radams@cyandata.com, @ninetimeout)
+# Date:     2017-Feb-13
+
+# Note: The state is [position, velocity]. The accelerometer is the filter's input (held between samples), and the
+#       laser distance sensor (track length - distance) and the contrast sensors (the position of each strip edge) are
+#       its position measurements. It's meant as a check on the FCU's navigation, so it only uses what the FCU gets.
+# Note: Samples are collected by listeners on the sensors and only processed when there's a position measurement or
+#       when it's time to log, so most steps cost one comparison. An update propagates the state through all of the
+#       accel samples since the last update at once (cumulative sums over the samples), then does a single matrix update
+#       with all of the position measurements. Each measurement is related to the end state through the accel samples
+#       between its time and the end (H = [1, -dt]); process noise within that interval is ignored.
+# Note: The estimate is logged against the pod's actual values (from the pod sensor) every log_interval of sim time,
+#       in the csv given by log_filename. The rms and max errors are logged at the end of the run.
+
+import math
+import logging
+from collections import namedtuple
+
+import numpy as np
+
+from units import Units
+from hot_logging import get_logger
+
+
+class SampleCollector(object):
+    """ Sensor listener that keeps the samples until the estimator takes them """
+
+    def __init__(self):
+        self.samples = []
+
+    def step_callback(self, sensor, samples):
+        self.samples.extend(samples)
+
+    def take(self):
+        samples, self.samples = self.samples, []
+        return samples
+
+    def reset(self):
+        self.samples = []
+
+
+class LatestSample(object):
+    """ Sensor listener that keeps the latest sample (for the pod's actual values) """
+
+    def __init__(self):
+        self.sample = None
+
+    def step_callback(self, sensor, samples):
+        self.sample = samples[-1]
+
+    def reset(self):
+        self.sample = None
+
+
+class PodStateEstimator(object):
+    """ Sim step listener that estimates the pod's position and velocity from its sensors """
+
+    def __init__(self, sim, config):
+        self.sim = sim
+        self.config = config
+        self.logger = get_logger("PodStateEstimator")
+
+        self.data = namedtuple('EstimatorData', ['t_usec', 'position', 'velocity', 'position_sigma', 'velocity_sigma',
+                                                 'true_position', 'true_velocity', 'position_error', 'velocity_error',
+                                                 'n_accel', 'n_laser_dist', 'n_strips'])
+        self.step_listeners = []
+
+        self.log_interval_usec = Units.usec(self.config.log_interval or '50 ms')
+        self.process_noise = Units.SI(self.config.process_noise or '0.05 G')**2         # (m/s^2)^2 per second
+        self.laser_dist_variance = Units.SI(self.config.laser_dist_noise or '5 mm')**2
+        self.strip_variance = Units.SI(self.config.strip_noise or '5 mm')**2
+        self.initial_variance = (Units.SI(self.config.initial_position_sigma or '0.1 m')**2, 0.0,
+                                 Units.SI(self.config.initial_velocity_sigma or '0.1 m/s')**2)
+
+        # Sensors
+        accel_idx = int(self.config.accel or 0)
+        accels = self.sim.sensors.get('accel') or []
+        if accel_idx >= len(accels):
+            raise ValueError("Estimator accel {} isn't configured (there are {} accelerometers)".format(accel_idx, len(accels)))
+        self.accel = accels[accel_idx]
+        self.accel_samples = SampleCollector()
+        self.accel.add_step_listener(self.accel_samples)
+
+        self.laser_dist = self.sim.sensors.get('laser_dist')
+        self.laser_dist_samples = SampleCollector()
+        self.max_dist = None
+        if self.laser_dist is not None:
+            self.laser_dist.add_step_listener(self.laser_dist_samples)
+            if self.laser_dist.config.max_dist:
+                self.max_dist = Units.SI(self.laser_dist.config.max_dist)
+
+        self.strip_samples = SampleCollector()
+        for sensor in self.sim.sensors.get('laser_contrast') or []:
+            sensor.add_step_listener(self.strip_samples)
+
+        self.truth = LatestSample()
+        self.sim.sensors['pod'].add_step_listener(self.truth)
+
+        if self.config.log_filename:
+            self.add_step_listener(self.sim.make_csv_writer(self.config))
+
+        self.reset()
+
+    def add_step_listener(self, listener):
+        self.step_listeners.append(listener)
+
+    def get_csv_headers(self):
+        return self.data._fields
+
+    def reset(self):
+        """ Start again from the pod's (reset) position and velocity """
+        self.x = (float(self.sim.pod.position), float(self.sim.pod.velocity))
+        self.P = self.initial_variance   # (position variance, covariance, velocity variance)
+        self.t_usec = 0  # Note: the sim is at time 0 when we start or reset
+        self.accel_last = 0.0
+        self.next_log_usec = self.t_usec
+        self.counts = [0, 0, 0]   # accel, laser_dist, strip samples since the last log row
+
+        self.n_errors = 0
+        self.sum_sq_errors = [0.0, 0.0]
+        self.max_errors = [0.0, 0.0]
+
+        for collector in (self.accel_samples, self.laser_dist_samples, self.strip_samples, self.truth):
+            collector.reset()
+        for listener in self.step_listeners:
+            reset = getattr(listener, 'reset', None)
+            if reset is not None:
+                reset()
+
+    def step_callback(self, sim):
+        t_usec = sim.elapsed_time_usec
+        if t_usec < self.next_log_usec and not self.laser_dist_samples.samples and not self.strip_samples.samples:
+            return  # Note: accel samples just wait for the next update
+        self.update(t_usec)
+        if t_usec >= self.next_log_usec:
+            self._log(t_usec)
+            self.next_log_usec += self.log_interval_usec * max(1, (t_usec - self.next_log_usec) // self.log_interval_usec + 1)
+
+    def update(self, t_end_usec):
+        """ Propagate to t_end_usec through the accel samples, then apply the position measurements """
+        t0 = self.t_usec
+        T = (t_end_usec - t0) / 1000000.0
+        tm, z, r = self._measurements()
+
+        # Accel samples (each one held until the next)
+        samples = self.accel_samples.take()
+        if samples or len(tm):
+            if samples:
+                ta = np.array([s.t_usec for s in samples], dtype=float)
+                # Note: +y accel = +x pod reference frame (see sensor_accel.py); the raw value is what the FCU sees
+                a = np.interp([s.raw_y for s in samples], self.accel.sensor_output_range, self.accel.sensor_input_range)
+                tb = np.concatenate(([t0], np.clip(ta, t0, t_end_usec), [t_end_usec]))
+                acc = np.concatenate(([self.accel_last], a))
+                self.accel_last = a[-1]
+            else:
+                tb = np.array([t0, t_end_usec], dtype=float)
+                acc = np.array([self.accel_last])
+            dt = np.diff(tb) / 1000000.0
+
+            # Contribution of the accel input to position and velocity at each boundary (from zero initial state)
+            va = np.concatenate(([0.0], np.cumsum(acc * dt)))
+            pa = np.concatenate(([0.0], np.cumsum(va[:-1] * dt + 0.5 * acc * dt * dt)))
+            pa_end, va_end = pa[-1], va[-1]
+        else:
+            pa_end, va_end = 0.5 * self.accel_last * T * T, self.accel_last * T
+
+        # Predict (F = [[1, T], [0, 1]], Q for white acceleration noise)
+        # Note: done in scalars since most updates have nothing else to do
+        position, velocity = self.x
+        p00, p01, p11 = self.P
+        q = self.process_noise
+        position += velocity * T + pa_end
+        velocity += va_end
+        p00 += 2.0 * T * p01 + T * T * p11 + q * T**3 / 3.0
+        p01 += T * p11 + q * T * T / 2.0
+        p11 += q * T
+
+        # Position measurements, all at once
+        if len(tm):
+            # Accel contribution at each measurement time
+            k = np.clip(np.searchsorted(tb, tm, side='right') - 1, 0, len(acc) - 1)
+            s = (tm - tb[k]) / 1000000.0
+            pa_m = pa[k] + va[k] * s + 0.5 * acc[k] * s * s
+            delta = (t_end_usec - tm) / 1000000.0
+
+            x = np.array([position, velocity])
+            P = np.array([[p00, p01], [p01, p11]])
+            H = np.column_stack((np.ones(len(tm)), -delta))
+            predicted = np.dot(H, x) + va_end * delta - pa_end + pa_m
+            PHt = np.dot(P, H.T)
+            S = np.dot(H, PHt) + np.diag(r)
+            K = np.linalg.solve(S, PHt.T).T
+            x = x + np.dot(K, z - predicted)
+            P = np.dot(np.eye(2) - np.dot(K, H), P)
+            position, velocity = float(x[0]), float(x[1])
+            p00, p01, p11 = float(P[0, 0]), float(P[0, 1] + P[1, 0]) / 2.0, float(P[1, 1])
+
+        self.x = (position, velocity)
+        self.P = (p00, p01, p11)
+        self.t_usec = t_end_usec
+        self.counts[0] += len(samples)
+
+    def _measurements(self):
+        """ Times (usec), positions and variances of the position measurements since the last update """
+        if not self.laser_dist_samples.samples and not self.strip_samples.samples:
+            return (), (), ()
+        times, positions, variances = [], [], []
+
+        samples = self.laser_dist_samples.take()
+        if samples:
+            length = self.sim.track.length
+            for sample in samples:
+                if 0.0 <= sample.distance and (self.max_dist is None or sample.distance <= self.max_dist):
+                    times.append(sample.t_usec)
+                    positions.append(length - sample.distance)
+            self.counts[1] += len(times)
+            variances.extend([self.laser_dist_variance] * len(times))
+
+        samples = self.strip_samples.take()
+        if samples:
+            times.extend([sample.t for sample in samples])
+            positions.extend([sample.pos for sample in samples])
+            variances.extend([self.strip_variance] * len(samples))
+            self.counts[2] += len(samples)
+
+        return np.array(times, dtype=float), np.array(positions, dtype=float), np.array(variances)
+
+    def _log(self, t_usec):
+        truth = self.truth.sample
+        if truth is None:
+            return
+        position, velocity = self.x
+        errors = (position - truth.pod_position, velocity - truth.pod_velocity)
+        self.n_errors += 1
+        for i, error in enumerate(errors):
+            self.sum_sq_errors[i] += error * error
+            self.max_errors[i] = max(self.max_errors[i], abs(error))
+
+        if self.step_listeners:
+            sample = self.data(t_usec, position, velocity, math.sqrt(self.P[0]), math.sqrt(self.P[2]),
+                               truth.pod_position, truth.pod_velocity, errors[0], errors[1],
+                               self.counts[0], self.counts[1], self.counts[2])
+            for step_listener in self.step_listeners:
+                step_listener.step_callback(self, [sample])
+        self.counts = [0, 0, 0]
+
+    def stats(self):
+        """ rms and max position and velocity errors so far (m, m/s) """
+        rms = [math.sqrt(sum_sq / self.n_errors) if self.n_errors else 0.0 for sum_sq in self.sum_sq_errors]
+        return {
+            'position_rms': rms[0], 'position_max': self.max_errors[0],
+            'velocity_rms': rms[1], 'velocity_max': self.max_errors[1],
+            'n': self.n_errors,
+        }
+
+    def end_callback(self, sim):
+        self.logger.info("Estimator error: position rms {position_rms:.4f} m (max {position_max:.4f} m), velocity rms {velocity_rms:.4f} m/s (max {velocity_max:.4f} m/s) over {n} samples", **self.stats())
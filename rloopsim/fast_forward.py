@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# coding=UTF-8
+
+# File:     fast_forward.py
+# Purpose:  Longer sim steps through quasi-steady phases (waiting at rest before the push, coasting with the brakes still)
+# Author:   Ryan Adams (radams@cyandata.com, @ninetimeout)
+# Date:     2017-Feb-13
+
+# Note: Before each step, Sim.run() asks FastForward.next_step_usec() how long it should be. Normally that's the fixed
+#       timestep, but when nothing is about to change (the pusher isn't pushing the pod, the brakes and their motors are
+#       at rest with no commands pending, and the pod isn't levitating) the step is a whole number of fixed timesteps, up
+#       to max_step. While the pod is moving the step is also limited so that its velocity changes by at most max_dv and
+#       it moves at most max_dx (and its velocity doesn't change sign).
+# Note: A long step is a normal Sim.step() -- the pod's constant acceleration step and the pusher's closed-form phases
+#       are exact for a pod at rest and close for a coasting one, and the sensors make all of the samples for the
+#       interval at once (the polling sensors at their sampling rate, the contrast sensors at each strip edge, and the
+#       pod and pusher sensors once per fixed timestep), so listeners and the FCU get the same sample streams.
+# Note: Anything that needs to react (e.g. the FCU commanding the brakes, or the run controller starting the push)
+#       is seen before the next step, so it's at most max_step late.
+
+from units import Units
+from hot_logging import get_logger
+
+
+class FastForward(object):
+    """ Chooses the length of each sim step """
+
+    def __init__(self, sim, config):
+        self.sim = sim
+        self.config = config
+        self.logger = get_logger("FastForward")
+
+        self.fixed_step_usec = sim.fixed_timestep_usec
+        self.max_steps = max(1, int(Units.usec(self.config.max_step or '50 ms') // self.fixed_step_usec))  # Fixed timesteps
+        self.max_dv = Units.SI(self.config.max_dv or '0.05 m/s')
+        self.max_dx = Units.SI(self.config.max_dx or '2 m')
+
+        self.reset()
+
+    def reset(self):
+        self.n_steps = 0            # Long steps taken
+        self.n_fixed_steps = 0      # Fixed timesteps they covered
+        self.forwarded_usec = 0
+
+    def is_steady(self):
+        """ Is nothing about to change (other than the pod's velocity, slowly)? """
+        sim = self.sim
+        pod = sim.pod
+        pusher = sim.pusher
+        if not sim.physics_enabled:
+            return False  # Replaying recorded sensor data
+        if pod.he_height != pod.last_he_height:
+            return False
+        if pusher.state == 'PUSH':
+            return False
+        if pusher.state != 'HOLD' and pusher.state != 'STOPPED':
+            # Coasting or braking -- it mustn't catch the pod during the step
+            if pod.pusher_in_contact() or pusher.velocity > pod.velocity or pusher.acceleration > pod.acceleration:
+                return False
+        return pod.brakes.is_steady()
+
+    def next_step_usec(self):
+        """ The length of the next step: the fixed timestep, or a whole number of them if we're in a steady phase """
+        fixed = self.fixed_step_usec
+        if self.max_steps <= 1 or not self.is_steady():
+            return fixed
+
+        pod = self.sim.pod
+        v = pod.velocity
+        a = pod.acceleration
+        t_max = self.max_steps * fixed / 1000000.0
+        if a != 0.0:
+            t_max = min(t_max, self.max_dv / abs(a))
+            if v * a < 0.0:
+                t_max = min(t_max, -v / a)  # Not past stopped
+        if v != 0.0:
+            t_max = min(t_max, self.max_dx / abs(v))
+
+        n = int(t_max * 1000000.0 // fixed)
+        if n <= 1:
+            return fixed
+        self.n_steps += 1
+        self.n_fixed_steps += n
+        self.forwarded_usec += n * fixed
+        return n * fixed
+
+    def end_callback(self, sim):
+        self.logger.info("Fast-forwarded {:.2f} s of sim time in {} steps (instead of {})",
+                         self.forwarded_usec / 1000000.0, self.n_steps, self.n_fixed_steps)
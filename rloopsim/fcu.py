@@ -39,6 +39,7 @@ import struct
 # Our stuff
 from config import Config
 from units import Units
+from hot_logging import get_logger
 from networking import PodComms, UdpListener
 from sensors import QueueingListener, QueueingRawListener
 
@@ -92,6 +93,81 @@ class MissionProfile(object):
         pass
 
 
+class StepDriveBridge(object):
+    """ Batches the stepper position callbacks from the FCU and keeps the FCU's brake sensors (MLP, limit switches) up to date """
+    # Note: the firmware calls back for every motor step (tens of thousands for a brake deployment). On the FCU thread
+    #       we only keep each motor's latest position; once per sim step (step_callback(), on the sim thread) the brakes
+    #       get the final position. The MLP and switch values go back to the DLL from the FCU thread (push(), before each
+    #       vFCU__Process()) once for each batch of steps, as the per-step callback used to for every step.
+
+    # Inject_SwitchState u8ExtendRetract
+    EXTEND = 1
+    RETRACT = 0
+
+    def __init__(self, sim, lib):
+        self.sim = sim
+        self.lib = lib
+        self.n_motors = len(self.sim.pod.brakes)
+        self.reset()
+
+    def reset(self):
+        # Note: positions is only ever assigned to by the FCU thread (no swapping), so the latest position can't be lost.
+        #       Likewise n_applied is only changed by the sim thread and n_pushed by the FCU thread.
+        self.positions = [None] * self.n_motors   # Latest position from the FCU (microns)
+        self.applied = [None] * self.n_motors     # Last position given to the brake
+        self.n_applied = [0] * self.n_motors      # Positions given to the brake
+        self.n_pushed = [0] * self.n_motors       # Positions given to the brake as of the last push()
+        self.pushed = [(0, False, False)] * self.n_motors  # (MLP, extend, retract) the DLL has (see Fcu.fcu_init())
+
+    def update_position(self, motor_index, position):
+        """ Called (from the FCU thread) for every step """
+        self.positions[motor_index] = position
+
+    def step_callback(self, sim):
+        """ Give each brake its motor's latest position """
+        brakes = sim.pod.brakes
+        for i, position in enumerate(self.positions):
+            if position is not None and position != self.applied[i]:
+                self.applied[i] = position
+                brakes[i].stepdrive_update_position(position)
+                self.n_applied[i] += 1
+
+    def push(self):
+        """ Send the brakes' MLP values and limit switch states to the DLL if the motors have moved (FCU thread) """
+        lib = self.lib
+        brakes = self.sim.pod.brakes
+        for i in xrange(self.n_motors):
+            brake = brakes[i]
+            mlp = int(round(brake.mlp_raw))
+            extend = brake.extend_sw_activated
+            retract = brake.retract_sw_activated
+            n_applied = self.n_applied[i]
+            last_mlp = self.pushed[i][0]
+            # Note: the brake can also move without a new position (e.g. with the brake drive, see brake_drive.py)
+            if n_applied == self.n_pushed[i] and (mlp, extend, retract) == self.pushed[i]:
+                continue
+            self.n_pushed[i] = n_applied
+            self.pushed[i] = (mlp, extend, retract)
+
+            if mlp != last_mlp:
+                # vFCU_BRAKES_MLP_WIN32__ForceADC(0, CUShort(sMLP))
+                lib.vFCU_BRAKES_MLP_WIN32__ForceADC(i, mlp)
+
+            # Brake Limit Switches
+            #void vFCU_BRAKES_SW_WIN32__Inject_SwitchState(Luint8 u8Brake, Luint8 u8ExtendRetract, Luint8 u8Value)
+            # @todo: both brakes hit the Left ISRs -- check whether brake 1 should use the Right ones
+            if extend:
+                # Inject the extend switch state and hit the ISR
+                lib.vFCU_BRAKES_SW_WIN32__Inject_SwitchState(i, self.EXTEND, 1)
+                lib.vFCU_BRAKES_SW__Left_SwitchExtend_ISR()
+            elif retract:
+                # Inject the retract switch state and hit the ISR
+                lib.vFCU_BRAKES_SW_WIN32__Inject_SwitchState(i, self.RETRACT, 1)
+                lib.vFCU_BRAKES_SW__Left_SwitchRetract_ISR()
+            else:
+                # Set both to zero
+                lib.vFCU_BRAKES_SW_WIN32__Inject_SwitchState(i, self.EXTEND, 0)
+                lib.vFCU_BRAKES_SW_WIN32__Inject_SwitchState(i, self.RETRACT, 0)
 
 
 
@@ -152,7 +228,7 @@ class Fcu:
         self.sim = sim
         self.config = config
         
-        self.logger = logging.getLogger("FCU")
+        self.logger = get_logger("FCU")
 
         self.logger.info("Initializing FCU")
 
@@ -166,6 +242,10 @@ class Fcu:
         # Should we stop?
         self.end_flag = False
 
+        # Timers and sensor listeners are set up on the first run only (so that we can be reset and run again)
+        self.is_setup = False
+        self.thread = None
+
         # Load the DLL
         self.dll_path = os.path.normpath(self.config.dll_path)
         self.dll_filename = self.config.dll_filename
@@ -321,9 +401,22 @@ class Fcu:
 
         self.set_return_types()
 
+        # Stepper position callbacks -> brakes -> MLP and limit switches
+        self.stepdrive = StepDriveBridge(sim, self.lib)
+        sim.add_step_listener(self.stepdrive)
+
     def end_callback(self, sim):
         self.end_flag = True
 
+    def reset(self):
+        """ Get ready for another run. The DLL stays loaded; the firmware is re-initialized (vFCU__Init) when we run again. """
+        # Make sure the last run's timer loop has seen the end flag before we clear it
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.end_flag = False
+        self.timerunner.reset()
+
     def set_return_types(self):
         """ Set the return types for various DLL methods. NOTE: You must do this or risk bad auto-conversions (e.g. int16 -2001 => int32 62259) """
         
@@ -625,60 +718,10 @@ class Fcu:
         # Step is just 1, to say that a step has happened. Should probably never have a 0 (could have been falling edge)
         # Direction: 1 or 0 -- extend = 1 or 0 -- one is reversed, one is not. So delegate to the brake and allow that in config
         # Position: current lead screw position  that it's moved to -- so I don't have to calculate it.
-        self.logger.debug("Fcu.stepdrive_update_position_callback({}, {}, {}, {})".format(u8MotorIndex, u8Step, u8Dir, s32Position))
-
-        pod = self.sim.pod
-
-        # @TODO: Need to call the brake stepdrive move function
-        # @todo: put the brake switch code here
-        
-        # .....
-        
-        # Brake Linear Position Sensor
-        brake_index = u8MotorIndex  # Just for convenience -- the motor index is the same as the brake index (there is 1 motor per brake)
-        
-        # Set the screw position on the brake. This will update mlp_raw and gap in the brake
-        pod.brakes[brake_index].stepdrive_update_position(u8Step, u8Dir, s32Position)
-        
-        # Set the value of the MLP in the FCU
-        # vFCU_BRAKES_MLP_WIN32__ForceADC(0, CUShort(sMLP))
-        self.lib.vFCU_BRAKES_MLP_WIN32__ForceADC(brake_index, pod.brakes[brake_index].mlp_raw)
-                
-        # Brake Limit Switches                
-        #void vFCU_BRAKES_SW_WIN32__Inject_SwitchState(Luint8 u8Brake, Luint8 u8ExtendRetract, Luint8 u8Value)
-        
-        # For clarity
-        EXTEND = 1
-        RETRACT = 0
-
-        if pod.brakes[brake_index].extend_sw_activated:
-            # Inject the extend switch state and hit the ISR
-            self.lib.vFCU_BRAKES_SW_WIN32__Inject_SwitchState(brake_index, EXTEND, 1)
-            self.lib.vFCU_BRAKES_SW__Left_SwitchExtend_ISR()
-        elif pod.brakes[brake_index].retract_sw_activated:
-            # Inject the retract switch state and hit the ISR
-            self.lib.vFCU_BRAKES_SW_WIN32__Inject_SwitchState(brake_index, RETRACT, 1)
-            self.lib.vFCU_BRAKES_SW__Left_SwitchRetract_ISR()
-        else:
-            # Set both to zero
-            self.lib.vFCU_BRAKES_SW_WIN32__Inject_SwitchState(brake_index, EXTEND, 0)
-            self.lib.vFCU_BRAKES_SW_WIN32__Inject_SwitchState(brake_index, RETRACT, 0)
-        
-        """
-        '75mm
-        If s32Position > 750000 Then
-            vFCU_BRAKES_SW_WIN32__Inject_SwitchState(0, 1, 1)
-            vFCU_BRAKES_SW__Left_SwitchExtend_ISR()
-        ElseIf s32Position < -300 Then
-            'fake some cal limit
-            vFCU_BRAKES_SW_WIN32__Inject_SwitchState(0, 0, 1)
-            vFCU_BRAKES_SW__Left_SwitchRetract_ISR()
-        Else
-            vFCU_BRAKES_SW_WIN32__Inject_SwitchState(0, 1, 0)
-            vFCU_BRAKES_SW_WIN32__Inject_SwitchState(0, 0, 0)
-        End If        
-        """
-        
+        # Note: called for every step of the stepper motors (up to 20 kHz), so all we do is note the position. The brake
+        #       gets it once per sim step, and the MLP and limit switches are updated from the brake (see StepDriveBridge).
+        #       The motor index is the same as the brake index (there is 1 motor per brake).
+        self.stepdrive.update_position(u8MotorIndex, s32Position)
 
     def SC16IS_txdata_callback(self, u8DeviceIndex, pu8Data, u8Length):
         """ When the SC16 subsystem wants to transmit """
@@ -690,12 +733,12 @@ class Fcu:
     def AMC7812_DAC_volts_callback(self, u8Channel, f32Volts):
         """ When the DAC voltage is updated """
         # Public Delegate Sub AMC7812_WIN32__Set_DACVoltsCallbackDelegate(u8Channel As Byte, f32Volts As Single)
-        self.logger.debug("Fcu.AMC7812_DAC_volts_callback({}, {})".format(u8Channel, f32Volts))
+        self.logger.debug("Fcu.AMC7812_DAC_volts_callback({}, {})", u8Channel, f32Volts)
 
     def FCU_REPORT_MissionPhaseCallback(self, u8MissionPhase):
         """ When Mission phase is updated """
         # Public Delegate Sub FCU_REPORT_MissionPhaseCallbackDelegate(u8MissionPhase As Byte)
-        self.logger.debug("Fcu.FCU_REPORT_MissionPhaseCallback({}, {})".format(u8MissionPhase))
+        self.logger.debug("Fcu.FCU_REPORT_MissionPhaseCallback({})", u8MissionPhase)
 
     def register_callback(self, python_function, dll_function_name, restype, args):
 
@@ -922,8 +965,9 @@ class Fcu:
         self.lib.vSIL3_ETH_WIN32__Set_Ethernet_TxCallback(self.callback_refs['vSIL3_ETH_WIN32__Set_Ethernet_TxCallback'])
 
         # 'force the two motor positions to random so as we can simulate the cal process
-        self.lib.vSIL3_STEPDRIVE_WIN32__ForcePosition(0, -34)
-        self.lib.vSIL3_STEPDRIVE_WIN32__ForcePosition(1, 175)
+        for iMotor, s32Position in enumerate((-34, 175)):
+            self.lib.vSIL3_STEPDRIVE_WIN32__ForcePosition(iMotor, s32Position)
+            self.sim.pod.brakes[iMotor].stepdrive_force_position(s32Position)
 
         self.lib.vFCU_BRAKES_MLP_WIN32__ForceADC(0, 0)
         self.lib.vFCU_BRAKES_MLP_WIN32__ForceADC(1, 0)
@@ -932,6 +976,9 @@ class Fcu:
         for iBrake in [0, 1]:
             for iSwitch in [0, 1]:
                 self.lib.vFCU_BRAKES_SW_WIN32__Inject_SwitchState(iBrake, iSwitch, 0)
+
+        # The DLL now has the values above
+        self.stepdrive.reset()
         
     def fcu_setup(self):
         self.logger.info("Initializing timers")
@@ -999,6 +1046,7 @@ class Fcu:
     def fcu_process(self):
         """ FCU process function (called as part of the run loop) """
         try:
+            self.stepdrive.push()
             self.lib.vFCU__Process()
         except Exception as e:
             self.logger.error(e)
@@ -1010,14 +1058,18 @@ class Fcu:
         t = threading.Thread(target=self.run)
         t.daemon = True
         t.start()
+        self.thread = t
         return t
 
     def run(self):
-        self.fcu_setup()
-        self.fcu_init()        
+        if not self.is_setup:
+            self.fcu_setup()
+
+            # Set up to call fcu_process using a timer
+            self.timerunner.add_timer(CallbackTimer(0.001, self.fcu_process, name="FCU Process Loop Timer"))
+            self.is_setup = True
 
-        # Set up to call fcu_process using a timer
-        self.timerunner.add_timer(CallbackTimer(0.001, self.fcu_process, name="FCU Process Loop Timer"))
+        self.fcu_init()        
 
         self.timerunner.run()    
 
@@ -1175,15 +1227,13 @@ if __name__ == "__main__":
     #    sys.exit(admin.runAsAdmin())  # Run as admin, then exit when the script has finished
 
     from sim import Sim
-    import logging.config
-    import yaml
+    from hot_logging import configure_logging
 
     #logging.basicConfig(level=logging.DEBUG)
 
     print "Running fcu.py"
 
-    with open('conf/logging.conf') as f:  # @todo: make this work when run from anywhere (this works if run from top directory)
-        logging.config.dictConfig(yaml.load(f))
+    configure_logging('conf/logging.conf')
     
     config = Config()
     config.loadfile("conf/sim_config.yaml")
@@ -0,0 +1,345 @@
+#!/usr/bin/env python
+# coding=UTF-8
+
+# File:     force_models.py
+# Purpose:  Fitted force models (e.g. brake and hover engine lift/drag vs gap and velocity) -- building and loading them
+# Author:   Ryan Adams (radams@cyandata.com, @ninetimeout)
+# Date:     2017-Feb-13
+
+# Note: A force model is a json file (see conf/force_models/). Each output (e.g. 'normal', 'drag') is
+#       scale * sum(coef * factor * factor * ...), where each factor is one of the FACTORS below applied to one input.
+#       The coefficients and factor parameters are what gets fitted; scale converts the fitted data to what the sim
+#       uses (e.g. the A34 data gives drag for both brakes, but a Brake wants the drag for one brake, pointing backwards).
+# Note: load_force_model() compiles the outputs into a single python function of the inputs that returns a tuple of
+#       the outputs, e.g. normal, drag = model.fn(gap, v). The scalar version (model.fn) uses the math module and is
+#       what the step functions call; model.evaluate() uses numpy and takes arrays.
+# Note: A model can also carry a lookup table (2 inputs only) of the fitted surface, built with --table. If
+#       load_force_model() is asked to use it, fn does a bilinear lookup instead. Inputs outside of the table are clamped.
+# Note: To refit a model against its data (the 'data' section of the model file) and report the residuals:
+#           python rloopsim/force_models.py fit conf/force_models/a34_brake.json [-o out.json] [--table]
+#       To only report the residuals of a model as it is:
+#           python rloopsim/force_models.py check conf/force_models/a34_brake.json
+#       The whole surface is fitted at once (Levenberg-Marquardt, in numpy), so this takes a second or so.
+
+import sys
+import math
+import json
+import bisect
+import argparse
+from collections import OrderedDict
+
+import numpy as np
+
+
+# Factor kind -> (number of parameters, numpy function of (x, params), expression template)
+# Note: the templates are filled in with repr()'d floats and the input name, and use exp/log/atan (which are math.*
+#       for the scalar function and numpy's for the vectorized one)
+FACTORS = {
+    'exp':          (1, lambda x, p: np.exp(p[0]*x),                      "exp({0}*{x})"),
+    'log1p':        (0, lambda x, p: np.log(x + 1.0),                     "log({x} + 1.0)"),
+    'shift':        (1, lambda x, p: x + p[0],                            "({x} + {0})"),
+    'affine':       (2, lambda x, p: p[0] + p[1]*x,                       "({0} + {1}*{x})"),
+    'saturate':     (1, lambda x, p: 1.0 - np.exp(p[0]*x),                "(1.0 - exp({0}*{x}))"),
+    'exp_plus_one': (2, lambda x, p: p[0]*np.exp(p[1]*x) + 1.0,           "({0}*exp({1}*{x}) + 1.0)"),
+    'atan':         (1, lambda x, p: np.arctan(p[0]*x),                   "atan({0}*{x})"),
+}
+
+SCALAR_FUNCTIONS = {'exp': math.exp, 'log': math.log, 'atan': math.atan}
+NUMPY_FUNCTIONS = {'exp': np.exp, 'log': np.log, 'atan': np.arctan}
+
+_cache = {}  # (filename, use_table) -> ForceModel
+
+
+def load_force_model(filename, use_table=False):
+    """ Load (once) and compile a force model file """
+    key = (filename, use_table)
+    model = _cache.get(key)
+    if model is None:
+        model = ForceModel.load(filename, use_table)
+        _cache[key] = model
+    return model
+
+
+class ForceModel(object):
+    """ A compiled force model. fn(*inputs) returns a tuple of the outputs. """
+
+    def __init__(self, spec, use_table=False):
+        self.spec = spec
+        self.name = spec.get('name')
+        self.inputs = list(spec['inputs'])
+        self.outputs = list(spec['outputs'].keys())
+        for name, output in spec['outputs'].iteritems():
+            for term in output['terms']:
+                for kind, input_name, params in term['factors']:
+                    if kind not in FACTORS:
+                        raise ValueError("Unknown factor '{}' in output '{}' of force model {}".format(kind, name, self.name))
+                    if input_name not in self.inputs:
+                        raise ValueError("Unknown input '{}' in output '{}' of force model {}".format(input_name, name, self.name))
+                    if len(params) != FACTORS[kind][0]:
+                        raise ValueError("Factor '{}' takes {} parameters, got {} (force model {})".format(kind, FACTORS[kind][0], params, self.name))
+
+        self.source = self._source()
+        self._vectorized = self._compile(NUMPY_FUNCTIONS)
+        if use_table:
+            if not spec.get('table'):
+                raise ValueError("Force model {} doesn't have a lookup table (build one with --table)".format(self.name))
+            self.fn = LookupTable(spec['table'], self.inputs, self.outputs)
+        else:
+            self.fn = self._compile(SCALAR_FUNCTIONS)
+
+    @classmethod
+    def load(cls, filename, use_table=False):
+        with open(filename, 'r') as f:
+            spec = json.load(f, object_pairs_hook=OrderedDict)
+        return cls(spec, use_table)
+
+    def output_expression(self, name):
+        output = self.spec['outputs'][name]
+        terms = []
+        for term in output['terms']:
+            parts = [repr(float(term['coef']))]
+            for kind, input_name, params in term['factors']:
+                parts.append(FACTORS[kind][2].format(*[repr(float(p)) for p in params], x=input_name))
+            terms.append('*'.join(parts))
+        expression = ' + '.join(terms) or '0.0'
+        scale = float(output.get('scale', 1.0))
+        if scale != 1.0:
+            expression = "{}*({})".format(repr(scale), expression)
+        return expression
+
+    def _source(self):
+        expressions = [self.output_expression(name) for name in self.outputs]
+        return "def {}({}):\n    return ({},)\n".format(self.name or 'force_model', ', '.join(self.inputs), ', '.join(expressions))
+
+    def _compile(self, functions):
+        # Note: only our own factor templates and floats end up in the source (see FACTORS)
+        namespace = dict(functions)
+        exec compile(self.source, '<force model {}>'.format(self.name), 'exec') in namespace
+        return namespace[self.name or 'force_model']
+
+    def evaluate(self, **inputs):
+        """ Vectorized: input name -> array; returns output name -> array """
+        values = self._vectorized(*[np.asarray(inputs[name], dtype=float) for name in self.inputs])
+        return OrderedDict(zip(self.outputs, values))
+
+
+class LookupTable(object):
+    """ Bilinear lookup of a model's outputs on a (regular or not) grid of its 2 inputs. Clamps at the edges. """
+
+    def __init__(self, table, inputs, outputs):
+        if len(inputs) != 2:
+            raise ValueError("Lookup tables need exactly 2 inputs (got {})".format(inputs))
+        self.x = [float(v) for v in table['axes'][inputs[0]]]
+        self.y = [float(v) for v in table['axes'][inputs[1]]]
+        self.values = [[[float(v) for v in row] for row in table['values'][name]] for name in outputs]
+
+    def _locate(self, axis, value):
+        """ Index of the cell containing value and the fraction of the way across it """
+        if value <= axis[0]:
+            return 0, 0.0
+        if value >= axis[-1]:
+            return len(axis) - 2, 1.0
+        i = bisect.bisect_right(axis, value) - 1
+        return i, (value - axis[i]) / (axis[i+1] - axis[i])
+
+    def __call__(self, x, y):
+        i, fx = self._locate(self.x, x)
+        j, fy = self._locate(self.y, y)
+        result = []
+        for grid in self.values:
+            row0, row1 = grid[i], grid[i+1]
+            a = row0[j] + (row0[j+1] - row0[j]) * fy
+            b = row1[j] + (row1[j+1] - row1[j]) * fy
+            result.append(a + (b - a) * fx)
+        return tuple(result)
+
+
+# Building (fitting) models
+
+def load_data(spec):
+    """ The model's fit data as input/output name -> array (all rows at once) """
+    data = spec.get('data')
+    if not data:
+        raise ValueError("Force model {} doesn't have a 'data' section to fit against".format(spec.get('name')))
+    with open(data['filename'], 'r') as f:
+        headers = [h.strip() for h in f.readline().split(',')]
+    table = np.loadtxt(data['filename'], delimiter=',', skiprows=1, ndmin=2)
+    return dict((name, table[:, headers.index(column)]) for name, column in data['columns'].iteritems())
+
+
+def _parameters(output):
+    """ Flatten an output's coefficients and factor parameters into a vector """
+    values = []
+    for term in output['terms']:
+        values.append(float(term['coef']))
+        for kind, input_name, params in term['factors']:
+            values.extend(float(p) for p in params)
+    return np.array(values)
+
+
+def _with_parameters(output, theta):
+    """ A copy of the output with its coefficients and factor parameters taken from theta """
+    theta = iter(theta)
+    terms = []
+    for term in output['terms']:
+        coef = next(theta)
+        factors = [[kind, input_name, [next(theta) for p in params]] for kind, input_name, params in term['factors']]
+        terms.append(OrderedDict([('coef', coef), ('factors', factors)]))
+    result = OrderedDict(output)
+    result['terms'] = terms
+    return result
+
+
+def _evaluate_terms(output, theta, data):
+    """ Vectorized sum of the terms (without the output's scale) for parameter vector theta """
+    n = len(next(data.itervalues()))
+    total = np.zeros(n)
+    k = 0
+    for term in output['terms']:
+        value = np.full(n, theta[k])
+        k += 1
+        for kind, input_name, params in term['factors']:
+            n_params, fn, template = FACTORS[kind]
+            value *= fn(data[input_name], theta[k:k+n_params])
+            k += n_params
+        total += value
+    return total
+
+
+def residual_stats(predicted, measured):
+    residuals = predicted - measured
+    rms = float(np.sqrt(np.mean(residuals**2)))
+    ss_tot = float(np.sum((measured - np.mean(measured))**2))
+    return OrderedDict([
+        ('rms', rms),
+        ('max_abs', float(np.max(np.abs(residuals)))),
+        ('rel_rms', rms / float(np.sqrt(np.mean(measured**2)))),
+        ('r2', 1.0 - float(np.sum(residuals**2)) / ss_tot if ss_tot else 0.0),
+        ('n', int(len(measured))),
+    ])
+
+
+def fit_output(output, data, measured, max_iter=500, tol=1e-10):
+    """
+    Levenberg-Marquardt fit of an output's parameters to the measured values, over all of the data at once.
+    Starts from the output's current parameters. Returns the fitted parameter vector.
+    """
+    theta = _parameters(output)
+    r = _evaluate_terms(output, theta, data) - measured
+    cost = np.dot(r, r)
+    lam = 1e-3
+    for iteration in xrange(max_iter):
+        # Forward difference jacobian (one vectorized evaluation per parameter)
+        J = np.empty((len(r), len(theta)))
+        for k in xrange(len(theta)):
+            h = 1e-7 * max(abs(theta[k]), 1e-3)
+            shifted = theta.copy()
+            shifted[k] += h
+            J[:, k] = (_evaluate_terms(output, shifted, data) - measured - r) / h
+        JtJ = np.dot(J.T, J)
+        g = np.dot(J.T, r)
+        improved = False
+        while lam < 1e12:
+            A = JtJ + lam * np.diag(np.diag(JtJ) + 1e-12)
+            try:
+                step = -np.linalg.solve(A, g)
+            except np.linalg.LinAlgError:
+                lam *= 10.0
+                continue
+            trial = theta + step
+            with np.errstate(over='ignore', invalid='ignore'):
+                r_trial = _evaluate_terms(output, trial, data) - measured
+            cost_trial = np.dot(r_trial, r_trial)
+            if np.isfinite(cost_trial) and cost_trial < cost:
+                improved = True
+                done = (cost - cost_trial) <= tol * cost
+                theta, r, cost = trial, r_trial, cost_trial
+                lam = max(lam / 10.0, 1e-12)
+                break
+            lam *= 10.0
+        if not improved or done:
+            break
+    return theta
+
+
+def build_table(model, axes):
+    """ Evaluate the model on a grid. axes: input name -> [min, max, n] """
+    table_axes = OrderedDict()
+    for name in model.inputs:
+        lo, hi, n = axes[name]
+        table_axes[name] = np.linspace(float(lo), float(hi), int(n))
+    grid = np.meshgrid(*table_axes.values(), indexing='ij')
+    values = model.evaluate(**dict(zip(model.inputs, grid)))
+    return OrderedDict([
+        ('axes', OrderedDict((name, axis.tolist()) for name, axis in table_axes.iteritems())),
+        ('values', OrderedDict((name, value.tolist()) for name, value in values.iteritems())),
+    ])
+
+
+def write_model(spec, filename):
+    """ Write a model file. The lookup table (if any) goes on one line at the end so that the rest stays readable. """
+    spec = OrderedDict(spec)
+    table = spec.pop('table', None)
+    text = json.dumps(spec, indent=2, separators=(',', ': '))
+    if table is not None:
+        text = text[:-2] + ',\n  "table": ' + json.dumps(table, separators=(',', ':')) + '\n}'
+    with open(filename, 'w') as f:
+        f.write(text + '\n')
+
+
+def report(spec, data, title):
+    """ Residuals of each output of spec against the data, as output name -> stats """
+    model = ForceModel(spec)
+    predicted = model.evaluate(**dict((name, data[name]) for name in model.inputs))
+    residuals = OrderedDict()
+    print title
+    for name in model.outputs:
+        # Note: the data is unscaled (see the note at the top)
+        scale = float(spec['outputs'][name].get('scale', 1.0))
+        stats = residual_stats(predicted[name] / scale, data[name])
+        residuals[name] = stats
+        print "  {:10} rms {rms:10.3f}  max {max_abs:10.3f}  rel rms {rel_rms:7.4f}  r2 {r2:.5f}  ({n} points)".format(name, **stats)
+    return residuals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="rLoop force models")
+    commands = parser.add_subparsers(dest='command')
+
+    p = commands.add_parser('fit', help="Refit a model to its data, starting from its current parameters")
+    p.add_argument('model')
+    p.add_argument('-o', '--output', help="Where to write the fitted model (default: overwrite the model file)")
+    p.add_argument('--table', action='store_true', help="Also build the lookup table (see table_axes in the model file)")
+
+    p = commands.add_parser('check', help="Report the residuals of a model against its data")
+    p.add_argument('model')
+
+    args = parser.parse_args(argv)
+
+    with open(args.model, 'r') as f:
+        spec = json.load(f, object_pairs_hook=OrderedDict)
+    data = load_data(spec)
+
+    before = report(spec, data, "{} ({}):".format(spec.get('name'), args.model))
+    if args.command == 'check':
+        return
+
+    fitted = OrderedDict(spec)
+    fitted['outputs'] = OrderedDict()
+    for name, output in spec['outputs'].iteritems():
+        theta = fit_output(output, data, data[name])
+        fitted['outputs'][name] = _with_parameters(output, theta.tolist())
+    fitted['residuals'] = report(fitted, data, "Fitted:")
+
+    if args.table:
+        fitted['table'] = build_table(ForceModel(fitted), spec['table_axes'])
+    elif 'table' in fitted:
+        del fitted['table']  # Note: it would be stale
+
+    output = args.output or args.model
+    write_model(fitted, output)
+    print "Wrote {}".format(output)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,6 +9,7 @@
 import numpy as np
 from collections import namedtuple
 from units import Units
+from force_models import load_force_model
 
 class ForceExerter:
     
@@ -81,10 +82,8 @@ class HoverEngineForce(ForceExerter):
         ForceExerter.__init__(self, sim, config)
         self.name = 'F_hover_engines'
 
-        self.lift_a = self.config.lift.a
-        self.lift_b = self.config.lift.b
-        self.lift_c = self.config.lift.c
-        self.lift_k = self.config.lift.k
+        # Lift and drag for one hover engine (the fit parameters are in the model file)
+        self.force_model = load_force_model(self.config.model or 'conf/force_models/hover_engine.json', bool(self.config.use_table))
                 
     def get_force(self):
         """ 
@@ -112,10 +111,9 @@ class HoverEngineForce(ForceExerter):
         #rpm = self.sim.pod.hover_engines.rpm  # @todo: implement this. Do we want to split the hover engines? 
         rpm = 0
         
-        # Lift
-        p1 = np.exp(self.lift_b * height)
-        p2 = np.arctan(self.lift_c * (velocity + self.lift_k * rpm))
-        z = self.lift_a * p1 * p2
+        # Lift and drag (see conf/force_models/hover_engine.json)
+        # Note: rpm isn't an input of the model yet (it's always 0 here)
+        x, z = self.force_model.fn(height, velocity)
         #print "Hover engine lift: {} (RPM: {}, pod velocity: {})".format(z, rpm, velocity)
     
     
@@ -137,11 +135,7 @@ class HoverEngineForce(ForceExerter):
         """
         
         # Alternative method for HE drag (manual curve fitting and linear system solving for o1 and o2 (f(0.006) = 150, f(0.012) = 65))
-        o1 = 235
-        o2 = -14166.667
-        coeff = height * o2 + o1
-        x = - coeff * (-np.exp(-.16*velocity)+1) * (1.6*np.exp(-0.02*velocity) + 1)
-        #x = - (height*(o2) + o1) * (-(np.exp(-0.16*velocity))+1)*((1.6*(np.exp(-0.02*velocity))+1))
+        # Note: this is the drag in the model: - (o1 + o2*height) * (-np.exp(-.16*velocity)+1) * (1.6*np.exp(-0.02*velocity) + 1)
 
         #print "Calculated he drag (1 engine) at height {} and velocity {}: {}".format(height, velocity, x)
 
@@ -177,9 +171,13 @@ class AeroForce(ForceExerter):
         ForceExerter.__init__(self, sim, config)
         self.name = 'F_aero'
 
+        self.apply_config()
+
+    def apply_config(self):
+        """ (Re)calculate our constants from config (can be called mid-run, e.g. by LiveConfigEditor) """
         # @see http://www.softschools.com/formulas/physics/air_resistance_formula/85/
         self.air_resistance_k = Units.SI(self.config.air_density) * self.config.drag_coefficient * Units.SI(self.config.drag_area) / 2
-        
+
     def get_force(self):
         """ Get the drag force (based on pod velocity, negative in the x direction since it's drag) """
         x = -self.air_resistance_k * self.sim.pod.velocity ** 2
@@ -30,10 +30,10 @@ import matplotlib.animation as animation
 
 from collections import OrderedDict
 
-import Queue
-
 import random
 
+from live_data import LiveData, MinMaxEnvelope
+
 #from matplotlib.font_manager import FontProperties
 
 # IMPORTANT: If you're getting one or more graphs that fail to initialize properly, clear fontList.cache from the following directory.
@@ -64,57 +64,34 @@ class SimGui(tk.Frame):
         # start the update process
         #self.update_plot()
         
-        self.data_queue = Queue.Queue()
+        # Min/max of the samples per pixel (against sample number), so redraws don't get slower as the sim runs
+        self.n_samples = 0
+        self.velocity_data = MinMaxEnvelope(1200)
+        self.acceleration_data = MinMaxEnvelope(1200)
     
     def step_callback(self, sensor, step_samples):
         for sample in step_samples:
-            self.data_queue.put(sample)
+            self.velocity_data.add(self.n_samples, sample.v)
+            self.acceleration_data.add(self.n_samples, sample.a)
+            self.n_samples += 1
     
     def update_plot(self):
         self.handle_data()
-        #v = self.sim.pod.velocity
-        #a = self.sim.pod.acceleration
-        #v = 0
-        #print "v: {}".format(v)
-        #v = self.servo.getVelocity()
-        #a = self.servo.getTorque()
-        #print "v2: {}".format(v)
-        #self.add_point(self.velocity_line, v)
-        #self.add_point(self.acceleration_line, a)
-        self.canvas.xview_moveto(1.0)
         self.after(100, self.update_plot)
 
     def handle_data(self):
-        # Clear the queue
-        size = self.data_queue.qsize()
-        v_samples = []
-        a_samples = []
-        for i in xrange(size):
-            sample = self.data_queue.get(False)
-            v_samples.append(sample.v)
-            a_samples.append(sample.a)
-
-        self.add_points(self.velocity_line, v_samples)
-        self.add_points(self.acceleration_line, a_samples)
+        self.set_points(self.velocity_line, self.velocity_data)
+        self.set_points(self.acceleration_line, self.acceleration_data)
             
-    def add_points(self, line, data):
-        coords = self.canvas.coords(line)
-        for value in data: 
-            x = coords[-2] + 1
-            coords.append(x)
-            coords.append(value)
-            #coords = coords[-1200:] # keep # of points to a manageable size
+    def set_points(self, line, envelope):
+        xs, ys = envelope.points()
+        if len(xs) < 2:
+            return
+        # Note: one x unit per bucket, so the line is about as wide as the number of buckets no matter how many samples there are
+        coords = np.empty(len(xs) * 2)
+        coords[0::2] = xs / envelope.bucket_width
+        coords[1::2] = ys
         self.canvas.coords(line, *coords)
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-
-    def add_point(self, line, y):
-        coords = self.canvas.coords(line)
-        x = coords[-2] + 1
-        coords.append(x)
-        coords.append(y)
-        coords = coords[-1200:] # keep # of points to a manageable size
-        self.canvas.coords(line, *coords)
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))        
 
 
 class TkAnimGui:
@@ -125,8 +102,11 @@ class TkAnimGui:
 
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.root)
 
-        #self.mat = TkGraphBase(self.fig, self.sim)
-        self.mat = TkGraphForces(self.fig, self.sim)
+        self.live_data = LiveData(self.sim)
+        self.sim.add_step_listener(self.live_data)
+
+        #self.mat = TkGraphBase(self.fig, self.sim, self.live_data)
+        self.mat = TkGraphForces(self.fig, self.sim, self.live_data)
 
         self.canvas.get_tk_widget().grid(column=0,row=1)
     
@@ -138,6 +118,10 @@ class GuiLayout:
         self.sim = sim
         self.root = tk.Tk()
 
+        # Shared by all of the graphs. One bucket per pixel (the graphs are 8in wide at 100dpi)
+        self.live_data = LiveData(self.sim, n_buckets=800)
+        self.sim.add_step_listener(self.live_data)
+
         self.layout()
 
     def layout(self):
@@ -150,35 +134,35 @@ class GuiLayout:
         graph2 = ttk.Frame(content, width=200, height=60)
         graph2_fig = plt.figure(1, figsize=(8,1.5), dpi=100)
         graph2_canvas = FigureCanvasTkAgg(graph2_fig, master=graph2)
-        TkGraphBase(graph2_fig, self.sim)
+        TkGraphBase(graph2_fig, self.sim, self.live_data)
         graph2_canvas.show()
         graph2_canvas.get_tk_widget().grid(column=0, row=0)
 
         graph1 = ttk.Frame(content, width=200, height=60)
         graph1_fig = plt.figure(2, figsize=(8,1.5), dpi=100)
         graph1_canvas = FigureCanvasTkAgg(graph1_fig, master=graph1)
-        TkGraphForces(graph1_fig, self.sim)  # hate this
+        TkGraphForces(graph1_fig, self.sim, self.live_data)  # hate this
         graph2_canvas.show()  # Don't forget this!
         graph1_canvas.get_tk_widget().grid(column=0, row=0)
 
         graph_brakes = ttk.Frame(content, width=200, height=60)
         graph_brakes_fig = plt.figure(3, figsize=(8,1), dpi=100)
         graph_brakes_canvas = FigureCanvasTkAgg(graph_brakes_fig, master=graph_brakes)
-        TkGraphBrakes(graph_brakes_fig, self.sim)
+        TkGraphBrakes(graph_brakes_fig, self.sim, self.live_data)
         graph_brakes_canvas.show()  # Don't forget this!
         graph_brakes_canvas.get_tk_widget().grid(column=0, row=0)
 
         graph_height = ttk.Frame(content, width=200, height=60)
         graph_height_fig = plt.figure(4, figsize=(8,1), dpi=100)
         graph_height_canvas = FigureCanvasTkAgg(graph_height_fig, master=graph_height)
-        TkGraphHeight(graph_height_fig, self.sim)
+        TkGraphHeight(graph_height_fig, self.sim, self.live_data)
         graph_height_canvas.show()  # Don't forget this!
         graph_height_canvas.get_tk_widget().grid(column=0, row=0)
 
         graph_accel = ttk.Frame(content, width=200, height=60)
         graph_accel_fig = plt.figure(5, figsize=(8,1.5), dpi=100)
         graph_accel_canvas = FigureCanvasTkAgg(graph_accel_fig, master=graph_accel)
-        TkGraphAccel(graph_accel_fig, self.sim)
+        TkGraphAccel(graph_accel_fig, self.sim, self.live_data)
         graph_accel_canvas.show()  # Don't forget this!
         graph_accel_canvas.get_tk_widget().grid(column=0, row=0)
         
@@ -209,9 +193,14 @@ class GuiLayout:
 
 
 class TkGraphBase:
-    def __init__(self, fig, sim):
+    """ Velocity graph, and the base for the other graphs. Lines are drawn from the shared LiveData envelopes. """
+
+    ylim = (0, 160)   # Velocity
+
+    def __init__(self, fig, sim, live_data):
         self.fig = fig
         self.sim = sim
+        self.live_data = live_data
         self.ax = self.fig.add_subplot(1, 1, 1)
         
         # Make it prettier
@@ -222,220 +211,82 @@ class TkGraphBase:
         self.ax.tick_params(labelsize=8)
         self.ax.set_axis_bgcolor("#2E333A")
         
-        self.x = [] # x-array
-        self.y = [] # y-array
+        self.lines = OrderedDict()  # channel name -> line
+        self.versions = {}          # channel name -> envelope version when we last drew it
 
-        #self.ani = animation.FuncAnimation(self.fig, self.animate, np.arange(1, 100), interval=25, blit=False, init_func=self.init)
-        self.ani = animation.FuncAnimation(self.fig, self.update, interval=25, blit=False, init_func=self.init)
+        # Note: with blitting only our lines are redrawn (on top of a saved background), and only when they've changed
+        self.ani = animation.FuncAnimation(self.fig, self.update, interval=25, blit=True, init_func=self.init)
+
+    def channels(self):
+        """ (LiveData channel name, y scale, line style) for each line on the graph """
+        return [('velocity', 1, {'color': "#5992F9"})]
 
     def init(self):
-        self.line, = self.ax.plot(self.x, self.y, color="#5992F9")  # Initial line (before scrolling)
-        self.ax.set_xlim(-50, 1270)  # Position
-        self.ax.set_ylim(0, 160)   # Velocity
+        self.scales = {}
+        for name, scale, style in self.channels():
+            self.lines[name], = self.ax.plot([], [], **style)  # Initial line (before scrolling)
+            self.scales[name] = scale
+        self.ax.set_xlim(*self.live_data.x_range)  # Position
+        self.ax.set_ylim(*self.ylim)
+        return self.lines.values()
 
     def update(self, i):
-        self.x.append(self.sim.pod.position)
-        self.y.append(self.sim.pod.velocity)
-        self.line.set_xdata(self.x)
-        self.line.set_ydata(self.y)  # update the data
+        changed = False
+        for name, line in self.lines.iteritems():
+            envelope = self.live_data.channels[name]
+            version = envelope.version
+            if version == self.versions.get(name):
+                continue
+            self.versions[name] = version
+            xs, ys = envelope.points()
+            line.set_data(xs, ys * self.scales[name])
+            changed = True
+
+        # Note: returning all of the lines if any changed, since the blit restores the background under all of them
+        if changed:
+            return self.lines.values()
+        return []
 
-        return self.line,
 
 class TkGraphForces(TkGraphBase):
-    def __init__(self, fig, sim):
-        TkGraphBase.__init__(self, fig, sim)
-
-        self.xs = []
-        self.force_ys = {}
-        
-        self.dlines = OrderedDict()
-        self.lines = []
-        
-        self.ani = animation.FuncAnimation(self.fig, self.update, interval=10, blit=False, init_func=self.init)
-
-        
-    def init(self):
-        self.xs.append(0)
-        for name, force in self.sim.pod.step_forces.iteritems():
-            self.force_ys[name] = [force.x]  # Initialize lists
-            self.dlines[name], = self.ax.plot(self.xs, self.force_ys[name], label=name)  # Initial line (before scrolling)
-            
-        self.ax.set_xlim(-50, 1270)  # Position
-        self.ax.set_ylim(150, -1400)
-        #self.ax.invert_yaxis()
-        
-        #fontP = FontProperties()
-        #fontP.set_size('small')
 
-        #self.ax.legend(loc='bottom center', ncol=len(self.dlines), prop=fontP)
+    ylim = (150, -1400)
         
-    def update(self, i):
-        self.xs.append(self.sim.pod.position)
-        for name, force in self.sim.pod.step_forces.iteritems():
-            line = self.dlines[name]
-            self.force_ys[name].append(force.x)
-            line.set_xdata(self.xs)
-            line.set_ydata(self.force_ys[name])
-         
-        #self.ax.relim()
-        #self.ax.autoscale()
-        
-        #return self.lines
-        return [line for line in self.dlines.values()]  
+    def channels(self):
+        # Note: from live_data rather than the sim, so that this also works in a viewer process (see viewer.py)
+        names = [name for name in self.live_data.channels if name.startswith('force.')]
+        return [(name, 1, {'label': name[len('force.'):]}) for name in names]
 
 
 class TkGraphBrakes(TkGraphBase):
-    def __init__(self, fig, sim):
-        TkGraphBase.__init__(self, fig, sim)
 
-        self.xs = []
-        self.gap_ys = [] # This will be a list of lists (one for each brake)
-        
-        self.lines = []
-        
-        #self.ani = animation.FuncAnimation(self.fig, self.update, interval=10, blit=False, init_func=self.init)
+    ylim = (-0.035, 0.035)
 
-    def init(self):
-        print "TkGraphBrakes init!"
-        self.xs.append(0)
-        brakes = self.sim.pod.brakes
-        self.gap_ys.append( [brakes[0].gap] )
-        self.gap_ys.append( [-brakes[1].gap] )  # Negative so that it shows on the bottom of the graph
-        
-        b0line, = self.ax.plot(self.xs, self.gap_ys[0], color="#DDDD33")
-        self.lines.append( b0line )
-
-        b1line, = self.ax.plot(self.xs, self.gap_ys[1], color="#DDDD33")
-        self.lines.append( b1line )
-            
-        self.ax.set_xlim(-50, 1270)  # Position
-        self.ax.set_ylim(-0.035, 0.035)
-        #self.ax.invert_yaxis()
-        
-        #fontP = FontProperties()
-        #fontP.set_size('small')
-
-        #self.ax.legend(loc='bottom center', ncol=len(self.dlines), prop=fontP)
-        
-    def update(self, i):
-        self.xs.append(self.sim.pod.position)
-
-        brakes = self.sim.pod.brakes
-
-        # Brake 0
-        self.gap_ys[0].append(brakes[0].gap)
-        self.lines[0].set_xdata(self.xs)
-        self.lines[0].set_ydata(self.gap_ys[0])
-
-        # Brake 1 -- use negative brake gap to show it on the bottom of the graph
-        self.gap_ys[1].append(-brakes[1].gap)
-        self.lines[1].set_xdata(self.xs)
-        self.lines[1].set_ydata(self.gap_ys[1])
-         
-        #self.ax.relim()
-        #self.ax.autoscale()
-        
-        return self.lines
+    def channels(self):
+        # Brake 1 uses negative brake gap to show it on the bottom of the graph
+        return [('brake_gap.0', 1, {'color': "#DDDD33"}),
+                ('brake_gap.1', -1, {'color': "#DDDD33"})]
 
 
 class TkGraphHeight(TkGraphBase):
-    def __init__(self, fig, sim):
-        TkGraphBase.__init__(self, fig, sim)
 
-        self.xs = []
-        self.height_ys = [] # This will be a list of lists (one for the actual height and one for each sensor)
-        
-        self.lines = []
-        
-        self.ani = animation.FuncAnimation(self.fig, self.update, interval=10, blit=False, init_func=self.init)
+    ylim = (0.0, 0.016)
 
-    def init(self):
-        print "TkGraphHeight init!"
-
-        self.xs.append(0)
-        height = self.sim.pod.he_height
-        self.height_ys.append( [height] )
-        
-        h0line, = self.ax.plot(self.xs, self.height_ys[0], label="Actual Height", color="g")
-        self.lines.append( h0line )
-            
-        self.ax.set_xlim(-50, 1270)  # Position
-        self.ax.set_ylim(0.0, 0.016)
-        #self.ax.invert_yaxis()
-        
-        #fontP = FontProperties()
-        #fontP.set_size('small')
-
-        #self.ax.legend(loc='bottom center', ncol=len(self.dlines), prop=fontP)
-        
-    def update(self, i):
-        self.xs.append(self.sim.pod.position)
-
-        height = self.sim.pod.he_height
-
-        # Actual height
-        line = self.lines[0]
-        self.height_ys[0].append(height)
-        line.set_xdata(self.xs)
-        line.set_ydata(self.height_ys[0])
-         
-        #self.ax.relim()
-        #self.ax.autoscale()
-        
-        return self.lines
+    def channels(self):
+        return [('he_height', 1, {'label': "Actual Height", 'color': "g"})]
 
 
 class TkGraphAccel(TkGraphBase):
-    def __init__(self, fig, sim):
-        TkGraphBase.__init__(self, fig, sim)
-
-        self.xs = []
-        self.ys = [] # This will be a list of lists (one for the actual height and one for each sensor)
-        
-        self.lines = []
-        
-        self.ani = animation.FuncAnimation(self.fig, self.update, interval=10, blit=False, init_func=self.init)
-
-    def init(self):
-        print "TkGraphAccel init!"
 
-        self.xs.append(0)
-        acceleration = self.sim.pod.acceleration
-        self.ys.append( [acceleration] )
-        
-        h0line, = self.ax.plot(self.xs, self.ys[0], label="Actual Accel", color="g")
-        self.lines.append( h0line )
-            
-        self.ax.set_xlim(-50, 1270)  # Position
-        self.ax.set_ylim(-50, 30)
-        #self.ax.invert_yaxis()
-        
-        #fontP = FontProperties()
-        #fontP.set_size('small')
+    ylim = (-50, 30)
 
-        #self.ax.legend(loc='bottom center', ncol=len(self.dlines), prop=fontP)
-        
-    def update(self, i):
-        self.xs.append(self.sim.pod.position)
-
-        acceleration = self.sim.pod.acceleration
-
-        # Actual height
-        line = self.lines[0]
-        self.ys[0].append(acceleration)
-        line.set_xdata(self.xs)
-        line.set_ydata(self.ys[0])
-         
-        #self.ax.relim()
-        #self.ax.autoscale()
-        
-        return self.lines
+    def channels(self):
+        return [('acceleration', 1, {'label': "Actual Accel", 'color': "g"})]
 
 
 class TkGraphVelocity(TkGraphBase):
-    # @todo: Move the code from the base to here
-    def __init__(self, fig, sim):
-        TkGraphBase.__init__(self, fig, sim)
+    # Note: the velocity graph is the base graph
+    pass
     
 
         
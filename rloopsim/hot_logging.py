@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# coding=UTF-8
+
+# File:     hot_logging.py
+# Purpose:  Logging for hot paths (per step and per callback) that costs next to nothing when the level is disabled
+# Author:   Ryan Adams (radams@cyandata.com, @ninetimeout)
+# Date:     2017-Feb-13
+
+# Note: logger.debug("...".format(...)) formats the string even when debug logging is off, and isEnabledFor() walks
+#       the logger hierarchy on every call. HotLogger caches the level checks when it's created (and again whenever
+#       configure_logging() or refresh_levels() is called), and formats the message only if a handler actually emits it:
+#
+#           self.logger = get_logger("Brake")
+#           self.logger.debug("gap {} at step {}", gap, n, brake=self.id)   # Formatted with str.format() on output
+#           if self.logger.debug_enabled:                                  # For the hottest paths, skip even the call
+#               ...
+#
+#       Keyword arguments are 'structured fields': they can be used by name in the message, and are also attached to
+#       the log record as record.fields for handlers that want them.
+# Note: AsyncQueueHandler moves handler I/O (console, files) to a background thread. See the 'queued' handler in
+#       conf/logging.conf.
+#       logging.shutdown() (run at exit) closes it, which drains the queue.
+
+import time
+import logging
+import logging.config
+import threading
+from collections import deque
+
+import yaml
+
+
+class LazyFormat(object):
+    """ A log message that isn't formatted until a handler asks for it """
+
+    __slots__ = ('msg', 'args', 'fields')
+
+    def __init__(self, msg, args, fields):
+        self.msg = msg
+        self.args = args
+        self.fields = fields
+
+    def __str__(self):
+        if not self.args and not self.fields:
+            return str(self.msg)
+        return self.msg.format(*self.args, **self.fields)
+
+
+class HotLogger(object):
+    """ Wraps a logging.Logger with cached level checks and lazy formatting. Anything else goes to the Logger. """
+
+    def __init__(self, name):
+        self.name = name
+        self.logger = logging.getLogger(name)
+        self.refresh()
+
+    def refresh(self):
+        """ Re-check our levels (after the logging config has changed) """
+        self.debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
+        self.info_enabled = self.logger.isEnabledFor(logging.INFO)
+
+    def _log(self, level, msg, args, fields):
+        exc_info = fields.pop('exc_info', None)
+        self.logger.log(level, LazyFormat(msg, args, fields), exc_info=exc_info, extra={'fields': fields})
+
+    def debug(self, msg, *args, **fields):
+        if self.debug_enabled:
+            self._log(logging.DEBUG, msg, args, fields)
+
+    def info(self, msg, *args, **fields):
+        if self.info_enabled:
+            self._log(logging.INFO, msg, args, fields)
+
+    def warning(self, msg, *args, **fields):
+        self._log(logging.WARNING, msg, args, fields)
+
+    warn = warning
+
+    def error(self, msg, *args, **fields):
+        self._log(logging.ERROR, msg, args, fields)
+
+    def exception(self, msg, *args, **fields):
+        fields['exc_info'] = True
+        self._log(logging.ERROR, msg, args, fields)
+
+    def critical(self, msg, *args, **fields):
+        self._log(logging.CRITICAL, msg, args, fields)
+
+    def setLevel(self, level):
+        self.logger.setLevel(level)
+        refresh_levels()  # Note: children of this logger may have changed too
+
+    def __getattr__(self, name):
+        return getattr(self.logger, name)
+
+
+_loggers = {}
+_loggers_lock = threading.Lock()
+
+
+def get_logger(name):
+    """ The HotLogger for name (one per name, like logging.getLogger()) """
+    with _loggers_lock:
+        try:
+            return _loggers[name]
+        except KeyError:
+            logger = _loggers[name] = HotLogger(name)
+            return logger
+
+
+def refresh_levels():
+    """ Re-check the cached levels of all HotLoggers. Call this if you change levels or config after startup. """
+    with _loggers_lock:
+        loggers = _loggers.values()
+    for logger in loggers:
+        logger.refresh()
+
+
+def configure_logging(filename='conf/logging.conf'):
+    """ Load a (yaml) logging.config.dictConfig file and update the HotLoggers """
+    with open(filename) as f:  # @todo: make this work when run from anywhere (this works if run from top directory)
+        logging.config.dictConfig(yaml.load(f))
+    refresh_levels()
+
+
+class AsyncQueueHandler(logging.Handler):
+    """
+    Hands records to a background thread, which passes them on to the target handlers (handlers, or the names of
+    handlers from the same logging config). Never blocks the caller: if the queue is full, records are dropped and
+    counted.
+    """
+
+    def __init__(self, targets=(), queue_size=10000, level=logging.NOTSET):
+        logging.Handler.__init__(self, level)
+        self.targets = []
+        for target in targets:
+            if not isinstance(target, logging.Handler):
+                # Note: dictConfig() configures handlers in order of name, so our name must sort after our targets'
+                if target not in logging._handlers:
+                    raise ValueError("Unknown target handler {!r} (handlers are configured in order of name, so this one's name must sort after its targets')".format(target))
+                target = logging._handlers[target]
+            self.targets.append(target)  # Note: logging only keeps weak references to handlers, so we need these
+        self.queue = deque()
+        self.queue_size = queue_size
+        self.n_dropped = 0
+        self.ready = threading.Condition()
+        self.thread = None
+        self.closed = False
+
+    def emit(self, record):
+        # Note: format the message here, while its arguments are still what they were when it was logged
+        try:
+            record.msg = record.getMessage()
+            record.args = None
+            if record.exc_info:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+                record.exc_info = None
+        except Exception:
+            self.handleError(record)
+            return
+
+        with self.ready:
+            if len(self.queue) >= self.queue_size:
+                self.n_dropped += 1
+                return
+            self.queue.append(record)
+            self.ready.notify()
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="AsyncQueueHandler")
+                self.thread.daemon = True
+                self.thread.start()
+
+    def _run(self):
+        while True:
+            with self.ready:
+                while not self.queue and not self.closed:
+                    self.ready.wait(0.5)
+                if not self.queue and self.closed:
+                    return
+                records = list(self.queue)
+                self.queue.clear()
+                n_dropped, self.n_dropped = self.n_dropped, 0
+            if n_dropped:
+                records.append(logging.makeLogRecord({'name': 'AsyncQueueHandler', 'levelno': logging.WARNING, 'levelname': 'WARNING',
+                    'msg': "Dropped {} log records (queue full)".format(n_dropped)}))
+            for record in records:
+                for target in self.targets:
+                    if record.levelno >= target.level:
+                        target.handle(record)
+
+    def flush(self):
+        """ Wait (briefly) for the queue to drain """
+        for i in xrange(100):
+            with self.ready:
+                if not self.queue:
+                    break
+            time.sleep(0.01)
+
+    def close(self):
+        with self.ready:
+            self.closed = True
+            self.ready.notify()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(2.0)
+        logging.Handler.close(self)
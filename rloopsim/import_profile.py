@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# coding=UTF-8
+
+# File:     import_profile.py
+# Purpose:  Startup report showing how long each module took to import (for the --import-profile command line option)
+# Author:   Ryan Adams (radams@cyandata.com, @ninetimeout)
+# Date:     2017-Feb-13
+
+# Note: python 2.7 has no -X importtime, so we wrap __import__ and time each module the first time it's loaded.
+#       install() has to be called before the imports you want to see, so entry points check sys.argv for
+#       '--import-profile' at the very top of the file (before argparse has run).
+
+import sys
+import time
+import __builtin__
+
+
+class ImportProfiler(object):
+    """ Times first-time imports. Self time excludes the modules that were imported along the way. """
+
+    def __init__(self):
+        self.original_import = None
+        self.start_t = None
+        self.timings = {}   # module name -> [cumulative sec, self sec, depth]
+        self.order = []     # module names in the order they finished loading
+        self._stack = []    # Time spent in nested imports, per level
+
+    def install(self):
+        if self.original_import is not None:
+            return
+        self.original_import = __builtin__.__import__
+        self.start_t = time.time()
+        __builtin__.__import__ = self._import
+
+    def uninstall(self):
+        if self.original_import is not None:
+            __builtin__.__import__ = self.original_import
+            self.original_import = None
+
+    @staticmethod
+    def _module_name(name, globals, level):
+        """ Implicit relative imports (e.g. 'core' inside numpy) are reported as package.name """
+        if level < 0 and globals and globals.get('__name__'):
+            package = globals.get('__package__')
+            if not package:
+                package = globals['__name__'] if '__path__' in globals else globals['__name__'].rpartition('.')[0]
+            if package and sys.modules.get("{}.{}".format(package, name)) is not None:
+                return "{}.{}".format(package, name)
+        return name
+
+    def _import(self, name, globals=None, locals=None, fromlist=None, level=-1):
+        n_modules = len(sys.modules)
+        depth = len(self._stack)
+        self._stack.append(0.0)
+        t = time.time()
+        try:
+            return self.original_import(name, globals, locals, fromlist, level)
+        finally:
+            cumulative = time.time() - t
+            nested = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += cumulative
+            # Only count imports that actually loaded something (most calls just find the module in sys.modules)
+            # Note: failed imports (e.g. optional dependencies) are counted too, since they still cost time
+            if len(sys.modules) > n_modules:
+                module_name = self._module_name(name, globals, level)
+                if module_name not in self.timings:
+                    self.timings[module_name] = [cumulative, cumulative - nested, depth]
+                    self.order.append(module_name)
+
+    def report(self, limit=25, min_sec=0.001):
+        """ Summary of the slowest imports, as a string """
+        total = time.time() - self.start_t
+        lines = ["Import profile: {:.3f}s since startup, {} modules imported".format(total, len(self.timings))]
+
+        top_level = sum(cumulative for cumulative, _, depth in self.timings.values() if depth == 0)
+        lines.append("  {:.3f}s in imports, {:.3f}s elsewhere".format(top_level, total - top_level))
+
+        lines.append("  {:>9}  {:>9}  module (slowest by self time)".format("self", "cumulative"))
+        by_self = sorted(self.order, key=lambda name: self.timings[name][1], reverse=True)
+        for name in by_self[:limit]:
+            cumulative, self_sec, depth = self.timings[name]
+            if self_sec < min_sec:
+                break
+            lines.append("  {:8.3f}s  {:8.3f}s  {}".format(self_sec, cumulative, name))
+
+        lines.append("  {:>9}  {:>9}  module (top level imports in load order)".format("self", "cumulative"))
+        for name in self.order:
+            cumulative, self_sec, depth = self.timings[name]
+            if depth == 0 and cumulative >= min_sec:
+                lines.append("  {:8.3f}s  {:8.3f}s  {}".format(self_sec, cumulative, name))
+
+        return "\n".join(lines)
+
+
+profiler = ImportProfiler()
+
+
+def install_if_requested(argv=None):
+    """ Start profiling imports if '--import-profile' is on the command line. Returns True if profiling. """
+    if '--import-profile' in (argv if argv is not None else sys.argv):
+        profiler.install()
+        return True
+    return False
+
+
+def report(limit=25):
+    """ Print the report (if we're profiling) """
+    if profiler.start_t is not None:
+        print(profiler.report(limit))
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# coding=UTF-8
+
+# File:     live_config.py
+# Purpose:  Change (whitelisted) config values on a running sim without re-initializing it
+# Author:   Ryan Adams (radams@cyandata.com, @ninetimeout)
+# Date:     2017-Feb-13
+
+# Note: Components keep references into the sim config, so we just change the value in the config and then
+#       have the affected component re-derive its constants from it (see the apply_config() methods).
+#       Since the config is shared, edits also survive a sim reset (SimControlServicer._reset_sim()).
+
+import logging
+import numbers
+import yaml
+
+from config_compiler import compile_config, UNIT_STRING_RE
+
+
+# Config paths (relative to the 'sim' section) that can be edited on a live sim, and how to find the
+# component(s) that need to re-apply their config afterward. '*' matches a single path element, and the
+# matched elements are passed to the finder function (e.g. the brake index).
+EDITABLE_PARAMS = [
+    ('pod.forces.aero.drag_coefficient',   lambda sim, idx: [sim.pod.force_exerters['aero']]),
+    ('pod.forces.aero.drag_area',          lambda sim, idx: [sim.pod.force_exerters['aero']]),
+    ('pod.forces.aero.air_density',        lambda sim, idx: [sim.pod.force_exerters['aero']]),
+    ('pod.brakes.*.gap.gap_close_min_time', lambda sim, idx: [sim.pod.brakes[idx[0]]]),
+    ('pusher.max_push_velocity',           lambda sim, idx: [sim.pusher]),
+    ('pusher.max_push_time',               lambda sim, idx: [sim.pusher]),
+    ('pusher.push_end_position',           lambda sim, idx: [sim.pusher]),
+    ('pusher.push_accel',                  lambda sim, idx: [sim.pusher]),
+    ('pusher.brake_decel',                 lambda sim, idx: [sim.pusher]),
+    ('pusher.coast_duration',              lambda sim, idx: [sim.pusher]),
+    ('pusher.profile',                     lambda sim, idx: [sim.pusher]),
+    ('sensors.accel.*.noise.center',       lambda sim, idx: [sim.sensors['accel'][idx[0]]]),
+    ('sensors.accel.*.noise.scale',        lambda sim, idx: [sim.sensors['accel'][idx[0]]]),
+    ('sensors.accel.*.noise.enabled',      lambda sim, idx: [sim.sensors['accel'][idx[0]]]),
+]
+
+
+class LiveConfigEditor(object):
+    """ Apply 'path=value' edits (e.g. 'pusher.push_accel=0.8 G') to a sim """
+
+    def __init__(self, sim):
+        self.sim = sim
+        self.logger = logging.getLogger("LiveConfigEditor")
+
+    def edit(self, edits):
+        """
+        Apply a list of 'path=value' strings. Either all of the edits are applied or none are.
+        Returns a list of (path, old value, new value). Raises ValueError if an edit isn't allowed or doesn't work.
+        """
+        parsed = [self._parse(edit) for edit in edits]
+
+        applied = []
+        failed_path = None
+        try:
+            for path, value, components in parsed:
+                failed_path = path
+                container, key = self._lookup(path)
+                old_value = container[key]
+                if isinstance(value, numbers.Number) and not self._has_units(value) and not isinstance(value, bool) and self._has_units(old_value):
+                    raise ValueError("needs units (e.g. '{}')".format(old_value))
+                container.override(key, value)
+                applied.append((path, container, key, old_value))
+                for component in components:
+                    component.apply_config()
+        except Exception as e:
+            # Put everything back the way it was
+            for path, container, key, old_value in reversed(applied):
+                container.override(key, old_value)
+            for _, _, components in parsed:
+                for component in components:
+                    component.apply_config()
+            raise ValueError("Could not apply {}: {}".format(failed_path, e))
+
+        changes = [(path, old_value, container[key]) for path, container, key, old_value in applied]
+        for change in changes:
+            self.logger.info("Config {} changed from {} to {}".format(*change))
+        return changes
+
+    def _parse(self, edit):
+        """ Split 'path=value' and find the components affected by the path """
+        if '=' not in edit:
+            raise ValueError("Expected 'path=value', got '{}'".format(edit))
+        path, value = [part.strip() for part in edit.split('=', 1)]
+
+        components = self._find_components(path)
+        if components is None:
+            raise ValueError("{} is not a live-editable parameter".format(path))
+
+        # Let yaml decide if it's a number, bool, or string (e.g. '1.5 G'), same as in the config files, and resolve units
+        return path, compile_config(yaml.safe_load(value)), components
+
+    @staticmethod
+    def _has_units(value):
+        """ Is a config value a quantity with units (so a bare number would be ambiguous)? """
+        if hasattr(value, 'text'):
+            return True  # Compiled (see config_compiler.SIValue)
+        return isinstance(value, basestring) and UNIT_STRING_RE.match(value) is not None
+
+    def _find_components(self, path):
+        parts = path.split('.')
+        for pattern, finder in EDITABLE_PARAMS:
+            pattern_parts = pattern.split('.')
+            if len(pattern_parts) != len(parts):
+                continue
+            wildcards = []
+            for pattern_part, part in zip(pattern_parts, parts):
+                if pattern_part == '*':
+                    if not part.isdigit():
+                        break
+                    wildcards.append(int(part))
+                elif pattern_part != part:
+                    break
+            else:
+                try:
+                    return finder(self.sim, wildcards)
+                except (IndexError, KeyError):
+                    return None
+        return None
+
+    def _lookup(self, path):
+        """ Get the (dict, key) holding the value at path """
+        # Note: Config wraps nested dicts without copying them (and CompiledConfig sections are shared), so overriding a value on the returned container changes the sim config
+        container = self.sim.config
+        parts = path.split('.')
+        for part in parts[:-1]:
+            container = container[self._key(container, part)]
+        return container, self._key(container, parts[-1])
+
+    @staticmethod
+    def _key(container, part):
+        # Numbered entries (e.g. brakes, accelerometers) have int keys in the yaml
+        if part not in container and part.isdigit():
+            return int(part)
+        return part
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# coding=UTF-8
+
+# File:     live_data.py
+# Purpose:  Fixed-size min/max envelopes of sim values for live graphs (used by gui.py and viewer.py)
+# Author:   Ryan Adams (radams@cyandata.com, @ninetimeout)
+# Date:     2017-Feb-13
+
+# Note: The graphs used to append every sample to ever-growing lists, so each redraw got slower the longer the sim ran.
+#       Here each channel keeps the min and max value for a fixed number of x buckets (about one per pixel), so both
+#       recording a step and drawing a graph cost the same at the end of a run as at the start.
+
+from collections import OrderedDict
+import numpy as np
+
+
+class MinMaxEnvelope(object):
+    """
+    Min and max y for each of a fixed number of x buckets. If x runs past the last bucket, neighboring buckets
+    are merged (halving the resolution) so that the size stays fixed.
+    """
+
+    def __init__(self, n_buckets, x_min=0.0, x_max=None, bucket_width=1.0):
+        self.n_buckets = n_buckets + n_buckets % 2  # Needs to be even so we can merge pairs
+        self.x_min = x_min
+        if x_max is not None:
+            bucket_width = (x_max - x_min) / float(self.n_buckets)
+        self.initial_bucket_width = bucket_width
+        self.version = 0  # Bumped whenever anything changes, so graphs can skip redrawing
+        self.reset()
+
+    def reset(self):
+        self.bucket_width = self.initial_bucket_width
+        self.mins = np.full(self.n_buckets, np.nan)
+        self.maxs = np.full(self.n_buckets, np.nan)
+        self.n_used = 0   # Buckets [0, n_used) may have data
+        self.version += 1
+
+        # The current bucket is kept in plain floats and only written to the arrays when x moves to another
+        # bucket (this is called every sim step, so it needs to be cheap)
+        self._bucket = -1
+        self._min = None
+        self._max = None
+
+    def add(self, x, y):
+        b = int((x - self.x_min) / self.bucket_width)
+        if b == self._bucket:
+            if y < self._min:
+                self._min = y
+                self.version += 1
+            elif y > self._max:
+                self._max = y
+                self.version += 1
+            return
+
+        self._flush()
+        if b < 0:
+            b = 0  # Before the start (e.g. pod pushed backwards) -- lump it in with the first bucket
+        while b >= self.n_buckets:
+            self._merge()
+            b = int((x - self.x_min) / self.bucket_width)
+        self._bucket = b
+        self._min = y
+        self._max = y
+        self.version += 1
+
+    def _flush(self):
+        """ Write the current bucket to the arrays """
+        b = self._bucket
+        if b < 0:
+            return
+        current = self.mins[b]
+        if not current <= self._min:   # Note: also true if current is nan
+            self.mins[b] = self._min
+        current = self.maxs[b]
+        if not current >= self._max:
+            self.maxs[b] = self._max
+        self.n_used = max(self.n_used, b + 1)
+        self._bucket = -1
+
+    def _merge(self):
+        """ Halve the resolution to make room for more x """
+        # Note: new arrays rather than modifying them in place, so a graph reading the old ones isn't affected
+        half = self.n_buckets // 2
+        pad = np.full(half, np.nan)
+        self.mins = np.concatenate((np.fmin(self.mins[0::2], self.mins[1::2]), pad))
+        self.maxs = np.concatenate((np.fmax(self.maxs[0::2], self.maxs[1::2]), pad))
+        self.bucket_width *= 2
+        self.n_used = (self.n_used + 1) // 2
+
+    def points(self):
+        """ (x, y) arrays for drawing: the min and max at the center of each bucket that has data """
+        mins = self.mins
+        maxs = self.maxs
+        n = self.n_used
+        b, b_min, b_max = self._bucket, self._min, self._max
+        if b >= 0:
+            n = max(n, b + 1)
+        mins = mins[:n].copy()
+        maxs = maxs[:n].copy()
+        if b >= 0:
+            # Include the bucket we're still filling
+            mins[b] = np.fmin(mins[b], b_min)
+            maxs[b] = np.fmax(maxs[b], b_max)
+
+        has_data = ~np.isnan(mins)
+        centers = self.x_min + (np.arange(n)[has_data] + 0.5) * self.bucket_width
+        return np.repeat(centers, 2), np.column_stack((mins[has_data], maxs[has_data])).ravel()
+
+
+class LiveData(object):
+    """ Sim step listener that keeps a min/max envelope (against pod position) of each value shown in the GUI """
+
+    def __init__(self, sim, n_buckets=800, x_range=(-50, 1270)):
+        self.sim = sim
+        self.n_buckets = n_buckets
+        self.x_range = x_range
+
+        self.channels = OrderedDict()  # name -> MinMaxEnvelope
+        self._getters = []             # (envelope, function(sim) that gets the value)
+
+        self.add_channel('velocity', lambda sim: sim.pod.velocity)
+        self.add_channel('acceleration', lambda sim: sim.pod.acceleration)
+        self.add_channel('he_height', lambda sim: sim.pod.he_height)
+        for i in xrange(len(sim.pod.brakes)):
+            self.add_channel('brake_gap.{}'.format(i), lambda sim, i=i: sim.pod.brakes[i].gap)
+        for name in sim.pod.step_forces:
+            self.add_channel('force.{}'.format(name), lambda sim, name=name: sim.pod.step_forces[name].x)
+
+    def add_channel(self, name, getter):
+        envelope = MinMaxEnvelope(self.n_buckets, self.x_range[0], self.x_range[1])
+        self.channels[name] = envelope
+        self._getters.append((envelope, getter))
+        return envelope
+
+    def step_callback(self, sim):
+        x = sim.pod.position
+        for envelope, getter in self._getters:
+            envelope.add(x, getter(sim))
+
+    def reset(self):
+        for envelope in self.channels.values():
+            envelope.reset()
+
+
+class RingLiveData(object):
+    """ The same channels as LiveData, but fed from a StateRingReader (i.e. from a sim running in another process) """
+
+    def __init__(self, reader, n_buckets=800, x_range=(-50, 1270)):
+        self.reader = reader
+        self.n_buckets = n_buckets
+        self.x_range = x_range
+
+        self.channels = OrderedDict()  # name -> MinMaxEnvelope
+        self._getters = []             # (envelope, function(records) that gets the values)
+
+        self.add_channel('velocity', lambda records: records['pod_v'])
+        self.add_channel('acceleration', lambda records: records['pod_a'])
+        self.add_channel('he_height', lambda records: records['he_height'])
+        for i in xrange(reader.n_brakes):
+            self.add_channel('brake_gap.{}'.format(i), lambda records, i=i: records['brake_gap.{}'.format(i)])
+        for name in reader.force_names:
+            self.add_channel('force.{}'.format(name), lambda records, name=name: records['force_x.{}'.format(name)])
+
+        self.latest = None  # Most recent record
+
+    def add_channel(self, name, getter):
+        envelope = MinMaxEnvelope(self.n_buckets, self.x_range[0], self.x_range[1])
+        self.channels[name] = envelope
+        self._getters.append((envelope, getter))
+        return envelope
+
+    def poll(self):
+        """ Read whatever the sim has written since the last poll. Returns the number of new records. """
+        records = self.reader.read()
+        if self.reader.restarted:
+            for envelope in self.channels.values():
+                envelope.reset()
+        if not len(records):
+            return 0
+
+        xs = records['pod_p'].tolist()
+        for envelope, getter in self._getters:
+            for x, y in zip(xs, getter(records).tolist()):
+                envelope.add(x, y)
+        self.latest = records[-1]
+        return len(records)
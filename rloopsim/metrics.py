@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# coding=UTF-8
+
+# File:     metrics.py
+# Purpose:  Rolling run metrics (steps/sec, real time factor, sensor and csv throughput, FCU timer lag, queue depths)
+# Author:   Ryan Adams (radams@cyandata.com, @ninetimeout)
+# Date:     2017-Feb-13
+
+# Note: The sim only compares the step count against the next sample step. Everything else happens when a sample is
+#       taken, and the number of steps between samples is adjusted so that samples come about once per interval of
+#       wall clock time however fast or slow the sim is running.
+# Note: The latest metrics are available as RunMetrics.latest (a plain dict, replaced on each sample so that other
+#       threads can read it safely), via the GetStats gRPC call (see simulator_control.py) and, if a filename is
+#       configured, in a json file in the working directory.
+
+import os
+import json
+import time
+import logging
+from collections import deque, OrderedDict
+
+from units import Units
+from hot_logging import get_logger
+
+
+class RunMetrics(object):
+    """ Sim step listener that samples run metrics every so often (in wall clock time) """
+
+    FIRST_SAMPLE_STEPS = 100  # Before we know how fast the sim is running
+
+    def __init__(self, sim, config):
+        self.sim = sim
+        self.config = config
+        self.logger = get_logger("RunMetrics")
+
+        self.interval = Units.SI(self.config.interval)   # seconds (wall clock)
+        self.window = int(self.config.window or 10)      # Rates are averaged over this many samples
+        self.filename = self.config.filename
+
+        self.queues = OrderedDict()   # name -> function returning the queue's current depth
+        self.reset()
+
+    def reset(self):
+        self.history = deque(maxlen=self.window + 1)  # Counter snapshots, oldest first
+        self.next_sample_step = 0
+        self.latest = None
+
+    def add_queue(self, name, depth_fn):
+        """ Report the depth of a queue that isn't attached to a sensor (e.g. telemetry subscribers) """
+        self.queues[name] = depth_fn
+
+    def step_callback(self, sim):
+        if sim.n_steps_taken < self.next_sample_step:
+            return
+        self.sample(sim)
+
+    def end_callback(self, sim):
+        self.sample(sim)
+
+    def sample(self, sim):
+        now = time.time()
+        counters = {
+            't': now,
+            'n_steps': sim.n_steps_taken,
+            'elapsed_time_usec': sim.elapsed_time_usec,
+            'sensor_samples': 0,
+            'csv_bytes': 0,
+        }
+        for name, sensor in self._sensors():
+            counters['sensor_samples'] += sensor.n_samples
+            for listener in sensor.step_listeners:
+                bytes_written = getattr(listener, 'bytes_written', None)
+                if bytes_written is not None:
+                    counters['csv_bytes'] += bytes_written()
+        self.history.append(counters)
+
+        oldest = self.history[0]
+        dt = now - oldest['t']
+        if dt > 0:
+            rate = lambda key: (counters[key] - oldest[key]) / dt
+            steps_per_sec = rate('n_steps')
+            metrics = OrderedDict([
+                ('steps_per_sec', steps_per_sec),
+                ('real_time_factor', rate('elapsed_time_usec') / 1000000.0),   # Sim seconds per wall clock second
+                ('sensor_samples_per_sec', rate('sensor_samples')),
+                ('csv_bytes_per_sec', rate('csv_bytes')),
+            ])
+        else:
+            steps_per_sec = 0.0
+            metrics = OrderedDict((key, 0.0) for key in ('steps_per_sec', 'real_time_factor', 'sensor_samples_per_sec', 'csv_bytes_per_sec'))
+
+        metrics['n_steps'] = counters['n_steps']
+        metrics['elapsed_time_usec'] = counters['elapsed_time_usec']
+        metrics['sensor_samples'] = counters['sensor_samples']
+        metrics['csv_bytes'] = counters['csv_bytes']
+        metrics['wall_time'] = now
+        metrics['fcu_timer_lag_ms'], metrics['fcu_timer_max_lag_ms'] = self._timer_lag(sim)
+        metrics['queue_depths'] = self._queue_depths()
+        self.latest = metrics
+
+        # Take the next sample about one interval from now
+        if steps_per_sec > 0:
+            self.next_sample_step = sim.n_steps_taken + max(1, int(steps_per_sec * self.interval))
+        else:
+            self.next_sample_step = sim.n_steps_taken + self.FIRST_SAMPLE_STEPS
+
+        if self.filename:
+            self._write(sim)
+        self.logger.debug("{steps_per_sec:.0f} steps/s, {real_time_factor:.3f}x real time, {sensor_samples_per_sec:.0f} samples/s, {csv_bytes_per_sec:.0f} csv bytes/s, FCU timer lag {fcu_timer_lag_ms:.3f}ms", **metrics)
+
+    def _sensors(self):
+        for name, sensor in self.sim.sensors.iteritems():
+            if isinstance(sensor, list):
+                for i, s in enumerate(sensor):
+                    yield "{}.{}".format(name, i), s
+            else:
+                yield name, sensor
+
+    def _timer_lag(self, sim):
+        """ Latest and worst (since the last sample) lag of the FCU timers, in ms """
+        if not sim.config.fcu.enabled:
+            return 0.0, 0.0
+        lag = max_lag = 0.0
+        for timer in sim.fcu.timerunner.get_timers():
+            lag = max(lag, timer.lag)
+            max_lag = max(max_lag, timer.max_lag)
+            timer.max_lag = 0.0
+        return lag * 1000.0, max_lag * 1000.0
+
+    def _queue_depths(self):
+        """ Depths of the sensor listener queues (e.g. the FCU's) and any queues added with add_queue() """
+        depths = OrderedDict()
+        for name, sensor in self._sensors():
+            for listener in sensor.step_listeners:
+                q = getattr(listener, 'q', None)
+                if q is not None:
+                    depths["sensor.{}".format(name)] = depths.get("sensor.{}".format(name), 0) + len(q)
+        for name, depth_fn in self.queues.iteritems():
+            depths[name] = depth_fn()
+        return depths
+
+    def _write(self, sim):
+        """ Write the latest metrics to our file (atomically, so readers never see half a file) """
+        filename = os.path.join(sim.config.working_dir, self.filename)
+        tmp_filename = filename + '.tmp'
+        try:
+            with open(tmp_filename, 'w') as f:
+                json.dump(self.latest, f, indent=2)
+            if os.name == 'nt' and os.path.exists(filename):
+                os.remove(filename)  # Note: rename won't replace an existing file on Windows
+            os.rename(tmp_filename, filename)
+        except (IOError, OSError) as e:
+            self.logger.warning("Couldn't write metrics to {}: {}", filename, e)
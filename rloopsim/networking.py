@@ -16,6 +16,7 @@ import logging
 from collections import namedtuple
 
 from config import Config
+from hot_logging import get_logger
 
 SpaceXPacket = namedtuple('SpaceXPacket', 
     ['team_id', 'status', 'acceleration', 'position', 'velocity', 'battery_voltage', 'battery_current', 'battery_temperature', 'pod_temperature', 'stripe_count'])
@@ -25,7 +26,7 @@ class PodComms:
     def __init__(self, sim, config):
         self.sim = sim
         self.config = config
-        self.logger = logging.getLogger("PodComms")
+        self.logger = get_logger("PodComms")
 
         # print self.config.nodes
         thismodule = sys.modules[__name__]
@@ -53,7 +54,7 @@ class PodComms:
         # @todo: get the connection to use based on the destination port
         dest_node = self.port_node_map.get(dest_port, None)  # Find out where we want to send the packet by destination port (we only use ports for addressing)
         if dest_node is None:
-            self.logger.debug("Got packet destined for port {} -- that's not a receive port for us, so we should probably send it.".format(dest_port))
+            self.logger.debug("Got packet destined for port {} -- that's not a receive port for us, so we should probably send it.", dest_port)
         else:
             dest_addr = dest_node.tx_address
             dest_addr = ('127.255.255.255', dest_addr[1])  # Broadcast? Working on a way to get around the port binding issue (can't transmit out of python if bound on 127.0.0.1 and a port)
@@ -76,18 +77,26 @@ class PodComms:
     
     def run_threaded(self):
         # Start all of the nodes so they can listen on their rx_address
+        # Note: after a Sim.reset() the nodes are usually still listening (blocked in recvfrom()), so only start the ones that aren't
         for node in self.nodes.values():
-            node.run_threaded()        
+            if node.thread is None or not node.thread.is_alive():
+                node.run_threaded()        
+
+    def reset(self):
+        """ Get ready for another run (see Sim.reset()) """
+        for node in self.nodes.values():
+            node.end_flag = False
     
 
 class NetworkNode:
     def __init__(self, sim, config):
         self.sim = sim
         self.config = config
-        self.logger = logging.getLogger("NetworkNode")
+        self.logger = get_logger("NetworkNode")
 
         # Should we stop yet? 
         self.end_flag = False
+        self.thread = None
         
         # Set up our addresses
         if self.sim.config.networking.force_loopback:
@@ -112,6 +121,7 @@ class NetworkNode:
         t = threading.Thread(target=self.run)
         t.daemon = True
         t.start()
+        self.thread = t
         return t
 
     def run(self):
@@ -146,7 +156,7 @@ class NetworkNode:
             data, source_address = self.sock.recvfrom(self.buffer_len)
     
             dest_address = self.rx_address  # We are the destination, so use our rx_port
-            self.logger.debug('Received {} bytes from {}. Dest is {}'.format(len(data), source_address, dest_address))
+            self.logger.debug('Received {} bytes from {}. Dest is {}', len(data), source_address, dest_address)
             #print >>sys.stderr, data
 
             if data:
@@ -157,14 +167,14 @@ class NetworkNode:
     def recv_udp(self, packet, source_address):
         # @todo: is this used anywhere? We can maybe get rid of it (superseded by handle_udp_packet?)
         #self.logger.debug("Received packet: {} from {}".format([ str(x) for x in packet ]), source_address)  # verbose...
-        self.logger.debug("Received {} bytes from {} (dropping them for lack of a handler)".format(len(packet), source_address))
+        self.logger.debug("Received {} bytes from {} (dropping them for lack of a handler)", len(packet), source_address)
                 
         # By default, pass all UDP traffic to the FCU (@todo: is this right?)
         # @todo: not good that this knows about the FCU -- maybe pass this in as a callback? 
         #self.sim.fcu.handle_udp_packet(self, packet, source_address, self.rx_address)  # Note: self.rx_address is supplied by subclasses
 
     def handle_udp_packet(self, packet, source_address, dest_address):
-        self.logger.debug("Handling UDP packet ({} bytes from {} to {} -- dropping for lack of a handler)".format(len(packet), source_address, dest_address))
+        self.logger.debug("Handling UDP packet ({} bytes from {} to {} -- dropping for lack of a handler)", len(packet), source_address, dest_address)
         
     def send_udp(self, packet, dest_address):
         #self.logger.debug("Sending packet: {} to {}".format([ str(x) for x in packet ], dest_address))   # verbose...
@@ -180,17 +190,17 @@ class NetworkNode:
         sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)  # Reuse addresses
 
         if self.enable_tx:
-            self.logger.debug("Sending {} bytes to {}".format(len(packet), dest_address))
+            self.logger.debug("Sending {} bytes to {}", len(packet), dest_address)
             #self.sock.sendto(packet, dest_address)
             sock.sendto(packet, dest_address)
         else:
-            self.logger.debug("(not) sending {} bytes to {}".format(len(packet), dest_address))
+            self.logger.debug("(not) sending {} bytes to {}", len(packet), dest_address)
 
         
 class FlightControlNode(NetworkNode):
     def __init__(self, sim, config):
         NetworkNode.__init__(self, sim, config)
-        self.logger = logging.getLogger("FlightControlNode")
+        self.logger = get_logger("FlightControlNode")
     
         #self.rx_address = ('0.0.0.0', self.rx_address[1])
     
@@ -199,13 +209,13 @@ class FlightControlNode(NetworkNode):
             #self.sim.fcu.handle_udp_packet(packet, source_address, self.rx_address)  # Note: self.rx_address is supplied by subclasses
             self.sim.fcu.handle_udp_packet(packet, source_address, self.tx_address)  # Note: using tx_address instead of rx address for the node since we're using different ports for the GS
         else:
-            self.logger.debug("Handling UDP packet ({} bytes from {} to {} -- dropping since FCU is not enabled)".format(len(packet), source_address, dest_address))
+            self.logger.debug("Handling UDP packet ({} bytes from {} to {} -- dropping since FCU is not enabled)", len(packet), source_address, dest_address)
     
 
 class SpacexNode(NetworkNode):
     def __init__(self, sim, config):
         NetworkNode.__init__(self, sim, config)
-        self.logger = logging.getLogger("SpacexNode")
+        self.logger = get_logger("SpacexNode")
         
         # Disable listening (we don't receive SpaceX packets, we only send them)
         self.enable_rx = False
@@ -219,7 +229,7 @@ class SpacexNode(NetworkNode):
 class PySimControlNode(NetworkNode):
     def __init__(self, sim, config):
         NetworkNode.__init__(self, sim, config)
-        self.logger = logging.getLogger("PySimControlNode")
+        self.logger = get_logger("PySimControlNode")
         self.logger.info("Testing INFO message")
         self.logger.debug("Testing DEBUG message")
 
@@ -255,7 +265,7 @@ class PySimControlNode(NetworkNode):
             data, source_address = self.sock.recvfrom(self.buffer_len)
     
             dest_address = self.rx_address  # We are the destination, so use our rx_port
-            self.logger.debug('Received {} bytes from {}. Dest is {}'.format(len(data), source_address, dest_address))
+            self.logger.debug('Received {} bytes from {}. Dest is {}', len(data), source_address, dest_address)
             #print >>sys.stderr, data
 
             if data:
@@ -268,7 +278,7 @@ class PySimControlNode(NetworkNode):
 
     def handle_udp_packet(self, packet, source_address, dest_address):
         #self.sim.fcu.handle_udp_packet(packet, source_address, self.rx_address)  # Note: self.rx_address is supplied by subclasses
-        self.logger.debug("Handling UDP packet ({} bytes from {} to {}): {}".format(len(packet), source_address, dest_address, packet))
+        self.logger.debug("Handling UDP packet ({} bytes from {} to {}): {}", len(packet), source_address, dest_address, packet)
         
 
 
@@ -302,7 +312,7 @@ class UdpListener(object):
         self.sim = sim
         self.config = config
 
-        self.logger = logging.getLogger("FcuUdpListener")
+        self.logger = get_logger("FcuUdpListener")
         
         # Callback for passing the received packet
         self.callback = callback
@@ -344,7 +354,7 @@ class UdpListener(object):
             data, address = sock.recvfrom(4096)
     
             dest_port = self.port  # We are the destination, so use our rx_port
-            self.logger.debug('Received {} bytes from {}. Dest port is {}'.format(len(data), address, dest_port))
+            self.logger.debug('Received {} bytes from {}. Dest port is {}', len(data), address, dest_port)
             #print >>sys.stderr, data
             
     
@@ -353,7 +363,8 @@ class UdpListener(object):
                 
                 # Testing
                 byte_array = bytearray(data)
-                self.logger.debug("Data received: {}".format([chr(x) for x in byte_array]))
+                if self.logger.debug_enabled:
+                    self.logger.debug("Data received: {}", [chr(x) for x in byte_array])
                 #exit()
                 #print 'We had data!' + str(b"".join(map(chr, data)))
                 
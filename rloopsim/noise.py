@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# coding=UTF-8
+
+# File:     noise.py
+# Purpose:  Reproducible sensor noise -- an independent random stream per sensor, derived from the run's seed
+# Author:   Ryan Adams (radams@cyandata.com, @ninetimeout)
+# Date:     2017-Feb-13
+
+# Note: Each sensor gets its own NoiseStream (see Sim.noise_stream()), seeded from the run seed (sim.noise.seed) and
+#       the sensor's kind and id. Runs with the same seed get the same noise, adding or removing a sensor doesn't change
+#       the noise of the others, and sim processes running in parallel (e.g. a sweep) don't share any random state.
+# Note: Standard normal values are generated a block at a time and handed out by moving a cursor through the block,
+#       so a step only costs a slice and a multiply-add. NoiseStream.reset() rewinds to the start of the stream, so a
+#       reset sim replays the same noise.
+
+import os
+import struct
+import hashlib
+
+import numpy as np
+
+
+def derive_seed(run_seed, *keys):
+    """ A 32 bit seed for a stream, from the run seed and the stream's keys (stable across processes and platforms) """
+    text = ':'.join(str(k) for k in (run_seed,) + keys)
+    return struct.unpack('<I', hashlib.sha256(text).digest()[:4])[0]
+
+
+def random_run_seed():
+    """ A fresh run seed (for when sim.noise.seed isn't set) """
+    return struct.unpack('<I', os.urandom(4))[0]
+
+
+class NoiseStream(object):
+    """ Block-generated gaussian noise from its own RandomState """
+
+    def __init__(self, seed, block_size=65536):
+        self.seed = seed
+        self.block_size = int(block_size)
+        self.reset()
+
+    def reset(self):
+        self.rs = np.random.RandomState(self.seed)
+        self.block = self.rs.standard_normal(self.block_size)
+        self.cursor = 0
+
+    def standard_normal(self, n):
+        """ The next n standard normal values """
+        end = self.cursor + n
+        if end <= self.block_size:
+            values = self.block[self.cursor:end]
+            self.cursor = end
+            return values
+        # Use up the rest of this block and continue in new ones
+        parts = [self.block[self.cursor:]]
+        n -= len(parts[0])
+        while True:
+            self.block = self.rs.standard_normal(self.block_size)
+            take = min(n, self.block_size)
+            parts.append(self.block[:take])
+            n -= take
+            if n == 0:
+                self.cursor = take
+                return np.concatenate(parts)
+
+    def normal(self, center, scale, n):
+        """ Like numpy.random.normal(center, scale, n) """
+        return center + scale * self.standard_normal(n)
@@ -61,6 +61,7 @@ class Pod:
         self.acceleration = Units.SI(self.config.acceleration) or 0.0  # meters per second ^2
         self.velocity = Units.SI(self.config.velocity) or 0.0          # meters per second
         self.position = Units.SI(self.config.position) or 0.0          # meters. Position relative to the track; start position is 0m
+        self._initial_avp = (self.acceleration, self.velocity, self.position)  # For reset()
         
         # @todo: this is just a sketch, for use with the hover engine calculations. Maybe switch accel, velocity, and position to coordinates? hmmmm...
         self.z_acceleration = 0.0
@@ -138,7 +139,7 @@ class Pod:
         #self.brakes = []
         #for brake_config in self.config.brakes:
         #    self.brakes.append(Brake(self.sim, brake_config))
-        self.brakes = Brakes(self.sim, self.config.brakes)
+        self.brakes = BrakeArray(self.sim, self.config.brakes)
         
         """ Sketch:
         # Pod components
@@ -167,6 +168,25 @@ class Pod:
         """
         self.step_listeners.append(listener)
 
+    def reset(self):
+        """ Return to our initial conditions (see Sim.reset()) """
+        self.acceleration, self.velocity, self.position = self._initial_avp
+        self.z_acceleration = 0.0
+        self.z_velocity = 0.0
+        self.he_height = self._initial_he_height
+        self.elapsed_time_usec = 0
+
+        self.last_acceleration = 0.0
+        self.last_velocity = 0.0
+        self.last_position = 0.0
+        self.last_he_height = 0.0
+
+        self.net_force = np.array((0.0, 0.0, 0.0))
+        for key in self.step_forces:
+            self.step_forces[key] = ForceExerter.data(0,0,0)
+
+        self.brakes.reset()
+
     def apply_forces(self):        
         """ Apply all forces provided by the exerters, in order. This happens every step, and all forces are then cleared for the next step. """
         """
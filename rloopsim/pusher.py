@@ -9,11 +9,16 @@
 # NOTE: Please add your name to 'Author:' if you work on this file. Thanks!
 
 # Note: all units are SI: meters/s^2, meters/s, and meters. Time is in microseconds (?)
+# Note: The push is either at a constant push_accel or follows a tabulated profile (pusher.profile, see
+#       pusher_profiles.py). COAST and BRAKE are constant acceleration, so they're advanced in closed form from the
+#       start of the phase -- the coast ends after exactly coast_duration, and the brake stops exactly at zero velocity,
+#       even in the middle of a step.
 
 from __future__ import division
 
 from collections import namedtuple
 from units import Units
+from pusher_profiles import load_pusher_profile
 import logging
 
 
@@ -26,9 +31,12 @@ class Pusher(object):
 
         self.logger = logging.getLogger("Pusher")
 
-        # State Machine (HOLD, PUSH, COAST, BRAKE, DONE)
+        # State Machine (HOLD, PUSH, COAST, BRAKE, STOPPED)
         self.state = 'HOLD'
-        self.coast_timer = 0.0
+
+        # Constant acceleration phase (COAST, BRAKE): its time so far, and the position, velocity and acceleration at its start
+        self.phase_time_sec = 0.0
+        self._phase_start = (0.0, 0.0, 0.0)
 
         # Physics
         self.acceleration = 0.0
@@ -39,9 +47,20 @@ class Pusher(object):
         self.last_position = 0.0
 
         self.push_time_sec = 0.0
+        self.push_start_position = 0.0
         self.elapsed_time_sec = 0.0
 
         # Configuration (these are defaults -- you can also set these directly at some later point)
+        self.apply_config()
+
+        # @todo: change this to reasonable data about our pusher
+        self.data = namedtuple('Force', ['x', 'y', 'z'])  
+
+        self.debug_print_step = False
+
+    def apply_config(self):
+        """ (Re)load the push profile from config (can be called mid-run, e.g. by LiveConfigEditor) """
+        config = self.config
         self.max_push_velocity = Units.SI(config.max_push_velocity)        # meters per second
         self.max_push_time = Units.SI(config.max_push_time)  # @todo: test this -- seconds? 
         self.push_end_position = Units.SI(config.push_end_position)  # meters -- provided by spacex
@@ -50,13 +69,11 @@ class Pusher(object):
         self.brake_decel = Units.SI(config.brake_decel)
         self.coast_duration = Units.SI(config.coast_duration)       # Note: the pusher will not likely disconnect during coast due to drag from the pod
 
-        # @todo: change this to reasonable data about our pusher
-        self.data = namedtuple('Force', ['x', 'y', 'z'])  
+        # Tabulated push profile (replaces push_accel if given)
+        self.profile = load_pusher_profile(config.profile) if config.profile else None
 
-        self.debug_print_step = False
-    
-    def update_physics(self, dt_usec):
-        """ Update the pusher physics based on the acceleration (set elsewhere) """
+    def update_physics(self, dt_usec, distance=None):
+        """ Update the pusher physics based on the acceleration (set elsewhere), or the distance moved if we know it """
 
         # Save off our last values
         self.last_acceleration = self.acceleration
@@ -66,11 +83,58 @@ class Pusher(object):
         t_sec = dt_usec / 1000000.0
         
         # v*t + 1/2*a*t^2
-        self.position += self.velocity * t_sec + 0.5 * self.acceleration * (t_sec ** 2)
+        if distance is None:
+            distance = self.velocity * t_sec + 0.5 * self.acceleration * (t_sec ** 2)
+        self.position += distance
         
         # vf = v0 + at
         self.velocity = self.velocity + self.acceleration * t_sec
 
+    def _hold_still(self):
+        """ A step without moving (our last values are the current ones, e.g. for the pusher sensor) """
+        self.last_acceleration = self.acceleration
+        self.last_velocity = self.velocity
+        self.last_position = self.position
+
+    def _profile_x(self):
+        """ Where we are in the push profile (push time or distance pushed) """
+        if self.profile.kind == 'accel_vs_time':
+            return self.push_time_sec
+        return self.position - self.push_start_position
+
+    def advance_phase(self, t_sec):
+        """ Advance a constant acceleration phase (COAST or BRAKE) by t_sec, moving on to the next phase(s) as we get there """
+        self.last_acceleration = self.acceleration
+        self.last_velocity = self.velocity
+        self.last_position = self.position
+        start_velocity = self.velocity
+
+        remaining = t_sec
+        while remaining > 0.0 and self.state in ('COAST', 'BRAKE'):
+            position0, velocity0, accel = self._phase_start
+            if self.state == 'COAST':
+                phase_end = self.coast_duration
+            elif accel < 0.0 < velocity0:
+                phase_end = -velocity0 / accel  # When we stop
+            else:
+                phase_end = 0.0
+            dt = min(remaining, max(0.0, phase_end - self.phase_time_sec))
+            self.phase_time_sec += dt
+            remaining -= dt
+
+            t = self.phase_time_sec
+            self.position = position0 + velocity0 * t + 0.5 * accel * t * t
+            self.velocity = velocity0 + accel * t
+            if t >= phase_end:
+                if self.state == 'COAST':
+                    self.set_state("BRAKE")
+                else:
+                    self.velocity = 0.0
+                    self.set_state("STOPPED")  # just 'stop' because we don't care about the pusher after it disconnects
+
+        # Note: the step's average, so that the pod's velocity matches ours if we're still pushing it
+        self.acceleration = (self.velocity - start_velocity) / t_sec if self.state != 'STOPPED' else 0.0
+
 
     # -------------------------
     # Simulation methods
@@ -84,17 +148,20 @@ class Pusher(object):
             # Need to be able to have the pusher 'take over' the accel/pos/velocity of the pod
             # Maybe extract the physics calculation and allow switching between the physics of the pusher and that of the pod? 
 
+        t_sec = dt_usec / 1000000.0
+
         if self.state == "HOLD":
-            pass
+            self._hold_still()
 
         elif self.state == "PUSH":
             
             # Calculate and set our acceleration
-            # Based on push_accel, max_push_velocity, and max_push_distance, and maybe max_push_time
+            # Based on push_accel (or the push profile), max_push_velocity, and max_push_distance, and maybe max_push_time
             # Maybe also enact state transition if we've reached max distance or time
 
             # Note: the pod will update itself based on us; we don't need to tell it anything
 
+            distance = None
             if self.position >= self.push_end_position:                
                 # We've reached the end of the push (by distance limit)
                 self.logger.info("Pusher reached push end position of {} m (pusher velocity was {:.2f} m/s)".format(self.push_end_position, self.velocity))
@@ -105,55 +172,45 @@ class Pusher(object):
                 self.logger.info("Pusher reached max push time of {} seconds".format(self.max_push_time))
                 self.set_state("COAST")
 
+            elif self.profile is not None and self.profile.finished(self._profile_x()):
+                # We've reached the end of the push profile
+                self.logger.info("Pusher reached the end of push profile {} (pusher velocity was {:.2f} m/s)".format(self.profile.name, self.velocity))
+                self.set_state("COAST")
+
             elif self.velocity >= self.max_push_velocity:
                 # We've reached max velocity limit, so don't accelerate any more
                 self.logger.info("Pusher reached max velocity of {} m/s".format(self.max_push_velocity))
                 self.acceleration = 0.0
 
+            elif self.profile is not None:
+                # Follow the profile over the whole step (the pod takes our average acceleration for the step)
+                dv, distance = self.profile.advance(self._profile_x(), self.velocity, t_sec, self.sim.pod.mass)
+                self.acceleration = dv / t_sec
+
             else:
                 # We're pushing at our push acceleration
                 self.acceleration = self.push_accel
 
-            # Update physics
-            self.update_physics(dt_usec)
-
-            # Update our push time
-            self.push_time_sec += dt_usec / 1000000.0
-
-        elif self.state == "COAST":
+            if self.state == "PUSH":
+                # Update physics
+                self.update_physics(dt_usec, distance)
 
-            if self.coast_timer > self.coast_duration:
-                self.set_state("BRAKE")
-
-                # TESTING ONLY
-                #self.sim.pod.brakes._move_to_gap_target(.0025)  # Stop just after push
-                
-                self.coast_timer = 0.0  # just reset
-            else:
-                self.coast_timer += dt_usec / 1000000.0
-
-            # Update physics
-            self.update_physics(dt_usec)
-
-        elif self.state == "BRAKE":
-            # @todo: handle braking physics (set braking acceleration)
-            
-            if self.velocity <= 0.0001:   # m/s
-                self.velocity = 0.0
-                self.set_state("STOPPED")  # just 'stop' immediately because we don't care about the pusher after it disconnects
+                # Update our push time
+                self.push_time_sec += t_sec
             else:
-                self.acceleration = self.brake_decel
+                self.advance_phase(t_sec)
 
-            # Update physics
-            self.update_physics(dt_usec)
+        elif self.state in ("COAST", "BRAKE"):
+            # Constant acceleration, in closed form from the start of the phase
+            self.advance_phase(t_sec)
 
         elif self.state == "STOPPED":
-            pass   # Not much to do, we're done
+            self._hold_still()   # Not much to do, we're done
 
         else:
             raise Exception("Unknown state {}".format(self.state))
 
-        self.elapsed_time_sec += dt_usec / 1000000.0
+        self.elapsed_time_sec += t_sec
 
         # Print our step if requested
         if self.debug_print_step:
@@ -167,10 +224,33 @@ class Pusher(object):
             print("{t} {state} {a} {v} {p}".format(**info))
 
     
+    def reset(self):
+        """ Return to our initial state (see Sim.reset()). Note: the sim sets our position to meet the pod. """
+        self.state = 'HOLD'
+        self.phase_time_sec = 0.0
+        self._phase_start = (0.0, 0.0, 0.0)
+
+        self.acceleration = 0.0
+        self.velocity = 0.0
+        self.position = 0.0
+        self.last_acceleration = 0.0
+        self.last_velocity = 0.0
+        self.last_position = 0.0
+
+        self.push_time_sec = 0.0
+        self.push_start_position = 0.0
+        self.elapsed_time_sec = 0.0
+
     def set_state(self, state):
         old_state = self.state
         self.state = state
         self.logger.info("Pusher entered {} state (from {})".format(self.state, old_state))
+
+        # COAST keeps the acceleration we had at the end of the push; BRAKE is at brake_decel
+        if state in ("COAST", "BRAKE"):
+            accel = self.acceleration if state == "COAST" else self.brake_decel
+            self._phase_start = (self.position, self.velocity, accel)
+            self.phase_time_sec = 0.0
     
 
     # -------------------------
@@ -178,6 +258,7 @@ class Pusher(object):
     # -------------------------
     
     def start_push(self):
+        self.push_start_position = self.position
         self.set_state("PUSH")
     
     def run_standalone(self, dt_usec):
@@ -0,0 +1,290 @@
+#!/usr/bin/env python
+# coding=UTF-8
+
+# File:     replay.py
+# Purpose:  Replay recorded sensor data (e.g. from the test weekends) into the sim's sensor listeners, and so the FCU
+# Author:   Ryan Adams (radams@cyandata.com, @ninetimeout)
+# Date:     2017-Feb-13
+
+# Note: ReplayEngine replaces the sim's accel/laser sensors with ReplaySensors. A ReplaySensor takes over the step
+#       listeners of the sensor it replaces (the FCU's QueueingListeners/QueueingRawListeners, csv writers, ...) and on
+#       each step sends them the recorded samples that fall within the step, as the same namedtuples the simulated
+#       sensor would have sent. to_raw() etc. are still done by the simulated sensor.
+# Note: Recorded time = start + sim time * time_scale, so time_scale 2.0 plays the recording twice as fast (in sim time).
+#       Sample times are converted back to sim time, so the FCU sees a consistent clock. Without the physics model
+#       (replay.physics: False) the sim steps much faster than real time; use the time dialator to pace it.
+# Note: Sources can be a directory of csvs (read a chunk at a time, see csv_chunks.py) or a run archive (read a window at
+#       a time, see run_archive.py). Channels are named after the files, e.g. 'accel_0' for accel_0.csv.
+# Note: Recorded columns are matched to the sensor's fields by name, after applying the channel's column aliases (the
+#       test weekend files have t/x/y/z where the accelerometer now has t_usec/real_x/real_y/real_z). Fields that
+#       aren't in the recording are derived where we know how (the accelerometers' raw values) and are 0 otherwise.
+
+import os
+import logging
+from collections import OrderedDict
+
+import numpy as np
+
+from units import Units
+from config import Config
+from sensors import Sensor
+from hot_logging import get_logger
+
+
+# Recorded column name -> sensor field name, by sensor kind (for the test weekend files)
+DEFAULT_ALIASES = {
+    'accel': {'t': 't_usec', 'x': 'real_x', 'y': 'real_y', 'z': 'real_z'},
+    'laser_opto': {'t': 't_usec'},
+    'laser_dist': {'t': 't_usec'},
+    'laser_contrast': {},
+}
+
+
+def _derive_accel(sensor, fields, n):
+    """ Accelerometer raw values (what the FCU reads) from the recorded real values """
+    for axis in 'xyz':
+        raw, real = 'raw_' + axis, 'real_' + axis
+        if raw not in fields and real in fields:
+            fields[raw] = np.interp(fields[real], sensor.sensor_input_range, sensor.sensor_output_range).astype(int)
+
+
+DERIVED_FIELDS = {
+    'accel': _derive_accel,
+}
+
+
+class CsvReplaySource(object):
+    """ Reads a recorded csv a chunk at a time """
+
+    def __init__(self, filename, chunk_bytes=1024*1024):
+        from csv_chunks import CsvChunkReader
+        self.reader = CsvChunkReader(filename, chunk_bytes=chunk_bytes)
+        self.columns = self.reader.headers
+
+    def chunks(self, t_start):
+        """ Chunks (dicts of column -> array) from the one containing recorded time t_start on """
+        time_column = self.columns[0]
+        for chunk in self.reader:
+            if len(chunk[time_column]) and chunk[time_column][-1] >= t_start:
+                yield chunk
+
+
+class ArchiveReplaySource(object):
+    """ Reads a channel of a run archive a window at a time """
+
+    def __init__(self, archive, channel, window_usec=5000000):
+        self.archive = archive
+        self.channel = channel
+        self.window_usec = window_usec
+        self.columns = archive.columns(channel)
+
+    def chunks(self, t_start):
+        time_range = self.archive.time_range(self.channel)
+        if time_range is None:
+            return
+        t = max(t_start, time_range[0])
+        while t <= time_range[1]:
+            # Note: read() includes both ends, so step just past the end of the window
+            chunk = self.archive.read(self.channel, t_start=t, t_end=t + self.window_usec)
+            t = t + self.window_usec + 1e-6
+            if len(chunk[self.columns[0]]):
+                yield chunk
+
+
+class ReplaySensor(Sensor):
+    """ Stands in for a simulated sensor, sending recorded samples to its listeners """
+
+    def __init__(self, sim, engine, kind, sensor, source, aliases=None):
+        Sensor.__init__(self, sim, sensor.config)
+        self.logger = get_logger("ReplaySensor")
+        self.engine = engine
+        self.kind = kind
+        self.sensor = sensor   # The simulated sensor (for its data type, to_raw(), etc.)
+        self.source = source
+        self.data = sensor.data
+
+        # Take over the simulated sensor's listeners
+        self.step_listeners = sensor.step_listeners
+
+        # Recorded column -> field
+        aliases = dict(DEFAULT_ALIASES.get(kind, {}), **(aliases or {}))
+        fields = sensor.data._fields
+        self.column_fields = OrderedDict()
+        for column in source.columns:
+            field = column if column in fields else aliases.get(column)
+            if field in fields:
+                self.column_fields[column] = field
+        self.time_column = source.columns[0]
+        if self.column_fields.get(self.time_column) != fields[0]:
+            raise ValueError("Can't replay {} into {}: its time column '{}' doesn't map to '{}'".format(source.columns, fields, self.time_column, fields[0]))
+
+        self.done = False
+        self.seek(0.0)
+
+    def __getattr__(self, name):
+        # Anything else (to_raw(), get_csv_headers(), ...) comes from the simulated sensor
+        sensor = self.__dict__.get('sensor')
+        if sensor is None:
+            raise AttributeError(name)
+        return getattr(sensor, name)
+
+    def get_csv_headers(self):
+        return self.sensor.get_csv_headers()
+
+    def reset(self):
+        Sensor.reset(self)
+        self.seek(self.engine.start_usec)
+
+    def seek(self, t_usec):
+        """ Start (again) from recorded time t_usec """
+        self.chunks = self.source.chunks(t_usec)
+        self.t = np.empty(0)
+        self.fields = {}
+        self.pos = 0
+        self.done = False
+        self._next_chunk()
+        if not self.done:
+            self.pos = np.searchsorted(self.t, t_usec, side='left')
+
+    def _next_chunk(self):
+        try:
+            chunk = next(self.chunks)
+        except StopIteration:
+            self.done = True
+            return
+        self.t = chunk[self.time_column]
+        self.fields = dict((field, chunk[column]) for column, field in self.column_fields.iteritems())
+        derive = DERIVED_FIELDS.get(self.kind)
+        if derive is not None:
+            derive(self.sensor, self.fields, len(self.t))
+        self.pos = 0
+
+    def step(self, dt_usec):
+        if self.done:
+            return
+        t_end = self.engine.to_recorded_usec(self.sim.elapsed_time_usec + dt_usec)
+
+        samples = []
+        while not self.done:
+            end = np.searchsorted(self.t, t_end, side='left')
+            if end > self.pos:
+                samples.extend(self._samples(self.pos, end))
+                self.pos = end
+            if self.pos < len(self.t):
+                break
+            self._next_chunk()
+
+        if not samples:
+            return
+        self.n_samples += len(samples)
+        for step_listener in self.step_listeners:
+            step_listener.step_callback(self, samples)
+
+    def _samples(self, start, end):
+        """ Samples start:end of the current chunk, with times in sim time """
+        n = end - start
+        zeros = np.zeros(n)
+        names = self.data._fields
+        columns = []
+        for name in names:
+            values = self.fields.get(name)
+            columns.append(values[start:end] if values is not None else zeros)
+        columns[0] = self.engine.to_sim_usec(columns[0])
+        if names[0] == 't_usec':
+            columns[0] = columns[0].astype(int)  # Note: t_usec is an int for the simulated sensors too
+        return [self.data(*row) for row in zip(*[column.tolist() for column in columns])]
+
+
+class ReplayEngine(object):
+    """ Swaps the sim's sensors for ReplaySensors and keeps track of the recorded time """
+
+    def __init__(self, sim, config):
+        self.sim = sim
+        self.config = config
+        self.logger = get_logger("ReplayEngine")
+
+        self.time_scale = float(self.config.time_scale or 1.0)
+        self.start_usec = Units.usec(self.config.start or '0 s')
+        self.offset_usec = self.start_usec  # Recorded time at sim time 0
+
+        self.archive = None
+        source = self.config.source
+        if os.path.isfile(source):
+            from run_archive import RunArchive
+            self.archive = RunArchive(source)
+
+        self.sensors = []
+        for kind, channels in (self.config.channels or {}).iteritems():
+            self._replace(kind, channels)
+
+    def _source(self, channel):
+        if self.archive is not None:
+            return ArchiveReplaySource(self.archive, channel)
+        return CsvReplaySource(os.path.join(self.config.source, channel + '.csv'))
+
+    def _replace(self, kind, channels):
+        """ Replace the sim's sensor(s) of this kind with replay sensors for the given channels """
+        from sensor_accel import Accelerometer
+        from sensor_laser_opto import LaserOptoSensor
+        from sensor_laser_dist import LaserDistSensor
+        from sensor_laser_contrast import LaserContrastSensor
+        classes = {'accel': Accelerometer, 'laser_opto': LaserOptoSensor, 'laser_dist': LaserDistSensor, 'laser_contrast': LaserContrastSensor}
+        aliases = (self.config.aliases or {}).get(kind)
+
+        sensor_configs = self.sim.config.sensors[kind]
+        current = self.sim.sensors.get(kind)
+        if isinstance(channels, basestring):
+            # A single sensor (e.g. laser_dist)
+            sensor = current if current is not None else classes[kind](self.sim, Config(sensor_configs))
+            self.sim.sensors[kind] = self._replay_sensor(kind, sensor, channels, aliases)
+            return
+
+        replaced = []
+        for idx, channel in enumerate(channels):
+            if current is not None and idx < len(current):
+                sensor = current[idx]
+            elif idx not in sensor_configs:
+                raise ValueError("Can't replay {}: there's no sensors.{}[{}] in the config".format(channel, kind, idx))
+            else:
+                sensor = classes[kind](self.sim, Config(sensor_configs[idx]))
+            replaced.append(self._replay_sensor(kind, sensor, channel, aliases))
+        self.sim.sensors[kind] = replaced
+
+    def _replay_sensor(self, kind, sensor, channel, aliases):
+        self.logger.info("Replaying {} into {} {}", channel, kind, sensor.config.id)
+        replay_sensor = ReplaySensor(self.sim, self, kind, sensor, self._source(channel), aliases)
+        self.sensors.append(replay_sensor)
+        return replay_sensor
+
+    # Time
+
+    def to_recorded_usec(self, sim_usec):
+        return self.offset_usec + sim_usec * self.time_scale
+
+    def to_sim_usec(self, recorded_usec):
+        return (recorded_usec - self.offset_usec) / self.time_scale
+
+    def recorded_time_usec(self):
+        return self.to_recorded_usec(self.sim.elapsed_time_usec)
+
+    def seek(self, recorded_time):
+        """ Jump to a recorded time (e.g. '12.5 s') from the current sim time """
+        recorded_usec = Units.usec(recorded_time)
+        self.offset_usec = recorded_usec - self.sim.elapsed_time_usec * self.time_scale
+        for sensor in self.sensors:
+            sensor.seek(recorded_usec)
+
+    def set_time_scale(self, time_scale):
+        """ Change the playback speed without jumping (recorded seconds per sim second) """
+        recorded_usec = self.recorded_time_usec()
+        self.time_scale = float(time_scale)
+        self.offset_usec = recorded_usec - self.sim.elapsed_time_usec * self.time_scale
+
+    def reset(self):
+        self.time_scale = float(self.config.time_scale or 1.0)
+        self.offset_usec = self.start_usec
+
+    # End condition
+
+    def is_finished(self, sim):
+        return self.config.end_when_done and all(sensor.done for sensor in self.sensors)
@@ -0,0 +1,406 @@
+#!/usr/bin/env python
+# coding=UTF-8
+
+# File:     run_archive.py
+# Purpose:  Single file run archives: every sensor channel as compressed, time-chunked columns with a time index
+# Author:   Ryan Adams (radams@cyandata.com, @ninetimeout)
+# Date:     2017-Feb-13
+
+# Usage:    python rloopsim/run_archive.py info data/run.rla
+#           python rloopsim/run_archive.py pack data/test_2017-Jan-28-1 [-o run.rla]     (an existing directory of csvs)
+#           python rloopsim/run_archive.py export data/run.rla out_dir [--channels pod accel_0] [--start 1.5 s] [--end 3 s]
+#
+# Note: File layout: MAGIC, then the chunks, then the (zlib compressed json) index, then a footer with the index's offset:
+#
+#           MAGIC | chunk | chunk | ... | index | <offset of index: uint64> MAGIC
+#
+#       Each chunk holds chunk_rows rows of one channel (e.g. 'pod', 'accel_0'), with each column compressed separately,
+#       so reading a time window of one column only decompresses that column's chunks in the window. The index has the
+#       first and last time of every chunk, the byte ranges of its columns, and the run's metadata (merged config,
+#       FCU DLL name and checksum, ...).
+# Note: The first column of every channel is its time column (t_usec or t). Columns are stored as int64 if their first
+#       value is an integer and float64 otherwise, byte-shuffled (all of the first bytes, then all of the second bytes,
+#       ...) because that compresses much better than raw doubles.
+# Note: Exported csvs have the same headers and number formatting as the ones SensorCsvWriter writes, so existing
+#       scripts can read them.
+
+import os
+import csv
+import sys
+import json
+import zlib
+import time
+import struct
+import hashlib
+import operator
+import itertools
+import logging
+import argparse
+from collections import OrderedDict
+
+import numpy as np
+
+from units import Units
+from hot_logging import get_logger
+
+MAGIC = 'RLOOPRA1'
+FOOTER = struct.Struct('<Q8s')
+
+
+def _shuffle(values):
+    """ Byte-shuffle a column for better compression """
+    return values.view(np.uint8).reshape(-1, values.itemsize).T.tostring()
+
+
+def _unshuffle(data, dtype):
+    dtype = np.dtype(dtype)
+    return np.fromstring(data, dtype=np.uint8).reshape(dtype.itemsize, -1).T.copy().view(dtype).ravel()
+
+
+def file_checksum(filename, chunk_bytes=1024*1024):
+    """ sha1 of a file, or None if it can't be read """
+    h = hashlib.sha1()
+    try:
+        with open(filename, 'rb') as f:
+            while True:
+                block = f.read(chunk_bytes)
+                if not block:
+                    break
+                h.update(block)
+    except (IOError, OSError):
+        return None
+    return h.hexdigest()
+
+
+def run_metadata(sim):
+    """ Metadata for a sim's run archive: the merged config and the FCU DLL it ran against """
+    config = sim.config
+    meta = OrderedDict()
+    meta['created'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+    meta['config'] = str(config)  # yaml
+    meta['fcu_dll'] = None
+    if config.fcu.enabled:
+        dll_filepath = os.path.join(os.path.normpath(config.fcu.dll_path), config.fcu.dll_filename)
+        meta['fcu_dll'] = OrderedDict([
+            ('filename', config.fcu.dll_filename),
+            ('sha1', file_checksum(dll_filepath)),
+            ('size', os.path.getsize(dll_filepath) if os.path.exists(dll_filepath) else None),
+            ('mtime', os.path.getmtime(dll_filepath) if os.path.exists(dll_filepath) else None),
+        ])
+    return meta
+
+
+class RunArchiveWriter(object):
+    """ Writes a run archive one chunk at a time. Not thread safe: use it from one thread (e.g. the TelemetrySink's). """
+
+    def __init__(self, filename, meta=None, compress_level=6):
+        self.filename = filename
+        self.compress_level = compress_level
+        self.channels = OrderedDict()
+        self.meta = meta or {}
+        self.f = open(filename, 'wb')
+        self.f.write(MAGIC)
+
+    def add_channel(self, name, columns):
+        self.channels[name] = OrderedDict([('columns', list(columns)), ('dtypes', None), ('n_rows', 0), ('chunks', [])])
+
+    def add_chunk(self, name, rows):
+        """ Append rows (sequences of numbers, in time order) to a channel """
+        if not len(rows):
+            return
+        channel = self.channels[name]
+        if channel['dtypes'] is None:
+            channel['dtypes'] = ['<i8' if isinstance(value, (int, long)) and not isinstance(value, bool) else '<f8' for value in rows[0]]
+        n_cols = len(rows[0])
+        values = np.fromiter(itertools.chain.from_iterable(rows), dtype=float, count=len(rows) * n_cols).reshape(len(rows), n_cols)  # Much faster than np.array(rows)
+        columns = [values[:, i] for i in xrange(n_cols)]
+        for i, dtype in enumerate(channel['dtypes']):
+            if dtype == '<i8':
+                # Note: not via float, which is only exact up to 2^53
+                columns[i] = np.fromiter(itertools.imap(operator.itemgetter(i), rows), dtype=dtype, count=len(rows))
+        self.add_columns(name, columns)
+
+    def add_columns(self, name, columns):
+        """ Append a chunk given as one array per column """
+        channel = self.channels[name]
+        if channel['dtypes'] is None:
+            channel['dtypes'] = [str(np.dtype(column.dtype).newbyteorder('<')) if column.dtype.kind in 'iu' else '<f8' for column in columns]
+
+        n = len(columns[0])
+        chunk = OrderedDict([('t0', float(columns[0][0])), ('t1', float(columns[0][-1])), ('n', n), ('columns', [])])
+        for column, dtype in zip(columns, channel['dtypes']):
+            data = zlib.compress(_shuffle(np.ascontiguousarray(column, dtype=dtype)), self.compress_level)
+            chunk['columns'].append((self.f.tell(), len(data)))
+            self.f.write(data)
+        channel['chunks'].append(chunk)
+        channel['n_rows'] += n
+
+    def close(self):
+        if self.f is None:
+            return
+        index = OrderedDict([('meta', self.meta), ('channels', self.channels)])
+        offset = self.f.tell()
+        self.f.write(zlib.compress(json.dumps(index)))
+        self.f.write(FOOTER.pack(offset, MAGIC))
+        self.f.close()
+        self.f = None
+
+
+class RunArchive(object):
+    """ Reads a run archive """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.f = open(filename, 'rb')
+        if self.f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("{} is not a run archive".format(filename))
+        self.f.seek(-FOOTER.size, os.SEEK_END)
+        footer_offset = self.f.tell()
+        offset, magic = FOOTER.unpack(self.f.read(FOOTER.size))
+        if magic != MAGIC:
+            raise ValueError("{} is incomplete (the run may not have ended cleanly)".format(filename))
+        self.f.seek(offset)
+        index = json.loads(zlib.decompress(self.f.read(footer_offset - offset)), object_pairs_hook=OrderedDict)
+        self.meta = index['meta']
+        self._channels = index['channels']
+        for channel in self._channels.values():
+            channel['t0'] = np.array([chunk['t0'] for chunk in channel['chunks']])
+            channel['t1'] = np.array([chunk['t1'] for chunk in channel['chunks']])
+
+    def close(self):
+        self.f.close()
+
+    def channels(self):
+        return self._channels.keys()
+
+    def columns(self, channel):
+        return list(self._channels[channel]['columns'])
+
+    def n_rows(self, channel):
+        return self._channels[channel]['n_rows']
+
+    def time_range(self, channel):
+        channel = self._channels[channel]
+        if not channel['chunks']:
+            return None
+        return channel['t0'][0], channel['t1'][-1]
+
+    def config(self):
+        """ The merged config the run used (as a Config) """
+        import yaml
+        from config import Config
+        return Config(yaml.load(self.meta['config']))
+
+    def read(self, channel, columns=None, t_start=None, t_end=None):
+        """
+        Columns of a channel (all of them by default) between t_start and t_end (inclusive, in the units of the channel's
+        time column), as an OrderedDict of name -> numpy array. Only the chunks in the window are decompressed.
+        """
+        channel = self._channels[channel]
+        names = channel['columns']
+        if columns is None:
+            columns = names
+        missing = [name for name in columns if name not in names]
+        if missing:
+            raise ValueError("Columns {} not found (has {})".format(missing, names))
+
+        # Chunks that overlap the window (the chunks are in time order)
+        first, last = 0, len(channel['chunks'])
+        if t_start is not None:
+            first = np.searchsorted(channel['t1'], t_start, side='left')
+        if t_end is not None:
+            last = np.searchsorted(channel['t0'], t_end, side='right')
+        chunks = channel['chunks'][first:last]
+
+        # Note: we always need the time column to trim the first and last chunks
+        wanted = [0] + [names.index(name) for name in columns if names.index(name) != 0]
+        parts = dict((idx, []) for idx in wanted)
+        for chunk in chunks:
+            for idx in wanted:
+                offset, size = chunk['columns'][idx]
+                self.f.seek(offset)
+                parts[idx].append(_unshuffle(zlib.decompress(self.f.read(size)), channel['dtypes'][idx]))
+
+        values = dict((idx, np.concatenate(parts[idx]) if parts[idx] else np.empty(0, dtype=channel['dtypes'][idx])) for idx in wanted)
+        t = values[0]
+        mask = np.ones(len(t), dtype=bool)
+        if t_start is not None:
+            mask &= t >= t_start
+        if t_end is not None:
+            mask &= t <= t_end
+        return OrderedDict((name, values[names.index(name)][mask]) for name in columns)
+
+    def export_csv(self, channel, filename, t_start=None, t_end=None):
+        """ Write a channel to a csv file like the one SensorCsvWriter would have written """
+        values = self.read(channel, t_start=t_start, t_end=t_end)
+        with open(filename, 'wb') as f:
+            w = csv.writer(f, lineterminator=os.linesep)
+            w.writerow(values.keys())
+            w.writerows(zip(*[column.tolist() for column in values.values()]))
+
+
+class ArchiveChannelListener(object):
+    """ Sensor listener that collects rows for one channel of an ArchiveRecorder """
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+        self.columns = None
+        self.rows = []
+
+    def step_callback(self, sensor, step_samples):
+        if self.columns is None:
+            self.columns = list(sensor.get_csv_headers())
+            self.recorder.add_channel(self)
+        if self.recorder.sim.data_logging_enabled(self, sensor):
+            self.rows.extend(step_samples)
+            if len(self.rows) >= self.recorder.chunk_rows:
+                self.recorder.add_chunk(self)
+
+
+class ArchiveRecorder(object):
+    """ Records all of the sim's sensor channels to <working_dir>/<filename> """
+
+    def __init__(self, sim, config):
+        self.sim = sim
+        self.config = config
+        self.logger = get_logger("ArchiveRecorder")
+
+        self.chunk_rows = int(self.config.chunk_rows or 4096)
+        self.compress_level = int(self.config.compress_level or 1)
+        self.filename = None
+        self.writer = None
+        self.listeners = []
+
+        for name, sensor in self._sensors():
+            listener = ArchiveChannelListener(self, name)
+            sensor.add_step_listener(listener)
+            self.listeners.append(listener)
+
+        self.reset()
+
+    def _sensors(self):
+        """ (channel name, sensor) for each sensor that writes a csv file """
+        for sensor in self.sim.sensors.values():
+            for s in (sensor if isinstance(sensor, list) else [sensor]):
+                if s.config.log_filename:
+                    yield os.path.splitext(s.config.log_filename)[0], s
+
+    def _run(self, fn, *args):
+        """ Do archive I/O on the telemetry sink's thread if there is one """
+        sink = self.sim.telemetry_sink
+        if sink is not None:
+            sink.call(fn, *args)
+        else:
+            fn(*args)
+
+    def reset(self):
+        """ Finish the current archive (if it hasn't been already) and start a new one in the sim's working dir """
+        self.finish()
+        self.filename = os.path.join(self.sim.config.working_dir, self.config.filename)
+        self._run(self._open, self.filename, run_metadata(self.sim))
+        for listener in self.listeners:
+            listener.columns = None
+            listener.rows = []
+
+    def _open(self, filename, meta):
+        self.writer = RunArchiveWriter(filename, meta, self.compress_level)
+
+    def add_channel(self, listener):
+        self._run(self._add_channel, listener.name, listener.columns)
+
+    def _add_channel(self, name, columns):
+        self.writer.add_channel(name, columns)
+
+    def add_chunk(self, listener):
+        rows, listener.rows = listener.rows, []
+        self._run(self._add_chunk, listener.name, rows)
+
+    def _add_chunk(self, name, rows):
+        self.writer.add_chunk(name, rows)
+
+    def finish(self):
+        """ Write out the partial chunks and the index """
+        for listener in self.listeners:
+            if listener.rows:
+                self.add_chunk(listener)
+        self._run(self._close)
+        if self.sim.telemetry_sink is not None:
+            self.sim.telemetry_sink.wait()
+
+    def _close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    def end_callback(self, sim):
+        self.finish()
+        self.logger.info("Run archived to {}", self.filename)
+
+
+def pack_csv_dir(run_dir, filename, compress_level=6, chunk_bytes=4*1024*1024):
+    """ Archive an existing directory of sensor csvs (one channel per csv, named after the file) """
+    from csv_chunks import CsvChunkReader
+
+    writer = RunArchiveWriter(filename, OrderedDict([('created', time.strftime('%Y-%m-%dT%H:%M:%S')), ('source', os.path.abspath(run_dir)), ('config', None), ('fcu_dll', None)]), compress_level)
+    for csv_filename in sorted(os.listdir(run_dir)):
+        if not csv_filename.endswith('.csv'):
+            continue
+        path = os.path.join(run_dir, csv_filename)
+        reader = CsvChunkReader(path)
+        with open(path, 'rb') as f:
+            f.readline()
+            first_row = f.readline().strip().split(',')
+        if not first_row[0]:
+            continue  # Headers only
+        name = os.path.splitext(csv_filename)[0]
+        writer.add_channel(name, reader.headers)
+        writer.channels[name]['dtypes'] = ['<i8' if value.strip().lstrip('-').isdigit() else '<f8' for value in first_row]
+        for chunk in reader:
+            writer.add_columns(name, [chunk[column] for column in reader.headers])
+    writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="rLoop run archives")
+    commands = parser.add_subparsers(dest='command')
+
+    p = commands.add_parser('info', help="List the channels in an archive")
+    p.add_argument('archive')
+
+    p = commands.add_parser('pack', help="Archive a directory of sensor csvs")
+    p.add_argument('run_dir')
+    p.add_argument('-o', '--output', help="Archive filename (default: <run_dir>.rla)")
+
+    p = commands.add_parser('export', help="Export channels to csvs")
+    p.add_argument('archive')
+    p.add_argument('out_dir')
+    p.add_argument('--channels', nargs='*', help="Channels to export (default: all)")
+    p.add_argument('--start', help="Start time, e.g. '1.5 s' (default: the beginning)")
+    p.add_argument('--end', help="End time, e.g. '3 s' (default: the end)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'pack':
+        output = args.output or os.path.normpath(args.run_dir) + '.rla'
+        pack_csv_dir(args.run_dir, output)
+        print "Wrote {} ({} bytes)".format(output, os.path.getsize(output))
+        return
+
+    archive = RunArchive(args.archive)
+    if args.command == 'info':
+        for name in archive.channels():
+            print "{:24} {:>10} rows  {}  {}".format(name, archive.n_rows(name), archive.time_range(name), ','.join(archive.columns(name)))
+    elif args.command == 'export':
+        if not os.path.exists(args.out_dir):
+            os.makedirs(args.out_dir)
+        for name in args.channels or archive.channels():
+            # Note: sensor time columns are in usec
+            t_start = Units.usec(args.start) if args.start else None
+            t_end = Units.usec(args.end) if args.end else None
+            archive.export_csv(name, os.path.join(args.out_dir, name + '.csv'), t_start, t_end)
+    archive.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# coding=UTF-8
+
+# File:     scenarios.py
+# Purpose:  Several pod/track configurations run side by side in one process, for small comparison studies
+# Author:   Ryan Adams (radams@cyandata.com, @ninetimeout)
+# Date:     2017-Feb-13
+
+# Note: A scenario file (see conf/scenarios/) gives the base config files (and overrides for every variant) and a set of
+#       variants, each with extra config files (overlays, e.g. conf/spacex_tube.yaml) and/or overrides of the sim config:
+#           scenario:
+#               config_files: [conf/sim_config.yaml]
+#               overrides: {pusher: {max_push_time: 8 s}}
+#               duration: 60 s
+#               push_at: 1 s
+#               variants:
+#                   baseline: {}
+#                   heavy: {overrides: {pod: {mass: 500 kg}}}
+#                   tube: {config_files: [conf/spacex_tube.yaml]}
+# Note: Each variant is its own Sim -- its own pod, pusher, sensors, noise streams and outputs (in output_dir/<name>/).
+#       What they have in common is done once: the config files are compiled once (see config_compiler.py), the force
+#       models and push profiles are loaded once per process (see force_models.py and pusher_profiles.py), and variants
+#       with the same track config share one Track (the strip and gap positions).
+# Note: The sims are stepped in turn until each one ends (the pod stops after the push, hits the end of the track, or
+#       duration runs out), so their outputs grow together. The FCU is disabled -- there's only one FCU DLL per process
+#       -- and the push is started at push_at. With the same noise seed (sim.noise.seed) the variants get the same
+#       sensor noise, so differences between them are down to the configs.
+# Note: A ScenarioSet runs once -- run() closes the sims when they've all ended (their final state can still be read).
+# Note: A summary row per variant (final and peak pod values) is written to output_dir/scenarios.csv.
+
+import os
+import csv
+import time
+
+import yaml
+
+from units import Units
+from config_compiler import default_compiler, compile_config, overlay_config
+from hot_logging import get_logger, configure_logging
+from sim import Sim, SimEndCondition
+
+
+class PeakTracker(object):
+    """ Sim step listener that keeps the pod's peak values """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.max_velocity = 0.0
+        self.max_acceleration = 0.0
+        self.min_acceleration = 0.0
+
+    def step_callback(self, sim):
+        pod = sim.pod
+        if pod.velocity > self.max_velocity:
+            self.max_velocity = pod.velocity
+        if pod.acceleration > self.max_acceleration:
+            self.max_acceleration = pod.acceleration
+        elif pod.acceleration < self.min_acceleration:
+            self.min_acceleration = pod.acceleration
+
+
+class Scenario(object):
+    """ One variant: its sim and what we need to run it """
+
+    def __init__(self, name, sim, push_at_usec, duration_usec):
+        self.name = name
+        self.sim = sim
+        self.peaks = PeakTracker()
+        sim.add_step_listener(self.peaks)
+        sim.add_end_condition(SimEndCondition())
+
+        # Note: rounded to whole fixed timesteps, so that fast-forwarded steps line up with the push
+        fixed = sim.fixed_timestep_usec
+        self.push_at_usec = round(push_at_usec / fixed) * fixed
+        self.duration_usec = duration_usec
+        self.pushed = False
+
+    def next_step_usec(self):
+        dt_usec = self.sim.next_step_usec()
+        if not self.pushed:
+            dt_usec = min(dt_usec, max(self.sim.fixed_timestep_usec, self.push_at_usec - self.sim.elapsed_time_usec))
+        return dt_usec
+
+    def step(self):
+        """ Take a step. Returns False once the sim has ended. """
+        sim = self.sim
+        if sim.elapsed_time_usec >= self.duration_usec and not sim.end_flag:
+            sim.logger.info("Reached the scenario duration of {} s", self.duration_usec / 1000000.0)
+            sim.stop()
+        if sim.end_if_finished():
+            return False
+        if not self.pushed and sim.elapsed_time_usec >= self.push_at_usec:
+            sim.pusher.start_push()
+            self.pushed = True
+        sim.step(self.next_step_usec())
+        return True
+
+    def summary(self):
+        sim = self.sim
+        return [
+            ('name', self.name),
+            ('sim_time', sim.elapsed_time_usec / 1000000.0),
+            ('n_steps', sim.n_steps_taken),
+            ('pod_position', sim.pod.position),
+            ('pod_velocity', sim.pod.velocity),
+            ('max_velocity', self.peaks.max_velocity),
+            ('max_acceleration', self.peaks.max_acceleration),
+            ('min_acceleration', self.peaks.min_acceleration),
+            ('track_length', sim.track.length),
+            ('pusher_state', sim.pusher.state),
+        ]
+
+
+class ScenarioSet(object):
+    """ Builds a sim for each variant in a scenario config and runs them side by side """
+
+    def __init__(self, config, output_dir):
+        self.config = config
+        self.output_dir = output_dir
+        self.logger = get_logger("ScenarioSet")
+
+        base_files = list(self.config.config_files or [])
+        if not base_files:
+            raise ValueError("Scenario config needs config_files (the base sim config)")
+        duration_usec = Units.usec(self.config.duration or '120 s')
+        push_at_usec = Units.usec(self.config.push_at or '0 s')
+
+        variants = self.config.variants or {}
+        if not variants:
+            raise ValueError("Scenario config has no variants")
+
+        tracks = {}  # track config (as yaml) -> Track
+        self.scenarios = []
+        for name in sorted(variants.keys()):
+            variant = variants[name] or {}
+            config = default_compiler.load(base_files + list(variant.get('config_files') or [])).sim
+            for overrides in (self.config.overrides, variant.get('overrides')):
+                if overrides:
+                    overlay_config(config, overrides)
+            if config.fcu.enabled:
+                self.logger.info("Disabling the FCU for variant {} (there's only one FCU per process)", name)
+                config.fcu.override('enabled', False)
+
+            # Note: the Track is only geometry, so variants on the same track can share it
+            track_key = str(config.track)
+            sim = Sim(config, os.path.join(self.output_dir, name), track=tracks.get(track_key))
+            tracks.setdefault(track_key, sim.track)
+            self.scenarios.append(Scenario(name, sim, push_at_usec, duration_usec))
+
+        self.logger.info("{} variants on {} track(s)", len(self.scenarios), len(tracks))
+
+    def run(self):
+        """ Step each sim in turn until they've all ended """
+        start_t = time.time()
+        active = list(self.scenarios)
+        for scenario in active:
+            scenario.sim.is_running = True
+
+        while active:
+            for scenario in list(active):
+                if not scenario.step():
+                    scenario.sim.is_running = False
+                    scenario.sim.is_ended = True
+                    active.remove(scenario)
+                    self.logger.info("Variant {} ended at {:.2f} s: pod at {:.2f} m (peak velocity {:.2f} m/s)", scenario.name,
+                                     scenario.sim.elapsed_time_usec / 1000000.0, scenario.sim.pod.position, scenario.peaks.max_velocity)
+
+        self.logger.info("Ran {} variants in {:.2f} actual seconds", len(self.scenarios), time.time() - start_t)
+        self.write_summary()
+        self.close()
+
+    def close(self):
+        """ Stop each sim's background threads """
+        for scenario in self.scenarios:
+            scenario.sim.close()
+
+    def write_summary(self, filename='scenarios.csv'):
+        rows = [scenario.summary() for scenario in self.scenarios]
+        path = os.path.join(self.output_dir, filename)
+        with open(path, 'wb') as f:
+            writer = csv.writer(f)
+            writer.writerow([key for key, value in rows[0]])
+            for row in rows:
+                writer.writerow([value for key, value in row])
+        self.logger.info("Wrote the scenario summary to {}", path)
+
+
+def load_scenarios(filename, output_dir):
+    """ A ScenarioSet from a scenario file """
+    with open(filename, 'rb') as f:
+        config = compile_config(yaml.load(f))
+    if config.scenario is None:
+        raise ValueError("{} has no 'scenario' section".format(filename))
+    return ScenarioSet(config.scenario, output_dir)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Run several pod/track configurations side by side")
+    parser.add_argument('scenario_file', help="Scenario config (see conf/scenarios/)")
+    parser.add_argument('-o', '--output-dir', default='../eng-embed-sim-data/scenarios',
+        help="Each variant's data goes in a subdirectory of this")
+    args = parser.parse_args()
+
+    configure_logging('conf/logging.conf')
+
+    scenarios = load_scenarios(args.scenario_file, args.output_dir)
+    scenarios.run()
@@ -26,6 +26,11 @@ class Accelerometer(PollingSensor):
 
         self.sensor_input_range = (real_min, real_max)
         self.sensor_output_range = (raw_min, raw_max)
+
+    def apply_config(self):
+        PollingSensor.apply_config(self)
+        # Note: scale of noise is in G's in the config
+        self.noise_scale = Units.SI(self.config.noise.scale) if self.config.noise.scale else 0.0
         
     def create_step_samples(self, dt_usec):
         
@@ -46,25 +51,23 @@ class Accelerometer(PollingSensor):
 
         # Map real values to sample values
 
-        samples = []
-        for i, t in enumerate(sample_times):
-            real_x = 0
-            real_y = sample_data[i]
-            real_z = 9.81  # Accel due to gravity
-
-            # @todo: Apply a rotation matrix? 
+        # Note: all of the step's samples at once (one row of x, y, z per sample)
+        n = len(sample_times)
+        real_x = 0
+        real_z = 9.81  # Accel due to gravity
+        xyz = np.empty((n, 3))
+        xyz[:, 0] = real_x
+        xyz[:, 1] = sample_data[:n]
+        xyz[:, 2] = real_z
 
-            # Map 
-            xyz = np.array((real_x, real_y, real_z))
-            # Add some noise (in G's)
-            xyz += np.random.normal(self.noise_center, Units.SI(self.noise_scale), 3)
-            xyz = np.interp(xyz, self.sensor_input_range, self.sensor_output_range)  
-            xyz = xyz.astype(int)
-            samples.append(self.data(t, xyz[0], xyz[1], xyz[2], real_x, real_y, real_z))
+        # @todo: Apply a rotation matrix? 
 
-            #samples += self._get_gaussian_noise(samples, self.noise_center, self.noise_scale)            
+        # Add some noise (in G's) and map 
+        if self.noise_enabled and self.noise_scale > 0.0:
+            xyz += self.noise.normal(self.noise_center, self.noise_scale, 3 * n).reshape((n, 3))
+        raw = np.interp(xyz, self.sensor_input_range, self.sensor_output_range).astype(int).tolist()
 
-        return samples
+        return [self.data(t, raw[i][0], raw[i][1], raw[i][2], real_x, sample_data[i], real_z) for i, t in enumerate(sample_times)]
                         
     def to_raw(self, sample):
         """ Convert a sample to its raw form for the FCU """
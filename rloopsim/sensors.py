@@ -46,6 +46,11 @@ def ringbuff_numpy_test():
         ringbuff.get() #read
 """
 
+def _fixed_steps_in(sim, dt_usec):
+    """ Number of fixed timesteps in a (fast-forwarded) step """
+    return int(dt_usec // sim.fixed_timestep_usec) if dt_usec > sim.fixed_timestep_usec else 1
+
+
 class Sensor(object):
     def __init__(self, sim, config):
         self.sim = sim
@@ -54,6 +59,9 @@ class Sensor(object):
         # Communications
         self.step_listeners = []
 
+        # Total samples created (read by metrics.RunMetrics)
+        self.n_samples = 0
+
     def add_step_listener(self, listener):
         """ 
         Register a listener that will be called every step. 
@@ -62,6 +70,14 @@ class Sensor(object):
         """
         self.step_listeners.append(listener)
 
+    def reset(self):
+        """ Reset for a new run (see Sim.reset()). Listeners may optionally implement reset() as well. """
+        self.n_samples = 0
+        for listener in self.step_listeners:
+            reset = getattr(listener, 'reset', None)
+            if reset is not None:
+                reset()
+
     def create_step_samples(self, dt_usec):
         pass  # deferred to subclasses
         
@@ -90,6 +106,16 @@ class PusherSensor(Sensor):
         # Note: sensors always return a list of namedtuples. In this case, we always only return 1 'sample' per step. 
         data = [self.sim.elapsed_time_usec, pusher.position, pusher.velocity, pusher.acceleration]
         samples = [self.data(*data)]  # List containing a single named tuple
+
+        # A fast-forwarded step gets a sample per fixed timestep (lerp'd -- the pusher is stopped or in a closed-form phase)
+        n = _fixed_steps_in(self.sim, dt_usec)
+        if n > 1:
+            pcts = np.arange(1, n + 1) / float(n)
+            positions = pusher.last_position + pcts * (pusher.position - pusher.last_position)
+            velocities = pusher.last_velocity + pcts * (pusher.velocity - pusher.last_velocity)
+            times = self.sim.elapsed_time_usec + np.arange(n) * self.sim.fixed_timestep_usec
+            samples = [self.data(int(t), p, v, pusher.acceleration) for t, p, v in zip(times, positions, velocities)]
+        self.n_samples += len(samples)
         
         for step_listener in self.step_listeners:
             step_listener.step_callback(self, samples)
@@ -129,6 +155,17 @@ class PodSensor(Sensor):
             data.extend([force.x, force.y, force.z])
 
         samples = [self.data(*data)]  # List containing a single named tuple
+
+        # A fast-forwarded step gets a sample per fixed timestep, at constant acceleration (as the pod was stepped)
+        n = _fixed_steps_in(self.sim, dt_usec)
+        if n > 1:
+            tau = np.arange(1, n + 1) * (self.sim.fixed_timestep_usec / 1000000.0)
+            positions = pod.last_position + pod.last_velocity * tau + 0.5 * pod.acceleration * tau * tau
+            velocities = pod.last_velocity + pod.acceleration * tau
+            times = self.sim.elapsed_time_usec + np.arange(n) * self.sim.fixed_timestep_usec
+            rest = data[3:]
+            samples = [self.data(int(t), p, v, *rest) for t, p, v in zip(times, positions, velocities)]
+        self.n_samples += len(samples)
         
         for step_listener in self.step_listeners:
             step_listener.step_callback(self, samples)
@@ -159,9 +196,9 @@ class PollingSensor(Sensor):
         # Grab the fixed timestep from the sim. If we wanted to use a variable timestep we would need to do the next calculations in the lerp function
         self.sampling_rate = Units.SI(self.config.sampling_rate)  # Hz
 
-        # @see self._add_noise() and numpy.random.normal
-        self.noise_center = self.config.noise.center or 0.0
-        self.noise_scale = self.config.noise.scale or 0.0
+        # @see self._get_gaussian_noise() and noise.py
+        self.noise = self.sim.noise_stream(self.__class__.__name__, self.config.id)
+        self.apply_config()
 
         # Volatile
         #self.buffer = RingBuffer(config.buffer_size, config.dtype)   # @todo: How to specify dtype in configuration? There should be a string rep of dtype I think 
@@ -169,7 +206,21 @@ class PollingSensor(Sensor):
         self.sample_times = None
         self.next_start = 0.0
         self.step_lerp_pcts = None  # Set during step
+        self._step_dt_usec = None   # dt of the last step (next_start is a fraction of it)
+
 
+    def reset(self):
+        Sensor.reset(self)
+        self.next_start = 0.0
+        self.step_lerp_pcts = None
+        self._step_dt_usec = None
+        self.noise.reset()
+
+    def apply_config(self):
+        """ (Re)load the noise settings (can be called mid-run, e.g. by LiveConfigEditor) """
+        self.noise_enabled = bool(self.config.noise.enabled)
+        self.noise_center = self.config.noise.center or 0.0
+        self.noise_scale = self.config.noise.scale or 0.0
     
     def create_step_samples(self):
         """ Get the step samples """
@@ -183,7 +234,7 @@ class PollingSensor(Sensor):
         samples = start_value + self.step_lerp_pcts * (end_value - start_value)  # Or use self.lerp(start_value, end_value), but doing it directly is faster since no function call
         if self.noise_scale > 0:
             # Add gaussian noise if specified
-            return samples + np.random.normal(0.0, noise_scale, len(samples))
+            return samples + self.noise.normal(0.0, noise_scale, len(samples))
         else:
             # No noise
             return samples          
@@ -196,6 +247,12 @@ class PollingSensor(Sensor):
         # @todo: Maybe calculate self.next_step so that we can add sensors during sim, but only if it turns out to be necessary
         if len(self.step_listeners) == 0:
             return
+
+        # next_start is a fraction of the last step -- rescale it if this one is longer or shorter (see fast_forward.py)
+        if dt_usec != self._step_dt_usec:
+            if self._step_dt_usec is not None:
+                self.next_start *= float(self._step_dt_usec) / dt_usec
+            self._step_dt_usec = dt_usec
         
         # If the start of our next sample is greater than 1 (step), skip creating samples for this step
         if self.next_start >= 1.0:
@@ -209,6 +266,7 @@ class PollingSensor(Sensor):
 
         # Call get_step_samples() (implemented in subclasses) to get the samples and add them to the buffer
         samples = self.create_step_samples(dt_usec)  # Format np.array([<sample time>, <sample data 1>, ...])
+        self.n_samples += len(samples)
 
         # Send our data to any attached listeners
         #self.logger.debug("Sending samples to {} step listeners".format(len(self.step_listeners)))
@@ -229,8 +287,8 @@ class PollingSensor(Sensor):
         return (1.0-self.step_lerp_pcts)*start_value + self.step_lerp_pcts*end_value
         
     def _get_gaussian_noise(self, samples, noise_center=0.0, noise_scale=0.1):
-        if self.config.noise.enabled and noise_scale > 0.0:
-            return np.random.normal(noise_center, noise_scale, len(samples))
+        if self.noise_enabled and noise_scale > 0.0:
+            return self.noise.normal(noise_center, noise_scale, len(samples))
         else:
             return 0
     
@@ -254,6 +312,7 @@ class InterruptingSensor(Sensor):
                         
         # Call get_step_samples() (implemented in subclasses) to get the samples and add them to the buffer
         samples = self.create_step_samples(dt_usec)  # Note: samples for interrupting sensors include the time as the first column
+        self.n_samples += len(samples)
 
         # Send our data to any attached listeners
         #self.logger.debug("Sending samples to {} step listeners".format(len(self.step_listeners)))
@@ -304,6 +363,10 @@ class QueueingListener(SensorListener):
     def has_samples(self):
         return bool(len(self.q))
 
+    def reset(self):
+        self.q.clear()
+        self.last_data = None
+
     def step_callback(self, sensor, step_samples):
         # Push the samples onto the queue
         self.q.extendleft(step_samples)
@@ -359,15 +422,34 @@ class SensorCsvWriter(SensorListener):
         # Internal
         self._started = False        
         self._headers_written = False
+        self._file = None
         
-        self.output_filename = os.path.join(self.sim.config.working_dir, self.config.log_filename)        
+        self.output_filename = self._output_filename()
         
         # Create the step callback generator and get it started
         self.gen = self._step_callback_gen()
         
         # Start the generator (open csv file for writing)
         next(self.gen)        
+
+    def _output_filename(self):
+        return os.path.join(self.sim.config.working_dir, self.config.log_filename)
+
+    def reset(self):
+        """ Close our file and start a new one (in the sim's current working dir) """
+        self.gen.close()
+        self._headers_written = False
+        self.output_filename = self._output_filename()
+        self.gen = self._step_callback_gen()
+        next(self.gen)
         
+    def bytes_written(self):
+        """ Size of the csv file so far (including anything still buffered) """
+        f = self._file
+        if f is None or f.closed:
+            return 0
+        return f.tell()
+
     def play(self):
         self.enabled = True
         
@@ -378,6 +460,7 @@ class SensorCsvWriter(SensorListener):
         """ Generator for writing a csv file """
 
         with open(self.output_filename, 'wb') as f:   # Note: need to use wb since windows
+            self._file = f
             w = csv.writer(f, lineterminator=os.linesep)  # Also lineterminator=os.linesep for cross platform compatibility
 
             while True:
@@ -402,9 +485,11 @@ class SensorRawCsvWriter(SensorCsvWriter):
     def __init__(self, sim, config):
         SensorCsvWriter.__init__(self, sim, config)
         self.logger = logging.getLogger("SensorRawCsvWriter")
-        self.output_filename = os.path.join(self.sim.config.working_dir, "raw_"+self.config.log_filename)
         #self.logger.info("SensorRawCsvWriter ({}) initialized with filename {}".format(self.enabled, self.output_filename))
 
+    def _output_filename(self):
+        return os.path.join(self.sim.config.working_dir, "raw_"+self.config.log_filename)
+
     
     def _step_callback_gen(self):
         """ Generator for writing a csv file """
@@ -412,6 +497,7 @@ class SensorRawCsvWriter(SensorCsvWriter):
         self.logger.debug("step_callback_gen called -- starting")
 
         with open(self.output_filename, 'wb') as f:   # Note: need to use wb since windows
+            self._file = f
             w = csv.writer(f, lineterminator=os.linesep)  # Also lineterminator=os.linesep for cross platform compatibility
 
             while True:
@@ -454,6 +540,12 @@ class CompoundSensorListener(object):
     def add_step_listener(self, listener):
         self.step_listeners.append(listener)
 
+    def reset(self):
+        for listener in self.step_listeners:
+            reset = getattr(listener, 'reset', None)
+            if reset is not None:
+                reset()
+
 # ---------------------------
 # Just notes/sketches below here        
 
@@ -7,6 +7,12 @@
 # Date:     2016-Dec-28
 
 
+import sys
+if __name__ == "__main__":
+    # Note: this has to happen before the imports below so we can see them
+    import import_profile
+    import_profile.install_if_requested()
+
 import os
 import errno    
 import time
@@ -18,6 +24,8 @@ import yaml
 from units import *
 #from config import Config
 from config import *
+from config_compiler import default_compiler
+from hot_logging import get_logger, configure_logging
 
 from timers import TimeDialator
 
@@ -31,8 +39,17 @@ from sensor_laser_opto import *
 from sensor_accel import *
 
 from networking import PodComms
-
-from fcu import Fcu
+from state_ring import StateRingWriter
+from step_profiler import StepProfiler
+from metrics import RunMetrics
+from telemetry_sink import TelemetrySink, AsyncSensorCsvWriter
+from run_archive import ArchiveRecorder
+from replay import ReplayEngine
+from estimator import PodStateEstimator
+from fast_forward import FastForward
+from noise import NoiseStream, derive_seed, random_run_seed
+
+# Note: fcu (ctypes and the FCU DLL wrapper) is only imported if the FCU is enabled -- see Sim.__init__()
 
 import threading
 
@@ -43,8 +60,9 @@ from sensors import *   # @todo: move this to the top once we're done testing
 
 class Sim(object):
     
-    def __init__(self, config, working_dir=None):
-        self.logger = logging.getLogger("Sim")
+    def __init__(self, config, working_dir=None, track=None):
+        """ track: a Track to share with other sims in this process (e.g. see scenarios.py); by default we make our own """
+        self.logger = get_logger("Sim")
 
         self.logger.info("Initializing simulation")
         
@@ -54,7 +72,9 @@ class Sim(object):
 
         # Status vars (these indicate actual status)
         self.is_ready = False  # Simulation is ready to run
+        self.is_running = False  # Simulation run loop is active
         self.is_ended = False  # Simulation has ended
+        self.is_closed = False  # Background threads stopped (see close())
 
         # Config
         self.config = config
@@ -82,7 +102,7 @@ class Sim(object):
 
         # Components
         self.pusher = Pusher(self, self.config.pusher)
-        self.track = Track(self, self.config.track)
+        self.track = track if track is not None else Track(self, self.config.track)
         self.pod = Pod(self, self.config.pod)      
         #self.fcu = Fcu(self, self.config.fcu)  
 
@@ -92,13 +112,28 @@ class Sim(object):
         # @todo: should we set this somewhere else? Like in a run controller? 
         self.pusher.position = self.pod.pusher_plate_offset
 
+        # Sensor csv files are written on a background thread (see telemetry_sink.py)
+        self.telemetry_sink = None
+        if self.config.telemetry_sink.enabled:
+            self.telemetry_sink = TelemetrySink(self, self.config.telemetry_sink)
+            self.add_end_listener(self.telemetry_sink)  # Note: first, so that the files are complete for the other end listeners
+
+        # Physics (pusher and pod models). Can be turned off to replay recorded sensor data (see replay.py).
+        self.physics_enabled = True
+
+        # Sensor noise (see noise.py and noise_stream())
+        self.noise_seed = self.config.noise.seed
+        if self.noise_seed is None or self.noise_seed == '':
+            self.noise_seed = random_run_seed()
+        self.logger.info("Noise seed is {}", self.noise_seed)
+
         # Sensors
         self.sensors = {}
         self.sensors['pod'] = PodSensor(self, self.config.sensors.pod)
-        self.sensors['pod'].add_step_listener( SensorCsvWriter(self, self.config.sensors.pod) )
+        self.sensors['pod'].add_step_listener( self.make_csv_writer(self.config.sensors.pod) )
 
         self.sensors['pusher'] = PusherSensor(self, self.config.sensors.pusher)
-        self.sensors['pusher'].add_step_listener( SensorCsvWriter(self, self.config.sensors.pusher) )
+        self.sensors['pusher'].add_step_listener( self.make_csv_writer(self.config.sensors.pusher) )
 
         # - Accelerometers
         self.sensors['accel'] = []
@@ -108,7 +143,7 @@ class Sim(object):
             self.sensors['accel'].append(Accelerometer(self, Config(sensor_config)))
             sensor = self.sensors['accel'][idx]
             sensor.add_step_listener(AccelerometerTestListener(self, sensor.config))
-            sensor.add_step_listener(SensorCsvWriter(self, sensor.config))
+            sensor.add_step_listener(self.make_csv_writer(sensor.config))
             #sensor.add_step_listener(SensorRawCsvWriter(self, sensor.config))
         
         # - Laser Contrast Sensors
@@ -118,7 +153,7 @@ class Sim(object):
             self.sensors['laser_contrast'].append(LaserContrastSensor(self, Config(sensor_config)))
             sensor = self.sensors['laser_contrast'][idx]
             #sensor.add_step_listener(LaserContrastTestListener(self, sensor.config))  # For debugging
-            sensor.add_step_listener(SensorCsvWriter(self, sensor.config))
+            sensor.add_step_listener(self.make_csv_writer(sensor.config))
             #sensor.add_step_listener(SensorRawCsvWriter(self, sensor.config))  # These don't have 'raw' values since they just call an interrupt
 
         # - Laser Opto Sensors (height and yaw)
@@ -127,25 +162,73 @@ class Sim(object):
             self.sensors['laser_opto'].append(LaserOptoSensor(self, Config(sensor_config)))
             sensor = self.sensors['laser_opto'][idx]
             #sensor.add_step_listener(LaserOptoTestListener(self, sensor.config))  # For debugging
-            sensor.add_step_listener(SensorCsvWriter(self, sensor.config))
+            sensor.add_step_listener(self.make_csv_writer(sensor.config))
             #sensor.add_step_listener(SensorRawCsvWriter(self, sensor.config))   
         
         # - Laser Distance Sensor
         self.sensors['laser_dist'] = LaserDistSensor(self, Config(self.config.sensors.laser_dist))
         sensor = self.sensors['laser_dist']
-        sensor.add_step_listener(SensorCsvWriter(self, sensor.config))
+        sensor.add_step_listener(self.make_csv_writer(sensor.config))
         #sensor.add_step_listener(SensorRawCsvWriter(self, sensor.config))
         """
 
         # - Brake Sensors: MLP, limit switches (for both)
         pass
         
+        # Recorded sensor data instead of the simulated sensors (see replay.py)
+        self.replay = None
+        if self.config.replay.enabled:
+            self.replay = ReplayEngine(self, self.config.replay)
+            self.physics_enabled = bool(self.config.replay.physics)
+            self.add_end_condition(self.replay)
+
+        # All of the sensor channels in a single file (see run_archive.py)
+        self.archive = None
+        if self.config.archive.enabled:
+            self.archive = ArchiveRecorder(self, self.config.archive)
+            self.add_end_listener(self.archive)
+
+        # Independent position/velocity estimate from the sensors, logged against the pod's actual values (see estimator.py)
+        self.estimator = None
+        if self.config.estimator.enabled:
+            self.estimator = PodStateEstimator(self, self.config.estimator)
+            self.add_step_listener(self.estimator)
+            self.add_end_listener(self.estimator)
+
         # Networking
         self.comms = PodComms(self, self.config.networking)
         self.add_end_listener(self.comms)
 
+        # Sim state for viewers in another process (see viewer.py)
+        if self.config.viewer.enabled:
+            self.state_ring = StateRingWriter(self, self.config.viewer)
+            self.add_step_listener(self.state_ring)
+            self.add_end_listener(self.state_ring)
+
+        # Rolling throughput metrics (see metrics.py)
+        self.metrics = None
+        if self.config.metrics.enabled:
+            self.metrics = RunMetrics(self, self.config.metrics)
+            self.add_step_listener(self.metrics)
+            self.add_end_listener(self.metrics)
+            if self.telemetry_sink is not None:
+                self.metrics.add_queue('telemetry_sink', self.telemetry_sink.depth)
+
+        # Longer steps through quasi-steady phases (see fast_forward.py)
+        self.fast_forward = None
+        if self.config.fast_forward.enabled:
+            self.fast_forward = FastForward(self, self.config.fast_forward)
+            self.add_end_listener(self.fast_forward)
+
+        # Per-component step timing (see step_profiler.py)
+        self.profiler = None
+        if self.config.profiler.enabled:
+            self.profiler = StepProfiler(self, self.config.profiler)
+            self.add_end_listener(self.profiler)
+
         # FCU (!)
         if self.config.fcu.enabled:
+            from fcu import Fcu
             self.fcu = Fcu(self, self.config.fcu)
             self.add_end_listener(self.fcu)
         else:
@@ -183,9 +266,14 @@ class Sim(object):
         self.is_ready = True
 
     @classmethod
-    def load_config_files(cls, config_files):
-        """ Load one or more config files (later files overlay earlier ones) """
-        
+    def load_config_files(cls, config_files, compiled=True):
+        """ 
+        Load one or more config files (later files overlay earlier ones) 
+        If compiled, units are resolved up front and the result is read-only and cached (see config_compiler.py)
+        """
+        if compiled:
+            return default_compiler.load(config_files).sim
+
         ymls = []
         for configfile in config_files:
             with open(configfile, 'rb') as f:
@@ -203,10 +291,74 @@ class Sim(object):
         #    config.loadfile(configfile)
         #return config.sim
 
+    def reset(self, working_dir=None):
+        """ 
+        Return the sim to its initial conditions so that it can be run again (warm start). 
+        Config, track, sensors, listeners and the loaded FCU DLL are kept; the FCU firmware is re-initialized at the start of the next run.
+        Note: data files are restarted in working_dir if given, otherwise the current data files are overwritten.
+        Step listeners and end conditions may optionally implement reset() to be reset along with the sim.
+        """
+        if self.is_running:
+            raise RuntimeError("Can't reset the simulation while it is running -- stop it first")
+        if self.is_closed:
+            raise RuntimeError("Can't reset the simulation after it has been closed")
+
+        self.logger.info("Resetting simulation")
+
+        if working_dir is not None:
+            self.set_working_dir(working_dir)
+            self.ensure_working_dir()
+
+        self.end_flag = False
+        self.paused_flag = False
+        self.is_ended = False
+
+        self.elapsed_time_usec = 0
+        self.n_steps_taken = 0
+        self.time_dialator.reset()
+
+        self.pusher.reset()
+        self.pod.reset()
+        self.pusher.position = self.pod.pusher_plate_offset
+
+        for sensor in self.sensors.values():
+            if isinstance(sensor, list):
+                for s in sensor:
+                    s.reset()
+            else:
+                sensor.reset()
+
+        self.comms.reset()
+        if self.config.fcu.enabled:
+            self.fcu.reset()
+        if self.profiler is not None:
+            self.profiler.reset()
+        if self.fast_forward is not None:
+            self.fast_forward.reset()
+        if self.archive is not None:
+            self.archive.reset()
+
+        for listener in self.step_listeners + self.end_conditions:
+            reset = getattr(listener, 'reset', None)
+            if reset is not None:
+                reset()
+
+        self.logger.info("Simulator reset")
+
     def set_working_dir(self, working_dir):
         """ Set our working directory (for file writing and whatnot) """
-        self.config.working_dir = working_dir
+        self.config.override('working_dir', working_dir)
     
+    def noise_stream(self, *keys):
+        """ An independent noise stream for a sensor (keys identify the sensor, e.g. its class and id) """
+        return NoiseStream(derive_seed(self.noise_seed, *keys), self.config.noise.block_size or 65536)
+
+    def make_csv_writer(self, sensor_config):
+        """ A csv writer listener for a sensor (asynchronous if the telemetry sink is enabled) """
+        if self.telemetry_sink is not None:
+            return AsyncSensorCsvWriter(self, sensor_config, self.telemetry_sink)
+        return SensorCsvWriter(self, sensor_config)
+
     def data_logging_enabled(self, data_writer, sensor):
         """ Tell data writers whether or not to log data (e.g. csv writers) """
         # @todo: write something that gets a value from runtime config
@@ -217,11 +369,17 @@ class Sim(object):
 
     def step(self, dt_usec):        
 
-        # Step the pusher first (will apply pressure and handle disconnection)
-        self.pusher.step(dt_usec)
+        # Every so often the profiler takes the step instead, timing each part of it
+        if self.profiler is not None and self.profiler.should_sample():
+            self.profiler.profile_step(self, dt_usec)
+            return
+
+        if self.physics_enabled:
+            # Step the pusher first (will apply pressure and handle disconnection)
+            self.pusher.step(dt_usec)
 
-        # Step the pod (will handle all other forces and pod physics)
-        self.pod.step(dt_usec)
+            # Step the pod (will handle all other forces and pod physics)
+            self.pod.step(dt_usec)
         
         # Step the sensors
         for sensor in self.sensors.values():
@@ -234,11 +392,23 @@ class Sim(object):
 
         # Step the time dialator to keep our timers in sync
         self.time_dialator.step(dt_usec)
-        if self.n_steps_taken % 500 == 0:
-            self.logger.debug("Time dialation factor is {} after {} steps".format(self.time_dialator.dialation, self.n_steps_taken))
 
-            # Debugging
-            self.logger.debug("Track DB {}".format(self.fcu.lib.u32FCU_FCTL_TRACKDB__Get_CurrentDB()))
+        self.elapsed_time_usec += dt_usec
+        self.n_steps_taken += 1
+
+        for step_listener in self.step_listeners:
+            step_listener.step_callback(self)
+
+    def _log_step_debug(self):
+        """ Periodic debug output from run() """
+        if not self.logger.debug_enabled:
+            return  # Note: don't call into the FCU just to throw the results away
+
+        self.logger.debug("Time dialation factor is {} after {} steps", self.time_dialator.dialation, self.n_steps_taken)
+
+        # Debugging
+        if self.config.fcu.enabled:
+            self.logger.debug("Track DB {}", self.fcu.lib.u32FCU_FCTL_TRACKDB__Get_CurrentDB())
 
             info = [
                 #self.fcu.lib.u8FCU_FCTL_TRACKDB__Accel__Get_Use(),  # Deprecated
@@ -247,23 +417,17 @@ class Sim(object):
                 self.fcu.lib.s32FCU_FCTL_TRACKDB__Accel__Get_Decel_Threshold_mm_ss(),
                 self.fcu.lib.s16FCU_FCTL_TRACKDB__Accel__Get_Decel_ThresholdTime_x10ms(),
             ]
-            self.logger.debug("Track DB: Accel: {}".format(info))
-
-            info = {
-                'psa': self.pusher.acceleration,
-                'psv': self.pusher.velocity,
-                'psp': self.pusher.position,
-                'pda': self.pod.acceleration,
-                'pdv': self.pod.velocity,
-                'pdp': self.pod.position,
-            }
-            self.logger.debug("Pusher avp:  {psa}  {psv}  {psp};  Pod avp:  {pda}  {pdv}  {pdp}".format(**info))
-
-        self.elapsed_time_usec += dt_usec
-        self.n_steps_taken += 1
-
-        for step_listener in self.step_listeners:
-            step_listener.step_callback(self)
+            self.logger.debug("Track DB: Accel: {}", info)
+
+        info = {
+            'psa': self.pusher.acceleration,
+            'psv': self.pusher.velocity,
+            'psp': self.pusher.position,
+            'pda': self.pod.acceleration,
+            'pdv': self.pod.velocity,
+            'pdp': self.pod.position,
+        }
+        self.logger.debug("Pusher avp:  {psa}  {psv}  {psp};  Pod avp:  {pda}  {pdv}  {pdp}", **info)
 
     def run_threaded(self):
         """ Run the simulator in a thread and return the thread (don't join it here) """
@@ -278,6 +442,7 @@ class Sim(object):
         self.logger.info("Starting simulation")
 
         self.end_flag = False
+        self.is_running = True
         sim_start_t = time.time()
         
         # Notify preprocessors
@@ -295,21 +460,15 @@ class Sim(object):
 
             try: 
                 # Check our end listener(s) to see if we should end the simulation (e.g. the pod has stopped)
-                for listener in self.end_conditions:
-                    if listener.is_finished(self):
-                        self.stop()
-            
-                if self.end_flag:
-                    # Notify our 'finished' listeners and break the loop
-                    for end_listener in self.end_listeners:
-                        end_listener.end_callback(self)
-
+                if self.end_if_finished():
                     break  # Break out of our run loop
                 
                 if not self.paused_flag:
                     # @todo: do we need to handle pausing on other threads? Time runner for instance? 
                     # @todo: Maybe implement a pause listener or something? 
-                    self.step(self.fixed_timestep_usec)
+                    self.step(self.next_step_usec())
+                    if self.n_steps_taken % 500 == 0:
+                        self._log_step_debug()
             
             except KeyboardInterrupt:
                 self.logger.info("Received KeyboardInterrupt -- stopping simulation.")
@@ -325,8 +484,46 @@ class Sim(object):
         for processor in self.postprocessors:
             processor.process(self)
 
+        self.is_running = False
         self.is_ended = True
 
+    def next_step_usec(self):
+        """ Length of the next step: the fixed timestep, or longer if we're fast-forwarding (see fast_forward.py) """
+        if self.fast_forward is not None:
+            return self.fast_forward.next_step_usec()
+        return self.fixed_timestep_usec
+
+    def end_if_finished(self):
+        """ Check the end conditions, and if we've been stopped notify our 'finished' listeners. Returns True if we've ended. """
+        for listener in self.end_conditions:
+            if listener.is_finished(self):
+                self.stop()
+
+        if not self.end_flag:
+            return False
+        for end_listener in self.end_listeners:
+            end_listener.end_callback(self)
+        return True
+
+    def close(self):
+        """
+        Stop the sim's background threads (the telemetry sink's writer) when it's no longer needed, e.g. before
+        replacing it with a new Sim. A run that hasn't ended is ended first (so the end listeners finish their files).
+        The sim can't be run or reset after this.
+        """
+        if self.is_running:
+            raise RuntimeError("Can't close the simulation while it is running -- stop it first")
+        if self.is_closed:
+            return
+        if not self.is_ended:
+            self.stop()
+            self.end_if_finished()
+            self.is_ended = True
+        self.logger.info("Closing simulation")
+        if self.telemetry_sink is not None:
+            self.telemetry_sink.close()
+        self.is_closed = True
+
     def stop(self):
         self.logger.info("Stopping Simulation")
         self.end_flag = True  # Request that the sim stop
@@ -397,8 +594,15 @@ class StateMachineRunController(object):
         self.fake_accel_transition = False
         self.end_after_spindown = True
 
-        self.sim_finished = False
+        self.reset()
 
+    def reset(self):
+        """ Start over (called by Sim.reset()) """
+        self.started = False
+        self.pushed = False
+        self.push_step_counter = 0
+        self.ready_state_counter = 0
+        self.sim_finished = False
         self.state = "INIT"
 
     def setup_mission_profile(self):
@@ -587,6 +791,9 @@ class SimEndCondition(object):
     def __init__(self):
         self.logger = logging.getLogger("SimEndListener")
         self.pushed = False
+
+    def reset(self):
+        self.pushed = False
         
     def is_finished(self, sim):
 
@@ -614,8 +821,7 @@ if __name__ == "__main__":
     #from debug import stacktracer
     #stacktracer.trace_start("trace.html",interval=5,auto=True) # Set auto flag to always update file!
 
-    with open('conf/logging.conf') as f:  # @todo: make this work when run from anywhere (this works if run from top directory)
-        logging.config.dictConfig(yaml.load(f))
+    configure_logging('conf/logging.conf')
         
     test_logger = logging.getLogger("NetworkNode")
     #print(test_logger.__dict__)
@@ -627,10 +833,13 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="rPod Simulation")
     parser.add_argument('configfile', metavar='config', type=str, nargs='+', default="None",
         help='Simulation configuration file(s) -- later files overlay on previous files')
+    parser.add_argument('--import-profile', action='store_true',
+        help='Print a report of where startup time went (module imports and sim setup) before running')
     args = parser.parse_args()
 
     # Note: 'configfile' is a list of one or more config files. Later files overlay previous ones. 
     sim = Sim( Sim.load_config_files(args.configfile), '../eng-embed-sim-data/test')
+    import_profile.report()
     #t = sim.run_threaded()
     #t.join()
 
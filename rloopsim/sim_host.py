@@ -0,0 +1,354 @@
+#!/usr/bin/env python
+# coding=UTF-8
+
+# File:     sim_host.py
+# Purpose:  Host many concurrent simulations, each in its own worker process (used by simulator_control.py)
+# Author:   Ryan Adams (radams@cyandata.com, @ninetimeout)
+# Date:     2017-Feb-12
+
+# Note: Each sim runs in its own process so that sims don't fight over the GIL (and so each one can load its own copy of the FCU DLL).
+#       The host only talks to the workers through a pair of queues: commands go down, status updates come back up.
+
+import os
+import time
+import logging
+import threading
+import multiprocessing
+from collections import deque
+from Queue import Empty, Full
+
+
+# Hosted sim states
+SIM_CREATED = 'CREATED'      # Known to the host, but not started
+SIM_QUEUED = 'QUEUED'        # Start requested, waiting for a free worker slot
+SIM_RUNNING = 'RUNNING'      # Worker process is running the sim
+SIM_STOPPING = 'STOPPING'    # Stop requested, waiting for the worker to finish
+SIM_FINISHED = 'FINISHED'    # Sim ran to completion (or was stopped)
+SIM_FAILED = 'FAILED'        # Worker couldn't create the sim or died unexpectedly
+
+FINAL_STATES = (SIM_FINISHED, SIM_FAILED)
+
+# Commands sent to the worker process
+CMD_STOP = 'stop'
+CMD_PUSH = 'push'
+CMD_EDIT = 'edit'   # Sent as (CMD_EDIT, ['path=value', ...])
+
+
+class SimStatusReporter(object):
+    """ Sim step listener (in the worker process) that sends progress back to the host at a fixed wall clock interval """
+
+    def __init__(self, status_queue, interval_sec):
+        self.status_queue = status_queue
+        self.interval_sec = interval_sec
+        self.next_report_t = 0.0
+
+    def step_callback(self, sim):
+        t = time.time()
+        if t < self.next_report_t:
+            return
+        self.next_report_t = t + self.interval_sec
+        try:
+            self.status_queue.put_nowait(sim_status(sim, SIM_RUNNING))
+        except Full:
+            pass  # The host will catch up with the next one -- never hold up the sim
+
+
+class StopRequest(object):
+    """ Sim preprocessor that re-applies a stop that came in before the run started (Sim.run() clears the end flag) """
+
+    def __init__(self):
+        self.requested = False
+
+    def request(self, sim):
+        self.requested = True
+        sim.stop()
+
+    def process(self, sim):
+        if self.requested:
+            sim.stop()
+
+
+def sim_status(sim, state, message=""):
+    """ Progress info for a sim as a plain (picklable) dict """
+    return {
+        'state': state,
+        'message': message,
+        'n_steps': sim.n_steps_taken,
+        'elapsed_time_usec': sim.elapsed_time_usec,
+        'pod': (sim.pod.acceleration, sim.pod.velocity, sim.pod.position),
+        'pusher_state': sim.pusher.state,
+        'stats': sim.metrics.latest if sim.metrics is not None else None,
+    }
+
+
+def sim_worker(config_files, output_dir, auto_push, command_queue, status_queue, status_interval):
+    """ Worker process entry point: build a sim from the config files, run it, and report back """
+    # Note: this must be a module level function so that it can be pickled on Windows (no fork)
+
+    # Imported here so the host process doesn't need to load the whole simulator
+    from sim import Sim, SimEndCondition
+    from live_config import LiveConfigEditor
+
+    logger = logging.getLogger("SimWorker")
+
+    try:
+        sim = Sim(Sim.load_config_files(config_files), output_dir)
+    except Exception as e:
+        logger.exception("Failed to create sim")
+        status_queue.put({'state': SIM_FAILED, 'message': "Failed to create sim: {}".format(e)})
+        return
+
+    sim.add_end_condition(SimEndCondition())
+    sim.add_step_listener(SimStatusReporter(status_queue, status_interval))
+
+    config_editor = LiveConfigEditor(sim)
+
+    # Note: the command thread starts before sim.run(), so a stop can come in before the run loop does
+    stop_request = StopRequest()
+    sim.add_preprocessor(stop_request)
+
+    def handle_commands():
+        while not sim.is_ended:
+            try:
+                cmd = command_queue.get(timeout=0.5)
+            except Empty:
+                continue
+            if cmd == CMD_STOP:
+                stop_request.request(sim)
+            elif cmd == CMD_PUSH:
+                sim.pusher.start_push()
+            elif isinstance(cmd, tuple) and cmd[0] == CMD_EDIT:
+                try:
+                    changes = config_editor.edit(cmd[1])
+                    msg = "Config changed: {}".format(", ".join("{}={}".format(path, new) for path, old, new in changes))
+                except ValueError as e:
+                    msg = str(e)
+                status_queue.put(sim_status(sim, SIM_RUNNING, msg))
+            else:
+                logger.warning("Unknown command {}".format(cmd))
+
+    t = threading.Thread(target=handle_commands, args=())
+    t.daemon = True
+    t.start()
+
+    if auto_push:
+        sim.pusher.start_push()
+
+    start_t = time.time()
+    try:
+        sim.run()
+    except Exception as e:
+        logger.exception("Sim failed")
+        status_queue.put(sim_status(sim, SIM_FAILED, "Sim failed: {}".format(e)))
+        return
+
+    msg = "Simulated {} steps/{} seconds in {:.2f} actual seconds".format(sim.n_steps_taken, sim.elapsed_time_usec / 1000000.0, time.time() - start_t)
+    status_queue.put(sim_status(sim, SIM_FINISHED, msg))
+
+
+class HostedSim(object):
+    """ Host-side handle for a single sim """
+
+    def __init__(self, host, sim_id, config_files, output_dir, auto_push):
+        self.host = host
+        self.sim_id = sim_id
+        self.config_files = list(config_files)
+        self.output_dir = output_dir
+        self.auto_push = auto_push
+
+        self.process = None
+        self.command_queue = None
+        self.status_queue = None
+
+        # Latest status from the worker. Version is bumped on every update so that streams can wait for changes.
+        self.status = {'state': SIM_CREATED, 'message': "", 'n_steps': 0, 'elapsed_time_usec': 0, 'pod': (0.0, 0.0, 0.0), 'pusher_state': ''}
+        self.version = 0
+        self.updated = threading.Condition()
+
+        self.created_t = time.time()
+        self.started_t = None
+        self.ended_t = None
+
+    @property
+    def state(self):
+        return self.status['state']
+
+    def set_status(self, status):
+        with self.updated:
+            self.status = dict(self.status, **status)
+            self.version += 1
+            self.updated.notify_all()
+
+    def set_state(self, state, message=""):
+        self.set_status({'state': state, 'message': message})
+
+    def wait_for_update(self, version, timeout=None):
+        """ Wait until our status is newer than version; returns (version, status) """
+        with self.updated:
+            if self.version <= version:
+                self.updated.wait(timeout)
+            return self.version, dict(self.status)
+
+    def get_status(self):
+        with self.updated:
+            status = dict(self.status)
+        status['sim_id'] = self.sim_id
+        if self.started_t is not None:
+            status['real_time_sec'] = (self.ended_t or time.time()) - self.started_t
+        else:
+            status['real_time_sec'] = 0.0
+        return status
+
+    def start_worker(self, status_interval):
+        """ Spawn the worker process (called by the host once we've been given a slot) """
+        self.command_queue = multiprocessing.Queue()
+        self.status_queue = multiprocessing.Queue(maxsize=100)
+        self.process = multiprocessing.Process(target=sim_worker, name="sim-{}".format(self.sim_id),
+            args=(self.config_files, self.output_dir, self.auto_push, self.command_queue, self.status_queue, status_interval))
+        self.process.daemon = True
+        self.process.start()
+        self.started_t = time.time()
+        self.set_state(SIM_RUNNING)
+
+        t = threading.Thread(target=self._watch_worker, args=())
+        t.daemon = True
+        t.start()
+
+    def send_command(self, cmd):
+        if self.command_queue is not None:
+            self.command_queue.put(cmd)
+
+    def _watch_worker(self):
+        """ Pass status updates along until the worker finishes (or dies) """
+        while True:
+            try:
+                status = self.status_queue.get(timeout=1.0)
+            except Empty:
+                if self.process.is_alive():
+                    continue
+                # Worker died without telling us
+                status = {'state': SIM_FAILED, 'message': "Worker exited unexpectedly (exit code {})".format(self.process.exitcode)}
+
+            if self.state == SIM_STOPPING and status['state'] == SIM_RUNNING:
+                status = dict(status, state=SIM_STOPPING)  # Don't let stale progress updates undo the stop
+
+            self.set_status(status)
+            if status['state'] in FINAL_STATES:
+                break
+
+        self.process.join()
+        self.ended_t = time.time()
+        self.host._worker_done(self)
+
+
+class SimHost(object):
+    """ Keeps track of hosted sims and admits them to a fixed number of worker slots """
+
+    def __init__(self, max_sims=None, status_interval=0.25):
+        self.logger = logging.getLogger("SimHost")
+
+        # Default to one sim per core. Note that a sim with the FCU enabled also runs timer and network threads.
+        if not max_sims:
+            max_sims = multiprocessing.cpu_count()
+        self.max_sims = max_sims
+        self.status_interval = status_interval
+
+        self.sims = {}
+        self.n_running = 0
+        self.queued = deque()
+        self.next_id = 1
+        self._lock = threading.Lock()
+
+    def create(self, config_files, output_dir, auto_push=False):
+        """ Register a new sim. Config files are checked here, but not loaded until the worker starts. """
+        for config_file in config_files:
+            if not os.path.isfile(config_file):
+                raise ValueError("Config file {} not found".format(config_file))
+
+        with self._lock:
+            sim_id = self.next_id
+            self.next_id += 1
+            hosted = HostedSim(self, sim_id, config_files, output_dir, auto_push)
+            self.sims[sim_id] = hosted
+
+        self.logger.info("Created sim {} ({}, output to {})".format(sim_id, config_files, output_dir))
+        return hosted
+
+    def get(self, sim_id):
+        """ Get a hosted sim by id (raises KeyError if there is none) """
+        return self.sims[sim_id]
+
+    def start(self, sim_id):
+        """ Start the sim now if there is a free slot, otherwise queue it. Returns the new state. """
+        hosted = self.get(sim_id)
+        with self._lock:
+            if hosted.state != SIM_CREATED:
+                raise ValueError("Sim {} can't be started from state {}".format(sim_id, hosted.state))
+            if self.n_running < self.max_sims:
+                self._start_worker(hosted)
+            else:
+                self.queued.append(hosted)
+                hosted.set_state(SIM_QUEUED, "Waiting for a free worker ({} of {} running)".format(self.n_running, self.max_sims))
+        return hosted.state
+
+    def stop(self, sim_id):
+        """ Ask a sim to stop. Queued sims are just dropped from the queue. """
+        hosted = self.get(sim_id)
+        with self._lock:
+            if hosted.state == SIM_QUEUED:
+                self.queued.remove(hosted)
+                hosted.set_state(SIM_FINISHED, "Stopped before it was started")
+            elif hosted.state == SIM_CREATED:
+                hosted.set_state(SIM_FINISHED, "Stopped before it was started")
+            elif hosted.state == SIM_RUNNING:
+                hosted.set_state(SIM_STOPPING)
+                hosted.send_command(CMD_STOP)
+            else:
+                raise ValueError("Sim {} can't be stopped from state {}".format(sim_id, hosted.state))
+        return hosted.state
+
+    def push(self, sim_id):
+        hosted = self.get(sim_id)
+        if hosted.state != SIM_RUNNING:
+            raise ValueError("Sim {} must be running to start the push (state is {})".format(sim_id, hosted.state))
+        hosted.send_command(CMD_PUSH)
+
+    def edit_config(self, sim_id, edits):
+        """ Send 'path=value' config edits to a running sim (the result shows up in the sim's status message) """
+        hosted = self.get(sim_id)
+        if hosted.state != SIM_RUNNING:
+            raise ValueError("Sim {} must be running to edit its config (state is {})".format(sim_id, hosted.state))
+        hosted.send_command((CMD_EDIT, list(edits)))
+
+    def remove(self, sim_id):
+        """ Forget about a finished sim """
+        hosted = self.get(sim_id)
+        if hosted.state not in FINAL_STATES + (SIM_CREATED,):
+            raise ValueError("Sim {} must be stopped before it is removed (state is {})".format(sim_id, hosted.state))
+        with self._lock:
+            del self.sims[sim_id]
+
+    def list(self):
+        return [self.sims[sim_id] for sim_id in sorted(self.sims.keys())]
+
+    def shutdown(self):
+        """ Stop everything (e.g. when the server is shutting down) """
+        for hosted in self.list():
+            try:
+                self.stop(hosted.sim_id)
+            except ValueError:
+                pass
+
+    def _start_worker(self, hosted):
+        # Note: caller must hold self._lock
+        self.n_running += 1
+        hosted.start_worker(self.status_interval)
+        self.logger.info("Started sim {} ({} of {} workers in use)".format(hosted.sim_id, self.n_running, self.max_sims))
+
+    def _worker_done(self, hosted):
+        """ Called from a sim's watcher thread when its worker has exited """
+        with self._lock:
+            self.n_running -= 1
+            self.logger.info("Sim {} ended: {} {}".format(hosted.sim_id, hosted.state, hosted.status['message']))
+            while self.queued and self.n_running < self.max_sims:
+                self._start_worker(self.queued.popleft())
@@ -11,7 +11,6 @@ import os
 import errno    
 import time
 import logging
-import matplotlib.pyplot as plt
 
 from units import *
 from config import Config
@@ -195,7 +194,7 @@ class Sim(object):
 
     def set_working_dir(self, working_dir):
         """ Set our working directory (for file writing and whatnot) """
-        self.config.working_dir = working_dir
+        self.config.override('working_dir', working_dir)
     
     def data_logging_enabled(self, data_writer, sensor):
         """ Tell data writers whether or not to log data (e.g. csv writers) """
@@ -307,6 +306,7 @@ class Sim(object):
 
         #print "LaserOptoTestListener: gap sensor took {} samples that were within a gap.".format(self.lotl.n_gaps)
         self.logger.info("Simulated {} steps/{} seconds in {} actual seconds.".format(self.n_steps_taken, self.elapsed_time_usec/1000000, sim_time))
+        import matplotlib.pyplot as plt  # Note: imported here since it's slow to load
         fig, ax1 = plt.subplots()
         ax1.set_xlabel('Position (m)')
         ax1.set_ylabel('velocity (m/s)', color='b')
@@ -599,14 +599,12 @@ class SimEndCondition(object):
 if __name__ == "__main__":
     import sys
     import logging
-    import logging.config
-    import yaml
+    from hot_logging import configure_logging
 
     #from debug import stacktracer
     #stacktracer.trace_start("trace.html",interval=5,auto=True) # Set auto flag to always update file!
 
-    with open('conf/logging.conf') as f:  # @todo: make this work when run from anywhere (this works if run from top directory)
-        logging.config.dictConfig(yaml.load(f))
+    configure_logging('conf/logging.conf')
         
     test_logger = logging.getLogger("NetworkNode")
     #print(test_logger.__dict__)
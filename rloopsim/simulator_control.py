@@ -1,5 +1,10 @@
 #!/usr/bin/env python
 
+if __name__ == '__main__':
+    # Note: this has to happen before the imports below so we can see them
+    import import_profile
+    import_profile.install_if_requested()
+
 from concurrent import futures
 import time
 import math
@@ -10,6 +15,9 @@ import simulator_control_pb2
 import simulator_control_pb2_grpc
 
 from sim import Sim
+from telemetry import TelemetryStream
+from sim_host import SimHost, FINAL_STATES
+from live_config import LiveConfigEditor
 
 
 _ONE_DAY_IN_SECONDS = 60 * 60 * 24
@@ -22,8 +30,9 @@ PUSHER_CTRL_PUSH = 3
 
 class SimControlServicer(simulator_control_pb2_grpc.SimControlServicer):
     
-    def __init__(self):
+    def __init__(self, max_sims=None):
         self.sim = None
+        self.sim_thread = None
         self.sim_initialized = False
         self.sim_state = SIM_CTRL_STOP
 
@@ -31,19 +40,45 @@ class SimControlServicer(simulator_control_pb2_grpc.SimControlServicer):
         self.sim_config = None
         self.output_dir = None
 
+        # Telemetry outlives individual sims so that clients can keep streaming across resets
+        self.telemetry = None
+
+        # Hosted sims (separate from self.sim above, which runs in this process)
+        self.host = SimHost(max_sims)
+
     def _init_sim(self):
+        # Note: the constructor blocks until the sim is ready
         self.sim = Sim(self.sim_config, self.output_dir)
-        # Wait until the sim is ready (@todo: do we need this? Doesn't the constructor block until it's done?)
-        while not self.sim.is_ready:
-            time.sleep(0.1)
+        if self.telemetry is None:
+            self.telemetry = TelemetryStream(self.sim_config.telemetry)
+        self.sim.add_step_listener(self.telemetry)
+        self.sim.add_end_listener(self.telemetry)
+        if self.sim.metrics is not None:
+            self.sim.metrics.add_queue('telemetry', self._telemetry_queue_depth)
         self.sim_initialized = True
 
+    def _telemetry_queue_depth(self):
+        """ Depth of the fullest telemetry subscriber queue """
+        return max([len(subscriber.queue) for subscriber in self.telemetry.subscribers] or [0])
+
     def _reset_sim(self):
         self.sim.stop()
         # Wait until we're sure it's done
-        while not self.sim.is_ended:
-            time.sleep(0.1)
-        self._init_sim()
+        if self.sim_thread is not None:
+            self.sim_thread.join()
+            self.sim_thread = None
+        # Warm start -- keeps the FCU DLL loaded and everything else that doesn't change between runs
+        self.sim.reset()
+
+    def _close_sim(self):
+        """ Stop the current sim and its background threads before replacing it """
+        self.sim.stop()
+        if self.sim_thread is not None:
+            self.sim_thread.join()
+            self.sim_thread = None
+        self.sim.close()
+        self.sim = None
+        self.sim_initialized = False
 
 
     def ControlSim(self, request, context):
@@ -59,7 +94,7 @@ class SimControlServicer(simulator_control_pb2_grpc.SimControlServicer):
             # @todo: *** need to reset the simulator when it is stopped. 
 
             if cmd == SIM_CTRL_RUN:
-                self.sim.run_threaded()
+                self.sim_thread = self.sim.run_threaded()
                 # @todo: wait/check for proper startup
                 msg = "Simulation started"
                 self.sim_state = SIM_CTRL_RUN
@@ -145,24 +180,209 @@ class SimControlServicer(simulator_control_pb2_grpc.SimControlServicer):
         # @todo: error checking for config loading and output directory viability
         self.sim_config = Sim.load_config_files(config_files)
         self.output_dir = output_dir
+        if self.sim is not None:
+            self._close_sim()
         self._init_sim()
 
-
-
-def serve(sim_config, working_dir):
+    def EditConfig(self, request, context):
+        """ Change whitelisted config values on a live sim (see live_config.EDITABLE_PARAMS) """
+        if request.sim_id:
+            # Hosted sims apply edits asynchronously in their worker process
+            try:
+                self.host.edit_config(request.sim_id, request.value)
+            except KeyError:
+                return simulator_control_pb2.Ack(success=False, message="No sim with id {}".format(request.sim_id))
+            except ValueError as e:
+                return simulator_control_pb2.Ack(success=False, message=str(e))
+            return simulator_control_pb2.Ack(success=True, message="Config edits sent to sim {}".format(request.sim_id))
+
+        if not self.sim_initialized:
+            return simulator_control_pb2.Ack(success=False, message="Simulator has not been initialized")
+
+        try:
+            changes = LiveConfigEditor(self.sim).edit(request.value)
+        except ValueError as e:
+            return simulator_control_pb2.Ack(success=False, message=str(e))
+
+        msg = "Config changed: {}".format(", ".join("{}={}".format(path, new) for path, old, new in changes))
+        return simulator_control_pb2.Ack(success=True, message=msg)
+
+    def StreamTelemetry(self, request, context):
+        """ Stream decimated sim state to the client until it disconnects or falls too far behind """
+        # Note: each open stream ties up one of the server's worker threads
+        subscriber = self.telemetry.subscribe(request.rate_hz, request.queue_size)
+        try:
+            while context.is_active() and not subscriber.closed:
+                for snapshot in subscriber.get(timeout=0.5):
+                    yield self._telemetry_message(snapshot, subscriber)
+        finally:
+            self.telemetry.unsubscribe(subscriber)
+
+    @staticmethod
+    def _telemetry_message(snapshot, subscriber):
+        """ Convert a TelemetryStream snapshot into a Telemetry message """
+        msg = simulator_control_pb2.Telemetry(
+            n_steps=snapshot['n_steps'],
+            elapsed_time_usec=snapshot['elapsed_time_usec'],
+            he_height=snapshot['he_height'],
+            pusher_state=snapshot['pusher_state'],
+            fcu_state=snapshot['fcu_state'],
+            rate_hz=subscriber.rate_hz,
+            dropped=subscriber.n_dropped,
+        )
+        msg.pod.acceleration, msg.pod.velocity, msg.pod.position = snapshot['pod']
+        msg.pusher.acceleration, msg.pusher.velocity, msg.pusher.position = snapshot['pusher']
+        for brake in snapshot['brakes']:
+            msg.brakes.add(**brake)
+        for name, x, y, z in snapshot['forces']:
+            msg.forces.add(name=name, x=x, y=y, z=z)
+        return msg
+
+
+
+    # -------------------------
+    # Hosted sims
+    # -------------------------
+
+    def CreateSim(self, request, context):
+        """ Create a hosted sim (it won't run until StartSim) """
+        config_files = list(request.config_files) or ['conf/sim_config.yaml']
+        output_dir = request.output_dir or "../eng-embed-sim-data/test"
+        try:
+            hosted = self.host.create(config_files, output_dir, request.auto_push)
+        except ValueError as e:
+            return self._sim_error(context, grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        return self._sim_status_message(hosted.get_status())
+
+    def StartSim(self, request, context):
+        """ Start a hosted sim, or queue it if all of the workers are busy """
+        return self._hosted_call(self.host.start, request, context)
+
+    def StopSim(self, request, context):
+        return self._hosted_call(self.host.stop, request, context)
+
+    def PushSim(self, request, context):
+        return self._hosted_call(self.host.push, request, context)
+
+    def RemoveSim(self, request, context):
+        try:
+            self.host.remove(request.sim_id)
+        except KeyError:
+            return simulator_control_pb2.Ack(success=False, message="No sim with id {}".format(request.sim_id))
+        except ValueError as e:
+            return simulator_control_pb2.Ack(success=False, message=str(e))
+        return simulator_control_pb2.Ack(success=True, message="Sim {} removed".format(request.sim_id))
+
+    def QuerySim(self, request, context):
+        return self._hosted_call(None, request, context)
+
+    def ListSims(self, request, context):
+        msg = simulator_control_pb2.SimList(max_sims=self.host.max_sims, n_running=self.host.n_running, n_queued=len(self.host.queued))
+        for hosted in self.host.list():
+            msg.sims.extend([self._sim_status_message(hosted.get_status())])
+        return msg
+
+    def StreamSimStatus(self, request, context):
+        """ Stream status updates for a hosted sim until it finishes """
+        try:
+            hosted = self.host.get(request.sim_id)
+        except KeyError:
+            self._sim_error(context, grpc.StatusCode.NOT_FOUND, "No sim with id {}".format(request.sim_id))
+            return
+
+        version = -1
+        while context.is_active():
+            new_version, status = hosted.wait_for_update(version, timeout=1.0)
+            if new_version == version:
+                continue  # Timed out; check that the client is still there
+            version = new_version
+            yield self._sim_status_message(hosted.get_status())
+            if status['state'] in FINAL_STATES:
+                break
+
+    def GetStats(self, request, context):
+        """ Latest run metrics (see metrics.py) for our own sim (sim_id 0) or a hosted sim """
+        if request.sim_id == 0:
+            stats = self.sim.metrics.latest if self.sim is not None and self.sim.metrics is not None else None
+        else:
+            try:
+                stats = self.host.get(request.sim_id).get_status().get('stats')
+            except KeyError:
+                context.set_code(grpc.StatusCode.NOT_FOUND)
+                context.set_details("No sim with id {}".format(request.sim_id))
+                return simulator_control_pb2.SimStats()
+        return self._sim_stats_message(request.sim_id, stats)
+
+    @staticmethod
+    def _sim_stats_message(sim_id, stats):
+        if stats is None:
+            return simulator_control_pb2.SimStats(sim_id=sim_id, available=False)
+        msg = simulator_control_pb2.SimStats(
+            sim_id=sim_id,
+            available=True,
+            steps_per_sec=stats['steps_per_sec'],
+            real_time_factor=stats['real_time_factor'],
+            sensor_samples_per_sec=stats['sensor_samples_per_sec'],
+            csv_bytes_per_sec=stats['csv_bytes_per_sec'],
+            fcu_timer_lag_ms=stats['fcu_timer_lag_ms'],
+            fcu_timer_max_lag_ms=stats['fcu_timer_max_lag_ms'],
+            n_steps=stats['n_steps'],
+            elapsed_time_usec=stats['elapsed_time_usec'],
+            sensor_samples=stats['sensor_samples'],
+            csv_bytes=stats['csv_bytes'],
+            wall_time=stats['wall_time'],
+        )
+        for name, depth in stats['queue_depths'].iteritems():
+            msg.queues.add(name=name, depth=depth)
+        return msg
+
+    def _hosted_call(self, fn, request, context):
+        """ Call fn(sim_id) on the host (if given) and return the sim's status, translating errors to status codes """
+        try:
+            if fn is not None:
+                fn(request.sim_id)
+            hosted = self.host.get(request.sim_id)
+        except KeyError:
+            return self._sim_error(context, grpc.StatusCode.NOT_FOUND, "No sim with id {}".format(request.sim_id))
+        except ValueError as e:
+            return self._sim_error(context, grpc.StatusCode.FAILED_PRECONDITION, str(e))
+        return self._sim_status_message(hosted.get_status())
+
+    @staticmethod
+    def _sim_error(context, code, details):
+        context.set_code(code)
+        context.set_details(details)
+        return simulator_control_pb2.SimStatus()
+
+    @staticmethod
+    def _sim_status_message(status):
+        msg = simulator_control_pb2.SimStatus(
+            sim_id=status['sim_id'],
+            state=status['state'],
+            message=status['message'],
+            n_steps=status['n_steps'],
+            elapsed_time_usec=status['elapsed_time_usec'],
+            real_time_sec=status['real_time_sec'],
+            pusher_state=status['pusher_state'],
+        )
+        msg.pod.acceleration, msg.pod.velocity, msg.pod.position = status['pod']
+        return msg
+
+
+def serve(sim_config, working_dir, max_sims=None, grpc_port=9333):
 
     # Note: 'configfile' is a list of one or more config files. Later files overlay previous ones. 
     #sim = Sim(sim_config, '../eng-embed-sim-data/test')
 
-    servicer = SimControlServicer()
+    servicer = SimControlServicer(max_sims)
     servicer.sim_config = sim_config
     servicer.output_dir = working_dir
     servicer._init_sim()
 
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    # Note: every open stream holds a thread, so leave room for a stream per hosted sim plus the regular calls
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10 + servicer.host.max_sims))
     simulator_control_pb2_grpc.add_SimControlServicer_to_server(
         servicer, server)
-    grpc_port = 9333
 
     server.add_insecure_port("[::]:{}".format(grpc_port))
     print "Starting simulator control GRPC server on port {}".format(grpc_port)
@@ -173,6 +393,7 @@ def serve(sim_config, working_dir):
         while True:
             time.sleep(_ONE_DAY_IN_SECONDS)
     except KeyboardInterrupt:
+        servicer.host.shutdown()
         server.stop(0)
 
 
@@ -184,7 +405,7 @@ if __name__ == '__main__':
     import sys
     import logging
     import logging.config
-    import yaml
+    from hot_logging import configure_logging
     from config import *
     import pprint
     import argparse
@@ -192,8 +413,7 @@ if __name__ == '__main__':
     #from debug import stacktracer
     #stacktracer.trace_start("trace.html",interval=5,auto=True) # Set auto flag to always update file!
 
-    with open('conf/logging.conf') as f:  # @todo: make this work when run from anywhere (this works if run from top directory)
-        logging.config.dictConfig(yaml.load(f))
+    configure_logging('conf/logging.conf')
         
     test_logger = logging.getLogger("NetworkNode")
     #print(test_logger.__dict__)
@@ -201,9 +421,15 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="rPod Simulation")
     parser.add_argument('configfile', metavar='config', type=str, nargs='+', default="None",
         help='Simulation configuration file(s) -- later files overlay on previous files')
+    parser.add_argument('-p', '--port', type=int, default=9333, help='GRPC port to listen on')
+    parser.add_argument('-n', '--max-sims', type=int, default=None,
+        help='Maximum number of hosted sims to run at once (default: number of cpus). Extra sims are queued.')
+    parser.add_argument('--import-profile', action='store_true',
+        help='Print a report of where startup time went (module imports and config loading) before serving')
     args = parser.parse_args()
 
     sim_config = Sim.load_config_files(args.configfile)
+    import_profile.report()
     output_dir = "../eng-embed-sim-data/test"  # @todo: get this from command line args or something
 
-    serve(sim_config, output_dir)
\ No newline at end of file
+    serve(sim_config, output_dir, args.max_sims, args.port)
\ No newline at end of file
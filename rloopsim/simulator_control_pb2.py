@@ -1,13 +1,11 @@
+# -*- coding: utf-8 -*-
 # Generated by the protocol buffer compiler.  DO NOT EDIT!
 # source: simulator_control.proto
 
-import sys
-_b=sys.version_info[0]<3 and (lambda x:x) or (lambda x:x.encode('latin1'))
 from google.protobuf import descriptor as _descriptor
 from google.protobuf import message as _message
 from google.protobuf import reflection as _reflection
 from google.protobuf import symbol_database as _symbol_database
-from google.protobuf import descriptor_pb2
 # @@protoc_insertion_point(imports)
 
 _sym_db = _symbol_database.Default()
@@ -19,7 +17,9 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   name='simulator_control.proto',
   package='simproto',
   syntax='proto3',
-  serialized_pb=_b('\n\x17simulator_control.proto\x12\x08simproto\"\x9c\x01\n\nSimCommand\x12\x34\n\x07\x63ommand\x18\x01 \x01(\x0e\x32#.simproto.SimCommand.SimCommandEnum\"X\n\x0eSimCommandEnum\x12\x10\n\x0cRunSimulator\x10\x00\x12\x12\n\x0ePauseSimulator\x10\x01\x12\x11\n\rStopSimulator\x10\x02\x12\r\n\tStartPush\x10\x03\"\'\n\x03\x41\x63k\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"3\n\x07SimInit\x12\x14\n\x0c\x63onfig_files\x18\x01 \x03(\t\x12\x12\n\noutput_dir\x18\x02 \x01(\t2p\n\nSimControl\x12\x33\n\nControlSim\x12\x14.simproto.SimCommand\x1a\r.simproto.Ack\"\x00\x12-\n\x07InitSim\x12\x11.simproto.SimInit\x1a\r.simproto.Ack\"\x00\x62\x06proto3')
+  serialized_options=None,
+  create_key=_descriptor._internal_create_key,
+  serialized_pb=b'\n\x17simulator_control.proto\x12\x08simproto\"\x9c\x01\n\nSimCommand\x12\x34\n\x07\x63ommand\x18\x01 \x01(\x0e\x32#.simproto.SimCommand.SimCommandEnum\"X\n\x0eSimCommandEnum\x12\x10\n\x0cRunSimulator\x10\x00\x12\x12\n\x0ePauseSimulator\x10\x01\x12\x11\n\rStopSimulator\x10\x02\x12\r\n\tStartPush\x10\x03\"\'\n\x03\x41\x63k\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"F\n\x07SimInit\x12\x14\n\x0c\x63onfig_files\x18\x01 \x03(\t\x12\x12\n\noutput_dir\x18\x02 \x01(\t\x12\x11\n\tauto_push\x18\x03 \x01(\x08\"\x1c\n\nSimRequest\x12\x0e\n\x06sim_id\x18\x01 \x01(\r\"\xb7\x01\n\tSimStatus\x12\x0e\n\x06sim_id\x18\x01 \x01(\r\x12\r\n\x05state\x18\x02 \x01(\t\x12\x0f\n\x07message\x18\x03 \x01(\t\x12\x0f\n\x07n_steps\x18\x04 \x01(\x04\x12\x19\n\x11\x65lapsed_time_usec\x18\x05 \x01(\x04\x12\x15\n\rreal_time_sec\x18\x06 \x01(\x01\x12!\n\x03pod\x18\x07 \x01(\x0b\x32\x14.simproto.Kinematics\x12\x14\n\x0cpusher_state\x18\x08 \x01(\t\")\n\nQueueDepth\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\r\n\x05\x64\x65pth\x18\x02 \x01(\r\"\xe1\x02\n\x08SimStats\x12\x0e\n\x06sim_id\x18\x01 \x01(\r\x12\x11\n\tavailable\x18\x02 \x01(\x08\x12\x15\n\rsteps_per_sec\x18\x03 \x01(\x01\x12\x18\n\x10real_time_factor\x18\x04 \x01(\x01\x12\x1e\n\x16sensor_samples_per_sec\x18\x05 \x01(\x01\x12\x19\n\x11\x63sv_bytes_per_sec\x18\x06 \x01(\x01\x12\x18\n\x10\x66\x63u_timer_lag_ms\x18\x07 \x01(\x01\x12\x1c\n\x14\x66\x63u_timer_max_lag_ms\x18\x08 \x01(\x01\x12$\n\x06queues\x18\t \x03(\x0b\x32\x14.simproto.QueueDepth\x12\x0f\n\x07n_steps\x18\n \x01(\x04\x12\x19\n\x11\x65lapsed_time_usec\x18\x0b \x01(\x04\x12\x16\n\x0esensor_samples\x18\x0c \x01(\x04\x12\x11\n\tcsv_bytes\x18\r \x01(\x04\x12\x11\n\twall_time\x18\x0e \x01(\x01\"c\n\x07SimList\x12!\n\x04sims\x18\x01 \x03(\x0b\x32\x13.simproto.SimStatus\x12\x10\n\x08max_sims\x18\x02 \x01(\r\x12\x11\n\tn_running\x18\x03 \x01(\r\x12\x10\n\x08n_queued\x18\x04 \x01(\r\"+\n\nParameters\x12\r\n\x05value\x18\x01 \x03(\t\x12\x0e\n\x06sim_id\x18\x02 \x01(\r\"7\n\x10TelemetryRequest\x12\x0f\n\x07rate_hz\x18\x01 \x01(\x02\x12\x12\n\nqueue_size\x18\x02 \x01(\r\"F\n\nKinematics\x12\x14\n\x0c\x61\x63\x63\x65leration\x18\x01 \x01(\x01\x12\x10\n\x08velocity\x18\x02 \x01(\x01\x12\x10\n\x08position\x18\x03 \x01(\x01\"h\n\nBrakeState\x12\x0b\n\x03gap\x18\x01 \x01(\x01\x12\x12\n\ngap_target\x18\x02 \x01(\x01\x12\x14\n\x0cnormal_force\x18\x03 \x01(\x01\x12\x12\n\ndrag_force\x18\x04 \x01(\x01\x12\x0f\n\x07mlp_raw\x18\x05 \x01(\x01\"6\n\x05\x46orce\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\t\n\x01x\x18\x02 \x01(\x01\x12\t\n\x01y\x18\x03 \x01(\x01\x12\t\n\x01z\x18\x04 \x01(\x01\"\xa5\x02\n\tTelemetry\x12\x0f\n\x07n_steps\x18\x01 \x01(\x04\x12\x19\n\x11\x65lapsed_time_usec\x18\x02 \x01(\x04\x12!\n\x03pod\x18\x03 \x01(\x0b\x32\x14.simproto.Kinematics\x12\x11\n\the_height\x18\x04 \x01(\x01\x12$\n\x06pusher\x18\x05 \x01(\x0b\x32\x14.simproto.Kinematics\x12\x14\n\x0cpusher_state\x18\x06 \x01(\t\x12$\n\x06\x62rakes\x18\x07 \x03(\x0b\x32\x14.simproto.BrakeState\x12\x1f\n\x06\x66orces\x18\x08 \x03(\x0b\x32\x0f.simproto.Force\x12\x11\n\tfcu_state\x18\t \x01(\x05\x12\x0f\n\x07rate_hz\x18\n \x01(\x02\x12\x0f\n\x07\x64ropped\x18\x0b \x01(\r2\xeb\x05\n\nSimControl\x12\x33\n\nControlSim\x12\x14.simproto.SimCommand\x1a\r.simproto.Ack\"\x00\x12-\n\x07InitSim\x12\x11.simproto.SimInit\x1a\r.simproto.Ack\"\x00\x12\x33\n\nEditConfig\x12\x14.simproto.Parameters\x1a\r.simproto.Ack\"\x00\x12\x46\n\x0fStreamTelemetry\x12\x1a.simproto.TelemetryRequest\x1a\x13.simproto.Telemetry\"\x00\x30\x01\x12\x35\n\tCreateSim\x12\x11.simproto.SimInit\x1a\x13.simproto.SimStatus\"\x00\x12\x37\n\x08StartSim\x12\x14.simproto.SimRequest\x1a\x13.simproto.SimStatus\"\x00\x12\x36\n\x07StopSim\x12\x14.simproto.SimRequest\x1a\x13.simproto.SimStatus\"\x00\x12\x36\n\x07PushSim\x12\x14.simproto.SimRequest\x1a\x13.simproto.SimStatus\"\x00\x12\x32\n\tRemoveSim\x12\x14.simproto.SimRequest\x1a\r.simproto.Ack\"\x00\x12\x37\n\x08QuerySim\x12\x14.simproto.SimRequest\x1a\x13.simproto.SimStatus\"\x00\x12\x35\n\x08ListSims\x12\x14.simproto.SimRequest\x1a\x11.simproto.SimList\"\x00\x12@\n\x0fStreamSimStatus\x12\x14.simproto.SimRequest\x1a\x13.simproto.SimStatus\"\x00\x30\x01\x12\x36\n\x08GetStats\x12\x14.simproto.SimRequest\x1a\x12.simproto.SimStats\"\x00\x62\x06proto3'
 )
 
 
@@ -29,26 +29,31 @@ _SIMCOMMAND_SIMCOMMANDENUM = _descriptor.EnumDescriptor(
   full_name='simproto.SimCommand.SimCommandEnum',
   filename=None,
   file=DESCRIPTOR,
+  create_key=_descriptor._internal_create_key,
   values=[
     _descriptor.EnumValueDescriptor(
       name='RunSimulator', index=0, number=0,
-      options=None,
-      type=None),
+      serialized_options=None,
+      type=None,
+      create_key=_descriptor._internal_create_key),
     _descriptor.EnumValueDescriptor(
       name='PauseSimulator', index=1, number=1,
-      options=None,
-      type=None),
+      serialized_options=None,
+      type=None,
+      create_key=_descriptor._internal_create_key),
     _descriptor.EnumValueDescriptor(
       name='StopSimulator', index=2, number=2,
-      options=None,
-      type=None),
+      serialized_options=None,
+      type=None,
+      create_key=_descriptor._internal_create_key),
     _descriptor.EnumValueDescriptor(
       name='StartPush', index=3, number=3,
-      options=None,
-      type=None),
+      serialized_options=None,
+      type=None,
+      create_key=_descriptor._internal_create_key),
   ],
   containing_type=None,
-  options=None,
+  serialized_options=None,
   serialized_start=106,
   serialized_end=194,
 )
@@ -61,6 +66,7 @@ _SIMCOMMAND = _descriptor.Descriptor(
   filename=None,
   file=DESCRIPTOR,
   containing_type=None,
+  create_key=_descriptor._internal_create_key,
   fields=[
     _descriptor.FieldDescriptor(
       name='command', full_name='simproto.SimCommand.command', index=0,
@@ -68,7 +74,7 @@ _SIMCOMMAND = _descriptor.Descriptor(
       has_default_value=False, default_value=0,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
   ],
   extensions=[
   ],
@@ -76,7 +82,7 @@ _SIMCOMMAND = _descriptor.Descriptor(
   enum_types=[
     _SIMCOMMAND_SIMCOMMANDENUM,
   ],
-  options=None,
+  serialized_options=None,
   is_extendable=False,
   syntax='proto3',
   extension_ranges=[],
@@ -93,6 +99,7 @@ _ACK = _descriptor.Descriptor(
   filename=None,
   file=DESCRIPTOR,
   containing_type=None,
+  create_key=_descriptor._internal_create_key,
   fields=[
     _descriptor.FieldDescriptor(
       name='success', full_name='simproto.Ack.success', index=0,
@@ -100,21 +107,21 @@ _ACK = _descriptor.Descriptor(
       has_default_value=False, default_value=False,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
     _descriptor.FieldDescriptor(
       name='message', full_name='simproto.Ack.message', index=1,
       number=2, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=_b("").decode('utf-8'),
+      has_default_value=False, default_value=b"".decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
   ],
   extensions=[
   ],
   nested_types=[],
   enum_types=[
   ],
-  options=None,
+  serialized_options=None,
   is_extendable=False,
   syntax='proto3',
   extension_ranges=[],
@@ -131,6 +138,7 @@ _SIMINIT = _descriptor.Descriptor(
   filename=None,
   file=DESCRIPTOR,
   containing_type=None,
+  create_key=_descriptor._internal_create_key,
   fields=[
     _descriptor.FieldDescriptor(
       name='config_files', full_name='simproto.SimInit.config_files', index=0,
@@ -138,58 +146,827 @@ _SIMINIT = _descriptor.Descriptor(
       has_default_value=False, default_value=[],
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
     _descriptor.FieldDescriptor(
       name='output_dir', full_name='simproto.SimInit.output_dir', index=1,
       number=2, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=_b("").decode('utf-8'),
+      has_default_value=False, default_value=b"".decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
-      options=None, file=DESCRIPTOR),
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='auto_push', full_name='simproto.SimInit.auto_push', index=2,
+      number=3, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
   ],
   extensions=[
   ],
   nested_types=[],
   enum_types=[
   ],
-  options=None,
+  serialized_options=None,
   is_extendable=False,
   syntax='proto3',
   extension_ranges=[],
   oneofs=[
   ],
   serialized_start=237,
-  serialized_end=288,
+  serialized_end=307,
+)
+
+
+_SIMREQUEST = _descriptor.Descriptor(
+  name='SimRequest',
+  full_name='simproto.SimRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='sim_id', full_name='simproto.SimRequest.sim_id', index=0,
+      number=1, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=309,
+  serialized_end=337,
+)
+
+
+_SIMSTATUS = _descriptor.Descriptor(
+  name='SimStatus',
+  full_name='simproto.SimStatus',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='sim_id', full_name='simproto.SimStatus.sim_id', index=0,
+      number=1, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='state', full_name='simproto.SimStatus.state', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='message', full_name='simproto.SimStatus.message', index=2,
+      number=3, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='n_steps', full_name='simproto.SimStatus.n_steps', index=3,
+      number=4, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='elapsed_time_usec', full_name='simproto.SimStatus.elapsed_time_usec', index=4,
+      number=5, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='real_time_sec', full_name='simproto.SimStatus.real_time_sec', index=5,
+      number=6, type=1, cpp_type=5, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='pod', full_name='simproto.SimStatus.pod', index=6,
+      number=7, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='pusher_state', full_name='simproto.SimStatus.pusher_state', index=7,
+      number=8, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=340,
+  serialized_end=523,
+)
+
+
+_QUEUEDEPTH = _descriptor.Descriptor(
+  name='QueueDepth',
+  full_name='simproto.QueueDepth',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='name', full_name='simproto.QueueDepth.name', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='depth', full_name='simproto.QueueDepth.depth', index=1,
+      number=2, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=525,
+  serialized_end=566,
+)
+
+
+_SIMSTATS = _descriptor.Descriptor(
+  name='SimStats',
+  full_name='simproto.SimStats',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='sim_id', full_name='simproto.SimStats.sim_id', index=0,
+      number=1, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='available', full_name='simproto.SimStats.available', index=1,
+      number=2, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='steps_per_sec', full_name='simproto.SimStats.steps_per_sec', index=2,
+      number=3, type=1, cpp_type=5, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='real_time_factor', full_name='simproto.SimStats.real_time_factor', index=3,
+      number=4, type=1, cpp_type=5, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='sensor_samples_per_sec', full_name='simproto.SimStats.sensor_samples_per_sec', index=4,
+      number=5, type=1, cpp_type=5, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='csv_bytes_per_sec', full_name='simproto.SimStats.csv_bytes_per_sec', index=5,
+      number=6, type=1, cpp_type=5, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='fcu_timer_lag_ms', full_name='simproto.SimStats.fcu_timer_lag_ms', index=6,
+      number=7, type=1, cpp_type=5, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='fcu_timer_max_lag_ms', full_name='simproto.SimStats.fcu_timer_max_lag_ms', index=7,
+      number=8, type=1, cpp_type=5, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='queues', full_name='simproto.SimStats.queues', index=8,
+      number=9, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='n_steps', full_name='simproto.SimStats.n_steps', index=9,
+      number=10, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='elapsed_time_usec', full_name='simproto.SimStats.elapsed_time_usec', index=10,
+      number=11, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='sensor_samples', full_name='simproto.SimStats.sensor_samples', index=11,
+      number=12, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='csv_bytes', full_name='simproto.SimStats.csv_bytes', index=12,
+      number=13, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='wall_time', full_name='simproto.SimStats.wall_time', index=13,
+      number=14, type=1, cpp_type=5, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=569,
+  serialized_end=922,
+)
+
+
+_SIMLIST = _descriptor.Descriptor(
+  name='SimList',
+  full_name='simproto.SimList',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='sims', full_name='simproto.SimList.sims', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='max_sims', full_name='simproto.SimList.max_sims', index=1,
+      number=2, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='n_running', full_name='simproto.SimList.n_running', index=2,
+      number=3, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='n_queued', full_name='simproto.SimList.n_queued', index=3,
+      number=4, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=924,
+  serialized_end=1023,
+)
+
+
+_PARAMETERS = _descriptor.Descriptor(
+  name='Parameters',
+  full_name='simproto.Parameters',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='value', full_name='simproto.Parameters.value', index=0,
+      number=1, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='sim_id', full_name='simproto.Parameters.sim_id', index=1,
+      number=2, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1025,
+  serialized_end=1068,
+)
+
+
+_TELEMETRYREQUEST = _descriptor.Descriptor(
+  name='TelemetryRequest',
+  full_name='simproto.TelemetryRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='rate_hz', full_name='simproto.TelemetryRequest.rate_hz', index=0,
+      number=1, type=2, cpp_type=6, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='queue_size', full_name='simproto.TelemetryRequest.queue_size', index=1,
+      number=2, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1070,
+  serialized_end=1125,
+)
+
+
+_KINEMATICS = _descriptor.Descriptor(
+  name='Kinematics',
+  full_name='simproto.Kinematics',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='acceleration', full_name='simproto.Kinematics.acceleration', index=0,
+      number=1, type=1, cpp_type=5, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='velocity', full_name='simproto.Kinematics.velocity', index=1,
+      number=2, type=1, cpp_type=5, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='position', full_name='simproto.Kinematics.position', index=2,
+      number=3, type=1, cpp_type=5, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1127,
+  serialized_end=1197,
+)
+
+
+_BRAKESTATE = _descriptor.Descriptor(
+  name='BrakeState',
+  full_name='simproto.BrakeState',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='gap', full_name='simproto.BrakeState.gap', index=0,
+      number=1, type=1, cpp_type=5, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='gap_target', full_name='simproto.BrakeState.gap_target', index=1,
+      number=2, type=1, cpp_type=5, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='normal_force', full_name='simproto.BrakeState.normal_force', index=2,
+      number=3, type=1, cpp_type=5, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='drag_force', full_name='simproto.BrakeState.drag_force', index=3,
+      number=4, type=1, cpp_type=5, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='mlp_raw', full_name='simproto.BrakeState.mlp_raw', index=4,
+      number=5, type=1, cpp_type=5, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1199,
+  serialized_end=1303,
+)
+
+
+_FORCE = _descriptor.Descriptor(
+  name='Force',
+  full_name='simproto.Force',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='name', full_name='simproto.Force.name', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='x', full_name='simproto.Force.x', index=1,
+      number=2, type=1, cpp_type=5, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='y', full_name='simproto.Force.y', index=2,
+      number=3, type=1, cpp_type=5, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='z', full_name='simproto.Force.z', index=3,
+      number=4, type=1, cpp_type=5, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1305,
+  serialized_end=1359,
+)
+
+
+_TELEMETRY = _descriptor.Descriptor(
+  name='Telemetry',
+  full_name='simproto.Telemetry',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='n_steps', full_name='simproto.Telemetry.n_steps', index=0,
+      number=1, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='elapsed_time_usec', full_name='simproto.Telemetry.elapsed_time_usec', index=1,
+      number=2, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='pod', full_name='simproto.Telemetry.pod', index=2,
+      number=3, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='he_height', full_name='simproto.Telemetry.he_height', index=3,
+      number=4, type=1, cpp_type=5, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='pusher', full_name='simproto.Telemetry.pusher', index=4,
+      number=5, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='pusher_state', full_name='simproto.Telemetry.pusher_state', index=5,
+      number=6, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='brakes', full_name='simproto.Telemetry.brakes', index=6,
+      number=7, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='forces', full_name='simproto.Telemetry.forces', index=7,
+      number=8, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='fcu_state', full_name='simproto.Telemetry.fcu_state', index=8,
+      number=9, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='rate_hz', full_name='simproto.Telemetry.rate_hz', index=9,
+      number=10, type=2, cpp_type=6, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='dropped', full_name='simproto.Telemetry.dropped', index=10,
+      number=11, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1362,
+  serialized_end=1655,
 )
 
 _SIMCOMMAND.fields_by_name['command'].enum_type = _SIMCOMMAND_SIMCOMMANDENUM
 _SIMCOMMAND_SIMCOMMANDENUM.containing_type = _SIMCOMMAND
+_SIMSTATUS.fields_by_name['pod'].message_type = _KINEMATICS
+_SIMSTATS.fields_by_name['queues'].message_type = _QUEUEDEPTH
+_SIMLIST.fields_by_name['sims'].message_type = _SIMSTATUS
+_TELEMETRY.fields_by_name['pod'].message_type = _KINEMATICS
+_TELEMETRY.fields_by_name['pusher'].message_type = _KINEMATICS
+_TELEMETRY.fields_by_name['brakes'].message_type = _BRAKESTATE
+_TELEMETRY.fields_by_name['forces'].message_type = _FORCE
 DESCRIPTOR.message_types_by_name['SimCommand'] = _SIMCOMMAND
 DESCRIPTOR.message_types_by_name['Ack'] = _ACK
 DESCRIPTOR.message_types_by_name['SimInit'] = _SIMINIT
+DESCRIPTOR.message_types_by_name['SimRequest'] = _SIMREQUEST
+DESCRIPTOR.message_types_by_name['SimStatus'] = _SIMSTATUS
+DESCRIPTOR.message_types_by_name['QueueDepth'] = _QUEUEDEPTH
+DESCRIPTOR.message_types_by_name['SimStats'] = _SIMSTATS
+DESCRIPTOR.message_types_by_name['SimList'] = _SIMLIST
+DESCRIPTOR.message_types_by_name['Parameters'] = _PARAMETERS
+DESCRIPTOR.message_types_by_name['TelemetryRequest'] = _TELEMETRYREQUEST
+DESCRIPTOR.message_types_by_name['Kinematics'] = _KINEMATICS
+DESCRIPTOR.message_types_by_name['BrakeState'] = _BRAKESTATE
+DESCRIPTOR.message_types_by_name['Force'] = _FORCE
+DESCRIPTOR.message_types_by_name['Telemetry'] = _TELEMETRY
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
 
-SimCommand = _reflection.GeneratedProtocolMessageType('SimCommand', (_message.Message,), dict(
-  DESCRIPTOR = _SIMCOMMAND,
-  __module__ = 'simulator_control_pb2'
+SimCommand = _reflection.GeneratedProtocolMessageType('SimCommand', (_message.Message,), {
+  'DESCRIPTOR' : _SIMCOMMAND,
+  '__module__' : 'simulator_control_pb2'
   # @@protoc_insertion_point(class_scope:simproto.SimCommand)
-  ))
+  })
 _sym_db.RegisterMessage(SimCommand)
 
-Ack = _reflection.GeneratedProtocolMessageType('Ack', (_message.Message,), dict(
-  DESCRIPTOR = _ACK,
-  __module__ = 'simulator_control_pb2'
+Ack = _reflection.GeneratedProtocolMessageType('Ack', (_message.Message,), {
+  'DESCRIPTOR' : _ACK,
+  '__module__' : 'simulator_control_pb2'
   # @@protoc_insertion_point(class_scope:simproto.Ack)
-  ))
+  })
 _sym_db.RegisterMessage(Ack)
 
-SimInit = _reflection.GeneratedProtocolMessageType('SimInit', (_message.Message,), dict(
-  DESCRIPTOR = _SIMINIT,
-  __module__ = 'simulator_control_pb2'
+SimInit = _reflection.GeneratedProtocolMessageType('SimInit', (_message.Message,), {
+  'DESCRIPTOR' : _SIMINIT,
+  '__module__' : 'simulator_control_pb2'
   # @@protoc_insertion_point(class_scope:simproto.SimInit)
-  ))
+  })
 _sym_db.RegisterMessage(SimInit)
 
+SimRequest = _reflection.GeneratedProtocolMessageType('SimRequest', (_message.Message,), {
+  'DESCRIPTOR' : _SIMREQUEST,
+  '__module__' : 'simulator_control_pb2'
+  # @@protoc_insertion_point(class_scope:simproto.SimRequest)
+  })
+_sym_db.RegisterMessage(SimRequest)
+
+SimStatus = _reflection.GeneratedProtocolMessageType('SimStatus', (_message.Message,), {
+  'DESCRIPTOR' : _SIMSTATUS,
+  '__module__' : 'simulator_control_pb2'
+  # @@protoc_insertion_point(class_scope:simproto.SimStatus)
+  })
+_sym_db.RegisterMessage(SimStatus)
+
+QueueDepth = _reflection.GeneratedProtocolMessageType('QueueDepth', (_message.Message,), {
+  'DESCRIPTOR' : _QUEUEDEPTH,
+  '__module__' : 'simulator_control_pb2'
+  # @@protoc_insertion_point(class_scope:simproto.QueueDepth)
+  })
+_sym_db.RegisterMessage(QueueDepth)
+
+SimStats = _reflection.GeneratedProtocolMessageType('SimStats', (_message.Message,), {
+  'DESCRIPTOR' : _SIMSTATS,
+  '__module__' : 'simulator_control_pb2'
+  # @@protoc_insertion_point(class_scope:simproto.SimStats)
+  })
+_sym_db.RegisterMessage(SimStats)
+
+SimList = _reflection.GeneratedProtocolMessageType('SimList', (_message.Message,), {
+  'DESCRIPTOR' : _SIMLIST,
+  '__module__' : 'simulator_control_pb2'
+  # @@protoc_insertion_point(class_scope:simproto.SimList)
+  })
+_sym_db.RegisterMessage(SimList)
+
+Parameters = _reflection.GeneratedProtocolMessageType('Parameters', (_message.Message,), {
+  'DESCRIPTOR' : _PARAMETERS,
+  '__module__' : 'simulator_control_pb2'
+  # @@protoc_insertion_point(class_scope:simproto.Parameters)
+  })
+_sym_db.RegisterMessage(Parameters)
+
+TelemetryRequest = _reflection.GeneratedProtocolMessageType('TelemetryRequest', (_message.Message,), {
+  'DESCRIPTOR' : _TELEMETRYREQUEST,
+  '__module__' : 'simulator_control_pb2'
+  # @@protoc_insertion_point(class_scope:simproto.TelemetryRequest)
+  })
+_sym_db.RegisterMessage(TelemetryRequest)
+
+Kinematics = _reflection.GeneratedProtocolMessageType('Kinematics', (_message.Message,), {
+  'DESCRIPTOR' : _KINEMATICS,
+  '__module__' : 'simulator_control_pb2'
+  # @@protoc_insertion_point(class_scope:simproto.Kinematics)
+  })
+_sym_db.RegisterMessage(Kinematics)
+
+BrakeState = _reflection.GeneratedProtocolMessageType('BrakeState', (_message.Message,), {
+  'DESCRIPTOR' : _BRAKESTATE,
+  '__module__' : 'simulator_control_pb2'
+  # @@protoc_insertion_point(class_scope:simproto.BrakeState)
+  })
+_sym_db.RegisterMessage(BrakeState)
+
+Force = _reflection.GeneratedProtocolMessageType('Force', (_message.Message,), {
+  'DESCRIPTOR' : _FORCE,
+  '__module__' : 'simulator_control_pb2'
+  # @@protoc_insertion_point(class_scope:simproto.Force)
+  })
+_sym_db.RegisterMessage(Force)
+
+Telemetry = _reflection.GeneratedProtocolMessageType('Telemetry', (_message.Message,), {
+  'DESCRIPTOR' : _TELEMETRY,
+  '__module__' : 'simulator_control_pb2'
+  # @@protoc_insertion_point(class_scope:simproto.Telemetry)
+  })
+_sym_db.RegisterMessage(Telemetry)
+
 
 
 _SIMCONTROL = _descriptor.ServiceDescriptor(
@@ -197,9 +974,10 @@ _SIMCONTROL = _descriptor.ServiceDescriptor(
   full_name='simproto.SimControl',
   file=DESCRIPTOR,
   index=0,
-  options=None,
-  serialized_start=290,
-  serialized_end=402,
+  serialized_options=None,
+  create_key=_descriptor._internal_create_key,
+  serialized_start=1658,
+  serialized_end=2405,
   methods=[
   _descriptor.MethodDescriptor(
     name='ControlSim',
@@ -208,7 +986,8 @@ _SIMCONTROL = _descriptor.ServiceDescriptor(
     containing_service=None,
     input_type=_SIMCOMMAND,
     output_type=_ACK,
-    options=None,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
   ),
   _descriptor.MethodDescriptor(
     name='InitSim',
@@ -217,7 +996,118 @@ _SIMCONTROL = _descriptor.ServiceDescriptor(
     containing_service=None,
     input_type=_SIMINIT,
     output_type=_ACK,
-    options=None,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
+  _descriptor.MethodDescriptor(
+    name='EditConfig',
+    full_name='simproto.SimControl.EditConfig',
+    index=2,
+    containing_service=None,
+    input_type=_PARAMETERS,
+    output_type=_ACK,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
+  _descriptor.MethodDescriptor(
+    name='StreamTelemetry',
+    full_name='simproto.SimControl.StreamTelemetry',
+    index=3,
+    containing_service=None,
+    input_type=_TELEMETRYREQUEST,
+    output_type=_TELEMETRY,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
+  _descriptor.MethodDescriptor(
+    name='CreateSim',
+    full_name='simproto.SimControl.CreateSim',
+    index=4,
+    containing_service=None,
+    input_type=_SIMINIT,
+    output_type=_SIMSTATUS,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
+  _descriptor.MethodDescriptor(
+    name='StartSim',
+    full_name='simproto.SimControl.StartSim',
+    index=5,
+    containing_service=None,
+    input_type=_SIMREQUEST,
+    output_type=_SIMSTATUS,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
+  _descriptor.MethodDescriptor(
+    name='StopSim',
+    full_name='simproto.SimControl.StopSim',
+    index=6,
+    containing_service=None,
+    input_type=_SIMREQUEST,
+    output_type=_SIMSTATUS,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
+  _descriptor.MethodDescriptor(
+    name='PushSim',
+    full_name='simproto.SimControl.PushSim',
+    index=7,
+    containing_service=None,
+    input_type=_SIMREQUEST,
+    output_type=_SIMSTATUS,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
+  _descriptor.MethodDescriptor(
+    name='RemoveSim',
+    full_name='simproto.SimControl.RemoveSim',
+    index=8,
+    containing_service=None,
+    input_type=_SIMREQUEST,
+    output_type=_ACK,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
+  _descriptor.MethodDescriptor(
+    name='QuerySim',
+    full_name='simproto.SimControl.QuerySim',
+    index=9,
+    containing_service=None,
+    input_type=_SIMREQUEST,
+    output_type=_SIMSTATUS,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
+  _descriptor.MethodDescriptor(
+    name='ListSims',
+    full_name='simproto.SimControl.ListSims',
+    index=10,
+    containing_service=None,
+    input_type=_SIMREQUEST,
+    output_type=_SIMLIST,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
+  _descriptor.MethodDescriptor(
+    name='StreamSimStatus',
+    full_name='simproto.SimControl.StreamSimStatus',
+    index=11,
+    containing_service=None,
+    input_type=_SIMREQUEST,
+    output_type=_SIMSTATUS,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
+  _descriptor.MethodDescriptor(
+    name='GetStats',
+    full_name='simproto.SimControl.GetStats',
+    index=12,
+    containing_service=None,
+    input_type=_SIMREQUEST,
+    output_type=_SIMSTATS,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
   ),
 ])
 _sym_db.RegisterServiceDescriptor(_SIMCONTROL)
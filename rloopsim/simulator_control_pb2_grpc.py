@@ -1,63 +1,451 @@
 # Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
 import grpc
 
 import simulator_control_pb2 as simulator__control__pb2
 
 
 class SimControlStub(object):
-  # missing associated documentation comment in .proto file
-  pass
-
-  def __init__(self, channel):
-    """Constructor.
-
-    Args:
-      channel: A grpc.Channel.
-    """
-    self.ControlSim = channel.unary_unary(
-        '/simproto.SimControl/ControlSim',
-        request_serializer=simulator__control__pb2.SimCommand.SerializeToString,
-        response_deserializer=simulator__control__pb2.Ack.FromString,
-        )
-    self.InitSim = channel.unary_unary(
-        '/simproto.SimControl/InitSim',
-        request_serializer=simulator__control__pb2.SimInit.SerializeToString,
-        response_deserializer=simulator__control__pb2.Ack.FromString,
-        )
+    """Missing associated documentation comment in .proto file."""
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.ControlSim = channel.unary_unary(
+                '/simproto.SimControl/ControlSim',
+                request_serializer=simulator__control__pb2.SimCommand.SerializeToString,
+                response_deserializer=simulator__control__pb2.Ack.FromString,
+                )
+        self.InitSim = channel.unary_unary(
+                '/simproto.SimControl/InitSim',
+                request_serializer=simulator__control__pb2.SimInit.SerializeToString,
+                response_deserializer=simulator__control__pb2.Ack.FromString,
+                )
+        self.EditConfig = channel.unary_unary(
+                '/simproto.SimControl/EditConfig',
+                request_serializer=simulator__control__pb2.Parameters.SerializeToString,
+                response_deserializer=simulator__control__pb2.Ack.FromString,
+                )
+        self.StreamTelemetry = channel.unary_stream(
+                '/simproto.SimControl/StreamTelemetry',
+                request_serializer=simulator__control__pb2.TelemetryRequest.SerializeToString,
+                response_deserializer=simulator__control__pb2.Telemetry.FromString,
+                )
+        self.CreateSim = channel.unary_unary(
+                '/simproto.SimControl/CreateSim',
+                request_serializer=simulator__control__pb2.SimInit.SerializeToString,
+                response_deserializer=simulator__control__pb2.SimStatus.FromString,
+                )
+        self.StartSim = channel.unary_unary(
+                '/simproto.SimControl/StartSim',
+                request_serializer=simulator__control__pb2.SimRequest.SerializeToString,
+                response_deserializer=simulator__control__pb2.SimStatus.FromString,
+                )
+        self.StopSim = channel.unary_unary(
+                '/simproto.SimControl/StopSim',
+                request_serializer=simulator__control__pb2.SimRequest.SerializeToString,
+                response_deserializer=simulator__control__pb2.SimStatus.FromString,
+                )
+        self.PushSim = channel.unary_unary(
+                '/simproto.SimControl/PushSim',
+                request_serializer=simulator__control__pb2.SimRequest.SerializeToString,
+                response_deserializer=simulator__control__pb2.SimStatus.FromString,
+                )
+        self.RemoveSim = channel.unary_unary(
+                '/simproto.SimControl/RemoveSim',
+                request_serializer=simulator__control__pb2.SimRequest.SerializeToString,
+                response_deserializer=simulator__control__pb2.Ack.FromString,
+                )
+        self.QuerySim = channel.unary_unary(
+                '/simproto.SimControl/QuerySim',
+                request_serializer=simulator__control__pb2.SimRequest.SerializeToString,
+                response_deserializer=simulator__control__pb2.SimStatus.FromString,
+                )
+        self.ListSims = channel.unary_unary(
+                '/simproto.SimControl/ListSims',
+                request_serializer=simulator__control__pb2.SimRequest.SerializeToString,
+                response_deserializer=simulator__control__pb2.SimList.FromString,
+                )
+        self.StreamSimStatus = channel.unary_stream(
+                '/simproto.SimControl/StreamSimStatus',
+                request_serializer=simulator__control__pb2.SimRequest.SerializeToString,
+                response_deserializer=simulator__control__pb2.SimStatus.FromString,
+                )
+        self.GetStats = channel.unary_unary(
+                '/simproto.SimControl/GetStats',
+                request_serializer=simulator__control__pb2.SimRequest.SerializeToString,
+                response_deserializer=simulator__control__pb2.SimStats.FromString,
+                )
 
 
 class SimControlServicer(object):
-  # missing associated documentation comment in .proto file
-  pass
+    """Missing associated documentation comment in .proto file."""
+
+    def ControlSim(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def InitSim(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def EditConfig(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamTelemetry(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def CreateSim(self, request, context):
+        """Hosted sims (many concurrent sims, each in its own worker process)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
 
-  def ControlSim(self, request, context):
-    # missing associated documentation comment in .proto file
-    pass
-    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
-    context.set_details('Method not implemented!')
-    raise NotImplementedError('Method not implemented!')
+    def StartSim(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
 
-  def InitSim(self, request, context):
-    # missing associated documentation comment in .proto file
-    pass
-    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
-    context.set_details('Method not implemented!')
-    raise NotImplementedError('Method not implemented!')
+    def StopSim(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def PushSim(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def RemoveSim(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def QuerySim(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ListSims(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamSimStatus(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetStats(self, request, context):
+        """Throughput metrics for the server's own sim (sim_id 0) or a hosted sim
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
 
 
 def add_SimControlServicer_to_server(servicer, server):
-  rpc_method_handlers = {
-      'ControlSim': grpc.unary_unary_rpc_method_handler(
-          servicer.ControlSim,
-          request_deserializer=simulator__control__pb2.SimCommand.FromString,
-          response_serializer=simulator__control__pb2.Ack.SerializeToString,
-      ),
-      'InitSim': grpc.unary_unary_rpc_method_handler(
-          servicer.InitSim,
-          request_deserializer=simulator__control__pb2.SimInit.FromString,
-          response_serializer=simulator__control__pb2.Ack.SerializeToString,
-      ),
-  }
-  generic_handler = grpc.method_handlers_generic_handler(
-      'simproto.SimControl', rpc_method_handlers)
-  server.add_generic_rpc_handlers((generic_handler,))
+    rpc_method_handlers = {
+            'ControlSim': grpc.unary_unary_rpc_method_handler(
+                    servicer.ControlSim,
+                    request_deserializer=simulator__control__pb2.SimCommand.FromString,
+                    response_serializer=simulator__control__pb2.Ack.SerializeToString,
+            ),
+            'InitSim': grpc.unary_unary_rpc_method_handler(
+                    servicer.InitSim,
+                    request_deserializer=simulator__control__pb2.SimInit.FromString,
+                    response_serializer=simulator__control__pb2.Ack.SerializeToString,
+            ),
+            'EditConfig': grpc.unary_unary_rpc_method_handler(
+                    servicer.EditConfig,
+                    request_deserializer=simulator__control__pb2.Parameters.FromString,
+                    response_serializer=simulator__control__pb2.Ack.SerializeToString,
+            ),
+            'StreamTelemetry': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamTelemetry,
+                    request_deserializer=simulator__control__pb2.TelemetryRequest.FromString,
+                    response_serializer=simulator__control__pb2.Telemetry.SerializeToString,
+            ),
+            'CreateSim': grpc.unary_unary_rpc_method_handler(
+                    servicer.CreateSim,
+                    request_deserializer=simulator__control__pb2.SimInit.FromString,
+                    response_serializer=simulator__control__pb2.SimStatus.SerializeToString,
+            ),
+            'StartSim': grpc.unary_unary_rpc_method_handler(
+                    servicer.StartSim,
+                    request_deserializer=simulator__control__pb2.SimRequest.FromString,
+                    response_serializer=simulator__control__pb2.SimStatus.SerializeToString,
+            ),
+            'StopSim': grpc.unary_unary_rpc_method_handler(
+                    servicer.StopSim,
+                    request_deserializer=simulator__control__pb2.SimRequest.FromString,
+                    response_serializer=simulator__control__pb2.SimStatus.SerializeToString,
+            ),
+            'PushSim': grpc.unary_unary_rpc_method_handler(
+                    servicer.PushSim,
+                    request_deserializer=simulator__control__pb2.SimRequest.FromString,
+                    response_serializer=simulator__control__pb2.SimStatus.SerializeToString,
+            ),
+            'RemoveSim': grpc.unary_unary_rpc_method_handler(
+                    servicer.RemoveSim,
+                    request_deserializer=simulator__control__pb2.SimRequest.FromString,
+                    response_serializer=simulator__control__pb2.Ack.SerializeToString,
+            ),
+            'QuerySim': grpc.unary_unary_rpc_method_handler(
+                    servicer.QuerySim,
+                    request_deserializer=simulator__control__pb2.SimRequest.FromString,
+                    response_serializer=simulator__control__pb2.SimStatus.SerializeToString,
+            ),
+            'ListSims': grpc.unary_unary_rpc_method_handler(
+                    servicer.ListSims,
+                    request_deserializer=simulator__control__pb2.SimRequest.FromString,
+                    response_serializer=simulator__control__pb2.SimList.SerializeToString,
+            ),
+            'StreamSimStatus': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamSimStatus,
+                    request_deserializer=simulator__control__pb2.SimRequest.FromString,
+                    response_serializer=simulator__control__pb2.SimStatus.SerializeToString,
+            ),
+            'GetStats': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetStats,
+                    request_deserializer=simulator__control__pb2.SimRequest.FromString,
+                    response_serializer=simulator__control__pb2.SimStats.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'simproto.SimControl', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+
+
+ # This class is part of an EXPERIMENTAL API.
+class SimControl(object):
+    """Missing associated documentation comment in .proto file."""
+
+    @staticmethod
+    def ControlSim(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/simproto.SimControl/ControlSim',
+            simulator__control__pb2.SimCommand.SerializeToString,
+            simulator__control__pb2.Ack.FromString,
+            options, channel_credentials,
+            call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def InitSim(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/simproto.SimControl/InitSim',
+            simulator__control__pb2.SimInit.SerializeToString,
+            simulator__control__pb2.Ack.FromString,
+            options, channel_credentials,
+            call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def EditConfig(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/simproto.SimControl/EditConfig',
+            simulator__control__pb2.Parameters.SerializeToString,
+            simulator__control__pb2.Ack.FromString,
+            options, channel_credentials,
+            call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def StreamTelemetry(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/simproto.SimControl/StreamTelemetry',
+            simulator__control__pb2.TelemetryRequest.SerializeToString,
+            simulator__control__pb2.Telemetry.FromString,
+            options, channel_credentials,
+            call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def CreateSim(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/simproto.SimControl/CreateSim',
+            simulator__control__pb2.SimInit.SerializeToString,
+            simulator__control__pb2.SimStatus.FromString,
+            options, channel_credentials,
+            call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def StartSim(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/simproto.SimControl/StartSim',
+            simulator__control__pb2.SimRequest.SerializeToString,
+            simulator__control__pb2.SimStatus.FromString,
+            options, channel_credentials,
+            call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def StopSim(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/simproto.SimControl/StopSim',
+            simulator__control__pb2.SimRequest.SerializeToString,
+            simulator__control__pb2.SimStatus.FromString,
+            options, channel_credentials,
+            call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def PushSim(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/simproto.SimControl/PushSim',
+            simulator__control__pb2.SimRequest.SerializeToString,
+            simulator__control__pb2.SimStatus.FromString,
+            options, channel_credentials,
+            call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def RemoveSim(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/simproto.SimControl/RemoveSim',
+            simulator__control__pb2.SimRequest.SerializeToString,
+            simulator__control__pb2.Ack.FromString,
+            options, channel_credentials,
+            call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def QuerySim(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/simproto.SimControl/QuerySim',
+            simulator__control__pb2.SimRequest.SerializeToString,
+            simulator__control__pb2.SimStatus.FromString,
+            options, channel_credentials,
+            call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def ListSims(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/simproto.SimControl/ListSims',
+            simulator__control__pb2.SimRequest.SerializeToString,
+            simulator__control__pb2.SimList.FromString,
+            options, channel_credentials,
+            call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def StreamSimStatus(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/simproto.SimControl/StreamSimStatus',
+            simulator__control__pb2.SimRequest.SerializeToString,
+            simulator__control__pb2.SimStatus.FromString,
+            options, channel_credentials,
+            call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def GetStats(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/simproto.SimControl/GetStats',
+            simulator__control__pb2.SimRequest.SerializeToString,
+            simulator__control__pb2.SimStats.FromString,
+            options, channel_credentials,
+            call_credentials, compression, wait_for_ready, timeout, metadata)
@@ -36,6 +36,33 @@ def start_push(stub):
     result = stub.ControlSim(simulator_control_pb2.SimCommand(command=PUSHER_CTRL_PUSH))
     print("Start Push result: {}".format(result))
 
+def edit_config(stub, edits, sim_id=0):
+    result = stub.EditConfig(simulator_control_pb2.Parameters(value=edits, sim_id=sim_id))
+    print("Edit config result: {}".format(result))
+
+def stream_telemetry(stub, rate_hz=10, n_messages=20):
+    request = simulator_control_pb2.TelemetryRequest(rate_hz=rate_hz)
+    for i, msg in enumerate(stub.StreamTelemetry(request)):
+        print("t={} usec  pod v={:.3f} m/s p={:.3f} m  pusher {}  fcu state {}  dropped {}".format(
+            msg.elapsed_time_usec, msg.pod.velocity, msg.pod.position, msg.pusher_state, msg.fcu_state, msg.dropped))
+        if i + 1 >= n_messages:
+            break
+
+def run_batch(stub, config_files, n_sims=4):
+    """ Run a batch of hosted sims and wait for them all to finish """
+    sim_ids = []
+    for i in range(n_sims):
+        init = simulator_control_pb2.SimInit(config_files=config_files, output_dir="../eng-embed-sim-data/batch/{}".format(i), auto_push=True)
+        status = stub.CreateSim(init)
+        stub.StartSim(simulator_control_pb2.SimRequest(sim_id=status.sim_id))
+        sim_ids.append(status.sim_id)
+    print("Sims list: {}".format(stub.ListSims(simulator_control_pb2.SimRequest())))
+
+    for sim_id in sim_ids:
+        for status in stub.StreamSimStatus(simulator_control_pb2.SimRequest(sim_id=sim_id)):
+            print("Sim {}: {} {} steps, pod v={:.3f} m/s p={:.3f} m {}".format(
+                status.sim_id, status.state, status.n_steps, status.pod.velocity, status.pod.position, status.message))
+
 def run():
     print("Starting test client")
     channel = grpc.insecure_channel('localhost:9333')
@@ -49,7 +76,12 @@ def run():
 
     print("-------------- Start Push --------------")
     start_push(stub)
-    time.sleep(5)
+    print("-------------- Edit Config --------------")
+    edit_config(stub, ['pod.forces.aero.drag_coefficient=1.3', 'pod.brakes.0.gap.gap_close_min_time=2s'])
+    edit_config(stub, ['pod.mass=300 kg'])  # Not live-editable -- should fail
+    print("-------------- Stream Telemetry --------------")
+    stream_telemetry(stub)
+    time.sleep(2)
     print("-------------- Pause --------------")
     pause(stub)
     time.sleep(1)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+# coding=UTF-8
+
+# File:     state_ring.py
+# Purpose:  Memory mapped ring buffer of sim state, so that viewers (see viewer.py) can run in their own process
+# Author:   Ryan Adams (radams@cyandata.com, @ninetimeout)
+# Date:     2017-Feb-13
+
+# Note: The sim writes fixed size records into a memory mapped file and never waits on anyone, so a viewer can be
+#       attached or detached at any time (or never) without changing how fast the sim runs. Readers that fall more
+#       than a full ring behind just skip ahead.
+#
+# File layout:
+#   0     8 bytes   magic ('RLPRING1')
+#   8     uint64    number of records written so far (the newest record is at slot (count - 1) % n_slots)
+#   16    uint32    length of the json layout description that follows
+#   20    json      {'n_slots', 'columns', 'force_names', 'pusher_states'}
+#   4096  records: one little-endian float64 per column (struct.pack_into() is much cheaper for the sim than numpy)
+
+import os
+import json
+import mmap
+import struct
+import logging
+import numpy as np
+
+from units import Units
+
+
+MAGIC = 'RLPRING1'
+HEADER_SIZE = 4096
+_COUNT = struct.Struct('<Q')
+_COUNT_OFFSET = 8
+_LAYOUT_LEN = struct.Struct('<I')
+
+PUSHER_STATES = ['HOLD', 'PUSH', 'COAST', 'BRAKE', 'STOPPED']
+
+
+def record_columns(n_brakes, force_names, n_accels):
+    """ Column names for each record """
+    columns = [
+        'seq',      # Record number + 1, so readers can tell if a slot has been overwritten
+        't_usec', 'n_steps',
+        'pod_a', 'pod_v', 'pod_p', 'he_height',
+        'pusher_a', 'pusher_v', 'pusher_p',
+        'pusher_state',     # Index into PUSHER_STATES (-1 if unknown)
+        'fcu_state',        # -1 if the FCU is disabled
+    ]
+    for i in xrange(n_brakes):
+        columns += ['brake_gap.{}'.format(i), 'brake_gap_target.{}'.format(i), 'brake_mlp_raw.{}'.format(i)]
+    columns += ['force_x.{}'.format(name) for name in force_names]
+    for i in xrange(n_accels):
+        columns += ['accel.{}.{}'.format(i, axis) for axis in 'xyz']   # Latest real x, y, z from each accelerometer
+    return columns
+
+
+class AccelerometerTap(object):
+    """ Sensor listener that just remembers an accelerometer's latest sample """
+
+    def __init__(self):
+        self.xyz = (0.0, 0.0, 0.0)
+
+    def step_callback(self, sensor, samples):
+        if samples:
+            sample = samples[-1]
+            self.xyz = (sample.real_x, sample.real_y, sample.real_z)
+
+    def reset(self):
+        self.xyz = (0.0, 0.0, 0.0)
+
+
+class StateRingWriter(object):
+    """ Sim step listener that writes a state record into the ring (at most at the configured rate, in sim time) """
+
+    def __init__(self, sim, config):
+        self.sim = sim
+        self.config = config
+        self.logger = logging.getLogger("StateRingWriter")
+
+        self.n_slots = int(self.config.slots)
+        self.interval_usec = int(1000000.0 / Units.SI(self.config.rate))
+        self.next_sample_usec = 0
+        self.count = 0
+
+        self.force_names = list(self.sim.pod.step_forces.keys())
+        self.accel_taps = []
+        for sensor in self.sim.sensors['accel']:
+            tap = AccelerometerTap()
+            sensor.add_step_listener(tap)
+            self.accel_taps.append(tap)
+
+        self.columns = record_columns(len(self.sim.pod.brakes), self.force_names, len(self.accel_taps))
+        self.record = struct.Struct('<{}d'.format(len(self.columns)))
+        self.filename = os.path.join(self.sim.config.working_dir, self.config.filename)
+        self._open()
+
+    def _open(self):
+        layout = json.dumps({
+            'n_slots': self.n_slots,
+            'columns': self.columns,
+            'force_names': self.force_names,
+            'pusher_states': PUSHER_STATES,
+        })
+        size = HEADER_SIZE + self.n_slots * self.record.size
+        with open(self.filename, 'w+b') as f:
+            f.write(MAGIC + _COUNT.pack(0) + _LAYOUT_LEN.pack(len(layout)) + layout)
+            f.truncate(size)
+            self.mm = mmap.mmap(f.fileno(), size)
+        self.logger.info("Writing sim state for viewers to {} ({} records)".format(self.filename, self.n_slots))
+
+    def step_callback(self, sim):
+        t = sim.elapsed_time_usec
+        if t < self.next_sample_usec:
+            return
+        self.next_sample_usec = t + self.interval_usec
+
+        pod = sim.pod
+        pusher = sim.pusher
+        brakes = pod.brakes
+        try:
+            pusher_state = PUSHER_STATES.index(pusher.state)
+        except ValueError:
+            pusher_state = -1
+        fcu_state = sim.fcu.get_sm_state() if sim.config.fcu.enabled else -1
+
+        values = [self.count + 1, t, sim.n_steps_taken,
+            pod.acceleration, pod.velocity, pod.position, pod.he_height,
+            pusher.acceleration, pusher.velocity, pusher.position, pusher_state, fcu_state]
+        for brake in brakes:
+            values += [brake.gap, brake._gap_target, brake.mlp_raw]
+        for name in self.force_names:
+            values.append(pod.step_forces[name].x)
+        for tap in self.accel_taps:
+            values += tap.xyz
+
+        # Note: write the whole record, then publish it by bumping the count
+        self.record.pack_into(self.mm, HEADER_SIZE + (self.count % self.n_slots) * self.record.size, *values)
+        self.count += 1
+        _COUNT.pack_into(self.mm, _COUNT_OFFSET, self.count)
+
+    def end_callback(self, sim):
+        self.mm.flush()
+
+    def reset(self):
+        """ Start over (readers notice the count going backwards). Reopens the file if the sim's working dir changed. """
+        self.count = 0
+        self.next_sample_usec = 0
+        filename = os.path.join(self.sim.config.working_dir, self.config.filename)
+        if filename != self.filename:
+            self.mm.close()
+            self.filename = filename
+            self._open()
+        else:
+            _COUNT.pack_into(self.mm, _COUNT_OFFSET, 0)
+
+
+class StateRingReader(object):
+    """ Reads new records from a ring written by StateRingWriter (in this or another process) """
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(self.filename, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+            if header[:len(MAGIC)] != MAGIC:
+                raise ValueError("{} is not a sim state ring".format(self.filename))
+            layout_len, = _LAYOUT_LEN.unpack_from(header, 16)
+            layout = json.loads(header[20:20 + layout_len])
+            self.n_slots = layout['n_slots']
+            self.columns = [str(name) for name in layout['columns']]
+            self.force_names = [str(name) for name in layout['force_names']]
+            self.pusher_states = [str(state) for state in layout['pusher_states']]
+            # Records come back as a numpy array with a named float64 field per column
+            self.dtype = np.dtype([(name, '<f8') for name in self.columns])
+            self.mm = mmap.mmap(f.fileno(), HEADER_SIZE + self.n_slots * self.dtype.itemsize, access=mmap.ACCESS_READ)
+        self.records = np.frombuffer(self.mm, dtype=self.dtype, count=self.n_slots, offset=HEADER_SIZE)
+        self.n_brakes = len([name for name in self.columns if name.startswith('brake_gap.')])
+
+        self.next_record = 0
+        self.n_skipped = 0   # Records we missed because we fell more than a ring behind
+        self.restarted = False
+
+    def count(self):
+        return _COUNT.unpack_from(self.mm, _COUNT_OFFSET)[0]
+
+    def read(self):
+        """ Returns an array of the records written since the last read (oldest first) """
+        count = self.count()
+        self.restarted = count < self.next_record
+        if self.restarted:
+            self.next_record = 0  # Sim was reset
+        start = max(self.next_record, count - self.n_slots)
+        self.n_skipped += start - self.next_record
+        if start >= count:
+            return self.records[:0].copy()
+
+        slots = np.arange(start, count) % self.n_slots
+        records = self.records[slots]  # Note: fancy indexing copies
+
+        # Anything the writer may have overwritten while we were copying is no good
+        oldest_ok = self.count() - self.n_slots + 1
+        records = records[(records['seq'] == np.arange(start, count) + 1) & (np.arange(start, count) >= oldest_ok)]
+
+        self.next_record = count
+        return records
+
+    def close(self):
+        self.records = None
+        self.mm.close()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+# coding=UTF-8
+
+# File:     step_profiler.py
+# Purpose:  Built-in sampling profiler for Sim.step() -- times each component of the step and reports at sim end
+# Author:   Ryan Adams (radams@cyandata.com, @ninetimeout)
+# Date:     2017-Feb-13
+
+# Note: Only one in every sample_every steps is profiled (Sim.step() hands those steps to profile_step()), so the
+#       cost for the other steps is a counter check. Timings go into fixed size log-scale histograms, so memory
+#       doesn't grow with the length of the run.
+# Note: python 2.7 has no time.perf_counter_ns(), so we use timeit.default_timer (the best clock on each platform) and
+#       convert to integer nanoseconds. On Linux this has microsecond-ish resolution, which is fine for the component
+#       totals we're interested in (histograms of single, very short calls will be lumpy).
+
+import os
+import json
+import math
+import logging
+from collections import OrderedDict
+from timeit import default_timer as clock
+
+
+class TimingHistogram(object):
+    """ Log-scale histogram of durations in nanoseconds (4 buckets per power of 2, so about 19% resolution) """
+
+    SUB_BUCKETS = 4
+    N_BUCKETS = 48 * SUB_BUCKETS   # Up to 2^48 ns (~3 days) -- plenty
+
+    def __init__(self):
+        self.counts = [0] * self.N_BUCKETS
+        self.n = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+
+    def add(self, ns):
+        self.n += 1
+        self.total_ns += ns
+        if self.min_ns is None or ns < self.min_ns:
+            self.min_ns = ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+        if ns <= 0:
+            self.counts[0] += 1
+            return
+        mantissa, exponent = math.frexp(ns)  # ns = mantissa * 2**exponent, 0.5 <= mantissa < 1
+        bucket = exponent * self.SUB_BUCKETS + int((mantissa - 0.5) * 2 * self.SUB_BUCKETS)
+        self.counts[min(bucket, self.N_BUCKETS - 1)] += 1
+
+    def bucket_upper_ns(self, bucket):
+        exponent, sub = divmod(bucket, self.SUB_BUCKETS)
+        return (0.5 + (sub + 1) / (2.0 * self.SUB_BUCKETS)) * 2 ** exponent
+
+    def percentile(self, pct):
+        """ Approximate percentile (the upper edge of the bucket it falls in, but never more than the max) """
+        if self.n == 0:
+            return 0
+        target = self.n * pct / 100.0
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count:
+                return min(self.bucket_upper_ns(bucket), self.max_ns)
+        return self.max_ns
+
+    def mean(self):
+        return self.total_ns / float(self.n) if self.n else 0.0
+
+    def summary(self):
+        return OrderedDict([
+            ('n', self.n),
+            ('mean_ns', self.mean()),
+            ('min_ns', self.min_ns or 0),
+            ('p50_ns', self.percentile(50)),
+            ('p90_ns', self.percentile(90)),
+            ('p99_ns', self.percentile(99)),
+            ('max_ns', self.max_ns),
+            ('total_ns', self.total_ns),
+        ])
+
+
+class TimedListener(object):
+    """ Stands in for a sensor's listener during profiled steps """
+
+    def __init__(self, profiler, name, listener):
+        self.profiler = profiler
+        self.name = name
+        self.listener = listener
+        self.elapsed_ns = 0   # Total for the current step
+
+    def step_callback(self, sensor, samples):
+        t = clock()
+        self.listener.step_callback(sensor, samples)
+        ns = int((clock() - t) * 1e9)
+        self.elapsed_ns += ns
+        self.profiler.add(self.name, ns)
+
+
+class StepProfiler(object):
+    """ Times the parts of a sampled Sim.step(). Add it as an end listener to write the report at sim end. """
+
+    def __init__(self, sim, config):
+        self.sim = sim
+        self.config = config
+        self.logger = logging.getLogger("StepProfiler")
+
+        self.sample_every = max(1, int(self.config.sample_every or 100))
+        self.report_filename = self.config.report_filename or 'step_profile'
+
+        self.reset()
+
+    def reset(self):
+        self.histograms = OrderedDict()   # Component name -> TimingHistogram (in the order we first saw them)
+        self.n_sampled = 0
+        self._countdown = self.sample_every
+        self._listener_wrappers = {}      # id(sensor) -> (listeners they wrap, wrappers)
+
+    def should_sample(self):
+        """ Called by Sim.step() every step; True if this step should be profiled """
+        self._countdown -= 1
+        if self._countdown:
+            return False
+        self._countdown = self.sample_every
+        return True
+
+    def add(self, name, ns):
+        try:
+            histogram = self.histograms[name]
+        except KeyError:
+            histogram = self.histograms[name] = TimingHistogram()
+        histogram.add(ns)
+
+    def profile_step(self, sim, dt_usec):
+        """ Same as Sim.step(), but timing each part """
+        # Note: keep this in step with Sim.step() and Pod.step()
+        self.n_sampled += 1
+        step_t = clock()
+
+        t = clock()
+        if sim.physics_enabled:
+            sim.pusher.step(dt_usec)
+            t = self._lap('pusher', t)
+
+            # Pod.step()
+            pod = sim.pod
+            for key, exerter in pod.force_exerters.iteritems():
+                force = exerter.get_force()
+                pod.step_forces[key] = force
+                pod.apply_force(force)
+                t = self._lap('pod.force.' + key, t)
+            pod.update_physics(dt_usec)
+            t = self._lap('pod.physics', t)
+            pod.brakes.step(dt_usec)
+            t = self._lap('pod.brakes', t)
+            for step_listener in pod.step_listeners:
+                step_listener.step_callback(pod, None)
+            t = self._lap('pod.listeners', t)
+
+        for name, sensor in sim.sensors.iteritems():
+            if isinstance(sensor, list):
+                for i, s in enumerate(sensor):
+                    self._profile_sensor('sensor.{}.{}'.format(name, i), s, dt_usec)
+            else:
+                self._profile_sensor('sensor.{}'.format(name), sensor, dt_usec)
+        t = clock()
+
+        sim.time_dialator.step(dt_usec)
+        t = self._lap('time_dialator', t)
+
+        sim.elapsed_time_usec += dt_usec
+        sim.n_steps_taken += 1
+
+        for step_listener in sim.step_listeners:
+            step_listener.step_callback(sim)
+            t = self._lap('step_listener.' + step_listener.__class__.__name__, t)
+
+        self.add('step', int((clock() - step_t) * 1e9))
+
+    def _lap(self, name, t):
+        now = clock()
+        self.add(name, int((now - t) * 1e9))
+        return now
+
+    def _profile_sensor(self, name, sensor, dt_usec):
+        """ Time a sensor's step, with its listeners timed separately """
+        listeners = sensor.step_listeners
+        wrapped, wrappers = self._listener_wrappers.get(id(sensor), (None, None))
+        if wrapped != listeners:
+            # First time, or listeners have been added since
+            wrapped = list(listeners)
+            wrappers = [TimedListener(self, "{}.listener.{}".format(name, listener.__class__.__name__), listener) for listener in wrapped]
+            self._listener_wrappers[id(sensor)] = (wrapped, wrappers)
+
+        for wrapper in wrappers:
+            wrapper.elapsed_ns = 0
+        sensor.step_listeners = wrappers
+        t = clock()
+        try:
+            sensor.step(dt_usec)
+        finally:
+            sensor.step_listeners = listeners
+        ns = int((clock() - t) * 1e9)
+        self.add(name, ns - sum(wrapper.elapsed_ns for wrapper in wrappers))
+
+    def summary(self):
+        step_total = self.histograms['step'].total_ns if 'step' in self.histograms else 0
+        components = OrderedDict()
+        for name, histogram in self.histograms.iteritems():
+            summary = histogram.summary()
+            summary['pct_of_step'] = 100.0 * histogram.total_ns / step_total if step_total else 0.0
+            components[name] = summary
+        return OrderedDict([
+            ('n_steps', self.sim.n_steps_taken),
+            ('n_sampled', self.n_sampled),
+            ('sample_every', self.sample_every),
+            ('components', components),
+        ])
+
+    def report(self):
+        """ Human readable report """
+        summary = self.summary()
+        lines = ["Step profile: {} of {} steps sampled (1 in {})".format(summary['n_sampled'], summary['n_steps'], summary['sample_every']),
+            "{:<60} {:>8} {:>10} {:>10} {:>10} {:>10} {:>7}".format("component", "samples", "mean us", "p50 us", "p99 us", "max us", "% step")]
+        for name, c in summary['components'].iteritems():
+            lines.append("{:<60} {:>8} {:>10.2f} {:>10.2f} {:>10.2f} {:>10.2f} {:>7.1f}".format(
+                name, c['n'], c['mean_ns'] / 1000.0, c['p50_ns'] / 1000.0, c['p99_ns'] / 1000.0, c['max_ns'] / 1000.0, c['pct_of_step']))
+        return "\n".join(lines)
+
+    def end_callback(self, sim):
+        if not self.n_sampled:
+            return
+        report = self.report()
+        base = os.path.join(sim.config.working_dir, self.report_filename)
+        with open(base + '.txt', 'w') as f:
+            f.write(report + "\n")
+        with open(base + '.json', 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+        self.logger.info("Wrote step profile to {}.txt/.json".format(base))
+        self.logger.debug(report)
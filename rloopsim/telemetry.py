@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# coding=UTF-8
+
+# File:     telemetry.py
+# Purpose:  Decimated state snapshots for remote clients (e.g. the StreamTelemetry gRPC call)
+# Author:   Ryan Adams (radams@cyandata.com, @ninetimeout)
+# Date:     2017-Feb-11
+
+# Note: everything in step_callback() runs on the sim thread, so it must never block. Each client gets its own
+#       bounded queue; if a client can't keep up we drop its oldest snapshots, then lower its rate, then cut it off.
+
+import threading
+import logging
+from collections import deque
+
+from units import Units
+
+
+class TelemetrySubscriber(object):
+    """ A single telemetry client. The sim thread offers snapshots; the client thread get()s them. """
+
+    def __init__(self, rate_hz, queue_size, max_downsample_steps):
+        self.rate_hz = rate_hz
+        self.interval_usec = int(1000000.0 / rate_hz)
+        self.next_sample_usec = 0
+
+        self.max_downsample_steps = max_downsample_steps
+        self.downsample_steps = 0
+
+        # Note: deque appends/pops are atomic, so the sim thread doesn't need to take a lock
+        self.queue = deque(maxlen=queue_size)
+        self.ready = threading.Event()
+
+        self.n_dropped = 0
+        self.n_overflow = 0  # Drops since the client last pulled from the queue
+        self.closed = False
+
+    def offer(self, snapshot):
+        """ Called from the sim thread. Never blocks. """
+        if len(self.queue) == self.queue.maxlen:
+            # The deque will discard the oldest snapshot for us
+            self.n_dropped += 1
+            self.n_overflow += 1
+            if self.n_overflow >= self.queue.maxlen:
+                self._downsample()
+        self.queue.append(snapshot)
+        self.ready.set()
+
+    def _downsample(self):
+        """ The client has fallen a full queue behind -- halve its rate, or give up on it """
+        self.n_overflow = 0
+        if self.downsample_steps >= self.max_downsample_steps:
+            self.closed = True
+        else:
+            self.downsample_steps += 1
+            self.rate_hz /= 2.0
+            self.interval_usec *= 2
+        self.ready.set()  # Wake the client up so it notices
+
+    def get(self, timeout=None):
+        """ Called from the client thread. Returns a list of snapshots (possibly empty if we timed out) """
+        self.ready.wait(timeout)
+        self.ready.clear()
+        snapshots = []
+        while True:
+            try:
+                snapshots.append(self.queue.popleft())
+            except IndexError:
+                break
+        self.n_overflow = 0
+        return snapshots
+
+    def close(self):
+        self.closed = True
+        self.ready.set()
+
+    def reset(self):
+        """ Start over with a new run (sim time goes back to 0). Snapshots from the old run are thrown away. """
+        self.next_sample_usec = 0
+        self.downsample_steps = 0
+        self.queue.clear()
+        self.n_overflow = 0
+
+
+class TelemetryStream(object):
+    """
+    Sim step listener that hands state snapshots out to subscribers at their requested rates.
+    Note: this isn't tied to a specific sim, so it can be re-attached to a new sim after a reset
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.logger = logging.getLogger("TelemetryStream")
+
+        self.default_rate = Units.SI(self.config.default_rate)
+        self.max_rate = Units.SI(self.config.max_rate)
+        self.queue_size = self.config.queue_size
+        self.max_downsample_steps = self.config.max_downsample_steps
+
+        # Note: the list is replaced rather than modified so that the sim thread can iterate it without a lock
+        self.subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, rate_hz=None, queue_size=None):
+        """ Add a subscriber. A rate of 0 or None means the default rate. """
+        if not rate_hz:
+            rate_hz = self.default_rate
+        rate_hz = min(rate_hz, self.max_rate)
+        subscriber = TelemetrySubscriber(rate_hz, queue_size or self.queue_size, self.max_downsample_steps)
+        with self._lock:
+            self.subscribers = self.subscribers + [subscriber]
+        self.logger.info("Telemetry subscriber added at {} Hz ({} subscribers)".format(rate_hz, len(self.subscribers)))
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        subscriber.close()
+        with self._lock:
+            self.subscribers = [s for s in self.subscribers if s is not subscriber]
+        self.logger.info("Telemetry subscriber removed after dropping {} snapshots ({} subscribers)".format(subscriber.n_dropped, len(self.subscribers)))
+
+    def reset(self):
+        """ Called by Sim.reset() """
+        for subscriber in self.subscribers:
+            subscriber.reset()
+
+    def step_callback(self, sim):
+        subscribers = self.subscribers
+        if not subscribers:
+            return
+
+        t = sim.elapsed_time_usec
+        snapshot = None  # Only build the snapshot if someone wants it this step
+        for subscriber in subscribers:
+            if subscriber.closed or t < subscriber.next_sample_usec:
+                continue
+            if snapshot is None:
+                snapshot = self.snapshot(sim)
+            subscriber.offer(snapshot)
+            subscriber.next_sample_usec = t + subscriber.interval_usec
+
+    def end_callback(self, sim):
+        """ Wake up our subscribers so they can tell their clients that the run is over """
+        for subscriber in self.subscribers:
+            subscriber.ready.set()
+
+    @staticmethod
+    def snapshot(sim):
+        """ Gather the current sim state into a plain dict (cheap to build, and safe to hand to another thread) """
+        pod = sim.pod
+        pusher = sim.pusher
+
+        brakes = []
+        for brake in pod.brakes:
+            brakes.append({
+                'gap': brake.gap,
+                'gap_target': brake._gap_target,
+                'normal_force': brake.normal_force,
+                'drag_force': brake.drag_force,
+                'mlp_raw': brake.mlp_raw,
+            })
+
+        if sim.config.fcu.enabled:
+            fcu_state = sim.fcu.get_sm_state()
+        else:
+            fcu_state = -1
+
+        return {
+            'n_steps': sim.n_steps_taken,
+            'elapsed_time_usec': sim.elapsed_time_usec,
+            'pod': (pod.acceleration, pod.velocity, pod.position),
+            'he_height': pod.he_height,
+            'pusher': (pusher.acceleration, pusher.velocity, pusher.position),
+            'pusher_state': pusher.state,
+            'brakes': brakes,
+            'forces': [(name, force.x, force.y, force.z) for name, force in pod.step_forces.iteritems()],
+            'fcu_state': fcu_state,
+        }
@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+# coding=UTF-8
+
+# File:     telemetry_sink.py
+# Purpose:  Sensor csv files written on a background thread, so that disk stalls don't stall the sim
+# Author:   Ryan Adams (radams@cyandata.com, @ninetimeout)
+# Date:     2017-Feb-13
+
+# Note: AsyncSensorCsvWriter is a drop-in replacement for SensorCsvWriter (see Sim.make_csv_writer()). On the sim
+#       thread it only collects samples; every batch_size samples it hands the batch to the TelemetrySink's queue.
+#       The sink's writer thread owns all of the files and does the csv encoding and the writes.
+# Note: When the queue is full, when_full decides what happens: 'block' makes the sim wait for the writer (nothing is
+#       lost), 'drop' throws the batch away (and counts it) so the sim never waits. The sim's step latency only
+#       depends on the disk if the writer falls a whole queue behind.
+# Note: fsync can be 'never', 'close' (when a file is closed, i.e. at the end of a run) or 'interval' (every
+#       fsync_interval of wall clock time, plus on close).
+# Note: The writer thread runs until close() (see Sim.close()). Sinks that are still open at interpreter exit are
+#       closed then, but they're only weakly referenced until then, so that a closed sim can be collected.
+
+import os
+import csv
+import time
+import Queue
+import atexit
+import weakref
+import logging
+import threading
+
+from units import Units
+from sensors import SensorListener
+from hot_logging import get_logger
+
+
+_open_sinks = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_sinks():
+    """ Stop the writer threads that are still running at exit (otherwise python 2 complains about them) """
+    for sink in list(_open_sinks):
+        sink.close()
+
+
+class TelemetrySink(object):
+    """ A bounded queue of csv batches and the thread that writes them """
+
+    FSYNC_POLICIES = ('never', 'close', 'interval')
+    WHEN_FULL_POLICIES = ('block', 'drop')
+
+    def __init__(self, sim, config):
+        self.sim = sim
+        self.config = config
+        self.logger = get_logger("TelemetrySink")
+
+        self.batch_size = int(self.config.batch_size or 1000)
+        self.file_buffer_size = int(self.config.file_buffer_size or 1024 * 1024)
+        self.when_full = self.config.when_full or 'block'
+        self.fsync = self.config.fsync or 'close'
+        self.fsync_interval = Units.SI(self.config.fsync_interval or '5 s')  # seconds (wall clock)
+
+        if self.when_full not in self.WHEN_FULL_POLICIES:
+            raise ValueError("Unknown when_full policy '{}' (expected one of {})".format(self.when_full, self.WHEN_FULL_POLICIES))
+        if self.fsync not in self.FSYNC_POLICIES:
+            raise ValueError("Unknown fsync policy '{}' (expected one of {})".format(self.fsync, self.FSYNC_POLICIES))
+
+        self.q = Queue.Queue(maxsize=int(self.config.queue_size or 256))
+        self.writers = []
+        self.n_dropped = 0  # Batches
+
+        self.thread = threading.Thread(target=self._run, name="TelemetrySink")
+        self.thread.daemon = True
+        self.thread.start()
+        _open_sinks.add(self)
+
+    def add_writer(self, writer):
+        self.writers.append(writer)
+
+    def put(self, writer, op, data=None):
+        """ Called from the sim thread. Only 'rows' batches are ever dropped (not 'headers'). """
+        item = (writer, op, data)
+        if op == 'rows' and self.when_full == 'drop':
+            try:
+                self.q.put_nowait(item)
+            except Queue.Full:
+                self.n_dropped += 1
+                writer.n_dropped += len(data)
+        else:
+            self.q.put(item)
+
+    def call(self, fn, *args):
+        """ Run fn(*args) on the writer thread, after everything already queued (e.g. for run_archive.py). Never dropped. """
+        self.q.put((None, 'call', (fn, args)))
+
+    def depth(self):
+        return self.q.qsize()
+
+    def wait(self):
+        """ Wait for the writer thread to finish everything queued so far """
+        self.q.join()
+
+    def flush(self):
+        """ Hand over all partial batches and wait for the writer thread to write them """
+        for writer in self.writers:
+            writer.flush()
+        self.q.join()
+
+    def close(self):
+        """ Finish writing everything queued so far, close any files that are still open and stop the writer thread """
+        if self.thread.is_alive():
+            self.q.put((None, 'stop', None))
+            self.thread.join(5.0)
+        _open_sinks.discard(self)
+
+    def end_callback(self, sim):
+        """ Close the files at the end of the run (they're reopened by Sim.reset()) """
+        for writer in self.writers:
+            writer.close()
+        self.q.join()
+        for writer in self.writers:
+            if writer.n_dropped:
+                self.logger.warning("Dropped {} samples for {} (writer queue full)", writer.n_dropped, writer.output_filename)
+
+    # Writer thread
+
+    def _run(self):
+        files = {}  # writer -> [file, csv writer, time of last fsync]
+        while True:
+            writer, op, data = self.q.get()
+            if op == 'stop':
+                for entry in files.values():
+                    self._close(entry)
+                self.q.task_done()
+                return
+            try:
+                if op == 'rows' or op == 'headers':
+                    entry = files.get(writer)
+                    if entry is not None:
+                        entry[1].writerows(data)
+                        writer._bytes_written = entry[0].tell()
+                        if self.fsync == 'interval' and time.time() - entry[2] >= self.fsync_interval:
+                            self._fsync(entry[0])
+                            entry[2] = time.time()
+                elif op == 'open':
+                    self._close(files.pop(writer, None))
+                    f = open(data, 'wb', self.file_buffer_size)   # Note: need to use wb since windows
+                    files[writer] = [f, csv.writer(f, lineterminator=os.linesep), time.time()]
+                    writer._bytes_written = 0
+                elif op == 'close':
+                    self._close(files.pop(writer, None))
+                elif op == 'call':
+                    fn, args = data
+                    fn(*args)
+            except Exception:
+                self.logger.exception("Error in {} for {}", op, writer.output_filename if writer is not None else data[0])
+                files.pop(writer, None)  # Note: the writer's samples are thrown away until its file is reopened
+            finally:
+                self.q.task_done()
+
+    def _close(self, entry):
+        if entry is None:
+            return
+        f = entry[0]
+        if self.fsync != 'never':
+            self._fsync(f)
+        f.close()
+
+    def _fsync(self, f):
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class AsyncSensorCsvWriter(SensorListener):
+    """ Like SensorCsvWriter, but the file is written by a TelemetrySink """
+
+    def __init__(self, sim, config, sink):
+        SensorListener.__init__(self, sim, config)
+        self.sink = sink
+        self.sink.add_writer(self)
+
+        self._bytes_written = 0   # Updated by the writer thread
+        self.n_dropped = 0        # Samples (only if the sink's when_full is 'drop')
+        self._open()
+
+    def _output_filename(self):
+        return os.path.join(self.sim.config.working_dir, self.config.log_filename)
+
+    def _row(self, sensor, sample):
+        return sample  # Note: each sample is assumed to be a namedtuple of some sort
+
+    def _open(self):
+        self.output_filename = self._output_filename()
+        self._headers_written = False
+        self.batch = []
+        self.sink.put(self, 'open', self.output_filename)
+
+    def reset(self):
+        """ Close our file and start a new one (in the sim's current working dir) """
+        self.close()
+        self.n_dropped = 0
+        self._open()
+
+    def flush(self):
+        """ Hand our partial batch to the sink """
+        if self.batch:
+            batch, self.batch = self.batch, []
+            self.sink.put(self, 'rows', batch)
+
+    def close(self):
+        self.flush()
+        self.sink.put(self, 'close')
+
+    def bytes_written(self):
+        """ Size of the csv file so far (not including anything still queued) """
+        return self._bytes_written
+
+    def step_callback(self, sensor, step_samples):
+        if not self._headers_written:
+            # Note: on their own, so that they're never dropped (or counted as samples)
+            self.flush()
+            self.sink.put(self, 'headers', [sensor.get_csv_headers()])
+            self._headers_written = True
+
+        if self.sim.data_logging_enabled(self, sensor):
+            row = self._row
+            self.batch.extend([row(sensor, sample) for sample in step_samples])
+            if len(self.batch) >= self.sink.batch_size:
+                self.flush()
+
+
+class AsyncSensorRawCsvWriter(AsyncSensorCsvWriter):
+    """ Like SensorRawCsvWriter, but the file is written by a TelemetrySink """
+
+    def _output_filename(self):
+        return os.path.join(self.sim.config.working_dir, "raw_"+self.config.log_filename)
+
+    def _row(self, sensor, sample):
+        return sensor.to_raw(sample)
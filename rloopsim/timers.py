@@ -99,6 +99,16 @@ class TimeDialator(object):
         """ Add multiple timers (convenience method) """
         self.timers.extend(timers)
     
+    def reset(self):
+        """ Start over (see Sim.reset()) """
+        self.last_real_time = None
+        self.last_sim_time = None
+        self.ema_previous = 1.0
+        self.ema_current = 1.0
+        self.dialation = 1.0
+        for timer in self.timers:
+            timer.update_dialation(self.dialation)
+
     def dialate_time(self, dt_usec=None):
         """ Calculate the time dialation and set it on our timers """
 
@@ -160,6 +170,12 @@ class TimeRunner:
         self.logger.debug("TimeRunner.end_callback() called.")
         self.end_flag = True
 
+    def reset(self):
+        """ Get ready to run again after an end_callback() """
+        self.end_flag = False
+        for timer in self.timers:
+            timer.reset()
+
     def run(self):
         while True:
 
@@ -198,6 +214,10 @@ class CallbackTimer(object):
         self.name = kwargs.get('name', "{}s timer".format(self.interval))
         self.debug_callback = kwargs.get('debug_callback', None)
 
+        # How late (in seconds past the delay) the callback fired the last time, and the worst since max_lag was last cleared
+        self.lag = 0.0
+        self.max_lag = 0.0
+
         self.gen = self._create_generator()
 
     def _create_generator(self):
@@ -213,6 +233,9 @@ class CallbackTimer(object):
             t1 = time.clock()
             # delay = self.interval * self.dialation  # @todo: can we move this out of here for better performance? 
             if t1 - t0 >= self.delay:
+                self.lag = t1 - t0 - self.delay
+                if self.lag > self.max_lag:
+                    self.max_lag = self.lag
                 t0 = t1
                 if self.debug_callback is not None:
                     self.debug_callback(self)
@@ -226,6 +249,13 @@ class CallbackTimer(object):
     def stop(self):
         self.stop_flag = True
 
+    def reset(self):
+        """ Restart the timer after it has been stopped """
+        self.stop_flag = False
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.gen = self._create_generator()
+
     def update_dialation(self, dialation):
         """ set the time-dialated delay """
         self.dialation = dialation
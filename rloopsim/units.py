@@ -6,36 +6,71 @@
 # Author:   Ryan Adams (radams@cyandata.com, @ninetimeout)
 # Date:     2016-Dec-28
 
-from pint import UnitRegistry
-
 class Units:
 
-    ureg = UnitRegistry()
+    # Note: pint is slow to import and the registry is slow to build, so they're only loaded the first time we need to
+    #       parse something. Sims built from a cached compiled config (see config_compiler.py) may never need them.
+    ureg = None
+
+    # Parsing with pint is slow, so remember the results (config values are parsed over and over)
+    _cache = {}
 
-    # Define G as g force in the ureg
-    ureg.define('gforce = 9.80665 m/s^2 = G')
+    # Units we convert to, as pint names them (so we can skip pint if a compiled config value was already written in those units)
+    _UNIT_NAMES = {'microsecond': 'microsecond', 'seconds': 'second', 'millimeter': 'millimeter'}
+
+    @classmethod
+    def registry(cls):
+        if cls.ureg is None:
+            from pint import UnitRegistry
+            ureg = UnitRegistry()
+            # Define G as g force in the ureg
+            ureg.define('gforce = 9.80665 m/s^2 = G')
+            cls.ureg = ureg
+        return cls.ureg
+
+    @classmethod
+    def _parse(cls, quantity, target_units):
+        # Note: compiled config values (config_compiler.SIValue) are already SI, and keep their original string in .text
+        if hasattr(quantity, 'text'):
+            if target_units is not None and cls._UNIT_NAMES.get(target_units) == quantity.units:
+                return quantity.magnitude
+            quantity = quantity.text
+        key = (quantity, target_units)
+        try:
+            return cls._cache[key]
+        except KeyError:
+            pass
+        ureg = cls.registry()
+        parsed = ureg.parse_expression(quantity)
+        if target_units is None:
+            value = parsed.to_base_units().magnitude
+        else:
+            value = parsed.to(ureg.parse_expression(target_units)).magnitude
+        cls._cache[key] = value
+        return value
 
     @classmethod
     def SI(cls, quantity_str):
         """ Convert to standard units """
-        return cls.ureg.parse_expression(quantity_str).to_base_units().magnitude
+        if isinstance(quantity_str, float) and hasattr(quantity_str, 'text'):
+            return float(quantity_str)  # Compiled config value
+        return cls._parse(quantity_str, None)
             
     @classmethod
     def usec(cls, quantity_time):
-        return cls.ureg.parse_expression(quantity_time).to(cls.ureg.microsecond).magnitude
+        return cls._parse(quantity_time, 'microsecond')
 
     @classmethod
     def mm(cls, quantity_distance):
-        return cls.ureg.parse_expression(quantity_distance).to(cls.ureg.millimeter).magnitude
+        return cls._parse(quantity_distance, 'millimeter')
       
     @classmethod  
     def seconds(cls, quantity_time):
-        return cls.ureg.parse_expression(quantity_time).to(cls.ureg.seconds).magnitude
+        return cls._parse(quantity_time, 'seconds')
     
     @classmethod
     def convert(cls, quantity, target_units):
-        return cls.ureg.parse_expression(quantity).to(cls.ureg.parse_expression(target_units)).magnitude
-
+        return cls._parse(quantity, target_units)
 
 if __name__ == "__main__":
     a = ['1.25m', '3ft', '18psi', '4m/s', "100usec", '10min']
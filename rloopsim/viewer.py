@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# coding=UTF-8
+
+# File:     viewer.py
+# Purpose:  Live graphs of a running sim, in a separate process (reads the ring buffer written by state_ring.StateRingWriter)
+# Author:   Ryan Adams (radams@cyandata.com, @ninetimeout)
+# Date:     2017-Feb-13
+
+# Note: Run the sim with the viewer enabled (e.g. with conf/viewer_overlay.yaml), then start this at any time with the
+#       ring file from the sim's working directory. Closing the viewer doesn't affect the sim.
+
+import logging
+
+from state_ring import StateRingReader
+from live_data import RingLiveData
+
+
+class ViewerLayout:
+    def __init__(self, filename, poll_ms=50):
+        import Tkinter as tk
+
+        self.logger = logging.getLogger("Viewer")
+        self.reader = StateRingReader(filename)
+        self.live_data = RingLiveData(self.reader, n_buckets=800)  # One bucket per pixel (the graphs are 8in wide at 100dpi)
+        self.poll_ms = poll_ms
+
+        self.root = tk.Tk()
+        self.root.title("rPod Sim Viewer: {}".format(filename))
+        self.status = tk.StringVar()
+
+        self.layout()
+        self.poll()
+
+    def layout(self):
+        import ttk
+        import matplotlib
+        matplotlib.use("TkAgg")
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+        from gui import TkGraphBase, TkGraphForces, TkGraphBrakes, TkGraphHeight, TkGraphAccel
+
+        content = ttk.Frame(self.root)
+        content.grid(column=0, row=0)
+
+        self.graphs = []
+        for row, (graph_class, height) in enumerate([(TkGraphForces, 1.5), (TkGraphBase, 1.5), (TkGraphBrakes, 1), (TkGraphHeight, 1), (TkGraphAccel, 1.5)]):
+            fig = Figure(figsize=(8, height), dpi=100)
+            canvas = FigureCanvasTkAgg(fig, master=content)
+            # Note: graphs only use the sim for things the live data doesn't have, so there's no sim here
+            self.graphs.append(graph_class(fig, None, self.live_data))
+            canvas.show()
+            canvas.get_tk_widget().grid(column=0, row=row)
+
+        ttk.Label(content, textvariable=self.status).grid(column=0, row=len(self.graphs))
+
+    def poll(self):
+        self.live_data.poll()
+        latest = self.live_data.latest
+        if latest is not None:
+            pusher_state = int(latest['pusher_state'])
+            self.status.set("t={:.3f}s  step {}  pos {:.2f}m  vel {:.2f}m/s  pusher {}  fcu state {}  (skipped {})".format(
+                latest['t_usec'] / 1000000.0, int(latest['n_steps']), latest['pod_p'], latest['pod_v'],
+                self.reader.pusher_states[pusher_state] if pusher_state >= 0 else '?', int(latest['fcu_state']), self.reader.n_skipped))
+        self.root.after(self.poll_ms, self.poll)
+
+    def run(self):
+        self.root.mainloop()
+        self.reader.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="rPod Simulation Viewer")
+    parser.add_argument('ringfile', metavar='ringfile', type=str,
+        help='State ring file written by the sim (state.ring in its working directory, if the viewer is enabled in its config)')
+    args = parser.parse_args()
+
+    ViewerLayout(args.ringfile).run()
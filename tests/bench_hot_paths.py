@@ -0,0 +1,386 @@
+#!/usr/bin/env python
+# coding=UTF-8
+
+# File:     bench_hot_paths.py
+# Purpose:  Benchmarks for the simulation hot paths, with a history file so changes can be compared against a baseline
+# Author:   Ryan Adams (radams@cyandata.com, @ninetimeout)
+# Date:     2017-Feb-13
+
+# Usage:    python tests/bench_hot_paths.py [--label name] [--baseline label] [--quick] [--only regex] [--no-save]
+#
+# Note: Each run appends a json line to tests/benchmark_history.jsonl and prints ops/sec and allocations per op next to
+#       the baseline (the first run labeled 'baseline', or the first run in the file). Seeds are fixed so that runs
+#       do the same work every time.
+# Note: python 2.7 has no tracemalloc, so 'allocations' are the net number of gc-tracked objects (lists, dicts,
+#       tuples, instances, ...) created per op, from gc.get_count() with the collector off. Floats and numpy buffers
+#       aren't counted, but a growing number here still means more garbage (or a leak) per step.
+
+import os
+import re
+import gc
+import sys
+import json
+import time
+import random
+import shutil
+import logging
+import tempfile
+import argparse
+import subprocess
+from collections import OrderedDict
+from timeit import default_timer as clock
+
+import numpy as np
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TESTS_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'rloopsim'))
+
+from sim import Sim
+from config import Config
+from units import Units
+from sensors import SensorCsvWriter
+from sensor_laser_opto import LaserOptoSensor
+from sensor_laser_dist import LaserDistSensor
+from sensor_laser_contrast import LaserContrastSensor
+from telemetry_sink import AsyncSensorCsvWriter
+
+DEFAULT_CONFIG = os.path.join(ROOT_DIR, 'conf', 'sim_config.yaml')
+DEFAULT_HISTORY = os.path.join(TESTS_DIR, 'benchmark_history.jsonl')
+SEED = 1234
+
+
+class BenchmarkRunner(object):
+    """ Runs the benchmarks and collects the results """
+
+    def __init__(self, config_files, working_dir, quick=False, only=None):
+        self.config_files = config_files
+        self.working_dir = working_dir
+        self.scale = 0.1 if quick else 1.0
+        self.only = re.compile(only) if only else None
+        self.results = OrderedDict()
+        self.logger = logging.getLogger("BenchmarkRunner")
+
+    def wanted(self, name):
+        return self.only is None or self.only.search(name) is not None
+
+    def seed(self):
+        random.seed(SEED)
+        np.random.seed(SEED)
+
+    def measure(self, name, fn, n, ops_per_call=1, unit='ops'):
+        """ Call fn() n times; record ops/sec and net gc-tracked allocations per op """
+        if not self.wanted(name):
+            return
+        n = max(1, int(n * self.scale))
+        for i in xrange(min(10, n)):
+            fn()  # Warm up (first calls fill caches, open files, etc.)
+
+        gc.collect()
+        gc.disable()
+        try:
+            count_before = gc.get_count()[0]
+            t = clock()
+            for i in xrange(n):
+                fn()
+            elapsed = clock() - t
+            allocs = gc.get_count()[0] - count_before
+        finally:
+            gc.enable()
+
+        ops = n * ops_per_call
+        self.results[name] = OrderedDict([
+            ('ops_per_sec', ops / elapsed if elapsed > 0 else 0.0),
+            ('usec_per_op', elapsed * 1e6 / ops),
+            ('allocs_per_op', allocs / float(ops)),
+            ('n', ops),
+            ('unit', unit),
+        ])
+        self.logger.info("{}: {:.1f} {}/sec".format(name, self.results[name]['ops_per_sec'], unit))
+
+    def record(self, name, value, unit):
+        """ Record a derived value (e.g. bytes/sec) that isn't timed by measure() """
+        if self.wanted(name):
+            self.results[name] = OrderedDict([('ops_per_sec', value), ('unit', unit)])
+
+    # -------------------------
+    # Setup
+    # -------------------------
+
+    def load_config(self, timestep=None, track_length=None):
+        config = Sim.load_config_files(self.config_files, compiled=False)
+        for section in ('fcu', 'networking', 'viewer', 'profiler'):
+            config[section].override('enabled', False)
+        if timestep is not None:
+            config.override('fixed_timestep', timestep)
+        if track_length is not None:
+            config.track.override('length', track_length)
+        return config
+
+    def make_sim(self, name, timestep=None, track_length=None, push_steps=0):
+        """ A sim with the FCU and networking off, writing to its own dir. Optionally pushed for a while first. """
+        self.seed()
+        sim = Sim(self.load_config(timestep, track_length), os.path.join(self.working_dir, name))
+        sim.pusher.start_push()
+        for i in xrange(push_steps):
+            sim.step(sim.fixed_timestep_usec)
+        return sim
+
+    def close_sim(self, sim):
+        # Close the csv files
+        if sim.telemetry_sink is not None:
+            sim.telemetry_sink.end_callback(sim)
+        if sim.archive is not None:
+            sim.archive.finish()
+        for sensor in sim.sensors.values():
+            for s in (sensor if isinstance(sensor, list) else [sensor]):
+                for listener in s.step_listeners:
+                    gen = getattr(listener, 'gen', None)
+                    if gen is not None:
+                        gen.close()
+        sim.close()
+
+    # -------------------------
+    # Benchmarks
+    # -------------------------
+
+    def bench_sim_step(self):
+        for timestep, n in (('100 usec', 20000), ('1 ms', 10000), ('5 ms', 5000)):
+            name = 'sim.step.' + timestep.replace(' ', '')
+            if not self.wanted(name):
+                continue
+            sim = self.make_sim(name, timestep)
+            dt_usec = sim.fixed_timestep_usec
+            self.measure(name, lambda: sim.step(dt_usec), n, unit='steps')
+            self.close_sim(sim)
+
+    def bench_forces(self):
+        sim = self.make_sim('forces', push_steps=200)  # Moving, so the speed-dependent forces do some work
+        for key, exerter in sim.pod.force_exerters.iteritems():
+            self.measure('force.{}.get_force'.format(key), exerter.get_force, 20000)
+        self.close_sim(sim)
+
+    def bench_brakes(self):
+        sim = self.make_sim('brakes', push_steps=200)
+        brake = sim.pod.brakes[0]
+        dt_usec = sim.fixed_timestep_usec
+        self.measure('brake.step.idle', lambda: brake.step(dt_usec), 20000)
+
+        def moving():
+            # Keep the brake moving back and forth between its limits
+            if brake.gap <= 0.003:
+                brake._move_to_gap_target(0.025)
+            elif brake.gap >= 0.024:
+                brake._move_to_gap_target(0.0025)
+            brake.step(dt_usec)
+        brake._move_to_gap_target(0.0025)
+        self.measure('brake.step.moving', moving, 20000)
+
+        # All of the brakes (what Pod.step() does)
+        brakes = sim.pod.brakes
+        brakes.hold()
+        self.measure('brakes.step.idle', lambda: brakes.step(dt_usec), 20000)
+
+        def all_moving():
+            if brakes[0].gap <= 0.003:
+                brakes.retract()
+            elif brakes[0].gap >= 0.024:
+                brakes.apply()
+            brakes.step(dt_usec)
+        brakes.apply()
+        self.measure('brakes.step.moving', all_moving, 20000)
+        self.close_sim(sim)
+
+    def _polling_samples(self, sensor, dt_usec):
+        """ Set up a polling sensor's lerp percentages as PollingSensor.step() would and return its create_step_samples() """
+        samples_per_step = sensor.sampling_rate * dt_usec / 1000000.
+        sensor.step_lerp_pcts = np.arange(0.0, 1.0, 1.0 / samples_per_step + 0.00000001)
+        return lambda: sensor.create_step_samples(dt_usec)
+
+    def bench_sensors(self):
+        sim = self.make_sim('sensors', push_steps=200)
+        dt_usec = sim.fixed_timestep_usec
+
+        # Pod and pusher 'sensors' create their sample in step()
+        for name in ('pod', 'pusher'):
+            sensor = sim.sensors[name]
+            listeners, sensor.step_listeners = sensor.step_listeners, []
+            self.measure('sensor.{}.step'.format(name), lambda: sensor.step(dt_usec), 20000)
+            sensor.step_listeners = listeners
+
+        sensor = sim.sensors['accel'][0]
+        self.measure('sensor.accel.create_step_samples', self._polling_samples(sensor, dt_usec), 10000)
+
+        # Not created by the sim (currently), so we make our own
+        sensor = LaserOptoSensor(sim, Config(sim.config.sensors.laser_opto[0]))
+        self.measure('sensor.laser_opto.create_step_samples', self._polling_samples(sensor, dt_usec), 10000)
+        sensor = LaserDistSensor(sim, Config(sim.config.sensors.laser_dist))
+        self.measure('sensor.laser_dist.create_step_samples', self._polling_samples(sensor, dt_usec), 10000)
+        sensor = LaserContrastSensor(sim, Config(sim.config.sensors.laser_contrast[0]))
+        self.measure('sensor.laser_contrast.create_step_samples', lambda: sensor.create_step_samples(dt_usec), 10000)
+        self.close_sim(sim)
+
+    def bench_csv_writer(self):
+        name = 'csv_writer.pod'
+        if not self.wanted(name):
+            return
+        sim = self.make_sim('csv_writer', push_steps=10)
+        sensor = sim.sensors['pod']
+        writer = SensorCsvWriter(sim, Config({'log_filename': 'bench_pod.csv'}))
+        samples = [sensor.data(*([i * 100, 1.0 + i, 2.0, 3.0, 0.01] + [0.5, 0.0, -0.5] * len(sim.pod.step_forces))) for i in xrange(10)]
+        self.measure(name, lambda: writer.step_callback(sensor, samples), 5000, ops_per_call=len(samples), unit='rows')
+        writer.gen.close()
+        n_bytes = os.path.getsize(writer.output_filename)
+        result = self.results[name]
+        self.record(name + '.bytes', result['ops_per_sec'] * n_bytes / float(result['n'] + 10 * len(samples)), 'bytes')
+
+        # The sim thread's share of the work when the file is written by the telemetry sink
+        name = 'csv_writer.pod.async'
+        if self.wanted(name) and sim.telemetry_sink is not None:
+            writer = AsyncSensorCsvWriter(sim, Config({'log_filename': 'bench_pod_async.csv'}), sim.telemetry_sink)
+            self.measure(name, lambda: writer.step_callback(sensor, samples), 5000, ops_per_call=len(samples), unit='rows')
+        self.close_sim(sim)
+
+    def bench_track(self):
+        """ Track feature queries (strips and gaps in the pod's step range) as the pod moves down short and long tracks """
+        for label, length in (('short', '1260 m'), ('long', '12600 m')):
+            sim = self.make_sim('track_' + label, track_length=length)
+            dt_usec = sim.fixed_timestep_usec
+            pod = sim.pod
+            track_length = sim.track.length
+            opto = LaserOptoSensor(sim, Config(sim.config.sensors.laser_opto[0]))
+            opto_samples = self._polling_samples(opto, dt_usec)
+            contrast = LaserContrastSensor(sim, Config(sim.config.sensors.laser_contrast[0]))
+            step_m = 0.5   # 100 m/s at 5 ms
+
+            def move():
+                pod.last_position = pod.position
+                pod.position += step_m
+                if pod.position > track_length:
+                    pod.last_position = 0.0
+                    pod.position = step_m
+            pod.position = 0.0
+
+            def gaps():
+                move()
+                opto_samples()
+
+            def strips():
+                move()
+                contrast.create_step_samples(dt_usec)
+
+            self.measure('track.{}.gaps'.format(label), gaps, 20000)
+            self.measure('track.{}.strips'.format(label), strips, 20000)
+            self.close_sim(sim)
+
+    def bench_startup(self):
+        self.measure('startup.config.load', lambda: Sim.load_config_files(self.config_files, compiled=False), 20)
+        self.measure('startup.config.load_compiled', lambda: Sim.load_config_files(self.config_files, compiled=True), 200)
+
+        def parse():
+            Units._cache.clear()
+            for quantity in ('1.25m', '3ft', '18psi', '4m/s', '100usec', '10min'):
+                Units.SI(quantity)
+        Units.registry()  # Not timing the pint import/registry (see --import-profile for that)
+        self.measure('startup.units.parse', parse, 50, ops_per_call=6)
+
+        def create():
+            sim = Sim(self.load_config(), os.path.join(self.working_dir, 'startup'))
+            self.close_sim(sim)
+        self.measure('startup.sim.create', create, 10)
+
+    def run(self):
+        self.bench_sim_step()
+        self.bench_forces()
+        self.bench_brakes()
+        self.bench_sensors()
+        self.bench_csv_writer()
+        self.bench_track()
+        self.bench_startup()
+        return self.results
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(filename):
+    if not os.path.exists(filename):
+        return []
+    with open(filename, 'rb') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def find_baseline(history, label=None):
+    """ The most recent run with the given label; otherwise the first 'baseline' run (or just the first run) """
+    if label is not None:
+        runs = [run for run in history if run['label'] == label]
+        return runs[-1] if runs else None
+    for run in history:
+        if run['label'] == 'baseline':
+            return run
+    return history[0] if history else None
+
+
+def compare(results, baseline):
+    """ Table of results next to the baseline's """
+    lines = ["{:<45} {:>14} {:>14} {:>8} {:>10} {:>10}".format("benchmark", "ops/sec", "baseline", "change", "allocs/op", "baseline")]
+    base = baseline['results'] if baseline else {}
+    for name, result in results.iteritems():
+        other = base.get(name, {})
+        change = ''
+        if other.get('ops_per_sec'):
+            change = "{:+.1f}%".format(100.0 * (result['ops_per_sec'] / other['ops_per_sec'] - 1))
+        lines.append("{:<45} {:>14.1f} {:>14} {:>8} {:>10} {:>10}".format(
+            name + ' (' + result['unit'] + ')',
+            result['ops_per_sec'],
+            "{:.1f}".format(other['ops_per_sec']) if 'ops_per_sec' in other else '-',
+            change,
+            "{:.2f}".format(result['allocs_per_op']) if 'allocs_per_op' in result else '-',
+            "{:.2f}".format(other['allocs_per_op']) if 'allocs_per_op' in other else '-'))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="rPod Simulation hot path benchmarks")
+    parser.add_argument('configfile', metavar='config', type=str, nargs='*', default=[DEFAULT_CONFIG],
+        help='Simulation configuration file(s) -- later files overlay on previous files')
+    parser.add_argument('--label', type=str, default=None, help='Name for this run in the history (e.g. a branch name)')
+    parser.add_argument('--baseline', type=str, default=None, help='Compare against the latest run with this label')
+    parser.add_argument('--history', type=str, default=DEFAULT_HISTORY, help='History file (json lines)')
+    parser.add_argument('--quick', action='store_true', help='Run a tenth of the iterations (for a quick check)')
+    parser.add_argument('--only', type=str, default=None, help='Only run benchmarks whose names match this regex')
+    parser.add_argument('--no-save', action='store_true', help="Don't add this run to the history")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    working_dir = tempfile.mkdtemp(prefix='rloopsim_bench_')
+    try:
+        runner = BenchmarkRunner(args.configfile, working_dir, quick=args.quick, only=args.only)
+        results = runner.run()
+    finally:
+        shutil.rmtree(working_dir, ignore_errors=True)
+
+    history = load_history(args.history)
+    baseline = find_baseline(history, args.baseline)
+    print compare(results, baseline)
+    if baseline:
+        print "Baseline: {} ({}, {})".format(baseline['label'], baseline['git'], baseline['time'])
+
+    if not args.no_save:
+        run = OrderedDict([
+            ('label', args.label or ('baseline' if not history else git_revision())),
+            ('time', time.strftime('%Y-%m-%dT%H:%M:%S')),
+            ('git', git_revision()),
+            ('python', sys.version.split()[0]),
+            ('numpy', np.__version__),
+            ('seed', SEED),
+            ('quick', args.quick),
+            ('results', results),
+        ])
+        with open(args.history, 'ab') as f:
+            f.write(json.dumps(run) + "\n")
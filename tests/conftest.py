@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+
+# Shared test fixtures
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'rloopsim'))
+
+
+def end_run(sim):
+    """ End a sim that was stepped directly (rather than run()), so its end listeners close their files """
+    if not sim.is_ended:
+        sim.stop()
+        sim.end_if_finished()
+        sim.is_ended = True
+
+
+@pytest.fixture
+def make_sim(tmpdir, monkeypatch):
+    """ Make sims from conf/sim_config.yaml (FCU disabled) plus overrides, each in its own working dir under tmpdir """
+    from sim import Sim
+    from config_compiler import overlay_config
+
+    monkeypatch.chdir(ROOT)  # Note: paths in the config (e.g. force models) are relative to the top directory
+    sims = []
+
+    def make(overrides=None, name=None):
+        config = Sim.load_config_files([os.path.join(ROOT, 'conf', 'sim_config.yaml')])
+        overlay_config(config, {'fcu': {'enabled': False}})
+        if overrides:
+            overlay_config(config, overrides)
+        sim = Sim(config, str(tmpdir.join(name or 'sim{}'.format(len(sims)))))
+        sims.append(sim)
+        return sim
+
+    yield make
+    for sim in sims:
+        end_run(sim)
+        sim.close()
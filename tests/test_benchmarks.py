@@ -0,0 +1,25 @@
+#!/usr/bin/env python
+
+# Make sure the benchmarks (see bench_hot_paths.py) still run against the current code
+
+import shutil
+import tempfile
+
+from bench_hot_paths import BenchmarkRunner, DEFAULT_CONFIG, compare
+
+
+def test_benchmarks_run():
+    working_dir = tempfile.mkdtemp(prefix='rloopsim_bench_')
+    try:
+        runner = BenchmarkRunner([DEFAULT_CONFIG], working_dir, quick=True, only=r'^(sim\.step\.5ms|force\.|brake\.step\.idle|track\.short)')
+        results = runner.run()
+    finally:
+        shutil.rmtree(working_dir, ignore_errors=True)
+
+    assert 'sim.step.5ms' in results
+    assert 'force.hover_engines.get_force' in results
+    assert 'track.short.gaps' in results
+    assert 'startup.config.load' not in results
+    for result in results.values():
+        assert result['ops_per_sec'] > 0
+    assert 'sim.step.5ms (steps)' in compare(results, None)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+
+# Stepper motor and lead screw dynamics for the brakes (see brake_drive.py)
+
+import pytest
+
+
+def drive_sim(make_sim, timestep_usec=1000, **overrides):
+    return make_sim(dict({'fixed_timestep': '{} usec'.format(timestep_usec), 'pod': {'brake_drive': {'enabled': True}}}, **overrides))
+
+
+def step_until(sim, done, max_usec=10000000):
+    """ Step until done() (returns the sim time it took, in seconds) """
+    start_usec = sim.elapsed_time_usec
+    while not done():
+        assert sim.elapsed_time_usec - start_usec < max_usec, "Timed out"
+        sim.step(sim.fixed_timestep_usec)
+    return (sim.elapsed_time_usec - start_usec) / 1000000.0
+
+
+def settle(sim, max_usec=2000000):
+    step_until(sim, sim.pod.brakes.is_steady, max_usec)
+
+
+def expected_time(brake, screw_from, screw_to):
+    """ Time to move the screw at the configured speed (between the switches), ramping the step rate up and down """
+    speed = (brake.screw_limit_sw_extend - brake.screw_limit_sw_retract) / brake._gap_close_time
+    return abs(screw_to - screw_from) / speed + brake.drive.step_rate / brake.drive.step_ramp
+
+
+@pytest.mark.parametrize('timestep_usec', [1000, 5000])
+def test_apply_and_retract_reach_the_limit_switches(make_sim, timestep_usec):
+    sim = drive_sim(make_sim, timestep_usec)
+    brakes = sim.pod.brakes
+    assert brakes.drives is not None
+    # Note: the brakes start just short of the retract switch
+    assert not any(brake.retract_sw_activated or brake.extend_sw_activated for brake in brakes)
+
+    brake = brakes[0]
+    brakes.apply()
+    t = step_until(sim, lambda: all(brake.extend_sw_activated for brake in brakes))
+    assert t == pytest.approx(expected_time(brake, brake.screw_pos_for_gap(brake._initial_gap), brake.screw_limit_sw_extend), rel=0.05)
+    settle(sim)
+    for brake in brakes:
+        assert brake.extend_sw_activated and not brake.retract_sw_activated
+        assert brake.gap == pytest.approx(brake.extended_gap)
+        assert brake.drive.lost_steps == 0
+
+    brakes.retract()
+    t = step_until(sim, lambda: all(brake.retract_sw_activated for brake in brakes))
+    assert t == pytest.approx(expected_time(brake, brake.screw_limit_sw_extend, brake.screw_limit_sw_retract), rel=0.05)
+    settle(sim)
+    for brake in brakes:
+        assert brake.retract_sw_activated and not brake.extend_sw_activated
+        assert brake.gap == pytest.approx(brake.retracted_gap)
+        assert brake.drive.lost_steps == 0
+
+    # And they stay there
+    for i in xrange(200):
+        sim.step(sim.fixed_timestep_usec)
+    assert all(brake.retract_sw_activated for brake in brakes)
+
+
+def test_hold_midway(make_sim):
+    sim = drive_sim(make_sim)
+    brakes = sim.pod.brakes
+    brakes.apply()
+    for i in xrange(1000):  # 1 s
+        sim.step(sim.fixed_timestep_usec)
+    brakes.hold()
+    settle(sim)
+    gaps = brakes.get_gaps()
+    for i in xrange(500):
+        sim.step(sim.fixed_timestep_usec)
+    assert brakes.get_gaps() == gaps
+    for brake in brakes:
+        assert brake.extended_gap < brake.gap < brake.retracted_gap
+        assert not brake.retract_sw_activated and not brake.extend_sw_activated
+
+
+def test_unpowered_motors_let_the_negator_close_the_brakes(make_sim):
+    sim = drive_sim(make_sim)
+    brakes = sim.pod.brakes
+    brakes.set_motor_power(False)
+    step_until(sim, lambda: all(brake.extend_sw_activated for brake in brakes))
+
+
+def overload(make_sim, multiple, n_msec):
+    """ Hold the screw midway, then push it toward retract with multiple * the holding torque for n_msec """
+    sim = drive_sim(make_sim)
+    brake = sim.pod.brakes[0]
+    drive = brake.drive
+    drive.reset(0.03)
+    drive.set_target(0.03)
+    force = -multiple * drive.holding_torque / drive.meters_per_radian
+    for i in xrange(1000):
+        brake.set_screw_pos(drive.step(1000, force if 100 <= i < 100 + n_msec else 0.0))
+    assert drive.is_steady()
+    return brake, drive
+
+
+def test_overload_loses_steps(make_sim):
+    brake, drive = overload(make_sim, 1.5, 5)
+
+    # Caught again a whole number of electrical cycles short of the command (in the extend direction)
+    assert drive.lost_steps > 0 and drive.lost_steps % 4 == 0
+    full_step = drive.step_angle * drive.microsteps * drive.meters_per_radian
+    assert drive.command * drive.meters_per_radian - brake.screw_pos == pytest.approx(drive.lost_steps * full_step, abs=full_step)
+
+
+def test_overload_can_lose_the_screw_to_a_hard_stop(make_sim):
+    brake, drive = overload(make_sim, 2.0, 5)
+
+    # Out of sync, the negator runs the screw to the end of its travel, where it's held
+    assert brake.screw_pos == pytest.approx(drive.angle_range[1] * drive.meters_per_radian)
+    assert brake.extend_sw_activated
+    assert drive.lost_steps < 0
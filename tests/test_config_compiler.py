@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+
+# Compiled, cached config (see config_compiler.py)
+
+import pytest
+
+from units import Units
+from config_compiler import ConfigCompiler, SIValue, compile_config
+
+
+def write(path, text):
+    path.write(text, mode='wb')
+    return str(path)
+
+
+def test_editing_a_file_invalidates_the_cache(tmpdir):
+    filename = write(tmpdir.join('a.yaml'), "sim:\n    mass: 350 kg\n")
+    compiler = ConfigCompiler(cache_dir=str(tmpdir.join('cache')))
+
+    config = compiler.load([filename])
+    key = compiler.cache_key([open(filename, 'rb').read()])
+    assert config.sim.mass == 350.0
+    assert tmpdir.join('cache', key + '.pickle').check()
+
+    write(tmpdir.join('a.yaml'), "sim:\n    mass: 400 kg\n")
+    assert compiler.cache_key([open(filename, 'rb').read()]) != key
+    assert compiler.load([filename]).sim.mass == 400.0
+
+    # A new compiler (e.g. another process) sees the edit too, rather than the first file's cache entry
+    assert ConfigCompiler(cache_dir=str(tmpdir.join('cache'))).load([filename]).sim.mass == 400.0
+
+
+def test_moving_text_between_files_changes_the_key():
+    assert ConfigCompiler.cache_key(["ab", "c"]) != ConfigCompiler.cache_key(["a", "bc"])
+
+
+def test_each_load_is_independent(tmpdir):
+    filename = write(tmpdir.join('a.yaml'), "sim:\n    pod:\n        mass: 350 kg\n    working_dir: a\n")
+    compiler = ConfigCompiler(cache_dir=None)
+
+    first = compiler.load([filename])
+    second = compiler.load([filename])
+    first.sim.override('working_dir', 'b')
+    first.sim.pod.override('mass', 1.0)
+
+    assert second.sim.working_dir == 'a'
+    assert second.sim.pod.mass == 350.0
+    assert compiler.load([filename]).sim.pod.mass == 350.0
+
+
+def test_compiled_config_is_read_only():
+    config = compile_config({'mass': '350 kg'})
+    with pytest.raises(TypeError):
+        config.mass = 1.0
+
+
+@pytest.mark.parametrize('text', ['50 Hz', '1.5 G', '-0.1 G', '100 usec', '2.5 s', '10 mm', '3 ft', '18 psi', '4 m/s',
+                                  '0.1 kg/m^3', '1e-3 m', '.5 m'])
+def test_si_value_matches_units(text):
+    value = compile_config({'x': text}).x
+    assert isinstance(value, SIValue)
+    assert value.text == text
+    assert str(value) == text
+    assert float(value) == pytest.approx(Units.SI(text), rel=1e-12)
+    assert Units.SI(value) == pytest.approx(Units.SI(text), rel=1e-12)
+    if Units.registry().parse_expression(text).dimensionality == Units.registry().parse_expression('1 s').dimensionality:
+        assert Units.usec(value) == pytest.approx(Units.usec(text), rel=1e-12)
+
+
+@pytest.mark.parametrize('text', ['127.0.0.1', 'some name', '4 *pi', 'spacex_tube'])
+def test_other_strings_are_left_alone(text):
+    assert compile_config({'x': text}).x == text
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+
+# Chunked csv reading and min/max decimation (see csv_chunks.py)
+
+import numpy as np
+import pytest
+
+from csv_chunks import CsvChunkReader, MinMaxDecimator, decimate_csv
+
+
+def write_csv(path, n_rows=1000, seed=1):
+    """ A small pod.csv-like file with a few spikes. Returns (filename, t, v) """
+    rng = np.random.RandomState(seed)
+    t = np.arange(n_rows) * 0.005
+    v = np.sin(t) + rng.normal(0.0, 0.01, n_rows)
+    v[123] = 50.0
+    v[777] = -50.0
+    with open(str(path), 'wb') as f:
+        f.write("t,v,n\n")
+        for i in xrange(n_rows):
+            f.write("{!r},{!r},{}\n".format(t[i], v[i], i))
+    return str(path), t, v
+
+
+@pytest.mark.parametrize('chunk_bytes', [7, 64, 1000, 4*1024*1024])
+def test_chunks_split_on_row_boundaries(tmpdir, chunk_bytes):
+    filename, t, v = write_csv(tmpdir.join('pod.csv'))
+    chunks = list(CsvChunkReader(filename, chunk_bytes=chunk_bytes))
+
+    # Every row exactly once, in order, whatever the chunk size
+    n = np.concatenate([chunk['n'] for chunk in chunks])
+    assert np.array_equal(n, np.arange(len(t)))
+    assert np.array_equal(np.concatenate([chunk['t'] for chunk in chunks]), t)
+    assert np.array_equal(np.concatenate([chunk['v'] for chunk in chunks]), v)
+    if chunk_bytes < 1000:
+        assert len(chunks) > 1
+
+
+def test_last_row_without_a_newline(tmpdir):
+    path = tmpdir.join('pod.csv')
+    path.write("t,v\n0,1\n1,2\n2,3", mode='wb')
+    chunks = list(CsvChunkReader(str(path), ['v'], chunk_bytes=5))
+    assert list(np.concatenate([chunk['v'] for chunk in chunks])) == [1.0, 2.0, 3.0]
+
+
+def test_missing_columns_are_reported(tmpdir):
+    filename, t, v = write_csv(tmpdir.join('pod.csv'))
+    with pytest.raises(ValueError):
+        CsvChunkReader(filename, ['t', 'x'])
+
+
+def test_decimation_keeps_the_extremes_of_each_block():
+    rng = np.random.RandomState(2)
+    x = np.arange(1000, dtype=float)
+    y = rng.normal(0.0, 1.0, 1000)
+    block_rows = 10
+
+    decimator = MinMaxDecimator(block_rows)
+    # Uneven pieces, so that blocks straddle the chunks
+    for start, end in [(0, 3), (3, 250), (250, 251), (251, 999), (999, 1000)]:
+        decimator.add(x[start:end], y[start:end])
+    dx, dy = decimator.result()
+
+    assert len(dy) == 2 * len(y) // block_rows
+    for block in xrange(len(y) // block_rows):
+        rows = slice(block * block_rows, (block + 1) * block_rows)
+        pair = dy[2 * block:2 * block + 2]
+        assert sorted(pair) == [y[rows].min(), y[rows].max()]
+        # In the order they occurred, at their own x
+        assert list(dx[2 * block:2 * block + 2]) == sorted(x[rows][[y[rows].argmin(), y[rows].argmax()]])
+        assert list(y[dx[2 * block:2 * block + 2].astype(int)]) == list(pair)
+
+
+def test_decimation_keeps_leftover_rows():
+    decimator = MinMaxDecimator(4)
+    decimator.add(np.arange(10.0), np.arange(10.0))
+    dx, dy = decimator.result()
+    assert list(dx) == [0.0, 3.0, 4.0, 7.0, 8.0, 9.0]
+
+
+@pytest.mark.parametrize('chunk_bytes', [64, 4*1024*1024])
+def test_decimate_csv_keeps_the_spikes(tmpdir, chunk_bytes):
+    filename, t, v = write_csv(tmpdir.join('pod.csv'))
+    (x, y), = decimate_csv(filename, [('t', 'v')], max_points=100, chunk_bytes=chunk_bytes).values()
+
+    assert len(y) < len(v) / 4
+    assert y.max() == v.max() == 50.0
+    assert y.min() == v.min() == -50.0
+    assert x[y.argmax()] == t[123]
+    assert x[y.argmin()] == t[777]
+    assert np.all(np.diff(x) > 0)
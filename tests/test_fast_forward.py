@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+
+# Fast-forwarding through quasi-steady phases (see fast_forward.py)
+
+import os
+
+import numpy as np
+import pytest
+
+from conftest import end_run
+
+
+PUSH_AT_USEC = 2000000
+BRAKE_AT_USEC = 9000000
+END_USEC = 16000000
+
+
+def pushing(sim):
+    """ Is the pusher pushing the pod (rather than just resting against it)? """
+    return sim.pusher.state == 'PUSH' or (sim.pod.pusher_in_contact() and sim.pusher.velocity != 0.0)
+
+
+def run(sim):
+    """
+    Wait at rest, push, coast and then apply the brakes. Returns a list of (step length, whether anything was pushing
+    or moving the brakes during the step).
+    """
+    brakes = sim.pod.brakes
+    steps = []
+    pushed = False
+    while sim.elapsed_time_usec < END_USEC:
+        if sim.elapsed_time_usec >= PUSH_AT_USEC and not pushed:
+            sim.pusher.start_push()
+            pushed = True
+        if sim.elapsed_time_usec >= BRAKE_AT_USEC and brakes.gap_target[0] != brakes[0].extended_gap:
+            brakes.apply()
+
+        # Note: as for the push in scenarios.py, the wait is cut short so that everything happens at the same times
+        dt_usec = sim.next_step_usec()
+        for t_usec in (PUSH_AT_USEC, BRAKE_AT_USEC, END_USEC):
+            if sim.elapsed_time_usec < t_usec:
+                dt_usec = min(dt_usec, max(sim.fixed_timestep_usec, t_usec - sim.elapsed_time_usec))
+                break
+
+        was_pushing = pushing(sim)
+        gaps = brakes.get_gaps()
+        sim.step(dt_usec)
+        busy = was_pushing or pushing(sim) or brakes.get_gaps() != gaps
+        steps.append((dt_usec, busy))
+    end_run(sim)
+    return steps
+
+
+def read(sim, name):
+    return np.genfromtxt(os.path.join(sim.config.working_dir, name), delimiter=',', names=True)
+
+
+@pytest.mark.parametrize('brake_drive', [False, True])
+def test_fast_forward_matches_fixed_steps(make_sim, brake_drive):
+    overrides = {'pusher': {'max_push_time': '3 s'}, 'pod': {'brake_drive': {'enabled': brake_drive}}}
+    fixed_sim = make_sim(dict(overrides, fast_forward={'enabled': False}))
+    ff_sim = make_sim(dict(overrides, fast_forward={'enabled': True}))
+    assert fixed_sim.fast_forward is None
+
+    fixed_steps = run(fixed_sim)
+    ff_steps = run(ff_sim)
+    fixed = fixed_sim.fixed_timestep_usec
+
+    # Far fewer steps, but never a long one while the pusher is pushing or the brakes are moving
+    assert set(dt for dt, busy in fixed_steps) == set([fixed])
+    assert len(ff_steps) < len(fixed_steps) * 0.8
+    assert any(busy for dt, busy in ff_steps)
+    assert all(dt == fixed for dt, busy in ff_steps if busy)
+    assert ff_sim.fast_forward.n_steps > 0
+
+    # The same samples (one per fixed timestep) with about the same values (a long step's velocity change is at most max_dv)
+    for name, tolerances in (('pod.csv', {'pod_position': 0.02, 'pod_velocity': 0.02}),
+                             ('pusher.csv', {'pusher_position': 0.02, 'pusher_velocity': 0.02})):
+        fixed_data = read(fixed_sim, name)
+        ff_data = read(ff_sim, name)
+        assert fixed_data.dtype.names == ff_data.dtype.names
+        time_column = fixed_data.dtype.names[0]
+        assert np.array_equal(fixed_data[time_column], ff_data[time_column]), name
+        for column, tolerance in tolerances.items():
+            assert np.abs(fixed_data[column] - ff_data[column]).max() < tolerance, (name, column)
+
+    # It went somewhere, and stopped
+    assert fixed_sim.pod.position > 100.0
+    assert ff_sim.pod.velocity == pytest.approx(fixed_sim.pod.velocity, abs=0.02)
+    assert ff_sim.pod.position == pytest.approx(fixed_sim.pod.position, abs=0.02)
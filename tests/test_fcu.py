@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+
+# The FCU's brake sensors, from the stepper position callbacks (see fcu.StepDriveBridge)
+
+import pytest
+
+from fcu import StepDriveBridge
+
+
+class StubLib(object):
+    """ Records the DLL calls """
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        def call(*args):
+            self.calls.append((name,) + args)
+        return call
+
+    def take(self):
+        calls, self.calls = self.calls, []
+        return calls
+
+
+@pytest.fixture
+def bridge(make_sim):
+    sim = make_sim()
+    lib = StubLib()
+    bridge = StepDriveBridge(sim, lib)
+    sim.add_step_listener(bridge)
+
+    # The DLL starts with MLP 0 and the switches open (see Fcu.fcu_init()), so the first push() sends the brakes' state
+    bridge.push()
+    assert lib.take() == [
+        ('vFCU_BRAKES_MLP_WIN32__ForceADC', 0, mlp(sim, 0)),
+        ('vFCU_BRAKES_SW_WIN32__Inject_SwitchState', 0, StepDriveBridge.EXTEND, 0),
+        ('vFCU_BRAKES_SW_WIN32__Inject_SwitchState', 0, StepDriveBridge.RETRACT, 0),
+        ('vFCU_BRAKES_MLP_WIN32__ForceADC', 1, mlp(sim, 1)),
+        ('vFCU_BRAKES_SW_WIN32__Inject_SwitchState', 1, StepDriveBridge.EXTEND, 0),
+        ('vFCU_BRAKES_SW_WIN32__Inject_SwitchState', 1, StepDriveBridge.RETRACT, 0),
+    ]
+    return sim, bridge, lib
+
+
+def step(sim, bridge, positions):
+    """ The motors' steps during one sim step, then the FCU's next push() """
+    for motor_index, position in positions:
+        bridge.update_position(motor_index, position)
+    sim.step(sim.fixed_timestep_usec)
+    bridge.push()
+
+
+def mlp(sim, i):
+    return int(round(sim.pod.brakes[i].mlp_raw))
+
+
+def test_one_update_per_batch_of_steps(bridge):
+    sim, bridge, lib = bridge
+
+    # Mid-travel: only the last of the steps counts
+    step(sim, bridge, [(0, position) for position in xrange(30000, 30101)])
+    assert sim.pod.brakes[0].screw_pos == pytest.approx(0.0301)
+    assert lib.take() == [
+        ('vFCU_BRAKES_MLP_WIN32__ForceADC', 0, mlp(sim, 0)),
+        ('vFCU_BRAKES_SW_WIN32__Inject_SwitchState', 0, StepDriveBridge.EXTEND, 0),
+        ('vFCU_BRAKES_SW_WIN32__Inject_SwitchState', 0, StepDriveBridge.RETRACT, 0),
+    ]
+
+    # Nothing moved, nothing to send
+    step(sim, bridge, [])
+    bridge.push()
+    assert lib.take() == []
+
+
+def test_switch_isrs_fire_for_every_batch_while_a_switch_is_activated(bridge):
+    sim, bridge, lib = bridge
+
+    step(sim, bridge, [(0, 72000), (1, 100)])
+    assert lib.take() == [
+        ('vFCU_BRAKES_MLP_WIN32__ForceADC', 0, mlp(sim, 0)),
+        ('vFCU_BRAKES_SW_WIN32__Inject_SwitchState', 0, StepDriveBridge.EXTEND, 1),
+        ('vFCU_BRAKES_SW__Left_SwitchExtend_ISR',),
+        ('vFCU_BRAKES_MLP_WIN32__ForceADC', 1, mlp(sim, 1)),
+        ('vFCU_BRAKES_SW_WIN32__Inject_SwitchState', 1, StepDriveBridge.RETRACT, 1),
+        ('vFCU_BRAKES_SW__Left_SwitchRetract_ISR',),
+    ]
+
+    # Further into the switches: the same MLP values (clamped), but the ISRs fire again
+    step(sim, bridge, [(0, 72100), (1, 50)])
+    assert lib.take() == [
+        ('vFCU_BRAKES_SW_WIN32__Inject_SwitchState', 0, StepDriveBridge.EXTEND, 1),
+        ('vFCU_BRAKES_SW__Left_SwitchExtend_ISR',),
+        ('vFCU_BRAKES_SW_WIN32__Inject_SwitchState', 1, StepDriveBridge.RETRACT, 1),
+        ('vFCU_BRAKES_SW__Left_SwitchRetract_ISR',),
+    ]
+
+    # Off the switch
+    step(sim, bridge, [(1, 20000)])
+    assert lib.take() == [
+        ('vFCU_BRAKES_MLP_WIN32__ForceADC', 1, mlp(sim, 1)),
+        ('vFCU_BRAKES_SW_WIN32__Inject_SwitchState', 1, StepDriveBridge.EXTEND, 0),
+        ('vFCU_BRAKES_SW_WIN32__Inject_SwitchState', 1, StepDriveBridge.RETRACT, 0),
+    ]
+
+
+def test_unmoved_motors_are_sent_again_after_a_reset(bridge):
+    sim, bridge, lib = bridge
+    step(sim, bridge, [(1, 100)])
+    lib.take()
+
+    # Fcu.fcu_init() has set the DLL's MLP values to 0 and opened the switches
+    bridge.reset()
+    bridge.push()
+    assert lib.take() == [
+        ('vFCU_BRAKES_MLP_WIN32__ForceADC', 0, mlp(sim, 0)),
+        ('vFCU_BRAKES_SW_WIN32__Inject_SwitchState', 0, StepDriveBridge.EXTEND, 0),
+        ('vFCU_BRAKES_SW_WIN32__Inject_SwitchState', 0, StepDriveBridge.RETRACT, 0),
+        ('vFCU_BRAKES_SW_WIN32__Inject_SwitchState', 1, StepDriveBridge.RETRACT, 1),
+        ('vFCU_BRAKES_SW__Left_SwitchRetract_ISR',),
+    ]
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+
+# Live config edits (see live_config.py)
+
+import pytest
+
+from live_config import LiveConfigEditor
+
+
+def test_edits_are_applied_to_the_components(make_sim):
+    sim = make_sim()
+    editor = LiveConfigEditor(sim)
+    aero = sim.pod.force_exerters['aero']
+    k = aero.air_resistance_k
+    gap_close_speed = sim.pod.brakes.gap_close_speed[1]
+
+    changes = editor.edit(['pod.forces.aero.drag_coefficient=2.3698', 'pod.brakes.1.gap.gap_close_min_time=2 s',
+                           'pusher.push_accel=0.5 G'])
+    assert [path for path, old, new in changes] == ['pod.forces.aero.drag_coefficient', 'pod.brakes.1.gap.gap_close_min_time', 'pusher.push_accel']
+    assert abs(aero.air_resistance_k - 2 * k) < 1e-9
+    assert abs(sim.pod.brakes.gap_close_speed[1] - gap_close_speed * 2.5 / 2.0) < 1e-9   # From 2.5 s
+    assert sim.pod.brakes.gap_close_speed[0] == gap_close_speed
+    assert abs(sim.pusher.push_accel - 0.5 * 9.80665) < 1e-9
+
+
+def test_a_bad_edit_rolls_back_the_whole_batch(make_sim):
+    sim = make_sim()
+    editor = LiveConfigEditor(sim)
+    push_accel = sim.pusher.push_accel
+    with pytest.raises(ValueError) as e:
+        editor.edit(['pusher.push_accel=0.5 G', 'pusher.brake_decel=very fast'])
+    assert 'pusher.brake_decel' in str(e.value)
+    assert sim.pusher.push_accel == push_accel
+    assert str(sim.config.pusher.push_accel) == '1.0 G'
+
+    # Not editable
+    with pytest.raises(ValueError):
+        editor.edit(['pusher.push_accel=0.5 G', 'pod.mass=300 kg'])
+    assert sim.pusher.push_accel == push_accel
+
+
+def test_bare_numbers_need_units_where_the_config_has_them(make_sim):
+    sim = make_sim()
+    editor = LiveConfigEditor(sim)
+    with pytest.raises(ValueError) as e:
+        editor.edit(['sensors.accel.0.noise.scale=0.5'])
+    assert 'needs units' in str(e.value)
+
+    editor.edit(['sensors.accel.0.noise.scale=0.5 G'])
+    assert abs(sim.sensors['accel'][0].noise_scale - 0.5 * 9.80665) < 1e-9
+    editor.edit(['pod.forces.aero.drag_coefficient=1'])   # Dimensionless
+    assert sim.config.pod.forces.aero.drag_coefficient == 1
+
+
+def test_edits_survive_a_reset(make_sim):
+    sim = make_sim()
+    LiveConfigEditor(sim).edit(['pusher.push_accel=0.5 G', 'pusher.max_push_time=3 s'])
+    sim.reset()
+    assert abs(sim.pusher.push_accel - 0.5 * 9.80665) < 1e-9
+    assert sim.pusher.max_push_time == 3.0
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+
+# Reproducible sensor noise (see noise.py)
+
+import os
+
+import numpy as np
+
+from conftest import end_run
+from noise import NoiseStream, derive_seed
+
+
+class Recorder(object):
+    """ Sensor listener that keeps the samples """
+
+    def __init__(self):
+        self.samples = []
+
+    def step_callback(self, sensor, step_samples):
+        self.samples.extend(step_samples)
+
+
+def run(sim, n_steps=400, push_at=100):
+    for i in xrange(n_steps):
+        if i == push_at:
+            sim.pusher.start_push()
+        sim.step(sim.fixed_timestep_usec)
+    end_run(sim)
+
+
+def read_accel(sim):
+    with open(os.path.join(sim.config.working_dir, 'accel_0.csv'), 'rb') as f:
+        return f.read()
+
+
+def test_same_seed_same_noise(make_sim):
+    sims = [make_sim({'noise': {'seed': seed}}) for seed in (7, 7, 8)]
+    for sim in sims:
+        run(sim)
+    first, second, other_seed = [read_accel(sim) for sim in sims]
+
+    assert len(first.splitlines()) > 50
+    assert first == second
+    assert first != other_seed
+
+
+def add_accel(sim, sensor_id):
+    """ Another accelerometer like accel 0, stepped by the sim """
+    from config import Config
+    from sensor_accel import Accelerometer
+    config = sim.config.sensors.accel[0].to_dict()
+    config['id'] = sensor_id
+    sensor = Accelerometer(sim, Config(config))
+    sim.sensors['accel'].append(sensor)
+    return sensor
+
+
+def test_each_sensor_has_its_own_stream(make_sim):
+    sim = make_sim()
+    sensors = [sim.sensors['accel'][0], add_accel(sim, 1), add_accel(sim, 2)]
+    recorders = []
+    for sensor in sensors:
+        recorders.append(Recorder())
+        sensor.add_step_listener(recorders[-1])
+    run(sim)
+
+    # The same real values, with different noise
+    real = [[sample[4:] for sample in recorder.samples] for recorder in recorders]
+    raw = [[sample[1:4] for sample in recorder.samples] for recorder in recorders]
+    assert len(real[0]) > 50
+    assert real[0] == real[1] == real[2]
+    assert raw[0] != raw[1] and raw[0] != raw[2] and raw[1] != raw[2]
+
+    # Keyed by the run seed and the sensor's kind and id
+    assert [sensor.noise.seed for sensor in sensors] == [derive_seed(1, 'Accelerometer', i) for i in xrange(3)]
+    assert derive_seed(1, 'Accelerometer', 0) != derive_seed(1, 'LaserOptoSensor', 0)
+    assert derive_seed(1, 'Accelerometer', 0) != derive_seed(2, 'Accelerometer', 0)
+
+
+def test_reset_rewinds_the_noise(make_sim, tmpdir):
+    sim = make_sim()
+    run(sim)
+    first = read_accel(sim)
+
+    sim.reset(working_dir=str(tmpdir.join('second')))
+    run(sim)
+    assert read_accel(sim) == first
+
+
+def test_blocks_are_seamless():
+    whole = NoiseStream(5, block_size=1024).standard_normal(1000)
+    stream = NoiseStream(5, block_size=16)
+    pieces = np.concatenate([stream.standard_normal(n) for n in (3, 13, 16, 1, 40, 927)])
+    assert np.array_equal(pieces, whole)
+
+    stream.reset()
+    assert np.array_equal(stream.standard_normal(1000), whole)
+
+
+def accel_samples(make_sim, noise_enabled):
+    sim = make_sim({'sensors': {'accel': {0: {'noise': {'enabled': noise_enabled}}}}})
+    recorder = Recorder()
+    sim.sensors['accel'][0].add_step_listener(recorder)
+    run(sim)
+    return sim.sensors['accel'][0], recorder.samples
+
+
+def test_disabled_noise(make_sim):
+    sensor, samples = accel_samples(make_sim, False)
+    noisy_sensor, noisy_samples = accel_samples(make_sim, True)
+
+    # The same real values either way (the pod's acceleration and gravity)...
+    assert [sample[4:] for sample in samples] == [sample[4:] for sample in noisy_samples]
+    assert set(sample.real_z for sample in samples) == set([9.81])
+
+    # ...and without noise the raw values are exactly the real ones
+    real = np.array([sample[4:] for sample in samples])
+    raw = np.array([sample[1:4] for sample in samples])
+    assert np.array_equal(raw, np.interp(real, sensor.sensor_input_range, sensor.sensor_output_range).astype(int))
+    noisy_raw = np.array([sample[1:4] for sample in noisy_samples])
+    assert not np.array_equal(noisy_raw, raw)
+    assert 30 < (noisy_raw - raw).std() < 55    # 0.02 G is about 41 counts
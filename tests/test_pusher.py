@@ -1,2 +1,45 @@
 #!/usr/bin/env python
 
+# Push profiles (see pusher_profiles.py)
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'rloopsim'))
+
+from pusher_profiles import PusherProfile
+
+
+def advance(profile, t_end, n, mass=1.0):
+    """ Push from rest for t_end seconds in n steps; returns the velocity and position """
+    velocity = position = t = 0.0
+    dt = t_end / n
+    for i in xrange(n):
+        x = t if profile.kind == 'accel_vs_time' else position
+        dv, distance = profile.advance(x, velocity, dt, mass)
+        velocity += dv
+        position += distance
+        t += dt
+    return velocity, position
+
+
+def test_accel_vs_time_is_exact_for_any_step():
+    profile = PusherProfile({'name': 'ramp', 'kind': 'accel_vs_time', 'units': ['s', 'm/s^2'],
+                             'points': [[0.0, 0.0], [1.0, 10.0], [2.0, 10.0], [2.5, 0.0]]})
+    # v = 5 + 10 + 2.5; x = 5/3 (ramp) + 5*1 + 10/2 (hold) + 15*0.5 + 10*0.25/2 - 20*0.125/6 (ramp down) + 17.5*0.5 (after)
+    expected = (17.5, 5/3.0 + 10.0 + 7.5 + 1.25 - 5/12.0 + 8.75)
+    for n in (1, 7, 1000):
+        velocity, position = advance(profile, 3.0, n)
+        assert abs(velocity - expected[0]) < 1e-9
+        assert abs(position - expected[1]) < 1e-9
+    assert profile.finished(2.5)
+    assert profile.value(1.5) == 10.0
+
+
+def test_force_vs_position_follows_the_work_done():
+    profile = PusherProfile({'name': 'constant', 'kind': 'force_vs_position', 'units': ['m', 'kN'],
+                             'points': [[0.0, 2.0], [1000.0, 2.0]]})
+    # 2 kN on 1000 kg is 2 m/s^2
+    velocity, position = advance(profile, 5.0, 500, mass=1000.0)
+    assert abs(velocity - 10.0) < 1e-3
+    assert abs(position - 25.0) < 1e-2
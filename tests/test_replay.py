@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+
+# Replaying recorded sensor data (see replay.py)
+
+import os
+
+import numpy as np
+import pytest
+
+from conftest import ROOT
+from replay import ReplaySensor, _derive_accel
+
+
+def write_recording(path, duration_usec=1000000, accel_columns='t,x,y,z,extra'):
+    """ A test weekend style recording: accel_0 (real x = t in seconds) every 10 ms, laser_opto_* every 4 ms, laser_dist every 20 ms """
+    def write(name, headers, interval_usec, row):
+        with open(os.path.join(str(path), name + '.csv'), 'wb') as f:
+            f.write(headers + '\n')
+            for t in xrange(0, duration_usec, interval_usec):
+                f.write(','.join(repr(value) for value in row(t)) + '\n')
+    write('accel_0', accel_columns, 10000, lambda t: (t, t / 1000000.0, 0.0, 9.81, 1))
+    for i in xrange(4):
+        write('laser_opto_{}'.format(i), 't_usec,height', 4000, lambda t: (t, 0.024))
+    write('laser_dist', 't_usec,distance', 20000, lambda t: (t, 1260.0 - t / 1000000.0))
+    return str(path)
+
+
+class Recorder(object):
+    """ Sensor listener that keeps the samples """
+
+    def __init__(self):
+        self.samples = []
+
+    def step_callback(self, sensor, step_samples):
+        self.samples.extend(step_samples)
+
+
+@pytest.fixture
+def replay_sim(make_sim, tmpdir):
+    def make(duration_usec=1000000, accel_columns='t,x,y,z,extra', **replay):
+        source = write_recording(tmpdir.mkdir('recording{}'.format(len(tmpdir.listdir()))), duration_usec, accel_columns)
+        replay = dict({'enabled': True, 'source': source, 'physics': False}, **replay)
+        sim = make_sim({'replay': replay})
+        recorder = Recorder()
+        sim.sensors['accel'][0].add_step_listener(recorder)
+        return sim, recorder
+    return make
+
+
+def run(sim, n_steps):
+    for i in xrange(n_steps):
+        sim.step(sim.fixed_timestep_usec)
+
+
+def test_default_source_exists():
+    from sim import Sim
+    config = Sim.load_config_files([os.path.join(ROOT, 'conf', 'sim_config.yaml')])
+    source = os.path.join(ROOT, config.replay.source)
+    assert os.path.isdir(source)
+    for kind, channels in config.replay.channels.iteritems():
+        for channel in ([channels] if isinstance(channels, basestring) else channels):
+            assert os.path.isfile(os.path.join(source, channel + '.csv'))
+
+
+def test_columns_are_mapped_to_the_sensor_fields(replay_sim):
+    sim, recorder = replay_sim()
+    sensor = sim.sensors['accel'][0]
+    assert isinstance(sensor, ReplaySensor)
+    assert sensor.column_fields.keys() == ['t', 'x', 'y', 'z']   # 'extra' isn't a field
+
+    run(sim, 100)   # 0.5 s
+    samples = recorder.samples
+    assert len(samples) == 50
+    assert all(type(sample) is sensor.data for sample in samples)
+    assert [sample.t_usec for sample in samples] == range(0, 500000, 10000)
+    assert all(isinstance(sample.t_usec, int) for sample in samples)
+    assert [sample.real_x for sample in samples] == [t / 1000000.0 for t in xrange(0, 500000, 10000)]
+    assert set(sample.real_z for sample in samples) == set([9.81])
+    # The raw values are derived from the real ones
+    real_x = np.array([sample.real_x for sample in samples])
+    assert [sample.raw_x for sample in samples] == np.interp(real_x, sensor.sensor_input_range, sensor.sensor_output_range).astype(int).tolist()
+
+    # And the other sensors are replayed too
+    assert sim.sensors['laser_dist'].n_samples == 25
+    assert all(s.n_samples == 125 for s in sim.sensors['laser_opto'])
+
+
+def test_aliases(replay_sim):
+    sim, recorder = replay_sim(accel_columns='t,ax,y,z,extra', aliases={'accel': {'ax': 'real_x'}})
+    run(sim, 10)
+    assert [sample.real_x for sample in recorder.samples] == [0.0, 0.01, 0.02, 0.03, 0.04]
+
+
+def test_unmapped_time_column(replay_sim):
+    with pytest.raises(ValueError):
+        replay_sim(accel_columns='time,x,y,z,extra')
+
+
+def test_derive_accel():
+    class StubAccelerometer(object):
+        sensor_input_range = (-39.2266, 39.2266)
+        sensor_output_range = (-8192, 8192)
+
+    real = np.array([-50.0, -9.81, 0.0, 1.0, 9.81, 50.0])
+    fields = {'real_x': real, 'real_z': real, 'raw_z': np.arange(6)}
+    _derive_accel(StubAccelerometer(), fields, len(real))
+
+    assert fields['raw_x'].tolist() == [-8192, -2048, 0, 208, 2048, 8192]
+    assert fields['raw_x'].dtype.kind == 'i'
+    assert fields['raw_z'].tolist() == range(6)     # Recorded, so left alone
+    assert 'raw_y' not in fields                    # Nothing to derive it from
+
+
+def test_seek(replay_sim):
+    sim, recorder = replay_sim()
+    run(sim, 20)    # 0.1 s
+    del recorder.samples[:]
+
+    sim.replay.seek('0.5 s')
+    assert sim.replay.recorded_time_usec() == 500000
+    run(sim, 20)
+
+    # Recorded 0.5 s on, at sim times carrying on from 0.1 s
+    samples = recorder.samples
+    assert [sample.real_x for sample in samples] == [t / 1000000.0 for t in xrange(500000, 600000, 10000)]
+    assert [sample.t_usec for sample in samples] == range(100000, 200000, 10000)
+
+    # And back again
+    sim.replay.seek('0.2 s')
+    del recorder.samples[:]
+    run(sim, 2)
+    assert [sample.real_x for sample in recorder.samples] == [0.2]
+
+
+def test_set_time_scale_is_continuous(replay_sim):
+    sim, recorder = replay_sim()
+    run(sim, 20)    # 0.1 s
+    recorded_usec = sim.replay.recorded_time_usec()
+
+    sim.replay.set_time_scale(2.0)
+    assert sim.replay.recorded_time_usec() == recorded_usec
+    run(sim, 20)    # Another 0.1 s of sim time is 0.2 s of the recording
+
+    samples = recorder.samples
+    recorded = [int(round(sample.real_x * 1000000)) for sample in samples]
+    assert recorded == range(0, 300000, 10000)      # No gaps or repeats
+    t_usec = [sample.t_usec for sample in samples]
+    assert t_usec[:10] == range(0, 100000, 10000)
+    assert t_usec[10:] == range(100000, 200000, 5000)
+
+
+def test_ends_when_the_recording_runs_out(replay_sim):
+    sim, recorder = replay_sim(duration_usec=200000)
+    sim.run()
+    assert all(sensor.done for sensor in sim.replay.sensors)
+    assert 195000 <= sim.elapsed_time_usec <= 205000
+    assert len(recorder.samples) == 20
+
+
+def test_keeps_going_without_end_when_done(replay_sim):
+    sim, recorder = replay_sim(duration_usec=200000, end_when_done=False)
+    run(sim, 60)
+    assert all(sensor.done for sensor in sim.replay.sensors)
+    assert not sim.replay.is_finished(sim)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+
+# Single file run archives (see run_archive.py)
+
+import os
+
+import numpy as np
+import pytest
+
+from conftest import end_run
+from run_archive import RunArchiveWriter, RunArchive
+
+
+def write_archive(filename, n_rows=100, chunk_rows=10):
+    """ One channel with int and float columns, in chunks of chunk_rows. Returns the rows. """
+    rows = [(i * 1000, i * 0.5, i + 2**53) for i in xrange(n_rows)]
+    writer = RunArchiveWriter(filename, {'note': 'test'})
+    writer.add_channel('pod', ['t_usec', 'x', 'big'])
+    for start in xrange(0, n_rows, chunk_rows):
+        writer.add_chunk('pod', rows[start:start + chunk_rows])
+    writer.close()
+    return rows
+
+
+@pytest.fixture
+def archive(tmpdir):
+    filename = str(tmpdir.join('run.rla'))
+    rows = write_archive(filename)
+    archive = RunArchive(filename)
+    yield archive, np.array([row[0] for row in rows]), np.array([row[1] for row in rows])
+    archive.close()
+
+
+def test_channels_and_metadata(archive):
+    archive, t, x = archive
+    assert archive.channels() == ['pod']
+    assert archive.columns('pod') == ['t_usec', 'x', 'big']
+    assert archive.n_rows('pod') == 100
+    assert archive.time_range('pod') == (0, 99000)
+    assert archive.meta['note'] == 'test'
+
+
+@pytest.mark.parametrize('t_start, t_end', [
+    (None, None),
+    (10000, 19000),     # Exactly one chunk
+    (9000, 10000),      # The last row of one chunk and the first of the next
+    (9500, 10500),
+    (19000, 19000),     # A single row at the end of a chunk
+    (20000, None),
+    (None, 0),
+    (99000, 200000),
+    (100000, 200000),   # After the end
+    (5500, 5600),       # Between two rows
+])
+def test_windowed_reads(archive, t_start, t_end):
+    archive, t, x = archive
+    mask = np.ones(len(t), dtype=bool)
+    if t_start is not None:
+        mask &= t >= t_start
+    if t_end is not None:
+        mask &= t <= t_end
+
+    values = archive.read('pod', ['x'], t_start, t_end)
+    assert values.keys() == ['x']
+    assert np.array_equal(values['x'], x[mask])
+    assert np.array_equal(archive.read('pod', t_start=t_start, t_end=t_end)['t_usec'], t[mask])
+
+
+def test_int_and_float_columns(archive):
+    archive, t, x = archive
+    values = archive.read('pod')
+    assert values['t_usec'].dtype == np.int64
+    assert values['x'].dtype == np.float64
+    # int64 columns are exact, even where a double isn't
+    assert values['big'].dtype == np.int64
+    assert values['big'][1] == 2**53 + 1
+    assert np.array_equal(values['x'], x)
+
+
+def test_unknown_columns(archive):
+    archive, t, x = archive
+    with pytest.raises(ValueError):
+        archive.read('pod', ['y'])
+
+
+def test_incomplete_archive(tmpdir):
+    filename = str(tmpdir.join('run.rla'))
+    writer = RunArchiveWriter(filename)
+    writer.add_channel('pod', ['t_usec', 'x'])
+    writer.add_chunk('pod', [(0, 1.0), (1000, 2.0)])
+    writer.f.flush()  # Not closed, e.g. the sim was killed
+
+    with pytest.raises(ValueError) as e:
+        RunArchive(filename)
+    assert 'incomplete' in str(e.value)
+    writer.close()
+
+    with open(filename, 'rb') as f:
+        data = f.read()
+    with open(filename, 'wb') as f:
+        f.write(data[:-3])  # Truncated footer
+    with pytest.raises(ValueError):
+        RunArchive(filename)
+
+
+@pytest.mark.parametrize('telemetry_sink', [True, False])
+def test_exported_csvs_match_the_sensor_csvs(make_sim, tmpdir, telemetry_sink):
+    sim = make_sim({'archive': {'enabled': True, 'chunk_rows': 64}, 'telemetry_sink': {'enabled': telemetry_sink}})
+    for i in xrange(500):
+        if i == 100:
+            sim.pusher.start_push()
+        sim.step(sim.fixed_timestep_usec)
+    end_run(sim)
+    working_dir = sim.config.working_dir
+
+    archive = RunArchive(os.path.join(working_dir, 'run.rla'))
+    assert 'working_dir: {}'.format(working_dir) in archive.meta['config']
+    for name in ('pod', 'pusher', 'accel_0'):
+        exported = str(tmpdir.join(name + '.csv'))
+        archive.export_csv(name, exported)
+        with open(exported, 'rb') as f:
+            exported_lines = f.read().splitlines()
+        with open(os.path.join(working_dir, name + '.csv'), 'rb') as f:
+            lines = f.read().splitlines()
+        assert exported_lines[0] == lines[0]
+        if telemetry_sink:
+            # The synchronous writer's file isn't closed (and so may be incomplete) until it's garbage collected
+            assert exported_lines == lines
+    archive.close()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+
+# Pod and track configurations run side by side (see scenarios.py)
+
+import os
+import csv
+
+import pytest
+import yaml
+
+from conftest import ROOT
+from scenarios import load_scenarios
+
+
+def test_compare_pods(tmpdir, monkeypatch):
+    monkeypatch.chdir(ROOT)  # Note: paths in the scenario file are relative to the top directory
+
+    # conf/scenarios/compare_pods.yaml, but short
+    with open(os.path.join(ROOT, 'conf', 'scenarios', 'compare_pods.yaml'), 'rb') as f:
+        scenario_config = yaml.load(f)
+    scenario_config['scenario']['duration'] = '4 s'
+    scenario_config['scenario']['push_at'] = '0.5 s'
+    filename = str(tmpdir.join('compare_pods.yaml'))
+    with open(filename, 'wb') as f:
+        yaml.dump(scenario_config, f)
+
+    output_dir = str(tmpdir.join('out'))
+    scenarios = load_scenarios(filename, output_dir)
+    scenarios.run()
+
+    with open(os.path.join(output_dir, 'scenarios.csv'), 'rb') as f:
+        rows = {row['name']: row for row in csv.DictReader(f)}
+
+    # One row per variant, each with its own outputs
+    variants = sorted(scenario_config['scenario']['variants'].keys())
+    assert sorted(rows.keys()) == variants
+    by_name = dict((scenario.name, scenario) for scenario in scenarios.scenarios)
+    for name in variants:
+        sim = by_name[name].sim
+        assert os.path.isfile(os.path.join(output_dir, name, 'pod.csv'))
+        assert sim.is_ended
+        assert float(rows[name]['sim_time']) <= 4.0 + sim.fixed_timestep_usec / 1000000.0
+        assert float(rows[name]['max_velocity']) > 0.0  # Pushed
+        assert float(rows[name]['pod_position']) == pytest.approx(sim.pod.position)
+
+        # The overrides for every variant, and the FCU is off
+        assert float(sim.config.pusher.max_push_time) == 8.0
+        assert sim.config.fast_forward.enabled
+        assert sim.fast_forward is not None
+        assert not sim.config.fcu.enabled
+
+    # ...and each variant's own
+    assert float(by_name['heavy'].sim.config.pod.mass) == 600.0
+    assert float(by_name['baseline'].sim.config.pod.mass) != 600.0
+    assert by_name['planned_push'].sim.config.pusher.profile == 'conf/pusher_profiles/planned_1g.json'
+    assert not by_name['baseline'].sim.config.pusher.profile
+    assert float(rows['outdoor']['track_length']) != float(rows['baseline']['track_length'])
+    assert float(rows['heavy']['track_length']) == float(rows['baseline']['track_length'])
+    assert by_name['heavy'].sim.pod.mass == 600.0
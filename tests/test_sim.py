@@ -0,0 +1,28 @@
+#!/usr/bin/env python
+
+# The sim's run loop (see sim.py)
+
+import pytest
+
+
+class EndAfterSteps(object):
+    """ End condition: a fixed number of steps """
+
+    def __init__(self, n_steps):
+        self.n_steps = n_steps
+
+    def is_finished(self, sim):
+        return sim.n_steps_taken >= self.n_steps
+
+
+@pytest.mark.parametrize('metrics_enabled', [False, True])
+def test_periodic_debug_output(make_sim, monkeypatch, metrics_enabled):
+    sim = make_sim({'metrics': {'enabled': metrics_enabled}})
+    assert (sim.metrics is not None) == metrics_enabled
+
+    steps = []
+    monkeypatch.setattr(sim, '_log_step_debug', lambda: steps.append(sim.n_steps_taken))
+    sim.add_end_condition(EndAfterSteps(1600))
+    sim.run()
+
+    assert steps == [500, 1000, 1500]
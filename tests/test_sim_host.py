@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+
+# Hosting sims in worker processes (see sim_host.py)
+
+import os
+import sys
+import time
+import Queue
+import threading
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'rloopsim'))
+
+from sim_host import SimHost, sim_worker, CMD_STOP, SIM_QUEUED, SIM_RUNNING, SIM_FINISHED, SIM_FAILED, FINAL_STATES
+
+# No FCU, and a short track so that a pushed pod ends the run in a few seconds of sim time
+OVERLAY = """
+sim:
+    fcu:
+        enabled: False
+    track:
+        length: 20 m
+    archive:
+        enabled: False
+"""
+
+
+@pytest.fixture
+def config_files(tmpdir, monkeypatch):
+    monkeypatch.chdir(ROOT)  # Note: paths in the config (e.g. force models) are relative to the top directory
+    overlay = tmpdir.join('overlay.yaml')
+    overlay.write(OVERLAY)
+    return [os.path.join(ROOT, 'conf', 'sim_config.yaml'), str(overlay)]
+
+
+def wait_for(hosted, states, timeout=60.0):
+    end_t = time.time() + timeout
+    while hosted.state not in states:
+        assert time.time() < end_t, "Sim {} is still {} ({})".format(hosted.sim_id, hosted.state, hosted.status['message'])
+        time.sleep(0.05)
+    return hosted.state
+
+
+def test_sims_are_queued_for_a_free_worker(config_files, tmpdir):
+    host = SimHost(max_sims=1, status_interval=0.05)
+    first = host.create(config_files, str(tmpdir.join('first')))               # Runs until stopped (no push)
+    second = host.create(config_files, str(tmpdir.join('second')), auto_push=True)
+
+    assert host.start(first.sim_id) == SIM_RUNNING
+    assert host.start(second.sim_id) == SIM_QUEUED
+    assert host.n_running == 1
+
+    # The queued sim gets the worker when the first one is done
+    host.stop(first.sim_id)
+    assert wait_for(first, FINAL_STATES) == SIM_FINISHED
+    assert wait_for(second, FINAL_STATES) == SIM_FINISHED
+    assert second.status['pod'][2] >= 20.0 - 5.0  # Pushed to (about) the end of the track
+    wait_for_value(lambda: host.n_running, 0)
+
+
+def wait_for_value(fn, value, timeout=10.0):
+    end_t = time.time() + timeout
+    while fn() != value:
+        assert time.time() < end_t
+        time.sleep(0.05)
+
+
+def test_created_and_queued_sims_can_be_stopped(config_files, tmpdir):
+    host = SimHost(max_sims=1, status_interval=0.05)
+    created = host.create(config_files, str(tmpdir.join('created')))
+    running = host.create(config_files, str(tmpdir.join('running')))
+    queued = host.create(config_files, str(tmpdir.join('queued')))
+
+    assert host.stop(created.sim_id) == SIM_FINISHED
+    with pytest.raises(ValueError):
+        host.start(created.sim_id)
+
+    host.start(running.sim_id)
+    host.start(queued.sim_id)
+    assert host.stop(queued.sim_id) == SIM_FINISHED
+    assert queued not in host.queued
+    assert queued.process is None  # Never started
+
+    host.stop(running.sim_id)
+    assert wait_for(running, FINAL_STATES) == SIM_FINISHED
+    wait_for_value(lambda: host.n_running, 0)
+    assert queued.process is None
+
+
+def test_stop_right_after_start_is_not_lost(config_files, tmpdir):
+    host = SimHost(max_sims=1, status_interval=0.05)
+    hosted = host.create(config_files, str(tmpdir.join('sim')))  # Would run forever without the stop
+    host.start(hosted.sim_id)
+    host.stop(hosted.sim_id)
+    assert wait_for(hosted, FINAL_STATES) == SIM_FINISHED
+
+
+def test_stop_before_the_run_loop_starts_is_not_lost(config_files, tmpdir, monkeypatch):
+    # Run the worker in this process, with the run held back until the stop has been handled
+    import sim
+    run = sim.Sim.run
+    def late_run(self):
+        time.sleep(1.0)
+        run(self)
+    monkeypatch.setattr(sim.Sim, 'run', late_run)
+
+    command_queue, status_queue = Queue.Queue(), Queue.Queue()
+    command_queue.put(CMD_STOP)
+    t = threading.Thread(target=sim_worker, args=(config_files, str(tmpdir.join('sim')), False, command_queue, status_queue, 0.05))
+    t.daemon = True
+    t.start()
+    t.join(30.0)
+    assert not t.is_alive(), "The stop was lost"
+    statuses = []
+    while not status_queue.empty():
+        statuses.append(status_queue.get())
+    assert statuses[-1]['state'] == SIM_FINISHED
+
+
+def test_worker_failures_are_reported(config_files, tmpdir):
+    host = SimHost(max_sims=2, status_interval=0.05)
+
+    # The sim can't be created
+    bad_config = tmpdir.join('bad.yaml')
+    bad_config.write("sim:\n    fixed_timestep: not a time\n")
+    bad = host.create(config_files + [str(bad_config)], str(tmpdir.join('bad')))
+    host.start(bad.sim_id)
+    assert wait_for(bad, FINAL_STATES) == SIM_FAILED
+    assert "Failed to create sim" in bad.status['message']
+
+    # The worker dies without saying anything
+    hosted = host.create(config_files, str(tmpdir.join('killed')))
+    host.start(hosted.sim_id)
+    wait_for_value(lambda: hosted.status['n_steps'] > 0, True)
+    hosted.process.terminate()
+    assert wait_for(hosted, FINAL_STATES) == SIM_FAILED
+    assert "exited unexpectedly" in hosted.status['message']
+    wait_for_value(lambda: host.n_running, 0)
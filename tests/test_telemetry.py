@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+
+# Telemetry snapshots for remote clients (see telemetry.py)
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'rloopsim'))
+
+from config import Config
+from telemetry import TelemetryStream
+
+
+class StubSim(object):
+    """ Just the time -- the snapshots are stubbed too """
+
+    def __init__(self):
+        self.elapsed_time_usec = 0
+
+    def step(self, stream, dt_usec=1000):
+        self.elapsed_time_usec += dt_usec
+        stream.step_callback(self)
+
+
+class StubStream(TelemetryStream):
+
+    @staticmethod
+    def snapshot(sim):
+        return sim.elapsed_time_usec
+
+
+def make_stream(queue_size=100, max_downsample_steps=2):
+    return StubStream(Config({'default_rate': '20 Hz', 'max_rate': '200 Hz', 'queue_size': queue_size,
+                              'max_downsample_steps': max_downsample_steps}))
+
+
+def test_snapshots_are_downsampled_to_the_rate():
+    stream = make_stream()
+    sim = StubSim()
+    fast = stream.subscribe(100)
+    slow = stream.subscribe()  # Default rate
+    for i in xrange(1000):
+        sim.step(stream)  # 1 ms steps
+    fast_times = fast.get(0)
+    assert len(fast_times) == 100
+    assert set(b - a for a, b in zip(fast_times, fast_times[1:])) == set([10000])
+    slow_times = slow.get(0)
+    assert len(slow_times) == 20
+    assert set(b - a for a, b in zip(slow_times, slow_times[1:])) == set([50000])
+
+
+def test_rate_is_capped_at_max_rate():
+    stream = make_stream()
+    assert stream.subscribe(1000).rate_hz == 200
+    assert stream.subscribe(0).rate_hz == 20
+
+
+def test_full_queue_drops_the_oldest_then_downsamples_then_closes():
+    stream = make_stream(queue_size=4, max_downsample_steps=1)
+    sim = StubSim()
+    subscriber = stream.subscribe(200)   # Every 5 ms
+
+    for i in xrange(6 * 5):
+        sim.step(stream)
+    assert subscriber.n_dropped == 2
+    assert list(subscriber.queue) == [11000, 16000, 21000, 26000]   # The newest (snapshots from 1 ms, every 5 ms)
+
+    # A full queue behind -- the rate is halved
+    for i in xrange(2 * 5):
+        sim.step(stream)
+    assert subscriber.n_dropped == 4
+    assert subscriber.rate_hz == 100
+    assert subscriber.interval_usec == 10000
+    assert not subscriber.closed
+
+    # Pulling from the queue resets the overflow count
+    assert len(subscriber.get(0)) == 4
+    for i in xrange(4 * 10):
+        sim.step(stream)
+    assert subscriber.n_dropped == 4 and not subscriber.closed
+
+    # Another full queue behind, with no more downsampling allowed -- cut off
+    for i in xrange(4 * 10):
+        sim.step(stream)
+    assert subscriber.n_dropped == 8
+    assert subscriber.closed
+    n_queued = len(subscriber.queue)
+    sim.step(stream, 20000)
+    assert len(subscriber.queue) == n_queued
+
+
+def test_snapshots_start_from_zero_after_a_reset(make_sim):
+    sim = make_sim()
+    stream = TelemetryStream(sim.config.telemetry)
+    sim.add_step_listener(stream)
+    subscriber = stream.subscribe(100)
+
+    for run in xrange(2):
+        for i in xrange(200):   # 1 s
+            sim.step(sim.fixed_timestep_usec)
+        times = [snapshot['elapsed_time_usec'] for snapshot in subscriber.get(0)]
+        assert times[0] == sim.fixed_timestep_usec  # The first step's snapshot, on both runs
+        assert len(times) == 100
+        sim.reset()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+
+# Sensor csv files written on a background thread (see telemetry_sink.py)
+
+import os
+import gc
+import weakref
+import threading
+
+from conftest import ROOT, end_run
+from sensors import SensorCsvWriter
+
+
+def run(sim, n_steps, push_at=100):
+    for i in xrange(n_steps):
+        if i == push_at:
+            sim.pusher.start_push()
+        sim.step(sim.fixed_timestep_usec)
+
+
+def csv_files(path):
+    return sorted(name for name in os.listdir(path) if name.endswith('.csv'))
+
+
+def read(path, name):
+    with open(os.path.join(path, name), 'rb') as f:
+        return f.read()
+
+
+def close_csv_writers(sim):
+    """ SensorCsvWriter's files are only closed when it's garbage collected """
+    for sensor in sim.sensors.values():
+        for s in (sensor if isinstance(sensor, list) else [sensor]):
+            for listener in s.step_listeners:
+                if isinstance(listener, SensorCsvWriter):
+                    listener.gen.close()
+
+
+def pod_writer(sim):
+    return [writer for writer in sim.telemetry_sink.writers if writer.output_filename.endswith('pod.csv')][0]
+
+
+def test_csv_files_match_the_sensor_csv_writer(make_sim):
+    async_sim = make_sim({'telemetry_sink': {'enabled': True, 'batch_size': 7}})
+    sync_sim = make_sim({'telemetry_sink': {'enabled': False}})
+    assert async_sim.telemetry_sink is not None and sync_sim.telemetry_sink is None
+
+    for sim in (async_sim, sync_sim):
+        run(sim, 1000)
+        end_run(sim)
+    close_csv_writers(sync_sim)
+
+    names = csv_files(sync_sim.config.working_dir)
+    assert 'pod.csv' in names and 'pusher.csv' in names
+    assert csv_files(async_sim.config.working_dir) == names
+    for name in names:
+        assert read(async_sim.config.working_dir, name) == read(sync_sim.config.working_dir, name), name
+
+
+def test_dropped_samples_are_counted(make_sim):
+    sim = make_sim({'telemetry_sink': {'enabled': True, 'batch_size': 10, 'queue_size': 1, 'when_full': 'drop'},
+                    'archive': {'enabled': False}})
+    sink = sim.telemetry_sink
+    writer = pod_writer(sim)
+
+    run(sim, 50)
+    sink.wait()
+
+    # Stall the writer thread so that the queue fills up
+    stalled = threading.Event()
+    gate = threading.Event()
+    def stall():
+        stalled.set()
+        gate.wait(10.0)
+    sink.call(stall)
+    assert stalled.wait(10.0)
+    run(sim, 500)
+    gate.set()
+    sink.wait()     # Note: or the last partial batches may be dropped too
+    end_run(sim)
+
+    # One batch fit in the queue; the rest of the stalled steps' samples (one per step) were dropped
+    assert writer.n_dropped == 490
+    assert sink.n_dropped >= 49
+    lines = read(sim.config.working_dir, 'pod.csv').splitlines()
+    assert lines[0].startswith('t_usec')
+    assert len(lines) - 1 == sim.sensors['pod'].n_samples - writer.n_dropped
+
+
+def test_reset_reopens_the_files_in_the_new_working_dir(make_sim, tmpdir):
+    sim = make_sim({'telemetry_sink': {'enabled': True}})
+    first_dir = sim.config.working_dir
+    run(sim, 300)
+    end_run(sim)
+    first = read(first_dir, 'pod.csv')
+
+    second_dir = str(tmpdir.join('second'))
+    sim.reset(working_dir=second_dir)
+    run(sim, 200)
+    end_run(sim)
+
+    assert read(first_dir, 'pod.csv') == first   # Left alone
+    assert len(first.splitlines()) == 301
+    second = read(second_dir, 'pod.csv').splitlines()
+    assert len(second) == 201
+    assert second[0] == first.splitlines()[0]
+    assert second[1] == first.splitlines()[1]    # From the start again
+    assert csv_files(second_dir) == csv_files(first_dir)
+
+
+def sink_threads():
+    return [t for t in threading.enumerate() if t.name == 'TelemetrySink' and t.is_alive()]
+
+
+def test_closed_sims_stop_their_writer_threads(tmpdir, monkeypatch):
+    from sim import Sim
+    from config_compiler import overlay_config
+
+    monkeypatch.chdir(ROOT)
+    n_threads = len(sink_threads())
+    refs = []
+    for i in xrange(3):
+        config = Sim.load_config_files([os.path.join(ROOT, 'conf', 'sim_config.yaml')])
+        overlay_config(config, {'fcu': {'enabled': False}})
+        sim = Sim(config, str(tmpdir.join('sim{}'.format(i))))
+        run(sim, 200)
+        end_run(sim)
+        sim.close()
+        sim.close()  # Closing twice is fine
+        refs.append(weakref.ref(sim))
+        del sim
+
+    assert len(sink_threads()) == n_threads
+    gc.collect()
+    assert [ref() for ref in refs] == [None, None, None]
+
+
+def test_closing_ends_the_run(make_sim):
+    sim = make_sim()
+    run(sim, 200)
+    sim.close()
+    assert sim.is_ended
+    assert not sim.telemetry_sink.thread.is_alive()
+    # The files are complete
+    with open(pod_writer(sim).output_filename, 'rb') as f:
+        assert len(f.read().splitlines()) == 1 + 200